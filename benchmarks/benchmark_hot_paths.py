@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Benchmark harness for the OGIM integration and consolidation "hot paths".
+
+Each benchmark case runs one function from our `functions` folder on a
+synthetic layer (see synthetic_ogim_data.py) of a given size, in its own
+child process, and records wall time and peak memory for that call only.
+Results can be saved as a baseline and later runs compared against it, so
+we can tell whether a change made a hot path faster or slower. No network
+access or real OGIM source data is needed.
+
+Usage (from the root of the repository)
+---
+    # Run every benchmark at the default scales and print a table
+    python benchmarks/benchmark_hot_paths.py
+
+    # Run selected benchmarks at selected scales, and store as the baseline
+    python benchmarks/benchmark_hot_paths.py --benchmarks wells2sites grid_summarize --scales 10000 100000 --save-baseline
+
+    # Compare a run against the stored baseline (non-zero exit on regression)
+    python benchmarks/benchmark_hot_paths.py --compare
+
+@author: maobrien
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import platform
+import tempfile
+import datetime
+import multiprocessing as mp
+import queue as queue_module
+
+# Paths to this folder and to our helper functions
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FUNCTIONS_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), 'functions')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+
+# =============================================================================
+# Benchmark cases
+# Each case has a `setup` that builds inputs (NOT timed) and a `run` that
+# calls the hot path (timed). `max_rows` caps the scales a case runs at by
+# default, for functions that are far too slow to run at 5M rows today.
+# =============================================================================
+def _setup_integrate_facs(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells
+    return {'gdf': make_wells(n_rows, seed=seed)}
+
+
+def _run_integrate_facs(gdf):
+    from ogimlib import integrate_facs
+    return integrate_facs(gdf,
+                          starting_ids=1,
+                          category='OIL AND NATURAL GAS WELLS',
+                          fac_alias='WELLS',
+                          country='COUNTRY',
+                          state_prov='STATE_PROV',
+                          src_ref_id='SRC_REF_ID',
+                          src_date='SRC_DATE',
+                          on_offshore='ON_OFFSHORE',
+                          fac_name='FAC_NAME',
+                          fac_id='FAC_ID',
+                          fac_type='FAC_TYPE',
+                          spud_date='SPUD_DATE',
+                          comp_date='COMP_DATE',
+                          drill_type='DRILL_TYPE',
+                          fac_status='FAC_STATUS',
+                          op_name='OPERATOR',
+                          fac_latitude='LATITUDE',
+                          fac_longitude='LONGITUDE')
+
+
+def _setup_data_quality_checks(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells
+    return {'gdf': make_wells(n_rows, seed=seed)}
+
+
+def _run_data_quality_checks(gdf):
+    from data_quality_checks import data_quality_checks
+    return data_quality_checks(gdf, starting_ogim_id=1, check_attributes=False)
+
+
+def _setup_assign_offshore_attribute(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells, make_boundary_geoms
+    return {'gdf': make_wells(n_rows, seed=seed),
+            'boundary_geoms': make_boundary_geoms()}
+
+
+def _run_assign_offshore_attribute(gdf, boundary_geoms):
+    from assign_offshore_attribute import assign_offshore_attribute
+    return assign_offshore_attribute(gdf,
+                                     boundary_geoms=boundary_geoms,
+                                     overwrite_onoff_field=True)
+
+
+def _setup_wells2sites(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells
+    return {'gdf': make_wells(n_rows, seed=seed)}
+
+
+def _run_wells2sites(gdf):
+    from wells2sites import wells2sites
+    return wells2sites(gdf, aggreg_funcs={'Join_Count': 'sum'}, radius_m=25)
+
+
+def _setup_grid_summarize(n_rows, seed, workdir):
+    import numpy as np
+    import geopandas as gpd
+    import shapely
+    from synthetic_ogim_data import make_wells, STUDY_AREA
+    # Build a 0.1-degree fishnet over the study area directly, rather than
+    # through gridify(), so only grid_summarize() itself is timed
+    xmin, ymin, xmax, ymax = STUDY_AREA
+    xs = np.arange(xmin, xmax, 0.1)
+    ys = np.arange(ymin, ymax, 0.1)
+    x0, y0 = np.meshgrid(xs, ys)
+    squares = shapely.box(x0.ravel(), y0.ravel(),
+                          x0.ravel() + 0.1, y0.ravel() + 0.1)
+    gridsquares = gpd.GeoDataFrame(geometry=squares, crs='epsg:4326')
+    return {'points': make_wells(n_rows, seed=seed),
+            'gridsquares': gridsquares}
+
+
+def _run_grid_summarize(points, gridsquares):
+    from gridify import grid_summarize
+    return grid_summarize(points, gridsquares,
+                          columndict={'OPERATOR': 'nunique'})
+
+
+def _setup_internal_review_spreadsheet(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells
+    return {'infra_df': make_wells(n_rows, seed=seed),
+            'out_file_name': os.path.join(workdir, 'internal_review.xlsx')}
+
+
+def _run_internal_review_spreadsheet(infra_df, out_file_name):
+    from internal_review_protocol_Excel import create_internal_review_spreadsheet
+    return create_internal_review_spreadsheet(infra_df, out_file_name)
+
+
+def _setup_pipeline_length(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_pipelines
+    return {'gdf': make_pipelines(n_rows, seed=seed)}
+
+
+def _run_pipeline_length(gdf):
+    from ogimlib import calculate_pipeline_length_km
+    return calculate_pipeline_length_km(gdf)
+
+
+def _setup_basin_area(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_basins
+    return {'gdf': make_basins(n_rows, seed=seed)}
+
+
+def _run_basin_area(gdf):
+    from ogimlib import calculate_basin_area_km2
+    return calculate_basin_area_km2(gdf)
+
+
+def _setup_summarize_layer(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_production
+    return {'df': make_production(n_rows, seed=seed)}
+
+
+def _run_summarize_layer(df):
+    from summary_cube import summarize_layer
+    return summarize_layer(df, 'Oil_Natural_Gas_Production')
+
+
+def _setup_src_dates(n_rows, seed, workdir):
+    from synthetic_ogim_data import make_wells, make_data_catalog
+    return {'gdf': make_wells(n_rows, seed=seed),
+            'catalog': make_data_catalog(seed=seed).set_index('SRC_ID')}
+
+
+def _run_src_dates(gdf, catalog):
+    # SRC_DATE lookup as done during consolidation, one call per record
+    from data_consolidation_utils import get_src_date_from_ref_id
+    return [get_src_date_from_ref_id(x, catalog) for x in gdf['SRC_REF_ID']]
+
+
+BENCHMARKS = {
+    'integrate_facs': {'setup': _setup_integrate_facs,
+                       'run': _run_integrate_facs,
+                       'max_rows': 1_000_000},
+    'data_quality_checks': {'setup': _setup_data_quality_checks,
+                            'run': _run_data_quality_checks,
+                            'max_rows': 5_000_000},
+    'assign_offshore_attribute': {'setup': _setup_assign_offshore_attribute,
+                                  'run': _run_assign_offshore_attribute,
+                                  'max_rows': 5_000_000},
+    'wells2sites': {'setup': _setup_wells2sites,
+                    'run': _run_wells2sites,
+                    'max_rows': 1_000_000},
+    'grid_summarize': {'setup': _setup_grid_summarize,
+                       'run': _run_grid_summarize,
+                       'max_rows': 5_000_000},
+    'create_internal_review_spreadsheet': {'setup': _setup_internal_review_spreadsheet,
+                                           'run': _run_internal_review_spreadsheet,
+                                           'max_rows': 1_000_000},
+    'calculate_pipeline_length_km': {'setup': _setup_pipeline_length,
+                                     'run': _run_pipeline_length,
+                                     'max_rows': 5_000_000},
+    'calculate_basin_area_km2': {'setup': _setup_basin_area,
+                                 'run': _run_basin_area,
+                                 'max_rows': 1_000_000},
+    'summarize_layer': {'setup': _setup_summarize_layer,
+                        'run': _run_summarize_layer,
+                        'max_rows': 5_000_000},
+    'get_src_date_from_ref_id': {'setup': _setup_src_dates,
+                                 'run': _run_src_dates,
+                                 'max_rows': 1_000_000},
+}
+
+
+# =============================================================================
+# Running cases
+# =============================================================================
+def _run_case_in_child(name, n_rows, seed, queue):
+    """Target for the child process: set up, run and measure one case."""
+    sys.path.insert(0, BENCHMARK_DIR)
+    sys.path.insert(0, FUNCTIONS_DIR)
+    from data_consolidation_utils import HiddenPrints
+    from run_instrumentation import PeakMemorySampler
+
+    case = BENCHMARKS[name]
+    result = {'benchmark': name, 'n_rows': n_rows, 'status': 'ok'}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            kwargs = case['setup'](n_rows, seed, workdir)
+            with HiddenPrints(), PeakMemorySampler(interval=0.01) as mem:
+                t0 = time.perf_counter()
+                case['run'](**kwargs)
+                result['wall_s'] = time.perf_counter() - t0
+            result['rss_before_mb'] = mem.start_mb
+            result['peak_rss_mb'] = mem.peak_mb
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f'{type(e).__name__}: {e}'
+    queue.put(result)
+
+
+def run_benchmark_case(name, n_rows, seed=0, timeout=None):
+    """Run one benchmark case in a fresh process and return its measurements.
+
+    Parameters
+    ----------
+    name : str
+        Key of the case in `BENCHMARKS`.
+    n_rows : int
+        Number of synthetic rows to generate for the case.
+    seed : int, optional (default 0)
+        Seed for the synthetic data generator.
+    timeout : float, optional (default None)
+        Seconds to wait for the case before giving up on it. With None, the
+        case can run for as long as it needs.
+
+    Returns
+    -------
+    result : dict
+        'benchmark', 'n_rows', 'status', and if successful, 'wall_s',
+        'rss_before_mb' and 'peak_rss_mb'. 'status' is 'timeout' if the
+        case ran out of time, or 'crashed' (with the exit code in 'error')
+        if its process died without reporting a result, e.g. when it was
+        killed for running out of memory.
+
+    """
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case_in_child,
+                       args=(name, n_rows, seed, queue))
+    proc.start()
+    start = time.monotonic()
+    result = None
+    # Poll the queue rather than blocking on it, so a child that dies
+    # without putting a result doesn't hang the whole run
+    while result is None:
+        try:
+            result = queue.get(timeout=1)
+        except queue_module.Empty:
+            if timeout is not None and time.monotonic() - start > timeout:
+                proc.terminate()
+                result = {'benchmark': name, 'n_rows': n_rows, 'status': 'timeout'}
+            elif not proc.is_alive():
+                # The result may have been put just before the process exited
+                try:
+                    result = queue.get(timeout=1)
+                except queue_module.Empty:
+                    result = {'benchmark': name, 'n_rows': n_rows, 'status': 'crashed',
+                              'error': f'exit code {proc.exitcode}'}
+    proc.join()
+    return result
+
+
+def run_benchmarks(names=None, scales=None, seed=0, ignore_max_rows=False,
+                   timeout=None):
+    """Run a set of benchmark cases and return a list of result dicts.
+
+    Parameters
+    ----------
+    names : list of str, optional
+        Benchmarks to run; default is every key in `BENCHMARKS`.
+    scales : list of int, optional
+        Row counts to run each benchmark at; default is `DEFAULT_SCALES`.
+    seed : int, optional (default 0)
+        Seed for the synthetic data generator.
+    ignore_max_rows : bool, optional (default False)
+        If True, run cases even above a benchmark's `max_rows` cap.
+    timeout : float, optional (default None)
+        Seconds to wait for each case before giving up on it.
+
+    Returns
+    -------
+    results : list of dict
+        One entry per (benchmark, scale), in the order they ran.
+
+    """
+    names = names or list(BENCHMARKS.keys())
+    scales = scales or DEFAULT_SCALES
+    results = []
+    for name in names:
+        for n_rows in scales:
+            if not ignore_max_rows and n_rows > BENCHMARKS[name]['max_rows']:
+                results.append({'benchmark': name, 'n_rows': n_rows,
+                                'status': 'skipped'})
+                continue
+            print(f'{datetime.datetime.now():%H:%M:%S}  {name} @ {n_rows:,} rows...')
+            result = run_benchmark_case(name, n_rows, seed=seed,
+                                        timeout=timeout)
+            results.append(result)
+            if result['status'] == 'ok':
+                peak = result['peak_rss_mb']
+                peak = f'{peak:.0f} MB' if peak is not None else 'unavailable'
+                print(f'    {result["wall_s"]:.2f} s, peak RSS {peak}')
+            else:
+                print(f'    {result["status"]} {result.get("error", "")}')
+    return results
+
+
+# =============================================================================
+# Baselines
+# =============================================================================
+def _case_key(result):
+    return f'{result["benchmark"]}|{result["n_rows"]}'
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    """Write benchmark results, plus machine info, to a JSON baseline file."""
+    baseline = {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                'machine': {'platform': platform.platform(),
+                            'python': platform.python_version(),
+                            'processor': platform.processor(),
+                            'cpu_count': os.cpu_count()},
+                'results': {_case_key(r): r for r in results
+                            if r['status'] == 'ok'}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+    print(f'Baseline with {len(baseline["results"])} case(s) saved to {path}')
+
+
+def compare_to_baseline(results, path=DEFAULT_BASELINE, tolerance=0.2):
+    """Compare benchmark results against a stored baseline.
+
+    Parameters
+    ----------
+    results : list of dict
+        Output of `run_benchmarks`.
+    path : str, optional
+        Path to the baseline JSON written by `save_baseline`.
+    tolerance : float, optional (default 0.2)
+        Fractional slowdown (or memory increase) allowed before a case is
+        flagged as a regression; 0.2 means 20% worse than baseline.
+
+    Returns
+    -------
+    comparison : list of dict
+        One entry per case present in both `results` and the baseline, with
+        the time and memory ratios (current / baseline) and a 'regression'
+        flag.
+
+    """
+    with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    comparison = []
+    for r in results:
+        key = _case_key(r)
+        if r['status'] != 'ok' or key not in baseline:
+            continue
+        base = baseline[key]
+        time_ratio = r['wall_s'] / base['wall_s'] if base['wall_s'] else None
+        mem_ratio = None
+        if r.get('peak_rss_mb') and base.get('peak_rss_mb'):
+            mem_ratio = r['peak_rss_mb'] / base['peak_rss_mb']
+        regression = any(x is not None and x > 1 + tolerance
+                         for x in [time_ratio, mem_ratio])
+        comparison.append({'benchmark': r['benchmark'],
+                           'n_rows': r['n_rows'],
+                           'wall_s': r['wall_s'],
+                           'baseline_wall_s': base['wall_s'],
+                           'time_ratio': time_ratio,
+                           'peak_rss_mb': r.get('peak_rss_mb'),
+                           'baseline_peak_rss_mb': base.get('peak_rss_mb'),
+                           'memory_ratio': mem_ratio,
+                           'regression': regression})
+    return comparison
+
+
+def _print_comparison(comparison):
+    print('=' * 78)
+    print(f'{"benchmark":<36}{"rows":>10}{"time x":>10}{"memory x":>10}')
+    print('=' * 78)
+    for c in comparison:
+        t = f'{c["time_ratio"]:.2f}' if c['time_ratio'] is not None else '-'
+        m = f'{c["memory_ratio"]:.2f}' if c['memory_ratio'] is not None else '-'
+        flag = '  <-- REGRESSION' if c['regression'] else ''
+        print(f'{c["benchmark"]:<36}{c["n_rows"]:>10,}{t:>10}{m:>10}{flag}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS),
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--scales', nargs='+', type=int,
+                        help='row counts to run at (default: 10000 100000 1000000 5000000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ignore-max-rows', action='store_true',
+                        help='run cases above each benchmark\'s row cap')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='seconds to allow each case')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='path to the baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store this run as the new baseline')
+    parser.add_argument('--compare', action='store_true',
+                        help='compare this run against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--output', help='also write raw results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.benchmarks, args.scales, seed=args.seed,
+                             ignore_max_rows=args.ignore_max_rows,
+                             timeout=args.timeout)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+    if args.compare:
+        comparison = compare_to_baseline(results, args.baseline,
+                                         tolerance=args.tolerance)
+        _print_comparison(comparison)
+        if any(c['regression'] for c in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Seeded generator of synthetic OGIM layers, for benchmarking the OGIM
+integration and consolidation "hot paths" without any of our real source
+data or network access.
+
+Every layer produced here mimics the OGIM schema (see `schema_WELLS`,
+`schema_PIPELINES`, `schema_BASINS` and `schema_OIL_GAS_PROD` in ogimlib),
+including our standard missing-data markers ('N/A', -999, '1900-01-01'),
+so that the functions being benchmarked exercise the same code paths they
+do during a real consolidation run. The same `seed` and `n_rows` always
+produce identical layers.
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+# Missing-data markers, identical to those defined in ogimlib
+NULL_STRING = 'N/A'
+NULL_NUMERIC = -999
+NULL_DATE = '1900-01-01'
+
+# Extent of the synthetic "study area" (lon/lat, EPSG:4326). The western
+# quarter of this box is treated as offshore in the synthetic boundaries.
+STUDY_AREA = (-110.0, 28.0, -94.0, 40.0)
+OFFSHORE_FRACTION = 0.25
+
+COUNTRIES = ['UNITED STATES OF AMERICA', 'MEXICO', 'CANADA']
+STATES = ['TEXAS', 'NEW MEXICO', 'OKLAHOMA', 'COLORADO', 'KANSAS', 'UTAH',
+          'WYOMING', 'NORTH DAKOTA', 'COAHUILA', 'NUEVO LEON', 'TAMAULIPAS',
+          'ALBERTA']
+WELL_TYPES = ['OIL', 'GAS', 'OIL AND GAS', 'INJECTION', 'DISPOSAL',
+              'DRY HOLE', NULL_STRING]
+WELL_STATUSES = ['ACTIVE', 'PRODUCING', 'SHUT-IN', 'PLUGGED AND ABANDONED',
+                 'TEMPORARILY ABANDONED', 'PERMITTED', 'UNKNOWN', NULL_STRING]
+DRILL_TYPES = ['VERTICAL', 'HORIZONTAL', 'DIRECTIONAL', NULL_STRING]
+COMMODITIES = ['OIL', 'GAS', 'CRUDE OIL', 'NATURAL GAS', 'NGL', NULL_STRING]
+PIPE_MATERIALS = ['STEEL', 'PLASTIC', 'CAST IRON', NULL_STRING]
+RESERVOIR_TYPES = ['CONVENTIONAL', 'SHALE', 'TIGHT', NULL_STRING]
+SRC_TYPES = ['GOVERNMENT', 'ACADEMIC', 'NGO', 'COMPANY', 'NEWS']
+UPDATE_FREQS = ['DAILY', 'WEEKLY', 'MONTHLY', 'QUARTERLY', 'ANNUALLY',
+                'IRREGULAR']
+
+
+def _rng(seed):
+    """Return a NumPy random Generator for `seed`."""
+    return np.random.default_rng(seed)
+
+
+def _random_choice_with_nulls(rng, values, n, null_fraction=0.1,
+                              null_value=NULL_STRING):
+    """Draw `n` values from `values`, replacing a fraction with a null marker."""
+    out = rng.choice(np.array(values, dtype=object), size=n)
+    out[rng.random(n) < null_fraction] = null_value
+    return out
+
+
+def _random_dates(rng, n, start_year=1920, end_year=2024, null_fraction=0.2):
+    """Return `n` 'YYYY-MM-DD' strings, with a fraction set to NULL_DATE."""
+    start = np.datetime64(f'{start_year}-01-01')
+    span = (np.datetime64(f'{end_year}-12-31') - start).astype(int)
+    days = rng.integers(0, span, size=n)
+    dates = (start + days.astype('timedelta64[D]')).astype(str).astype(object)
+    dates[rng.random(n) < null_fraction] = NULL_DATE
+    return dates
+
+
+def _random_operators(rng, n, n_operators=2000):
+    """Return `n` operator names drawn from a skewed pool of spellings."""
+    base = np.array([f'OPERATOR {i:04d}' for i in range(n_operators)],
+                    dtype=object)
+    suffixes = np.array(['', ' LLC', ' INC', ' INC.', ', LLC', ' CORP',
+                         ' OPERATING LLC', ' CO'], dtype=object)
+    # A Zipf-like distribution, so a few operators own most of the wells
+    ix = np.minimum(rng.zipf(1.3, size=n) - 1, n_operators - 1)
+    ops = base[ix] + suffixes[rng.integers(0, len(suffixes), size=n)]
+    ops[rng.random(n) < 0.05] = NULL_STRING
+    return ops
+
+
+def _random_lon_lat(rng, n, clustered=True):
+    """Return lon/lat arrays within STUDY_AREA, optionally clustered into plays."""
+    xmin, ymin, xmax, ymax = STUDY_AREA
+    if not clustered:
+        return rng.uniform(xmin, xmax, n), rng.uniform(ymin, ymax, n)
+
+    # Real wells are concentrated in a few dozen plays; mimic that with a
+    # Gaussian mixture plus a uniform background of scattered wells
+    n_clusters = 40
+    centers_x = rng.uniform(xmin + 1, xmax - 1, n_clusters)
+    centers_y = rng.uniform(ymin + 1, ymax - 1, n_clusters)
+    spread = rng.uniform(0.05, 0.6, n_clusters)
+    which = rng.integers(0, n_clusters, size=n)
+    lon = rng.normal(centers_x[which], spread[which])
+    lat = rng.normal(centers_y[which], spread[which])
+    background = rng.random(n) < 0.1
+    lon[background] = rng.uniform(xmin, xmax, background.sum())
+    lat[background] = rng.uniform(ymin, ymax, background.sum())
+    return np.clip(lon, xmin, xmax), np.clip(lat, ymin, ymax)
+
+
+def make_boundary_geoms(n_cols=8, n_rows=6):
+    """Create synthetic land and marine boundary polygons covering STUDY_AREA.
+
+    The output mimics `marine_and_land_boundaries_seamless.shp`: each polygon
+    carries a `SOVEREIGN1` (country name) and an `ON_OFF` value, so it can be
+    passed directly to `assign_offshore_attribute` and
+    `assign_countries_to_feature`. A `name` column (state/province) is also
+    included for use with `assign_stateprov_to_feature`.
+
+    Parameters
+    ----------
+    n_cols : int, optional (default 8)
+        Number of polygon columns across the study area.
+    n_rows : int, optional (default 6)
+        Number of polygon rows across the study area.
+
+    Returns
+    -------
+    boundaries : GeoDataFrame
+        Polygon layer in EPSG:4326.
+
+    """
+    xmin, ymin, xmax, ymax = STUDY_AREA
+    xs = np.linspace(xmin, xmax, n_cols + 1)
+    ys = np.linspace(ymin, ymax, n_rows + 1)
+    x0, y0 = np.meshgrid(xs[:-1], ys[:-1])
+    x1, y1 = np.meshgrid(xs[1:], ys[1:])
+    geoms = shapely.box(x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel())
+
+    offshore_x = xmin + (xmax - xmin) * OFFSHORE_FRACTION
+    centroids_x = (x0.ravel() + x1.ravel()) / 2
+    on_off = np.where(centroids_x < offshore_x, 'OFFSHORE', 'ONSHORE')
+    # Assign countries in horizontal bands, states cell by cell
+    row_ix = np.repeat(np.arange(n_rows), n_cols)
+    country = np.array(COUNTRIES)[row_ix * len(COUNTRIES) // n_rows]
+    state = np.array(STATES)[np.arange(len(geoms)) % len(STATES)]
+
+    boundaries = gpd.GeoDataFrame({'SOVEREIGN1': country,
+                                   'name': state,
+                                   'ON_OFF': on_off},
+                                  geometry=geoms,
+                                  crs='epsg:4326')
+    return boundaries
+
+
+def make_wells(n_rows, seed=0, starting_id=1):
+    """Create a synthetic OGIM wells layer (schema_WELLS) with `n_rows` points.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of well records to generate.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+    starting_id : int, optional (default 1)
+        First OGIM_ID value.
+
+    Returns
+    -------
+    wells : GeoDataFrame
+        Point layer in EPSG:4326.
+
+    """
+    rng = _rng(seed)
+    lon, lat = _random_lon_lat(rng, n_rows)
+    state_ix = rng.integers(0, len(STATES), size=n_rows)
+    api = rng.integers(0, 10**10, size=n_rows)
+
+    wells = pd.DataFrame({
+        'OGIM_ID': np.arange(starting_id, starting_id + n_rows),
+        'CATEGORY': 'OIL AND NATURAL GAS WELLS',
+        'COUNTRY': rng.choice(COUNTRIES, size=n_rows, p=[0.8, 0.1, 0.1]),
+        'STATE_PROV': np.array(STATES, dtype=object)[state_ix],
+        'SRC_REF_ID': rng.integers(1, 300, size=n_rows).astype(str),
+        'SRC_DATE': _random_dates(rng, n_rows, 2020, 2024, 0.0),
+        'ON_OFFSHORE': rng.choice(['ONSHORE', 'OFFSHORE'], size=n_rows,
+                                  p=[0.95, 0.05]),
+        'FAC_NAME': _random_choice_with_nulls(
+            rng, [f'WELL {i}' for i in range(5000)], n_rows, 0.15),
+        'FAC_ID': np.char.zfill(api.astype(str), 10).astype(object),
+        'FAC_TYPE': _random_choice_with_nulls(rng, WELL_TYPES, n_rows),
+        'DRILL_TYPE': _random_choice_with_nulls(rng, DRILL_TYPES, n_rows),
+        'SPUD_DATE': _random_dates(rng, n_rows),
+        'COMP_DATE': _random_dates(rng, n_rows),
+        'FAC_STATUS': _random_choice_with_nulls(rng, WELL_STATUSES, n_rows),
+        'OGIM_STATUS': _random_choice_with_nulls(rng, WELL_STATUSES, n_rows),
+        'OPERATOR': _random_operators(rng, n_rows),
+        'LATITUDE': lat,
+        'LONGITUDE': lon,
+    })
+    wells = gpd.GeoDataFrame(wells,
+                             geometry=gpd.points_from_xy(lon, lat),
+                             crs='epsg:4326')
+    return wells
+
+
+def make_pipelines(n_rows, seed=0, starting_id=1, max_vertices=20):
+    """Create a synthetic OGIM pipelines layer (schema_PIPELINES).
+
+    Each pipeline is a random walk of 2 to `max_vertices` vertices, with
+    step lengths similar to real gathering and transmission lines.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of pipeline records to generate.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+    starting_id : int, optional (default 1)
+        First OGIM_ID value.
+    max_vertices : int, optional (default 20)
+        Maximum number of vertices in any one pipeline.
+
+    Returns
+    -------
+    pipelines : GeoDataFrame
+        LineString layer in EPSG:4326.
+
+    """
+    rng = _rng(seed + 1)
+    xmin, ymin, xmax, ymax = STUDY_AREA
+    n_vertices = rng.integers(2, max_vertices + 1, size=n_rows)
+    total = int(n_vertices.sum())
+    line_ix = np.repeat(np.arange(n_rows), n_vertices)
+
+    start_lon, start_lat = _random_lon_lat(rng, n_rows)
+    steps = rng.normal(0, 0.02, size=(total, 2))
+    # The first vertex of each line gets no step, so it starts on its origin
+    first_vertex = np.r_[0, np.cumsum(n_vertices)[:-1]]
+    steps[first_vertex] = 0
+    walk = np.cumsum(steps, axis=0)
+    # Remove the running offset accumulated by previous lines
+    walk -= np.repeat(walk[first_vertex], n_vertices, axis=0)
+    coords = np.column_stack([np.repeat(start_lon, n_vertices) + walk[:, 0],
+                              np.repeat(start_lat, n_vertices) + walk[:, 1]])
+    coords[:, 0] = np.clip(coords[:, 0], xmin, xmax)
+    coords[:, 1] = np.clip(coords[:, 1], ymin, ymax)
+    geoms = shapely.linestrings(coords, indices=line_ix)
+
+    diameter = rng.choice([2, 4, 6, 8, 12, 16, 20, 24, 30, 36, 42],
+                          size=n_rows) * 25.4
+    diameter[rng.random(n_rows) < 0.3] = NULL_NUMERIC
+
+    pipelines = pd.DataFrame({
+        'OGIM_ID': np.arange(starting_id, starting_id + n_rows),
+        'CATEGORY': 'OIL AND NATURAL GAS PIPELINES',
+        'COUNTRY': rng.choice(COUNTRIES, size=n_rows, p=[0.8, 0.1, 0.1]),
+        'STATE_PROV': rng.choice(np.array(STATES, dtype=object), size=n_rows),
+        'SRC_REF_ID': rng.integers(1, 300, size=n_rows).astype(str),
+        'SRC_DATE': _random_dates(rng, n_rows, 2020, 2024, 0.0),
+        'ON_OFFSHORE': rng.choice(['ONSHORE', 'OFFSHORE'], size=n_rows,
+                                  p=[0.9, 0.1]),
+        'FAC_NAME': _random_choice_with_nulls(
+            rng, ['Gas', 'Oil', 'Untitled Path', 'MAINLINE A', 'LATERAL 12',
+                  '12" GATHERING LINE', 'TRUNKLINE'], n_rows, 0.2),
+        'FAC_ID': _random_choice_with_nulls(
+            rng, [f'PL-{i}' for i in range(10000)], n_rows, 0.4),
+        'FAC_TYPE': _random_choice_with_nulls(
+            rng, ['GATHERING', 'TRANSMISSION', 'DISTRIBUTION'], n_rows),
+        'FAC_STATUS': _random_choice_with_nulls(
+            rng, ['OPERATING', 'ABANDONED', 'PROPOSED'], n_rows),
+        'OPERATOR': _random_operators(rng, n_rows, 500),
+        'INSTALL_DATE': _random_dates(rng, n_rows, 1950, 2024, 0.6),
+        'COMMODITY': _random_choice_with_nulls(rng, COMMODITIES, n_rows),
+        'LIQ_CAPACITY_BPD': NULL_NUMERIC,
+        'LIQ_THROUGHPUT_BPD': NULL_NUMERIC,
+        'GAS_CAPACITY_MMCFD': NULL_NUMERIC,
+        'GAS_THROUGHPUT_MMCFD': NULL_NUMERIC,
+        'PIPE_DIAMETER_MM': diameter,
+        'PIPE_LENGTH_KM': NULL_NUMERIC,
+        'PIPE_MATERIAL': _random_choice_with_nulls(rng, PIPE_MATERIALS, n_rows),
+    })
+    pipelines = gpd.GeoDataFrame(pipelines, geometry=geoms, crs='epsg:4326')
+    return pipelines
+
+
+def make_basins(n_rows, seed=0, starting_id=1, n_vertices=32):
+    """Create a synthetic OGIM basins/fields layer (schema_BASINS).
+
+    Each basin is a star-shaped polygon with `n_vertices` vertices, built
+    from jittered radii around a random centre.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of basin polygons to generate.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+    starting_id : int, optional (default 1)
+        First OGIM_ID value.
+    n_vertices : int, optional (default 32)
+        Number of vertices in each polygon's exterior ring.
+
+    Returns
+    -------
+    basins : GeoDataFrame
+        Polygon layer in EPSG:4326.
+
+    """
+    rng = _rng(seed + 2)
+    cx, cy = _random_lon_lat(rng, n_rows, clustered=False)
+    radius = rng.uniform(0.02, 1.5, size=n_rows)
+    angles = np.linspace(0, 2 * np.pi, n_vertices, endpoint=False)
+    jitter = rng.uniform(0.6, 1.0, size=(n_rows, n_vertices))
+    xs = cx[:, None] + radius[:, None] * jitter * np.cos(angles)
+    ys = cy[:, None] + radius[:, None] * jitter * np.sin(angles)
+    # Close each ring by repeating its first vertex
+    xs = np.column_stack([xs, xs[:, 0]])
+    ys = np.column_stack([ys, ys[:, 0]])
+    geoms = shapely.polygons(np.stack([xs, ys], axis=-1))
+
+    basins = pd.DataFrame({
+        'OGIM_ID': np.arange(starting_id, starting_id + n_rows),
+        'CATEGORY': 'OIL AND NATURAL GAS FIELDS',
+        'COUNTRY': rng.choice(COUNTRIES, size=n_rows),
+        'STATE_PROV': rng.choice(np.array(STATES, dtype=object), size=n_rows),
+        'SRC_REF_ID': rng.integers(1, 300, size=n_rows).astype(str),
+        'SRC_DATE': _random_dates(rng, n_rows, 2020, 2024, 0.0),
+        'ON_OFFSHORE': rng.choice(['ONSHORE', 'OFFSHORE'], size=n_rows),
+        'NAME': _random_choice_with_nulls(
+            rng, [f'FIELD {i}' for i in range(20000)], n_rows, 0.1),
+        'RESERVOIR_TYPE': _random_choice_with_nulls(rng, RESERVOIR_TYPES,
+                                                    n_rows),
+        'OPERATOR': _random_operators(rng, n_rows, 300),
+        'AREA_KM2': NULL_NUMERIC,
+    })
+    basins = gpd.GeoDataFrame(basins, geometry=geoms, crs='epsg:4326')
+    return basins
+
+
+def make_production(n_rows, seed=0, starting_id=1, prod_year=2022):
+    """Create a synthetic OGIM production layer (schema_OIL_GAS_PROD).
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of well-level production records to generate.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+    starting_id : int, optional (default 1)
+        First OGIM_ID value.
+    prod_year : int, optional (default 2022)
+        Value written to the PROD_YEAR attribute.
+
+    Returns
+    -------
+    production : GeoDataFrame
+        Point layer in EPSG:4326.
+
+    """
+    wells = make_wells(n_rows, seed=seed + 3, starting_id=starting_id)
+    rng = _rng(seed + 3)
+
+    def _volumes(scale, zero_fraction):
+        vol = rng.lognormal(mean=np.log(scale), sigma=1.5, size=n_rows)
+        vol[rng.random(n_rows) < zero_fraction] = 0
+        return np.round(vol, 2)
+
+    production = wells.drop(columns=['OGIM_STATUS'])
+    production['OIL_BBL'] = _volumes(2000, 0.3)
+    production['GAS_MCF'] = _volumes(20000, 0.2)
+    production['WATER_BBL'] = _volumes(5000, 0.4)
+    production['CONDENSATE_BBL'] = _volumes(200, 0.9)
+    production['PROD_DAYS'] = rng.integers(0, 366, size=n_rows)
+    production['PROD_YEAR'] = prod_year
+    production['ENTITY_TYPE'] = 'WELL'
+    production['CATEGORY'] = 'OIL AND NATURAL GAS PRODUCTION'
+    return production
+
+
+def make_data_catalog(src_ids=None, seed=0):
+    """Create a synthetic Data Catalog matching `ogim_standalone_source_table.xlsx`.
+
+    Parameters
+    ----------
+    src_ids : list of str, optional
+        SRC_ID values to include. The default is '1' through '299', which
+        covers every SRC_REF_ID written by the layer generators above.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+
+    Returns
+    -------
+    catalog : DataFrame
+        One row per SRC_ID.
+
+    """
+    rng = _rng(seed + 4)
+    if src_ids is None:
+        src_ids = [str(i) for i in range(1, 300)]
+    n = len(src_ids)
+
+    catalog = pd.DataFrame({
+        'SRC_ID': src_ids,
+        'SRC_NAME': [f'SYNTHETIC SOURCE {s}' for s in src_ids],
+        'SRC_ALIAS': [f'SRC{s}' for s in src_ids],
+        'SRC_TYPE': rng.choice(SRC_TYPES, size=n),
+        'PUB_PRIV': rng.choice(['PUBLIC', 'PRIVATE'], size=n, p=[0.9, 0.1]),
+        'SRC_YEAR': rng.integers(2015, 2025, size=n),
+        'SRC_MNTH': rng.integers(1, 13, size=n).astype(float),
+        'SRC_DAY': rng.integers(1, 29, size=n).astype(float),
+        'UPDATE_FREQ': rng.choice(UPDATE_FREQS, size=n),
+        'LASTVISIT': _random_dates(rng, n, 2023, 2024, 0.0),
+        'REGION': 'NORTH AMERICA',
+        'COUNTRY': rng.choice(COUNTRIES, size=n),
+        'STATE_PROV': rng.choice(STATES, size=n),
+        'FAC_CATEGORY': rng.choice(['WELLS', 'PIPELINES', 'FIELDS',
+                                    'PRODUCTION'], size=n),
+        'SRC_URL': [f'https://example.org/source/{s}' for s in src_ids],
+        'DOWNLOAD_INSTRUCTIONS': NULL_STRING,
+        'FILE_NAME': [f'source_{s}.geojson' for s in src_ids],
+        'ORIGINAL_CRS': 'EPSG:4326',
+        'NOTES': np.nan,
+    })
+    return catalog
+
+
+def make_all_layers(n_rows, seed=0):
+    """Create every synthetic layer at a given scale.
+
+    Wells and production are generated at `n_rows`; pipelines at a tenth,
+    and basins at a hundredth of that (minimum 100), which is roughly the
+    ratio seen in the North America OGIM release.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of well records; other layers are scaled from this.
+    seed : int, optional (default 0)
+        Seed for the random number generator.
+
+    Returns
+    -------
+    layers : dict
+        Keys 'wells', 'pipelines', 'basins', 'production', 'catalog' and
+        'boundaries'.
+
+    """
+    layers = {'wells': make_wells(n_rows, seed=seed),
+              'pipelines': make_pipelines(max(n_rows // 10, 100), seed=seed),
+              'basins': make_basins(max(n_rows // 100, 100), seed=seed),
+              'production': make_production(n_rows, seed=seed),
+              'catalog': make_data_catalog(seed=seed),
+              'boundaries': make_boundary_geoms()}
+    return layers
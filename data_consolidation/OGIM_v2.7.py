@@ -33,6 +33,7 @@ from data_quality_checks import data_quality_checks
 from standardize_countries import standardize_countries, add_region_column
 from assign_offshore_attribute import assign_offshore_attribute
 from assign_countries_to_feature_2 import assign_countries_to_feature, assign_stateprov_to_feature
+from excel_cache import read_excel_cached
 
 # !!! PARAMETERS TO EDIT before running this script !!!
 # -----------------------------------------------------------------------------
@@ -112,7 +113,7 @@ my_state_geoms = gpd.read_file(path_to_state_geoms)
 # %% Load OGIM standalone data catalog; format properly
 # =============================================================================
 fp2 = r"Public_Data\data\OGIM_Data_Catalog.xlsx"
-catalog = pd.read_excel(fp2, sheet_name='source_table')  # ignore warning msg about Data Validation
+catalog = read_excel_cached(fp2, sheet_name='source_table')  # ignore warning msg about Data Validation
 
 catalog = format_data_catalog(catalog)
 
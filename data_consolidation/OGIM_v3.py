@@ -29,6 +29,11 @@ from data_quality_checks import data_quality_checks
 from standardize_countries import standardize_countries, add_region_column
 from assign_offshore_attribute import assign_offshore_attribute
 from abbreviation_utils import *
+from run_instrumentation import RunProfiler
+from ogim_dtypes import (apply_dtype_policy, to_export_dtypes, remap_values, replace_missing_dates,
+                         NULL_STRING)
+from excel_cache import read_excel_cached
+import ogimlib
 # from hybridization import get_uniques
 
 # -----------------------------------------------------------------------------
@@ -45,6 +50,12 @@ countrycsv_fp = 'C:\\Users\\maobrien\\Documents\\GitHub\\ogim-msat\\docs\\UN_cou
 # get string of today's date
 timestr = time.strftime("%Y-%m-%d")
 
+# Record wall time, row counts and peak memory of each consolidation stage.
+# Turn off gdf previews and progress bars printed by ogimlib functions.
+profiler = RunProfiler('OGIM_v3', verbose=True)
+ogimlib.VERBOSE = False
+run_report_fp = final_layers + 'OGIM_v3_run_report_' + timestr + '.json'
+
 # =============================================================================
 # %% Define custom functions
 # =============================================================================
@@ -163,6 +174,12 @@ def replace_missing_strings_with_na(gdf,
             if limit_acceptable_columns == True and column not in acceptable_columns:
                 continue
 
+            elif isinstance(gdf[column].dtype, pd.CategoricalDtype):
+                # Edit only the categories, so the column stays compact
+                missing_upper = set(str(v).upper() for v in possible_missing_values)
+                gdf[column] = remap_values(gdf[column],
+                                           lambda v: NULL_STRING if str(v).upper() in missing_upper else str(v).upper())
+
             else:
                 gdf[column] = gdf[column].astype(str)
                 gdf[column] = gdf[column].str.upper()
@@ -202,7 +219,11 @@ def replace_missing_dates_with_na(gdf, columns2check):
 
         if column in acceptable_columns and column in gdf.columns:
 
-            gdf[column] = gdf[column].replace(possible_missing_values, NULL_DATE)
+            if pd.api.types.is_datetime64_any_dtype(gdf[column]):
+                # Dates already parsed by `apply_dtype_policy`; NaT and sentinel dates are missing
+                gdf[column] = replace_missing_dates(gdf[column])
+            else:
+                gdf[column] = gdf[column].replace(possible_missing_values, NULL_DATE)
 
     return gdf
 
@@ -231,7 +252,7 @@ my_boundary_geoms = gpd.read_file(boundary_geoms)  # may take a while to read in
 # %% Read OGIM standalone data catalog
 # =============================================================================
 fp2 = r"Public_Data\data\ogim_standalone_source_table.xlsx"
-catalog = pd.read_excel(fp2, sheet_name='source_table')  # ignore warning msg about Data Validation
+catalog = read_excel_cached(fp2, sheet_name='source_table')  # ignore warning msg about Data Validation
 
 # Calculate REFRESH_SCORES properly
 catalog = refresh_score(catalog)
@@ -269,7 +290,9 @@ everything = {}
 for kwd, lyr in zip(keywords.keys(), keywords.values()):
     df = read_files_by_keyword(os.getcwd(), 'geojson', kwd)
     if df is not None:
-        everything[lyr] = df
+        # Store low-cardinality strings as categoricals and dates as datetime64
+        # to save memory; `to_export_dtypes` restores plain strings on write
+        everything[lyr] = apply_dtype_policy(df, inplace=True)
 
 print(f'All individual integrated files successfully read in at {str(datetime.datetime.now())}')
 
@@ -285,18 +308,18 @@ for key, df in everything.items():
     everything[key] = everything[key][~everything[key].STATE_PROV.isin(can_provs)]
 
 for key, df in everything.items():
-    everything[key]['STATE_PROV'].replace({' WASHINGTON': 'WASHINGTON',
-                                           'PR': 'PUERTO RICO',
-                                           'GM': 'GUAM',  # despite the fact the proper abbrev is 'GU'...
-                                           'MP': 'NORTHERN MARIANA ISLANDS',
-                                           'VI': 'US VIRGIN ISLANDS'},
-                                          inplace=True)
+    everything[key]['STATE_PROV'] = remap_values(everything[key]['STATE_PROV'],
+                                                 {' WASHINGTON': 'WASHINGTON',
+                                                  'PR': 'PUERTO RICO',
+                                                  'GM': 'GUAM',  # despite the fact the proper abbrev is 'GU'...
+                                                  'MP': 'NORTHERN MARIANA ISLANDS',
+                                                  'VI': 'US VIRGIN ISLANDS'})
 
 wellcols2remove = ['PUB_PRIV', 'ORIGINAL_SRC']
 everything['Oil_and_Natural_Gas_Wells'] = everything['Oil_and_Natural_Gas_Wells'].drop(wellcols2remove, axis=1)
 
-everything['Oil_Natural_Gas_Pipelines']['COUNTRY'].replace({'UNITED STATES ': 'UNITED STATES'},
-                                                           inplace=True)
+everything['Oil_Natural_Gas_Pipelines']['COUNTRY'] = remap_values(everything['Oil_Natural_Gas_Pipelines']['COUNTRY'],
+                                                                   {'UNITED STATES ': 'UNITED STATES'})
 
 # =============================================================================
 # %% Remove stratigraphic test wells and mineral wells
@@ -393,8 +416,10 @@ for layername in keylist:
     gdf['OGIM_ID'] = np.arange(0, len(gdf))
 
     print(f'Beginning data quality checks for {layername}.....\n')
-    # with HiddenPrints():
-    gdf = data_quality_checks(gdf, starting_ogim_id=last_ogim_id + 1)
+    with profiler.stage('data_quality_checks', rows_in=len(gdf), layer=layername) as stage_:
+        with HiddenPrints():
+            gdf = data_quality_checks(gdf, starting_ogim_id=last_ogim_id + 1)
+        stage_.rows_out = len(gdf)
 
     # Advance the OGIM_ID value counter
     last_ogim_id = gdf.OGIM_ID.iloc[-1]
@@ -444,9 +469,9 @@ for layername in keylist:
     print(f'Standardizing status column for {layername}.....\n')
     if 'FAC_STATUS' in gdf.columns:
         if 'wells' in layername.lower():
-            gdf['OGIM_STATUS'] = gdf['FAC_STATUS'].map(wells_status_dict).fillna('Error')
+            gdf['OGIM_STATUS'] = remap_values(gdf['FAC_STATUS'], lambda v: wells_status_dict.get(v, 'Error'))
         else:
-            gdf['OGIM_STATUS'] = gdf['FAC_STATUS'].map(midstream_status_dict).fillna('Error')
+            gdf['OGIM_STATUS'] = remap_values(gdf['FAC_STATUS'], lambda v: midstream_status_dict.get(v, 'Error'))
 
         # get column index of FAC_STATUS column
         loc_of_fac_status = gdf.columns.get_loc('FAC_STATUS')
@@ -461,10 +486,12 @@ for layername in keylist:
     # -----------------------------------------------------------------------------
     # STANDARDIZE COUNTRY NAMES
     gdf.rename(columns={"COUNTRY": "COUNTRY_OLD"}, inplace=True)
-    gdf = standardize_countries(gdf,
-                                'COUNTRY_OLD',
-                                'COUNTRY',
-                                path_to_country_csv=countrycsv_fp)
+    with profiler.stage('standardize_countries', rows_in=len(gdf), layer=layername) as stage_:
+        gdf = standardize_countries(gdf,
+                                    'COUNTRY_OLD',
+                                    'COUNTRY',
+                                    path_to_country_csv=countrycsv_fp)
+        stage_.rows_out = len(gdf)
 
     # Move COUNTRY_NEW column position right next to COUNTRY position
     loc_of_country_col = gdf.columns.get_loc('COUNTRY_OLD')
@@ -481,28 +508,38 @@ for layername in keylist:
     # FILL ON_OFFSHORE COLUMN
     # gdf['ON_OFFSHORE_OLD'] = gdf['ON_OFFSHORE']
 
-    gdf = assign_offshore_attribute(
-        gdf,
-        my_boundary_geoms,
-        overwrite_onoff_field=True)
+    with profiler.stage('assign_offshore_attribute', rows_in=len(gdf), layer=layername) as stage_:
+        gdf = assign_offshore_attribute(
+            gdf,
+            my_boundary_geoms,
+            overwrite_onoff_field=True)
+        stage_.rows_out = len(gdf)
+
+    # Re-apply the compact dtypes to any columns the steps above turned back
+    # into object strings (e.g. COUNTRY, REGION), then render plain strings,
+    # dates and numbers (with 'N/A', '1900-01-01', -999 markers) for export
+    gdf = apply_dtype_policy(gdf, inplace=True)
+    everything[layername] = gdf
 
     # Reset indices
-    gdf_ = gdf.reset_index(drop=True)
+    gdf_ = to_export_dtypes(gdf.reset_index(drop=True))
 
     # -----------------------------------------------------------------------------
     # Write just this layer to a GeoJSON
     print(f'Writing layer {layername} as a geoJSON...')
-    gdf_.to_file(final_layers + layername + ".geojson",
-                 driver="GeoJSON",
-                 encoding="utf-8")
+    with profiler.stage('write_geojson', rows_in=len(gdf_), layer=layername):
+        gdf_.to_file(final_layers + layername + ".geojson",
+                     driver="GeoJSON",
+                     encoding="utf-8")
 
     # -----------------------------------------------------------------------------
     # Add this layer to a GeoPackage
     print('Writing layer ' + layername + ' to final Geopackage... ' + fp_of_output_gpkg)
-    gdf_.to_file(fp_of_output_gpkg,
-                 layer=layername,
-                 driver="GPKG",
-                 encoding="utf-8")
+    with profiler.stage('write_geopackage', rows_in=len(gdf_), layer=layername):
+        gdf_.to_file(fp_of_output_gpkg,
+                     layer=layername,
+                     driver="GPKG",
+                     encoding="utf-8")
 
     # record what SRC_IDs are actually present
     src_ids_in_gpkg.append(gdf_.SRC_REF_ID.unique())
@@ -523,8 +560,9 @@ for layername in keylist:
 
     # Generate report
     print(f'Creating Excel report for {layername}')
-    with HiddenPrints():
-        create_internal_review_spreadsheet(gdf_, out_put_path)
+    with profiler.stage('create_internal_review_spreadsheet', rows_in=len(gdf_), layer=layername):
+        with HiddenPrints():
+            create_internal_review_spreadsheet(gdf_, out_put_path)
 
     # -----------------------------------------------------------------------------
 
@@ -532,6 +570,10 @@ endtime_duration = datetime.datetime.now() - starttime
 print(f'Completed data consolidation for GEOPACKAGE at {str(datetime.datetime.now())}')
 print(f'Duration: {str(endtime_duration)}\n')
 
+# Save a machine-readable report of where the run spent its time
+profiler.print_summary()
+profiler.write_report(run_report_fp)
+
 
 # =============================================================================
 # %% Add Data Catalog
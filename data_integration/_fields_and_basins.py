@@ -20,7 +20,6 @@ import geopandas as gpd
 import numpy as np
 import glob
 from tqdm import tqdm
-import fiona
 from bs4 import BeautifulSoup
 # import datetime
 
@@ -32,6 +31,7 @@ from ogimlib import (replace_row_names, create_concatenated_well_name,
                      read_spatial_data, calculate_basin_area_km2,
                      schema_BASINS, strip_z_coord, dict_us_states)
 from read_iffy_file import read_iffy_file
+from kml_reader import read_kml_layers
 from assign_countries_to_feature_2 import assign_countries_to_feature, assign_stateprov_to_feature
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
@@ -670,17 +670,15 @@ save_spatial_data(
 # %% ITALY
 # =============================================================================
 os.chdir(v24data)
-# Turn on GeoPandas's KML support.
-gpd.io.file.fiona.drvsupport.supported_drivers['KML'] = 'rw'
-
-# Read in distinct layers of the license blocks KML
+# Read in distinct layers of the license blocks KML (all layers in one pass)
 fp_titoli = r'italy\titoli-idrocarburi.kml'
-fiona.listlayers(fp_titoli)
+titoli_layers = read_kml_layers(fp_titoli)
+print(list(titoli_layers))
 
-perm_on = gpd.read_file(fp_titoli, driver='KML', layer='Permessi di ricerca in terraferma')
-perm_off = gpd.read_file(fp_titoli, driver='KML', layer='Permessi di ricerca in mare')
-conc_on = gpd.read_file(fp_titoli, driver='KML', layer='Concessioni di coltivazione in terraferma')
-conc_off = gpd.read_file(fp_titoli, driver='KML', layer='Concessioni di coltivazione in mare')
+perm_on = titoli_layers['Permessi di ricerca in terraferma']
+perm_off = titoli_layers['Permessi di ricerca in mare']
+conc_on = titoli_layers['Concessioni di coltivazione in terraferma']
+conc_off = titoli_layers['Concessioni di coltivazione in mare']
 
 italy_fields = pd.concat([perm_on, perm_off, conc_on, conc_off]).reset_index()
 italy_fields = calculate_basin_area_km2(italy_fields, attrName="AREA_KM2")
@@ -15,6 +15,7 @@ path_to_github = 'C:\\Users\\maobrien\\Documents\\GitHub\\ogim-msat\\'
 os.chdir(path_to_github + 'functions')
 from ogimlib import integrate_flares, save_spatial_data
 from assign_countries_to_feature_2 import assign_stateprov_to_feature
+from nearest_infrastructure import load_facility_points, nearest_facilities, nearest_segment
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -101,6 +102,35 @@ flares = assign_stateprov_to_feature(flares,
 
 flares['flare_year'] = yearstring
 
+# =============================================================================
+# %% Link each flare to its nearest OGIM facilities
+# =============================================================================
+# !!! Path to the most recent consolidated OGIM GeoPackage
+path_to_ogim = os.path.join(buii_path, f'OGIM_{version_num}', f'OGIM_{version_num}.gpkg')
+facility_layers = ['Oil_and_Natural_Gas_Wells',
+                   'Tank_Battery',
+                   'Offshore_Platforms',
+                   'Natural_Gas_Compressor_Stations',
+                   'Gathering_and_Processing',
+                   'LNG_Facilities',
+                   'Crude_Oil_Refineries',
+                   'Petroleum_Terminals']
+facilities = load_facility_points(path_to_ogim, layers=facility_layers)
+flare_links = nearest_facilities(flares.set_index(id_column),
+                                 facilities,
+                                 k=3,
+                                 max_distance_km=2,
+                                 max_distance_by_category={'OIL AND NATURAL GAS WELLS': 1})
+flare_links.to_csv(os.path.join(integration_out_path, f'flaring_nearest_facilities_{yearstring}.csv'))
+
+# Segment implied by the nearest linked facility of each flare (N/A if none
+# is linked), kept next to the VIIRS 'segment' classification, which is the
+# one integrated below
+flares['segment_nearest_facility'] = flares[id_column].map(nearest_segment(flare_links)).fillna('N/A')
+linked = flares.segment_nearest_facility != 'N/A'
+print(f"Nearest-facility segment differs from the VIIRS segment for "
+      f"{(linked & (flares.segment_nearest_facility != flares.segment)).sum()} of {linked.sum()} linked flares")
+
 # =============================================================================
 # %% Integrate flares
 # =============================================================================
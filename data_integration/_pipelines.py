@@ -16,7 +16,6 @@ import os
 import pandas as pd
 import numpy as np
 import geopandas as gpd
-from tqdm import tqdm
 # import glob
 
 # Import custom functions
@@ -31,6 +30,8 @@ from ogimlib import (replace_row_names, transform_CRS, integrate_pipelines,
 # from standardize_countries import *
 # from assign_offshore_attribute import assign_offshore_attribute
 from assign_countries_to_feature_2 import assign_countries_to_feature
+from sharded_reader import read_sharded
+from attribute_rules import apply_rules
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -214,22 +215,10 @@ _pipes_us2, _pipes_us_list2 = integrate_pipelines(
 # %% USA - TEXAS
 # =============================================================================
 os.chdir(v24data)
-# List all files in the directory, then read in the county-specific pipelines.
-# Will take 5-ish minutes to read and concatenate them all.
+# Read all county-specific pipelines into one state-wide gdf, several
+# counties at a time, converting them to WGS84 as they're read
 fp = 'united_states\\texas\\pipelines\\'
-files = os.listdir(fp)
-
-# Empty dictionary to hold county-specific gdfs
-p = {}
-
-for file in tqdm(files):
-    fips = file[4:7]
-    if file.endswith('.shp'):
-        p[fips] = gpd.read_file(fp + file)
-
-# Concatenate all county-specific locations into one state-wide gdf
-tex_pipes = pd.concat(p.values())
-tex_pipes = tex_pipes.reset_index(drop=True)
+tex_pipes = read_sharded(fp + '*.shp', target_crs='epsg:4326', n_workers=8)
 
 tex_pipes = transform_CRS(tex_pipes,
                           target_epsg_code="epsg:4326",
@@ -1293,24 +1282,10 @@ pipelines_concat = gpd.GeoDataFrame(pd.concat([pipelines11, pipelines22], ignore
 pipelines_concat_1 = pipelines_concat.set_crs(4326)
 
 
-names = []
-
-for idx1_, row1_ in tqdm(pipelines_concat_1.iterrows(), total=pipelines_concat_1.shape[0]):
-    # Append to dates list the reformatted date by splitting at each slash mark and then reorganizing the order and format
-    name = row1_.Name
-    if name == 'Gas':
-        names_null = "N/A"
-        names.append(names_null)
-    elif name == 'Oil':
-        names_null = "N/A"
-        names.append(names_null)
-    elif name == 'Untitled Path':
-        names_null = "N/A"
-        names.append(names_null)
-    else:
-        names.append(name)
-
-pipelines_concat_1['NAMES'] = names
+# Placeholder names become N/A
+name_rules = [{'rule': 'map', 'source': 'Name', 'target': 'NAMES',
+               'mapping': {'Gas': 'N/A', 'Oil': 'N/A', 'Untitled Path': 'N/A'}}]
+pipelines_concat_1 = apply_rules(pipelines_concat_1, name_rules)
 
 
 # Assign countries to pipelines - changed on 1/20/2023 to use new function
@@ -1541,30 +1516,13 @@ pipelines_cleaned2 = calculate_pipeline_length_km(
 )
 
 
-names = []
-commodity = []
-
-# Reformat names, calculate pipeline diameter
-# Splitting the names at the inch marker, then appending names list with just name
-# Then using the split name to recalculate diameter to mm
-for idx1_, row1_ in tqdm(pipelines_cleaned2.iterrows(), total=pipelines_cleaned2.shape[0]):
-    name = row1_.Name
-    if name == "gas":
-        names.append("N/A")
-        commodity.append("Gas")
-    elif name == "oil":
-        names.append("N/A")
-        commodity.append("Oil")
-    elif name == "Nogat pipeline":
-        names.append(name)
-        commodity.append("N/A")
-
-    else:
-        pass
-
-
-pipelines_cleaned2['FORMATTED_NAME'] = names
-pipelines_cleaned2['Commodity'] = commodity
+# Placeholder names ('gas', 'oil') become N/A, and give the pipeline's commodity
+name_rules = [{'rule': 'map', 'source': 'Name', 'target': 'FORMATTED_NAME',
+               'mapping': {'gas': 'N/A', 'oil': 'N/A'}},
+              {'rule': 'map', 'source': 'Name', 'target': 'Commodity',
+               'mapping': {'gas': 'Gas', 'oil': 'Oil'},
+               'default': 'N/A'}]
+pipelines_cleaned2 = apply_rules(pipelines_cleaned2, name_rules)
 
 
 # Assign countries to pipelines - changed on 1/20/2023 to use new function
@@ -1713,24 +1671,12 @@ pipelines_concat = gpd.GeoDataFrame(pd.concat([gasoffshore2, onshore2, oiloffsho
 
 # Data manipulation / processing if needed
 # -----------------------------------------------------------------------------
-names = []
-
-for idx1_, row1_ in tqdm(pipelines_concat.iterrows(), total=pipelines_concat.shape[0]):
-    # Append to dates list the reformatted date by splitting at each slash mark and then reorganizing the order and format
-    name = row1_.Name
-    if 'Mukta Panna oil and gas' in name:
-        mukta = "Mukta Panna"
-        names.append(mukta)
-    elif 'Mukta Panna export' in name:
-        mukta = "Mukta Panna"
-        names.append(mukta)
-    elif 'Tapti' in name:
-        tapti = "Tapti"
-        names.append(tapti)
-    else:
-        names.append('N/A')
-
-pipelines_concat['NAME1'] = names
+name_rules = [{'rule': 'contains', 'source': 'Name', 'target': 'NAME1',
+               'patterns': {'Mukta Panna oil and gas': 'Mukta Panna',
+                            'Mukta Panna export': 'Mukta Panna',
+                            'Tapti': 'Tapti'},
+               'default': 'N/A'}]
+pipelines_concat = apply_rules(pipelines_concat, name_rules)
 pipelines_concat2 = pipelines_concat.set_crs(4326)
 
 # Assign countries to pipelines - changed on 1/20/2023 to use new function
@@ -1803,21 +1749,10 @@ pipelines_concat_1 = pipelines_concat.set_crs(4326)
 
 # Data manipulation / processing if needed
 # -----------------------------------------------------------------------------
-names = []
-
-for idx1_, row1_ in tqdm(pipelines_concat_1.iterrows(), total=pipelines_concat_1.shape[0]):
-    # Append to dates list the reformatted date by splitting at each slash mark and then reorganizing the order and format
-    name = row1_.Name
-    if name == 'Gas Pipeline':
-        names_null = "Gas"
-        names.append(names_null)
-    elif name == 'Oil Pipeline':
-        names_null = "Oil"
-        names.append(names_null)
-    else:
-        names.append(name)
-
-pipelines_concat_1['NAMES'] = names
+# Derive commodity from the pipeline name
+name_rules = [{'rule': 'map', 'source': 'Name', 'target': 'NAMES',
+               'mapping': {'Gas Pipeline': 'Gas', 'Oil Pipeline': 'Oil'}}]
+pipelines_concat_1 = apply_rules(pipelines_concat_1, name_rules)
 
 # Assign countries to pipelines - changed on 1/20/2023 to use new function
 pipelines_concat_1 = pipelines_concat_1.reset_index(drop=False)
@@ -1985,18 +1920,10 @@ pipelines_concat = gpd.GeoDataFrame(pd.concat([gas2, oil2], ignore_index=True))
 # Data manipulation / processing if needed
 # -----------------------------------------------------------------------------
 # retain single row that does have a name
-names = []
-
-for idx1_, row1_ in tqdm(pipelines_concat.iterrows(), total=pipelines_concat.shape[0]):
-    # Append to dates list the reformatted date by splitting at each slash mark and then reorganizing the order and format
-    name = row1_.Name
-    if 'Sino' in name:
-        mukta = "Sino Burma"
-        names.append(mukta)
-    else:
-        names.append('N/A')
-
-pipelines_concat['NAME1'] = names
+name_rules = [{'rule': 'contains', 'source': 'Name', 'target': 'NAME1',
+               'patterns': {'Sino': 'Sino Burma'},
+               'default': 'N/A'}]
+pipelines_concat = apply_rules(pipelines_concat, name_rules)
 pipelines_concat2 = pipelines_concat.set_crs(4326)
 
 # =============================================================================
@@ -2930,24 +2857,11 @@ pipelines_concat_1 = pipelines_concat.set_crs(4326)
 
 # Data manipulation / processing if needed
 # -----------------------------------------------------------------------------
-names = []
-
-for idx1_, row1_ in tqdm(pipelines_concat_1.iterrows(), total=pipelines_concat_1.shape[0]):
-    # Append to dates list the reformatted date by splitting at each slash mark and then reorganizing the order and format
-    name = row1_.Name
-    if name == 'Gas Pipeline':
-        names_null = "Gas"
-        names.append(names_null)
-    elif name == 'Oil Pipeline':
-        names_null = "Oil"
-        names.append(names_null)
-    elif name == 'Untitled Path':
-        names_null = "N/A"
-        names.append(names_null)
-    else:
-        names.append(name)
-
-pipelines_concat_1['NAMES'] = names
+# Derive commodity from the pipeline name; placeholder names become N/A
+name_rules = [{'rule': 'map', 'source': 'Name', 'target': 'NAMES',
+               'mapping': {'Gas Pipeline': 'Gas', 'Oil Pipeline': 'Oil',
+                           'Untitled Path': 'N/A'}}]
+pipelines_concat_1 = apply_rules(pipelines_concat_1, name_rules)
 
 # Assign countries to pipelines - changed on 1/11/2023 to use new function
 pipelines_concat_1 = pipelines_concat_1.reset_index(drop=False)  # create unique ID for next step
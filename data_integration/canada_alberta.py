@@ -13,16 +13,14 @@ Based extensively on Mark's previous code:
 import os
 import pandas as pd
 import numpy as np
-import geopandas as gpd
-from tqdm import tqdm
-import glob
-import csv
 
 os.chdir(r'C:\Users\maobrien\Documents\GitHub\ogim-msat\functions')
 from ogimlib import (replace_row_names, transform_CRS, integrate_facs, integrate_pipelines,
                      save_spatial_data, read_spatial_data,
                      schema_LNG_STORAGE, schema_COMPR_PROC, schema_REFINERY,
                      schema_OTHER, schema_PIPELINES, calculate_pipeline_length_km)
+from sharded_reader import read_sharded
+from report_csv import read_report_csv
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -42,109 +40,6 @@ integration_out_path = f'{buii_path}\\OGIM_{version_num}\\integrated_results\\'
 # =============================================================================
 
 
-def standardize_DLS_AB(
-    df,
-    legalSubDivision_col: str,
-    section_col: str,
-    township_col: str,
-    range_col: str,
-    meridian_col: str
-):
-    """
-    standardize_DLS_AB generates a standard DLS format
-    for the location of the facility based on the information
-    for legal sub division (00), section (00), township (000), range (00), meridian (W0)
-    XX-XX-XXX-XXWX
-
-    Location data in Alberta are reported usign Dominion Land Survey format.
-    """
-
-    lsd_ = []
-    sec_ = []
-    town_ = []
-    range__ = []
-    full_lsd = []
-
-    for idx, row in df.iterrows():
-        legalSubdivision = str(row[legalSubDivision_col])
-        section = str(row[section_col])
-        township = str(row[township_col])
-        range_ = str(row[range_col])
-        meridian = str(row[meridian_col])
-
-        # Legal sub division
-        if len(legalSubdivision) != 2:
-            # Append a zero before the value
-            lsd = '0' + legalSubdivision
-            lsd_.append(lsd)
-        else:
-            lsd = legalSubdivision
-            lsd_.append(lsd)
-
-        # Section
-        if len(section) == 2:
-            sect = section
-            sec_.append(sect)
-        else:
-            sect = '0' + section
-            sec_.append(sect)
-
-        # Township
-        if len(township) == 3:
-            townsh = township
-            town_.append(townsh)
-        elif len(township) == 2:
-            townsh = '0' + township
-            town_.append(townsh)
-        else:
-            townsh = '00' + township
-            town_.append(townsh)
-
-        # Range
-        if len(range_) == 2:
-            Range = range_
-            range__.append(Range)
-        else:
-            Range = '0' + range_
-            range__.append(Range)
-
-        # Reconstructed DLS
-        reconstruct_dls = lsd + "-" + sect + "-" + townsh + "-" + Range + "W" + meridian
-        full_lsd.append(reconstruct_dls)
-
-    # Create dataframe
-    df2 = pd.DataFrame(lsd_, columns=['LegalSubDivision'])
-    df2['Section'] = sec_
-    df2['Township'] = town_
-    df2['Range'] = range__
-    df2['Meridian'] = meridian
-    df2['FacilityLocation'] = full_lsd
-
-    return df2
-
-
-def clean_AB_ST13_csv(input_file, output_file, substrings, num_footer_lines=8):
-    '''Pre-clean a CSV file to remove subheader rows before reading it in as a DataFrame.'''
-    with open(input_file, mode='r', newline='', encoding='latin-1') as infile, \
-            open(output_file, mode='w', newline='', encoding='latin-1') as outfile:
-
-        reader = csv.reader(infile)
-        writer = csv.writer(outfile)
-
-        # Read all rows into memory
-        rows = list(reader)
-
-        # Remove the last `num_footer_lines` (blank or non-blank) from the rows
-        rows = rows[:-num_footer_lines]
-
-        # Write the filtered rows back to the output file
-        for row in rows:
-            # Skip completely blank lines or lines starting with the specified substring
-            if not row or any(row[0].startswith(sub) for sub in substrings):
-                continue
-            writer.writerow(row)
-
-
 # =============================================================================
 # %% Read + Clean - Gas Plants + Gathering, Receipts & Dispositions (ST13B, ST13C)
 # =============================================================================
@@ -169,26 +64,22 @@ def clean_AB_ST13_csv(input_file, output_file, substrings, num_footer_lines=8):
 # year will be refreshed up to and including the December publication.
 # =============================================================================
 
-# Clean the ST13B file, save a cleaned copy, and then read in the cleaned CSV
-original_st13b = "facilities\\AB_ST13B_GP_2024_Annual_Stats_Receipts_Disp.csv"
-cleaned_st13b = "facilities\\AB_ST13B_GP_2024_Annual_Stats_Receipts_Disp_cleaned.csv"
-substrings = ['Monthly Gas', 'Gas Plant', 'Gas Gathering System', 'GGS', 'Sub total']
-clean_AB_ST13_csv(original_st13b, cleaned_st13b, substrings, num_footer_lines=8)
-st13b = pd.read_csv("facilities\\AB_ST13B_GP_2024_Annual_Stats_Receipts_Disp_cleaned.csv",
-                    on_bad_lines='skip',
-                    index_col=False,
-                    encoding='latin-1')
-
-
-# Clean the ST13C file, save a cleaned copy, and then read in the cleaned CSV
-original_st13c = "facilities\\AB_ST13C_2024_GasGathering_Volumetric_Data.csv"
-cleaned_st13c = "facilities\\AB_ST13C_2024_GasGathering_Volumetric_Data_cleaned.csv"
+# Read the ST13B and ST13C files, dropping subheader rows and the footer as
+# the files are read
 substrings = ['Monthly Gas', 'Gas Plant', 'Gas Gathering System', 'GGS', 'Sub total']
-clean_AB_ST13_csv(original_st13c, cleaned_st13c, substrings, num_footer_lines=8)
-st13c = pd.read_csv("facilities\\AB_ST13C_2024_GasGathering_Volumetric_Data_cleaned.csv",
-                    on_bad_lines='skip',
-                    index_col=False,
-                    encoding='latin-1')
+st13b = read_report_csv("facilities\\AB_ST13B_GP_2024_Annual_Stats_Receipts_Disp.csv",
+                        subheader_prefixes=substrings,
+                        footer_lines=8,
+                        on_bad_lines='skip',
+                        index_col=False,
+                        encoding='latin-1')
+
+st13c = read_report_csv("facilities\\AB_ST13C_2024_GasGathering_Volumetric_Data.csv",
+                        subheader_prefixes=substrings,
+                        footer_lines=8,
+                        on_bad_lines='skip',
+                        index_col=False,
+                        encoding='latin-1')
 
 # Preview
 st13b.head()
@@ -550,9 +441,10 @@ ab_proc[ab_proc.FAC_ID.isin(list(fac_comb_receipts['Facility ID'].unique()))]
 # https://www.aer.ca/providing-information/data-and-reports/statistical-reports/st50
 # ===============================================================================
 fpProc = "facilities\\AB_ST50A_GasPlant_Data.csv"
-proc_data_ = pd.read_csv(fpProc,
-                         skiprows=[0, 1, 2, 3, 4, 6],  # remove header rows
-                         skipfooter=28)  # remove footer rows
+proc_data_ = read_report_csv(fpProc,
+                             skip_rows=[0, 1, 2, 3, 4, 6],  # remove header rows
+                             footer_lines=28,  # remove footer rows
+                             encoding='utf-8')
 
 # try:
 #     # Attempt to read the CSV file
@@ -1203,21 +1095,11 @@ save_spatial_data(
 # =============================================================================
 # Add in detailed distribution pipeline data from rural areas, by concatenating
 # individual geodatabase contents into a single GDF
+# Each geodatabase is read and transformed to EPSG:4326 on its own thread
 fp3 = "pipelines"
-files_ = glob.glob(fp3 + "\\*.gdb")
-pipes_rural = []
-
-for pipe in tqdm(files_):
-    gdf_ = gpd.read_file(pipe)
-    pipes_rural.append(gdf_)
-
-# Concatenate
-pipes_rural_all = pd.concat(pipes_rural).reset_index()
-
-# Transform CRS to EPSG:4326 -- takes ~4 minutes to run on all these pipelines
-# -----------------------------------------------------------------------------
-print("CRS of data = {}".format(pipes_rural_all.crs))
-ab_pipes_rural = transform_CRS(pipes_rural_all, target_epsg_code='epsg:4326')
+ab_pipes_rural = read_sharded(fp3 + "\\*.gdb",
+                              target_crs='epsg:4326',
+                              n_workers=8)
 
 # Calculate pipeline length in km
 ab_pipes_rural_v2 = calculate_pipeline_length_km(ab_pipes_rural)
@@ -1410,7 +1292,7 @@ save_spatial_data(
 #     data_out = pd.merge(data_in2, data_fac22, on='ReportingFacilityID', how='left')
 
 #     # # Standardize LSD coordinates
-#     df_listOUT = standardize_DLS_AB(data_out,'FacilityLegalSubdivision','FacilitySection', 'FacilityTownship', 'FacilityRange',
+#     df_listOUT = standardize_dls(data_out,'FacilityLegalSubdivision','FacilitySection', 'FacilityTownship', 'FacilityRange',
 #        'FacilityMeridian' )
 
 #     # Reformat facility location
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Build the Prairie (Alberta, Saskatchewan, Manitoba) LSD index used to
+geolocate Petrinex facilities that only report a Dominion Land Survey
+location. The index is saved once per version as a GeoParquet file in the
+`data\\canada\\dls_index` folder, and read by the province scripts with
+`dls_codec.load_lsd_index`, instead of each script re-reading and re-parsing
+its province's LSD grid.
+
+Runs before `canada_manitoba.py` and `canada_saskatchewan.py` when all
+integration scripts are run in alphabetical order.
+
+@author: maobrien
+"""
+import os
+
+os.chdir(r'C:\Users\maobrien\Documents\GitHub\ogim-msat\functions')
+from ogimlib import read_spatial_data, read_msAccess
+from dls_codec import build_lsd_index
+
+# !!! Specify version number, in v style. Must match name of folder on shared drive
+version_num = 'v2.7'
+
+# -----------------------------------------------------------------------------
+# Define path to Bottom Up Infra Inventory directory
+buii_path = r'C:\Users\maobrien\Environmental Defense Fund - edf.org\Mark Omara - Infrastructure_Mapping_Project\Bottom-Up-Infra-Inventory'
+
+# Set current working directory
+os.chdir(os.path.join(buii_path, f'OGIM_{version_num}', 'data', 'canada'))
+
+index_out_path = 'dls_index\\prairie_lsd_index.parquet'
+os.makedirs('dls_index', exist_ok=True)
+
+# =============================================================================
+# %% Read in the LSD grid of each province
+# =============================================================================
+# ALBERTA -- lat/lon centroid of the smallest grid in the Alberta DLS grid
+# system, from Scott Seymour. 'Alberta_DL' is in the format 00-00-000-00W0
+tableNamesIdx, tableNames, dfs = read_msAccess("alberta\\latlong_dls_\\LatLong_DLS_Trim.accdb")
+ab_grid = dfs[0]
+
+# SASKATCHEWAN -- LSD polygons downloaded from a REST server via QGIS:
+# https://gis.saskatchewan.ca/arcgis/rest/services/CadastreLegalSubdivision/MapServer
+# 'LLD' is in the format 00-AA-00-000-00-0
+sk_grid = read_spatial_data("saskatchewan\\cadastral_LSD\\saskatchewan_legal_subdivision_.geojson",
+                            table_gradient=True)  # LARGE file, takes a while to load
+
+# MANITOBA -- LSD grid centroid points created by Mark, in EPSG:3158.
+# 'LOCATION' is in the format 00-00-000-00W0
+mb_grid = read_spatial_data("manitoba\\manitoba_grids\\manitoba_grids_LSD_.shp")
+
+# =============================================================================
+# %% Build and save the index
+# =============================================================================
+lsd_index = build_lsd_index([
+    {'province': 'AB', 'data': ab_grid, 'location_col': 'Alberta_DL',
+     'lon_col': 'Longitude', 'lat_col': 'Latitude'},
+    {'province': 'SK', 'data': sk_grid, 'location_col': 'LLD', 'format': 'lld'},
+    {'province': 'MB', 'data': mb_grid, 'location_col': 'LOCATION'}
+], out_fp=index_out_path)
+
+print(lsd_index.PROVINCE.value_counts())
@@ -11,9 +11,7 @@ Based extensively on Mark's previous code:
 import os
 import pandas as pd
 # import numpy as np
-import geopandas as gpd
 # from tqdm import trange
-import glob
 
 os.chdir(r'C:\Users\maobrien\Documents\GitHub\ogim-msat\functions')
 from ogimlib import (replace_row_names, transform_CRS, integrate_facs,
@@ -22,6 +20,8 @@ from ogimlib import (replace_row_names, transform_CRS, integrate_facs,
                      calculate_pipeline_length_km,
                      integrate_pipelines, schema_PIPELINES,
                      calculate_basin_area_km2, schema_BASINS, integrate_basins)
+from dls_codec import load_lsd_index, geolocate_by_lsd
+from sharded_reader import read_sharded
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -105,12 +105,13 @@ save_spatial_data(
 
 
 # =============================================================================
-# %% Read in the Manitoba LSD grid centroid shapefile created by Mark
-# 'LOCATION' attribute of these points is in the format 00-00-000-00W0
-# Original easting and northing locations are in EPSG:3158 (a.k.a. NAD83(CSRS) / UTM zone 14N)
+# %% Read in the Manitoba part of the Prairie LSD index
+# The index is built by `canada_build_lsd_index.py` from the Manitoba LSD grid
+# centroid shapefile created by Mark ('manitoba_grids_LSD_.shp', originally
+# in EPSG:3158 a.k.a. NAD83(CSRS) / UTM zone 14N).
 # Note that because the lat and lon are approximated based on the grid system [each grid is ~400mx400m]
 # =============================================================================
-data_grids_gdf = read_spatial_data("manitoba_grids\\manitoba_grids_LSD_.shp")
+lsd_index = load_lsd_index("..\\dls_index\\prairie_lsd_index.parquet", provinces=['MB'])
 
 # TODO - add code that creates centroids from these LSD grid squares,
 # rather than import a shapefile that's been manipulated in ways that aren't
@@ -146,21 +147,14 @@ fac_codes_id = {
 fac_data_mb2 = replace_row_names(fac_data_mb, "FacilityCodeId", fac_codes_id)
 
 
-# Merge the facility records with the LSD centroid location points,
-# based on the LOCATION attribute in both dataframes.
-locs_with_fac = data_grids_gdf[data_grids_gdf.LOCATION.isin(fac_data_mb2.Location)]
-print("Number of LSD centroids that correspond with a facility location in the Petrinex facilities df = ", locs_with_fac.shape[0])
-
-fac_data_mb2['LOCATION'] = fac_data_mb2['Location']  # change attribute name for merging
-mb_fac_merged = pd.merge(fac_data_mb2,
-                         data_grids_gdf,
-                         on='LOCATION',
-                         how='left')
+# Geolocate the facility records at their LSD centroid, based on the
+# 'Location' attribute (format 00-00-000-00W0), with one join against the index
+mb_fac_merged = geolocate_by_lsd(fac_data_mb2, 'Location', lsd_index)
 print(f'Total number of facilities originally = {len(fac_data_mb)}')
 print(f'Total number of rows in merged facility dataset = {len(mb_fac_merged)}')
 
 # REMOVE any infrastructure records which did NOT get matched to a location
-mb_fac_merged = mb_fac_merged[mb_fac_merged.EASTING.notna()]
+mb_fac_merged = mb_fac_merged[mb_fac_merged.geometry.notna()]
 
 # TODO - for now, drop the last duplicate records randomly
 mb_fac_merged = mb_fac_merged.drop_duplicates(subset=['FacilityCode',
@@ -170,8 +164,7 @@ mb_fac_merged = mb_fac_merged.drop_duplicates(subset=['FacilityCode',
                                                       'OperatorName',
                                                       'FacilityCode']).reset_index()
 
-# Finally, convert the merged facilities dataframe into a geodataframe,
-# retaining only the columns that I need
+# Finally, retain only the columns that I need
 cols_select = [
     'FacilityCode',
     'FacilityName',
@@ -182,15 +175,9 @@ cols_select = [
     'OperatorId',
     'OperatorName',
     'FacilityCodeId',
-    'EASTING',
-    'NORTHING'
+    'geometry'
 ]
 mb_fac_gdf = mb_fac_merged[cols_select]
-
-mb_fac_gdf = gpd.GeoDataFrame(mb_fac_gdf,
-                              geometry=gpd.points_from_xy(mb_fac_gdf.EASTING,
-                                                          mb_fac_gdf.NORTHING),
-                              crs="epsg:3158")
 mb_fac_gdf2 = transform_CRS(mb_fac_gdf, appendLatLon=True)
 
 
@@ -513,14 +500,7 @@ save_spatial_data(
 # =============================================================================
 # Read in all individual shapefiles containing separate pools, and concatenate
 mb_pools_shp = "oil_pool_layers"
-all_files = glob.glob(os.getcwd() + "//" + mb_pools_shp + "//*.shp")
-data_pools = []
-
-for file in all_files:
-    df_ = gpd.read_file(file)
-    data_pools.append(df_)
-
-result_pools = pd.concat(data_pools)
+result_pools = read_sharded(os.getcwd() + "//" + mb_pools_shp + "//*.shp")
 
 result_pools.head()
 result_pools.boundary.plot()
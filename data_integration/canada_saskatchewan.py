@@ -25,6 +25,8 @@ from ogimlib import (transform_CRS, integrate_facs,
                      calculate_pipeline_length_km, get_duplicate_api_records,
                      integrate_pipelines, schema_PIPELINES, schema_REFINERY,
                      calculate_basin_area_km2, schema_BASINS, integrate_basins, check_invalid_geoms)
+from dls_codec import load_lsd_index, geolocate_by_lsd
+from excel_cache import read_excel_cached
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -80,75 +82,6 @@ def flatten_gdf_geometry(gdf, geom_type):
     return new_gdf_geom
 
 
-def convert_LLD_to_LSD(lld):
-    '''Convert a Legal Land Description I.D. to a Legal Sub-Division I.D.
-
-    Add a leading zero to numeric sections of the legal land description, if it's missing
-    Skip the portion of the LLD with cardinal directions (NE, SW, etc.)
-
-    Parameters
-    ----------
-    lld : str
-        A single LLD (Legal Land Description) value, in the format
-        '00-AA-00-000-00-0'
-        LSD Number - Quarter - Section - Township - Range - Meridian
-
-    Returns
-    -------
-    lsd_new_ : str
-        A single LSD (Legal SubDivision) value, in the format
-        00-00-000-00W0
-        LSD Number - Section - Township - Range + W + Meridian
-
-    Example Usage
-    -------
-    convert_LLD_to_LSD('12-NW-10-71-23-3')
-    >> 12-10-071-23W3
-
-    '''
-    # Some of the LLDs have a letter "a" in parts of them. For the purposes of
-    # creating a LSD from the LLD, remove the "a" from the string
-    lld = lld.replace('a', '')
-    lld = lld.replace('A', '')
-
-    split_ = lld.split("-")
-
-    # LSD Number
-    num_01 = split_[0]
-    if len(num_01) == 1:
-        num_01_ = "0" + num_01
-    elif len(num_01) == 2:
-        num_01_ = num_01
-
-    # Section
-    num_02 = split_[2]
-    if len(num_02) == 1:
-        num_02_ = "0" + num_02
-    elif len(num_02) == 2:
-        num_02_ = num_02
-
-    # Township
-    num_03 = split_[3]
-    if len(num_03) == 2:
-        num_03_ = "0" + num_03
-    elif len(num_03) == 1:
-        num_03_ = "00" + num_03
-    else:
-        num_03_ = num_03
-
-    # Range
-    num_04 = split_[4]
-    if len(num_04) == 1:
-        num_04_ = "0" + num_04
-    elif len(num_04) == 2:
-        num_04_ = num_04
-
-    # Assemble new location description
-    lsd_new_ = num_01_ + "-" + num_02_ + "-" + num_03_ + "-" + num_04_ + "W" + split_[5]
-
-    return lsd_new_
-
-
 def remove_trailing_parentheses(my_series,
                                 parenthesis=True,
                                 bracket=False):
@@ -343,7 +276,7 @@ save_spatial_data(
 # %% FACILITIES - Read & preprocess Facility Licence Inventory data
 # =============================================================================
 fp_ = "facilities\\Saskatchewan_Facilities_Inventory_.xlsx"
-sk_fac = pd.read_excel(fp_, sheet_name=0, header=3, dtype={'Built \nDate': str})
+sk_fac = read_excel_cached(fp_, sheet_name=0, header=3, dtype={'Built \nDate': str})
 
 # Replace all line breaks in the column names with a space
 # If after that, there are double-spaces, replace those with a single space
@@ -444,31 +377,17 @@ print("Number of records in original registry dataset = {} \ncompared with recor
 
 # =============================================================================
 # %% LEGAL SUBDIVISION (CADASTRAL) - PREPROCESSING
-# FYI: this code block takes 10+ minutes to run completely
 # =============================================================================
-# Read in LSD (legal sub-division) data for Saskatchewan,
-# which was downloaded from a REST server via QGIS:
+# Read in the Saskatchewan part of the Prairie LSD index, built by
+# `canada_build_lsd_index.py` from the LSD (legal sub-division) polygons
+# downloaded from a REST server via QGIS:
 # https://gis.saskatchewan.ca/arcgis/rest/services/CadastreLegalSubdivision/MapServer
-
-fp2 = "cadastral_LSD\\saskatchewan_legal_subdivision_.geojson"
-cad_data_ = read_spatial_data(fp2, table_gradient=True)  # LARGE file, takes a while to load
-
-print(cad_data_.LLD)
-# Format of LLD (Legal Land Description)
-# 00-AA-00-000-00-0
-# LSD Number - Quarter - Section - Township - Range - Meridian
-
-# Convert the Legal Land Description in each row of the cadastral data
-# into a township-range-section format that can join with other tables.
-# Also, get the lat-long centroid of each subdivision polygon.
-# -----------------------------------------------------------------------------
-cad_data_['LSD'] = cad_data_.LLD.apply(lambda x: convert_LLD_to_LSD(x))
-cad_data_.LSD
-
-cad_data_['geom_centroid'] = cad_data_.geometry.centroid
-cad_data_['src_id'] = '40'
-
-cad_data_.head()
+# The LLD (Legal Land Description) of each polygon, in the format
+# 00-AA-00-000-00-0 (LSD Number - Quarter - Section - Township - Range - Meridian),
+# is stored as a key that joins with "Location" values in the format 00-00-000-00W0,
+# along with the lat-long centroid of each subdivision polygon.
+lsd_index = load_lsd_index("..\\dls_index\\prairie_lsd_index.parquet", provinces=['SK'])
+lsd_index.head()
 
 # =============================================================================
 # %% FACILITIES - PREPROCESSING AND MERGING
@@ -505,30 +424,14 @@ sk_fac_merged_.head()
 # Finally, merge facility records with cadastral records, so that facilities
 # without an existing lat-long can be associated with the lat-long centroid of
 # the section-township-range they fall within
-
-# Before merging any datasets, confirm that they all use the same CRS
-if sk_fac_gdf.crs == cad_data_.crs:
-    print('Facilities data and cadastral data use same CRS; OK to merge')
-else:
-    print('Facilities data and cadastral data DO NOT USE same CRS.')
-    print('Re-project before merging geometry columns')
-
-sel_loc_data_ = cad_data_[cad_data_.LSD.isin(sk_fac_merged_.Location.unique())]
-print(f'# of Location codes present in both datasets = {len(sel_loc_data_)}')
-print(f'compared with total facility records = {len(sk_fac_merged_.Location.unique())}')
-
-cad_data_['Location'] = cad_data_.LSD
-sk_fac_gdf2 = pd.merge(sk_fac_merged_,    # TODO check for dupes
-                       cad_data_,
-                       suffixes=('_facs', '_cadastral'),
-                       on='Location',
-                       how='left')  # left join because we want to retain all facilities
+sk_fac_gdf2 = geolocate_by_lsd(sk_fac_merged_, 'Location', lsd_index,
+                               geometry_name='geom_centroid')
 
 # -----------------------------------------------------------------------------
 # Create a new point geometry column for the gdf. By default, use the coordinate
 # provided by the Facilities Inventory dataset; if no coordinate is provided by
 # that dataset, use the cadastral centroid geometry.
-sk_fac_gdf2['geometry_final'] = sk_fac_gdf2.geometry_facs
+sk_fac_gdf2['geometry_final'] = sk_fac_gdf2['geometry']
 sk_fac_gdf2.loc[sk_fac_gdf2.geometry_final.isna(), 'geometry_final'] = sk_fac_gdf2.geom_centroid
 
 sk_fac_gdf2 = sk_fac_gdf2.set_geometry("geometry_final")
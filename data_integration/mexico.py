@@ -30,6 +30,7 @@ from ogimlib import (replace_row_names, transform_CRS, integrate_facs,
                      calculate_pipeline_length_km, explode_multi_geoms,
                      integrate_pipelines, schema_REFINERY,
                      calculate_basin_area_km2, integrate_basins)
+from attribute_rules import apply_rules
 
 # !!! Specify version number, in v style. Must match name of folder on shared drive
 version_num = 'v2.7'
@@ -1147,8 +1148,9 @@ monthSpanishToEnglish = {'Enero': 'January',
                          'Diciembre': 'December'
                          }
 # Replace occurences of Spanish abbrevs within the strings with English abbrevs
-for old, new in monthSpanishToEnglish.items():
-    sistrangas.start_year = sistrangas.start_year.str.replace(old, new)
+month_rules = [{'rule': 'replace', 'source': 'start_year',
+                'replacements': monthSpanishToEnglish}]
+sistrangas = apply_rules(sistrangas, month_rules)
 
 # FIXME
 sistrangas['install_date_datetime'] = pd.to_datetime(sistrangas['start_year'],
@@ -21,6 +21,8 @@ from datetime import datetime
 
 os.chdir(r'C:\Users\maobrien\Documents\GitHub\ogim-msat\functions')
 from ogimlib import integrate_production, save_spatial_data, schema_OIL_GAS_PROD
+from excel_cache import read_excel_many
+from well_identifiers import pun_key, format_pun, hash_key
 
 os.chdir(r'C:\Users\maobrien\Environmental Defense Fund - edf.org\Mark Omara - Infrastructure_Mapping_Project\Bottom-Up-Infra-Inventory\Public_Production_v0\data\oklahoma')
 
@@ -33,18 +35,12 @@ results_folder = "C:\\Users\\maobrien\\Environmental Defense Fund - edf.org\\Mar
 
 
 def create_pun_number_column(df, county_num, lease_num, sub_num, merge_num):
-    df = df[[county_num, lease_num, sub_num, merge_num]].copy()
-    df[county_num] = df[county_num].astype(str).str.zfill(3)
-    df[lease_num] = df[lease_num].astype(str).str.zfill(6)
-    df[sub_num] = df[sub_num].astype(str)  # only one character, no zfill needed
-    df[merge_num] = df[merge_num].astype(str).str.zfill(4)
-    output_column = df[[county_num, lease_num, sub_num, merge_num]].agg('-'.join, axis=1)
-    return output_column
+    # 'CCC-LLLLLL-S-MMMM' string, built from the integer PUN key
+    return format_pun(pun_key(df, county_num, lease_num, sub_num, merge_num))
 
 
 def create_hash_from_columns(df, col_list):
-    df_for_hashing = df[col_list]
-    return df_for_hashing.apply(lambda x: hash(tuple(x)), axis=1)
+    return hash_key(df, col_list)
 
 
 def get_40acre_polys_from_LLD(q160, q40):
@@ -135,10 +131,12 @@ excel_sheet_names = ['GHP12,36,GTR36',
                      'LEASE LEGAL',
                      'OPERATOR']
 
-for sheet in excel_sheet_names:
-    # Read the Excel sheet as a (temp) df
-    df = pd.read_excel('Layout for Outside Entities.xlsx',
-                       sheet_name=sheet)
+# Read the Excel sheets (through the cache, so they're parsed only once)
+layout_sheets = read_excel_many([{'path': 'Layout for Outside Entities.xlsx',
+                                  'sheet_name': sheet}
+                                 for sheet in excel_sheet_names])
+
+for sheet, df in zip(excel_sheet_names, layout_sheets):
 
     # Save the set of col names and widths as LISTS, to preserve their order
     metadata[sheet] = {}
@@ -259,18 +257,21 @@ before_after_table.at['OKLAHOMA', 'gas_original'] = ok_prod_2022.gas_mcf.sum()
 # =============================================================================
 # %% Aggregate the production records so there is one per lease
 # =============================================================================
-# Create a 14-digit PUN number
-ok_prod_2022['PUN_NUM'] = create_pun_number_column(ok_prod_2022,
-                                                   'pun_county_num',
-                                                   'pun_lease_num',
-                                                   'pun_sub_num',
-                                                   'pun_merge_num')
+# Create a 14-digit PUN number, as an integer key (for grouping and joining)
+# and as a string
+ok_prod_2022['PUN_KEY'] = pun_key(ok_prod_2022,
+                                  'pun_county_num',
+                                  'pun_lease_num',
+                                  'pun_sub_num',
+                                  'pun_merge_num')
+ok_prod_2022['PUN_NUM'] = format_pun(ok_prod_2022.PUN_KEY)
 
 ok_agg_funcs = {
     'pun_county_num': 'first',
     'pun_lease_num': 'first',
     'pun_sub_num': 'first',
     'pun_merge_num': 'first',
+    'PUN_NUM': 'first',
     'company name ??': 'first',
     'producer name ??': 'first',
     'product_name': pd.Series.mode,
@@ -278,10 +279,18 @@ ok_agg_funcs = {
     'gas_mcf': 'sum'
 }
 
-ok_prod_2022_agg = ok_prod_2022.groupby(by='PUN_NUM', as_index=False).agg(ok_agg_funcs)
+ok_prod_2022_agg = ok_prod_2022.groupby(by='PUN_KEY', as_index=False, dropna=False).agg(ok_agg_funcs)
 ok_prod_2022_agg['product_name'] = ok_prod_2022_agg.product_name.astype(str)
 
-# Record the total oil and gas produced in 2022 AFTER aggregation
+# Records without a valid PUN form one group with a missing PUN_KEY. They
+# can't be joined to a lease, so record their production and drop them.
+no_key = ok_prod_2022_agg.PUN_KEY.isna()
+before_after_table.at['OKLAHOMA', 'oil_no_key'] = ok_prod_2022_agg.loc[no_key, 'oil_barrels'].sum()
+before_after_table.at['OKLAHOMA', 'gas_no_key'] = ok_prod_2022_agg.loc[no_key, 'gas_mcf'].sum()
+ok_prod_2022_agg = ok_prod_2022_agg[~no_key].reset_index(drop=True)
+
+# Record the total oil and gas produced in 2022 AFTER aggregation (excluding
+# the records without a PUN)
 before_after_table.at['OKLAHOMA', 'oil_agg'] = ok_prod_2022_agg.oil_barrels.sum()
 before_after_table.at['OKLAHOMA', 'gas_agg'] = ok_prod_2022_agg.gas_mcf.sum()
 
@@ -322,12 +331,13 @@ lease_['panhandle_str'] = 'i'
 lease_.loc[lease_.name.isin(['BEAVER', 'CIMARRON', 'TEXAS']), 'panhandle_str'] = 'c'
 
 # REDUCE LEASE TABLE TO ONLY LEASES THAT MIGHT INTERSECT PRODUCTION
-lease_['PUN_NUM'] = create_pun_number_column(lease_,
-                                             'pun_county_num',
-                                             'pun_lease_num',
-                                             'pun_sub_num',
-                                             'pun_merge_num')
-lease = lease_[lease_.PUN_NUM.isin(list(ok_prod_2022_agg.PUN_NUM))].reset_index(drop=True)
+lease_['PUN_KEY'] = pun_key(lease_,
+                            'pun_county_num',
+                            'pun_lease_num',
+                            'pun_sub_num',
+                            'pun_merge_num')
+lease = lease_[lease_.PUN_KEY.isin(ok_prod_2022_agg.PUN_KEY.dropna())].reset_index(drop=True)
+lease['PUN_NUM'] = format_pun(lease.PUN_KEY)
 
 # For reducing the PLSS dataset later, create a Section-Township-Range value
 lease['STR_M'] = lease[['section_str',
@@ -482,7 +492,7 @@ lease_gdf = lease_gdf[lease_gdf.geom_single_poly.notna()].reset_index(drop=True)
 # identify the lease / PRU. After this, we'll have one row per PUN.
 # !!! After this step, some of the attribute values might be incorrect, since the
 # "first" value is taken by default during the dissolve
-lease_gdf_diss = lease_gdf.dissolve(by=['PUN_NUM'])
+lease_gdf_diss = lease_gdf.dissolve(by=['PUN_KEY'])
 # Reset index so that PUN_ID remains a column for joining with later
 lease_gdf_diss = lease_gdf_diss.reset_index(drop=False)
 # Plot to see how some leases/PUNs are made up of multiple, contiguous LLD areas.
@@ -512,9 +522,9 @@ lease_gdf_centroids.to_file(results_folder + 'ok_lease_gdf_centroids_TEST2.shp')
 # =============================================================================
 ok_prod_2022_pt = pd.merge(
     left=ok_prod_2022_agg,   # aggregated to annual already
-    right=lease_gdf_centroids,
+    right=lease_gdf_centroids.drop('PUN_NUM', axis=1),
     how='left',
-    on=['PUN_NUM']
+    on=['PUN_KEY']
 )
 # gdf turned into df during the merge
 ok_prod_2022_pt = gpd.GeoDataFrame(ok_prod_2022_pt,
@@ -33,6 +33,10 @@ from ogimlib import (integrate_production, replace_row_names,
                      clean_a_date_field, create_concatenated_well_name,
                      get_msAccess_table_names)
 from internal_review_protocol_Excel import create_internal_review_spreadsheet
+from production_rollup import rollup_states
+from excel_cache import read_excel_many
+from access_reader import read_access_table
+from well_identifiers import api_key, normalize_api
 
 import cartopy.crs as ccrs
 from matplotlib.axes import Axes
@@ -555,6 +559,9 @@ before_after_table = pd.DataFrame(index=states2keep,
                                            'cond_agg',
                                            'cond_geojson',
                                            'cond_pct_in_geojson',
+                                           'oil_no_key',  # Sum of 2022 prod. values of records without a valid lease/well ID, dropped when aggregating
+                                           'gas_no_key',
+                                           'cond_no_key',
                                            'units_reporting_production_original',  # Count of how many unique APIs, Leases, etc. report production in the original dataset before any cleaning
                                            'units_reporting_production_geojson'  # Count of how many unique APIs, Leases report production in the integrated dataset
                                            ])
@@ -570,79 +577,446 @@ ogim_wells_usa = ogim_wells[ogim_wells.STATE_PROV.isin(states2keep)].reset_index
 del ogim_wells
 print(datetime.datetime.now())
 
+# =============================================================================
+# %% Read + aggregate production of config-driven states (in parallel)
+# Each state below only declares its column names and quirks; reading, year
+# selection, day capping, the well / month then well / year aggregation and
+# the before_after_table totals are handled by `rollup_states`. To add a
+# state, add an entry to `state_rollups`.
+# Ohio and Wyoming already report one annual record per well, so they have
+# nothing to roll up and are read in their own blocks below.
+# =============================================================================
+
+
+def prepare_nm_production(nm_prod):
+    # NM reports one row per product kind; create separate columns for Oil,
+    # Gas, and Water production
+    nm_prod.prd_knd_cde = nm_prod.prd_knd_cde.str.strip()  # remove trailing spaces
+    nm_prod.loc[nm_prod.prd_knd_cde == 'O', 'OIL_BBL'] = nm_prod.prod_amt
+    nm_prod.loc[nm_prod.prd_knd_cde == 'G', 'GAS_MCF'] = nm_prod.prod_amt
+    nm_prod.loc[nm_prod.prd_knd_cde == 'W', 'WATER_BBL'] = nm_prod.prod_amt
+    # Create API field on which to aggregate
+    nm_prod.api_cnty_cde = nm_prod.api_cnty_cde.astype(str).str.zfill(3)
+    nm_prod.api_well_idn = nm_prod.api_well_idn.astype(str).str.zfill(5)
+    nm_prod['api'] = nm_prod.api_st_cde.astype(str) + '-' + nm_prod.api_cnty_cde + '-' + nm_prod.api_well_idn
+    return nm_prod
+
+
+def prepare_co_production(co_prod):
+    # Create complete API number from separate columns
+    co_prod["api_num"] = '05-' + co_prod['api_county_code'] + '-' + co_prod['api_seq_num'] + '-' + co_prod['sidetrack_num']
+    return co_prod
+
+
+def prepare_ut_production(ut_prod):
+    ut_prod["report_year"] = pd.to_datetime(ut_prod["ReportPeriod"]).dt.year
+    return ut_prod
+
+
+def read_ks_production():
+    # Oil and gas leases are reported in separate tables with the same
+    # columns. NOTE that the column "PRODUCTION" in each table has different
+    # meanings and units, so it's copied to a column of its own before the
+    # tables are concatenated.
+    ks_gas = pd.read_csv(r"kansas\gas_leases_2020_present.txt", sep=",", header=0)
+    ks_oil = pd.read_csv(r"kansas\oil_leases_2020_present.txt", sep=",", header=0)
+    ks_gas["GAS_MCF"] = ks_gas["PRODUCTION"]
+    ks_oil["OIL_BBL"] = ks_oil["PRODUCTION"]
+    return pd.concat([ks_gas, ks_oil]).reset_index(drop=True)
+
+
+def read_ky_production():
+    # There are separate Excel files for each year and hydrocarbon type.
+    # Workbooks are parsed in parallel on the first run, then read from the cache
+    prod_files_ky = [file for file in os.listdir("kentucky") if file.endswith('.xlsx')]
+    ky_workbooks = read_excel_many([{'path': os.path.join("kentucky", file)}
+                                    for file in prod_files_ky])
+    for file, df in zip(prod_files_ky, ky_workbooks):
+        print(file)
+        df = df.rename(columns={'Year 2017': 'Year', 'PERMIT': 'Permit'})
+        if "Oil" in file:
+            ky_prod_oil = df
+        elif "Gas" in file:
+            ky_prod_gas = df
+
+    # Merge, rather than concatenate, the records, so that wells that report both
+    # oil and gas production report those volumes in the same record.
+    ky_prod_all = ky_prod_oil.merge(ky_prod_gas,
+                                    how='outer',
+                                    on=['Year',
+                                        'County',
+                                        'Permit',
+                                        'Company',
+                                        'Lease_NM',
+                                        'Well_No',
+                                        'PoolName',
+                                        'Formation',
+                                        'LAT',
+                                        'LONG'],
+                                    suffixes=('_oil', '_gas'))
+
+    # Sum the total gas and total oil production for each row (which is a specific
+    # lease plus year), and put the results in a new column
+    gas_prod_cols = [col for col in ky_prod_all if col.endswith('Gas')]
+    ky_prod_all['total_gas_prod'] = ky_prod_all[gas_prod_cols].sum(axis=1)
+    oil_prod_cols = [col for col in ky_prod_all if col.endswith('Oil')]
+    ky_prod_all['total_oil_prod'] = ky_prod_all[oil_prod_cols].sum(axis=1)
+    return ky_prod_all
+
+
+def prepare_mi_production(mi_prod):
+    mi_prod["count_months"] = 1  # Add a field to count the months a PRU produced
+    return mi_prod
+
+
+def prepare_mt_production(mt_prod):
+    mt_prod['Rpt_Date'] = pd.to_datetime(mt_prod['Rpt_Date'], format='%m/%d/%Y', errors='coerce')
+    # A small number of monthly production records report an impossible number of
+    # production days (like 270 days in a month). Since we can't really know what
+    # they intended to write, set these values to n/a instead (days up to 31
+    # are capped at the days in the month by `rollup_states`)
+    mt_prod.loc[mt_prod.DAYS_PROD > 31, 'DAYS_PROD'] = np.nan
+    return mt_prod
+
+
+def read_nd_production():
+    # Read individual Excel files (parsed in parallel on the first run, then read
+    # from the cache) and concatenate them
+    files = os.listdir("north_dakota")
+    nd_prod_dfs = read_excel_many([{'path': os.path.join("north_dakota", file), 'sheet_name': 0}
+                                   for file in files
+                                   if file.endswith('.xlsx') and file.startswith('2022')])
+    return pd.concat(nd_prod_dfs).reset_index(drop=True)
+
+
+def read_pa_production(wire_label):
+    # Unconventional and conventional wells are reported in the same file
+    pa_prod = pd.read_csv("pennsylvania\\OilGasProduction_2022.csv")
+    return pa_prod[pa_prod.WIRE_LABEL.str.contains(wire_label)].reset_index(drop=True)
+
+
+def prepare_pa_u_production(pa_u_prod):
+    # Sort records so that the most recent month of reporting is FIRST, and
+    # therefore the most recent status/operator is listed first
+    pa_u_prod['PRODUCTION_PERIOD_END_DATE'] = pd.to_datetime(pa_u_prod['PRODUCTION_PERIOD_END_DATE'])
+    return pa_u_prod.sort_values(by='PRODUCTION_PERIOD_END_DATE',
+                                 ascending=False,
+                                 na_position='last')
+
+
+def prepare_pa_c_production(pa_c_prod):
+    # Select only records that reflect 2022 production
+    return pa_c_prod.query("PERIOD_ID == '2022-0'")
+
+
+def prepare_wv_production(wv_2022):
+    # Total gas [Mcf] and liquids [bbl]
+    # TODO - should we add NGL into any of these fields? wv_data_prod_all["Total_NGL"]
+    wv_2022['total_gas_mcf'] = wv_2022["Total_Gas"]
+    wv_2022['total_liq_bbl'] = wv_2022["Total_Oil"]
+    wv_2022['total_water_bbl'] = wv_2022["Total_Water"]
+    return wv_2022
+
+
+# Attributes of Pennsylvania wells, with how they're combined
+pa_attributes = {
+    'FARM': 'first',  # well name and number
+    'WELL_STATUS': 'first',
+    'WELL_NO': 'first',
+    'SPUD_DATE': 'first',
+    'GAS_OPERATING_DAYS': 'sum',
+    'CONDENSATE_OPERATING_DAYS': 'sum',
+    'OIL_OPERATING_DAYS': 'sum',
+    'AVERAGE_IND': 'first',
+    'CLIENT': 'first',
+    'COUNTY': 'first',
+    'LATITUDE_DECIMAL': 'first',
+    'LONGITUDE_DECIMAL': 'first',
+    'UNCONVENTIONAL_IND': 'first',
+    'CONFIG_CODE': 'first',
+    'WELL_CODE_DESC': 'first'
+}
+
+
+state_rollups = {
+    # DATA downloaded from: https://www.commerce.alaska.gov/web/aogcc/Data.aspx
+    # A small number of APIs report more than one row of production in a
+    # single month, one row per formation/pool that API has access to.
+    # Group API-14 rows to one record per month, then API-10s to the year.
+    'ALASKA': {
+        'reader': lambda: read_excel_many([{'path': r'alaska\wellproductionpost2000.xlsx'}])[0],  # takes a WHILE to read the first time
+        'date_col': 'ReportDate',
+        'year': 2022,
+        'api': {'source': 'Api', 'target': 'API10', 'length': 10},
+        'volumes': {'oil': 'OilProduced', 'gas': 'GasProduced', 'water': 'WaterProduced'},
+        'days_col': 'DaysProduced',
+        'cap_days': False,
+        'levels': [{'by': ['Api', 'ReportDate'], 'days': 'max'},
+                   {'by': ['API10'], 'days': 'sum'}],
+        'attributes': ['WellName', 'OperatorName', 'WellStatus', 'AreaName',
+                       'FieldName', 'PadName', 'PoolName', 'ProductionType',
+                       'ProductionMethod']
+    },
+    # Monthly production per production reporting unit (PruID), from the
+    # "Prod" table of the AOGC Access database
+    'ARKANSAS': {
+        'reader': lambda: read_access_table(r'arkansas/AOGC.mdb', 'Prod'),
+        'date_col': 'RptDate',
+        'year': 2022,
+        'volumes': {'oil': 'OilProd', 'gas': 'GasProd', 'water': 'WtrProd'},
+        'levels': [{'by': ['PruID']}],
+        'lease_col': 'PruID',
+        'attributes': {'PruNumber': 'first'}
+    },
+    # Some records report more producing days than possible per month (for
+    # ex., 31 producing days in June). API-12s are converted to API-10s
+    # (well locations are at the API-10 level), with the leading zero of the
+    # state code added back.
+    'CALIFORNIA': {
+        'reader': lambda: pd.read_csv(r"california\2022CaliforniaOilAndGasWellMonthlyProduction.csv"),
+        'date_col': 'ProductionReportDate',
+        'year': 2022,
+        'api': {'source': 'APINumber', 'target': 'API10', 'length': 10},
+        'volumes': {'oil': 'OilorCondensateProduced', 'gas': 'GasProduced', 'water': 'WaterProduced'},
+        'days_col': 'DaysProducing',
+        'levels': [{'by': ['API10', 'ProductionReportDate'], 'days': 'max'},
+                   {'by': ['API10'], 'days': 'sum'}],
+        'attributes': ['WellTypeCode']
+    },
+    # Data available for download here: https://ecmc.state.co.us/data2.html#/downloads
+    # Annual data. An API-12 can report more than one row because (A) a row
+    # reports production from one of many formations/pools, or (B) the well
+    # changed operators part way through the year. Group to one row per
+    # API-12 + operator, then per API-12 (summing each operator's "stint"),
+    # then per API-10 surface location.
+    'COLORADO': {
+        'reader': lambda: read_excel_many([{'path': r'colorado/2022 Colorado Annual Production.xlsx',
+                                            'dtype': {'name': str,
+                                                      'api_county_code': str,
+                                                      'api_seq_num': str,
+                                                      'sidetrack_num': str}}])[0],
+        'prepare': prepare_co_production,
+        'api': {'source': 'api_num', 'target': 'API10', 'length': 10},
+        'volumes': {'oil': 'oil_prod', 'gas': 'gas_prod', 'water': 'water_prod'},
+        'days_col': 'Prod_days',
+        'levels': [{'by': ['api_num', 'name'], 'days': 'max'},
+                   {'by': ['api_num'], 'days': 'sum'},
+                   {'by': ['API10'], 'days': 'max'}],
+        'attributes': {'report_year': 'last',
+                       'flared_vented': 'sum',
+                       'gas_used_on_lease': 'sum'}
+    },
+    # KANSAS production data available at the lease level https://www.kgs.ku.edu/Magellan/Field/lease.html
+    # Monthly oil and gas lease records are grouped to one record per lease
+    # and product. Leases that don't report a product are assumed to have
+    # produced none of it.
+    'KANSAS': {
+        'reader': read_ks_production,
+        'date_col': 'MONTH-YEAR',
+        'year': 2022,
+        'fillna': True,
+        'volumes': {'oil': 'OIL_BBL', 'gas': 'GAS_MCF'},
+        'levels': [{'by': ['LEASE_KID', 'PRODUCT']}],
+        'lease_col': 'LEASE_KID',
+        'attributes': ['LEASE', 'DOR_CODE', 'API_NUMBER', 'FIELD', 'PRODUCING_ZONE',
+                       'OPERATOR', 'LATITUDE', 'LONGITUDE', 'WELLS']
+    },
+    # Production data available here https://eec.ky.gov/Natural-Resources/Oil-and-Gas/Resources/Pages/Production-Reports.aspx
+    # Annual records, grouped by Permit number AND year
+    'KENTUCKY': {
+        'reader': read_ky_production,
+        'volumes': {'oil': 'total_oil_prod', 'gas': 'total_gas_prod'},
+        'levels': [{'by': ['Year', 'Permit']}],
+        'unit_col': 'Permit',
+        'attributes': ['County', 'Company', 'Lease_NM', 'Well_No', 'LAT', 'LONG']
+    },
+    # Monthly production by LUW (lease unit or well) Code, all reported
+    # months
+    'LOUISIANA': {
+        'reader': lambda: pd.read_csv(r'louisiana/Oil and Gas Detail Production by Month.csv'),
+        'volumes': {'oil': 'Oil Production (Barrels)', 'gas': 'Gas Production (MCFs)',
+                    'cond': 'Condensate Oil'},
+        'levels': [{'by': ['LUW Code']}],
+        'attributes': {'Field ID': 'first',
+                       'Field Name': 'first',
+                       'Operator Name': 'first',
+                       'Luw Type Description': 'first',
+                       'Parish Name': 'first',
+                       'Well Count': 'max'}
+    },
+    # production data FTP site URL: ftp://ftp.deq.state.mi.us/geowebface
+    # Production volumes are reported monthly for each production reporting
+    # unit (PRU), which may include one or multiple wells. Month-specific
+    # rows are grouped to one row per PRU; the months it produced are
+    # counted to estimate its producing days.
+    'MICHIGAN': {
+        'reader': lambda: read_access_table(r'michigan/Oil&GasProduction 3-1-2023.accdb', 'Production'),
+        'prepare': prepare_mi_production,
+        'date_col': 'RptDate',
+        'year': 2022,
+        'volumes': {'oil': 'OilProd', 'gas': 'GasSold',  # FIXME is this field right?
+                    'water': 'WtrProd', 'cond': 'CondProd'},
+        'levels': [{'by': ['PRUNumber']}],
+        'lease_col': 'PRUNumber',
+        'attributes': {'OpNo': 'first',  # Operator Number
+                       'NGLProd': 'sum',
+                       'count_months': 'sum'}
+    },
+    # Mississippi production data available here https://www.ogb.state.ms.us/proddata.php
+    # Production values stored as NaNs are replaced with 0s. API-14s are
+    # grouped to the year (summing days), then API-10s so production from
+    # multiple bottom holes is combined (2+ bores can produce at once, so
+    # days aren't summed).
+    'MISSISSIPPI': {
+        'reader': lambda: pd.read_csv('mississippi/QueryResults_2022.csv'),
+        'year_col': 'Year',
+        'month_col': 'Month',
+        'year': 2022,
+        'fillna': True,
+        'api': {'source': 'WellID', 'target': 'API10', 'length': 10},
+        'volumes': {'oil': 'OilProd', 'gas': 'GasProd', 'water': 'WaterProd'},  # TODO should we use the SOLD fields?
+        'days_col': 'ProdDays',
+        'levels': [{'by': ['WellID'], 'days': 'sum'},
+                   {'by': ['API10'], 'days': 'max'}],
+        'attributes': ['Year', 'WellNameNumber', 'OperatorName',
+                       'ProdOperatorName', 'FieldName', 'CountyName']
+    },
+    # Monthly well-level production. Although API-14 values are listed, all
+    # of the values end with '0000' so they are equal to API-10 values.
+    # A small number of APIs report more than one row of production in a
+    # single month, one per formation/pool. Group to one record per API and
+    # month, then to the year.
+    'MONTANA': {
+        'reader': lambda: pd.read_csv(r'montana/MT_HistoricalWellProduction.tab', sep='\t'),
+        'prepare': prepare_mt_production,
+        'date_col': 'Rpt_Date',
+        'year': 2022,
+        'api': {'source': 'API_WellNo', 'target': 'API_str'},  # as string
+        'volumes': {'oil': 'BBLS_OIL_COND', 'gas': 'MCF_GAS', 'water': 'BBLS_WTR'},
+        'days_col': 'DAYS_PROD',
+        'levels': [{'by': ['API_str', 'Rpt_Date'], 'days': 'max'},
+                   {'by': ['API_str'], 'days': 'sum'}],
+        'lease_col': 'Lease_Unit',
+        'attributes': ['Lease_Unit', 'CoName']
+    },
+    # api_st_cde, api_cnty_cde, api_well_idn: API state, county and well codes
+    # prodn_mth, prodn_yr: month and year in which production occurred
+    # prd_knd_cde: Product Kind Code (Oil, Gas, or Water)
+    # prod_amt: volume of fluid produced (MCF or BBLS)
+    # prodn_day_num: number of days well completion produced or injected
+    # Some records report more days than possible (for ex., 37 in July).
+    # APIs that produced zero oil, gas, and water all year are dropped.
+    'NEW MEXICO': {
+        'reader': lambda: pd.read_csv(r'new_mexico\FTP_data_set\nm_2022_production_wells_from_FTP.csv'),
+        'prepare': prepare_nm_production,
+        'month_col': 'prodn_mth',
+        'year_col': 'prodn_yr',
+        'year': 2022,
+        'volumes': {'oil': 'OIL_BBL', 'gas': 'GAS_MCF', 'water': 'WATER_BBL'},
+        'days_col': 'prodn_day_num',
+        'levels': [{'by': ['api', 'prodn_mth'], 'days': 'max'},
+                   {'by': ['api'], 'days': 'sum'}],
+        'drop_zero': True
+    },
+    # Production data downloaded from: https://www.dmr.nd.gov/oilgas/mprindex.asp
+    # Monthly records of 2022, with well coordinates. A small number of APIs
+    # report more than one row of production in a single month, one per
+    # POOL. Group to one API record per month, then to the year.
+    'NORTH DAKOTA': {
+        'reader': read_nd_production,
+        'date_col': 'ReportDate',
+        'volumes': {'oil': 'Oil', 'gas': 'Gas', 'water': 'Wtr'},  # TODO should we use GasSold instead?
+        'days_col': 'Days',
+        'cap_days': False,
+        'levels': [{'by': ['API_WELLNO', 'ReportDate'], 'days': 'max'},
+                   {'by': ['API_WELLNO'], 'days': 'sum'}],
+        'attributes': {'Company': 'last',
+                       'WellName': 'last',
+                       'County': 'last',
+                       'GasSold': 'sum',
+                       'Flared': 'sum',
+                       'Lat': 'last',
+                       'Long': 'last'}
+    },
+    # Monthly production of unconventional wells, grouped by PERMIT_NUM to
+    # one row per well. The most recent status/operator is kept.
+    'PENNSYLVANIA_U': {
+        'reader': lambda: read_pa_production('Unconventional'),
+        'prepare': prepare_pa_u_production,
+        'state_prov': 'PENNSYLVANIA',
+        'date_col': 'PRODUCTION_PERIOD_END_DATE',
+        'volumes': {'oil': 'OIL_QUANTITY', 'gas': 'GAS_QUANTITY', 'cond': 'CONDENSATE_QUANTITY'},
+        'levels': [{'by': ['PERMIT_NUM']}],
+        'attributes': pa_attributes
+    },
+    # Annual production of conventional wells.
+    # There are some instances of duplicated PERMIT_NUMs across rows, with different CLIENT values
+    # TODO - if each of these rows have production and we sum them, are we double
+    # counting some production volumnes?
+    'PENNSYLVANIA_C': {
+        'reader': lambda: read_pa_production('Conventional'),
+        'prepare': prepare_pa_c_production,
+        'state_prov': 'PENNSYLVANIA',
+        'volumes': {'oil': 'OIL_QUANTITY', 'gas': 'GAS_QUANTITY', 'cond': 'CONDENSATE_QUANTITY'},
+        'levels': [{'by': ['PERMIT_NUM', 'FARM', 'CLIENT']}],
+        'attributes': pa_attributes
+    },
+    # Production data available from https://oilgas.ogm.utah.gov/oilgasweb/data-center/dc-main.xhtml
+    # Each API-10 can appear in 2+ rows per month, one per rock formation or
+    # well bore. Group to one API + bore record per month, then per year,
+    # then per API-10 (2+ bores can produce at once, so days aren't summed).
+    'UTAH': {
+        'reader': lambda: pd.read_csv(r'utah/Production2020To2024.csv'),
+        'prepare': prepare_ut_production,
+        'date_col': 'ReportPeriod',
+        'year': 2022,
+        'api': {'source': 'API', 'target': 'API'},  # as string
+        'volumes': {'oil': 'Oil', 'gas': 'Gas', 'water': 'Water'},
+        'days_col': 'DaysProd',
+        'cap_days': False,
+        'levels': [{'by': ['API', 'WellBore', 'ReportPeriod'], 'days': 'max'},
+                   {'by': ['API', 'WellBore'], 'days': 'sum'},
+                   {'by': ['API'], 'days': 'max'}],
+        'attributes': ['Operator', 'WellType', 'report_year']
+    },
+    # Well production data available from the WV [DEP](https://dep.wv.gov/oil-and-gas/databaseinfo/Pages/default.aspx)
+    # Units used. Gas = MCF (1,000 cubic feet). Oil, Condensate, Water = Barrels (42 gallons).
+    # Some APIs have multiple records, one per "Reporting_RP" value;
+    # aggregate these records so each API only has one annual production
+    # record. The API always only has one Operator associated with it.
+    'WEST VIRGINIA': {
+        'reader': lambda: read_excel_many([{'path': "west_virginia//2023-07-18 2022 Production File.xlsx"}])[0],
+        'prepare': prepare_wv_production,
+        'api': {'source': 'API', 'target': 'API'},  # as string (they will all be API-10)
+        'volumes': {'oil': 'total_liq_bbl', 'gas': 'total_gas_mcf', 'water': 'total_water_bbl'},
+        'levels': [{'by': ['API', 'Operator']}],
+        'attributes': {'Year': 'first', 'Well Type': 'first'}
+    }
+}
+
+# The monthly records of each state are also kept in the multi-year
+# production store, so other years can be derived later with
+# `production_store.annual_production` without re-reading the raw data.
+# States are processed in threads, which only overlap file I/O and the parts
+# of pandas that release the GIL. Parsing Excel workbooks is pure Python and
+# doesn't, so the Excel readers above use `read_excel_many`, which parses
+# uncached workbooks in separate processes (a process pool would need an
+# `if __name__ == '__main__':` guard that this script doesn't have).
+print(datetime.datetime.now())
+state_prod, state_totals = rollup_states(state_rollups,
+                                         n_workers=len(state_rollups),
+                                         before_after_table=before_after_table,
+                                         store_root='production_store')
+print(datetime.datetime.now())
+
 # ======================================================
 # %% ALASKA [2022] - Read + aggregate production
 # DATA downloaded from: https://www.commerce.alaska.gov/web/aogcc/Data.aspx
 # ======================================================
-# Read AK production well data (takes a WHILE to read)
-ak_prod = pd.read_excel(r'alaska\wellproductionpost2000.xlsx')
-print(ak_prod.columns)
-print(ak_prod.head())
-
-# Select only for 2022 production
-ak_prod["report_date"] = pd.to_datetime(ak_prod["ReportDate"])
-ak_prod["report_year"] = pd.to_datetime(ak_prod["ReportDate"]).dt.year
-ak_prod_2022 = ak_prod.query("report_year == 2022").reset_index(drop=True)
+# Annual production per API-10, from `rollup_states` above
+ak_prod_2022 = state_prod['ALASKA']
 print(ak_prod_2022.head())
 
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['ALASKA', 'oil_original'] = ak_prod_2022.OilProduced.sum()
-before_after_table.at['ALASKA', 'gas_original'] = ak_prod_2022.GasProduced.sum()
-# -----------------------------------------------------------------------------
-
-# Convert API-14 into API-10
-ak_prod_2022['API10'] = ak_prod_2022.Api.astype(str).str[:-4]
-
-# There are a small number of APIs that report more than one row of production
-# in a single month, and that's because each row reports the production from a
-# particular formation/pool that API has access to.
-dupes = ak_prod_2022[ak_prod_2022.duplicated(subset=['Api', 'ReportDate'], keep=False)]
-
-# FIRST, group the API-14 rows so that there's only one API-14 record per month.
-# This step prevents DaysProduced for wells being double-counted and above 365 in a year
-agg_funcs_1 = {
-    'API10': 'last',
-    'WellName': 'last',
-    'OperatorName': 'last',
-    'WellStatus': 'last',
-    'AreaName': 'last',
-    'FieldName': 'last',
-    'PadName': 'last',
-    'PoolName': 'last',
-    'ProductionType': 'last',
-    'ProductionMethod': 'last',
-    'OilProduced': 'sum',
-    'GasProduced': 'sum',
-    'WaterProduced': 'sum',
-    'DaysProduced': 'max'  # NOTE that handling of this field differs
-}
-ak_prod_2022 = ak_prod_2022.groupby(by=['Api',
-                                        'ReportDate'],
-                                    as_index=False).agg(agg_funcs_1)
-
-# THEN, group by API-10s so that you get one record for that well's 2022 annual production
-agg_funcs_2 = {
-    'WellName': 'last',
-    'OperatorName': 'last',
-    'WellStatus': 'last',
-    'AreaName': 'last',
-    'FieldName': 'last',
-    'PadName': 'last',
-    'PoolName': 'last',
-    'ProductionType': 'last',
-    'ProductionMethod': 'last',
-    'OilProduced': 'sum',
-    'GasProduced': 'sum',
-    'WaterProduced': 'sum',
-    'DaysProduced': 'sum'  # NOTE that handling of this field differs
-}
-ak_prod_2022 = ak_prod_2022.groupby(by=["API10"],
-                                    as_index=False).agg(agg_funcs_2).reset_index(drop=True)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['ALASKA', 'oil_agg'] = ak_prod_2022.OilProduced.sum()
-before_after_table.at['ALASKA', 'gas_agg'] = ak_prod_2022.GasProduced.sum()
-
 # =============================================================================
 # %% ALASKA - Location data
 # =============================================================================
@@ -657,11 +1031,13 @@ print(ak_wells.head())
 # =============================================================================
 # %% ALASKA - Merge and clean
 # =============================================================================
-ak_prod_merged = pd.merge(ak_wells,
-                          ak_prod_2022,
+# Production APIs and OGIM well FAC_IDs are joined on integer API-10 keys
+# (see well_identifiers.api_key), so differences in format (dashes, a lost
+# leading zero, a '.0' float suffix) don't prevent a match
+ak_prod_merged = pd.merge(ak_wells.assign(API10_KEY=api_key(ak_wells.FAC_ID)),
+                          ak_prod_2022.assign(API10_KEY=api_key(ak_prod_2022.API10)),
                           how="right",
-                          left_on="FAC_ID",
-                          right_on='API10')
+                          on='API10_KEY')
 # Convert to GeoDataFrame not necessary, as well's geometry column is preserved
 print(ak_prod_merged.head())
 print(ak_prod_merged.columns)
@@ -745,27 +1121,13 @@ save_spatial_data(
 # Read all tables from the MS Access database
 # NOTE: individual table names MUST be manually renamed to remove white spaces
 # (e.g., `PRU Master` to `PRUMaster`), or else `read_msAccess()` will fail
+# (The "Prod" table is read and aggregated by `rollup_states` above.)
 fp = r'arkansas/AOGC.mdb'
 tableNamesIdx_ar, tableNames_ar, dfs_ar = read_msAccess(fp,
-                                                        table_subset=['Prod',
-                                                                      'WellMaster_SideTrack',
+                                                        table_subset=['WellMaster_SideTrack',
                                                                       'UICMonitor'])
 name2index = dict(zip(tableNames_ar, tableNamesIdx_ar))
 
-# -----------------------------------------------------------------------------
-# Read the "Production" table from the Access DB into its own dataframe.
-prod_index = name2index.get('Prod')
-ar_prod_all = dfs_ar[prod_index]
-print(ar_prod_all.columns)
-print(ar_prod_all.head())
-
-# Filter to 2022 only
-ar_prod_2022 = ar_prod_all[ar_prod_all.RptDate.dt.year == 2022].reset_index(drop=True)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['ARKANSAS', 'oil_original'] = ar_prod_2022.OilProd.sum()  # is in BBL
-before_after_table.at['ARKANSAS', 'gas_original'] = ar_prod_2022.GasProd.sum()  # is in MCF
-
 # -----------------------------------------------------------------------------
 # Read the UICMonitor table
 uic_index = name2index.get('UICMonitor')
@@ -803,17 +1165,9 @@ pru_to_api = pru_to_api[pru_to_api.PRUID.notna()].reset_index(drop=True)
 pru_to_api_dict = dict(zip(pru_to_api.PRUID, pru_to_api.API_WellNo))
 
 # -----------------------------------------------------------------------------
-# Aggregate monthly production to an annual total for each PRUID
-agg_funcs_ar = {'PruNumber': 'first',
-                'OilProd': 'sum',
-                'GasProd': 'sum',
-                'WtrProd': 'sum'}
-ar_prod_agg = ar_prod_2022.groupby(by=['PruID'],
-                                   as_index=False).agg(agg_funcs_ar)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['ARKANSAS', 'oil_agg'] = ar_prod_agg.OilProd.sum()
-before_after_table.at['ARKANSAS', 'gas_agg'] = ar_prod_agg.GasProd.sum()
+# Annual production per PRUID, from `rollup_states` above (OilProd is in BBL,
+# GasProd in MCF)
+ar_prod_agg = state_prod['ARKANSAS']
 
 # Add a new column to `ar_prod_agg` that contains the API number for that PruID
 ar_prod_agg['api'] = ar_prod_agg.PruID.map(pru_to_api_dict)
@@ -912,74 +1266,9 @@ save_spatial_data(
 # ======================================================
 # %% CALIFORNIA [2022] - Read + aggregate production
 # ======================================================
-# Read in production datasets
-# These datasets have repeated APIs because data is stored monthly
-fp = r"california\2022CaliforniaOilAndGasWellMonthlyProduction.csv"
-ca_prod = pd.read_csv(fp)
-print(ca_prod.columns)
-print(ca_prod.head())
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['CALIFORNIA', 'oil_original'] = ca_prod.OilorCondensateProduced.sum()
-before_after_table.at['CALIFORNIA', 'gas_original'] = ca_prod.GasProduced.sum()
-# -----------------------------------------------------------------------------
-
-# There are some entries with more production days than possible per month
-# (for ex., 31 producing days reported in June which has 30 days)
-# Repair any of these cases so only the maximum days in each month is reported
-
-# Create a DateTime version of the ProductionReportDate value
-ca_prod['ProductionReport_datetime'] = pd.to_datetime(ca_prod['ProductionReportDate'])
-
-# If a record is for a month with 30 days AND it reports more than 30 days of
-# production, make it report only 30 days instead
-mask_30_day_month = ca_prod['ProductionReport_datetime'].dt.month.isin([4, 6, 9, 11])
-mask_over_30_days_producing = ca_prod.DaysProducing > 30
-ca_prod.loc[mask_30_day_month & mask_over_30_days_producing, 'DaysProducing'] = 30
-
-# If a record is for a month with 28 days (Feb) AND it reports more than 28 days of
-# production, make it report only 28 days instead
-mask_february = ca_prod['ProductionReport_datetime'].dt.month.isin([2])
-mask_over_28_days_producing = ca_prod.DaysProducing > 28
-ca_prod.loc[mask_february & mask_over_28_days_producing, 'DaysProducing'] = 28
-
-# ------------------------------------------------------
-# Before aggregating production to annual, convert API from an integer to a string
-# (and add the leading zero that is part of the state code portion of the API)
-ca_prod.APINumber = ca_prod.APINumber.astype(str)
-ca_prod['API12'] = "0" + ca_prod.APINumber
-# Convert API-12 into API-10 (well locations are at the API-10 level)
-ca_prod['API10'] = ca_prod.API12.str[:-2]
-dupes = ca_prod[ca_prod.duplicated(subset=['API10',
-                                           'ProductionReport_datetime'],
-                                   keep=False)]
-
-# FIRST, group the API-10 rows so that there's only one API-10 record per month.
-# This step prevents DaysProducing for wells being double-counted and above 365 in a year
-ca_agg_funcs_1 = {
-    'WellTypeCode': 'last',
-    'OilorCondensateProduced': 'sum',
-    'GasProduced': 'sum',
-    'WaterProduced': 'sum',
-    'DaysProducing': 'max'  # CHECK
-}
-ca_prod = ca_prod.groupby(by=['API10',
-                              'ProductionReport_datetime'],
-                          as_index=False).agg(ca_agg_funcs_1)
-
-# THEN, group by API-10s so that you get one record for that well's 2022 annual production
-ca_agg_funcs_2 = {
-    'WellTypeCode': 'last',
-    'OilorCondensateProduced': 'sum',
-    'GasProduced': 'sum',
-    'WaterProduced': 'sum',
-    'DaysProducing': 'sum'  # CHECK
-}
-ca_prod_agg = ca_prod.groupby(by=['API10'], as_index=False).agg(ca_agg_funcs_2)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['CALIFORNIA', 'oil_agg'] = ca_prod_agg.OilorCondensateProduced.sum()
-before_after_table.at['CALIFORNIA', 'gas_agg'] = ca_prod_agg.GasProduced.sum()
+# Annual production per API-10, from `rollup_states` above
+ca_prod_agg = state_prod['CALIFORNIA']
+print(ca_prod_agg.head())
 
 # =============================================================================
 # %% CALIFORNIA - Read wells
@@ -992,10 +1281,9 @@ print(ca_wells.head())
 # =============================================================================
 # %% CALIFORNIA - Merge and clean
 # =============================================================================
-ca_prod_merge = pd.merge(ca_prod_agg,
-                         ca_wells,
-                         left_on='API10',
-                         right_on="FAC_ID",
+ca_prod_merge = pd.merge(ca_prod_agg.assign(API10_KEY=api_key(ca_prod_agg.API10)),
+                         ca_wells.assign(API10_KEY=api_key(ca_wells.FAC_ID)),
+                         on='API10_KEY',
                          how="left")
 
 # Convert df to gdf, since CRS got dropped during the merge
@@ -1088,90 +1376,9 @@ save_spatial_data(
 # %% COLORADO [2022] - Read + aggregate production data
 # Data available for download here: https://ecmc.state.co.us/data2.html#/downloads
 # ======================================================
-# Read production data from the MS acc database
-# fp_prod = r"North_America\United_States_\State_Raw_Data\Colorado\Production\CO 2022 Annual Production.xlsx"
-
-# fp = r'colorado/CO 2022 Annual Production Summary-xp.mdb'
-# tableNamesIdx_co, tableNames_co, dfs_co = read_msAccess(fp)
-
-fp = r'colorado/2022 Colorado Annual Production.xlsx'
-co_prod = pd.read_excel(fp, converters={'name': str,
-                                        'api_county_code': str,
-                                        'api_seq_num': str,
-                                        'sidetrack_num': str})
-print(co_prod.columns)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['COLORADO', 'oil_original'] = co_prod.oil_prod.sum()
-before_after_table.at['COLORADO', 'gas_original'] = co_prod.gas_prod.sum()
-# -----------------------------------------------------------------------------
-
-# Create complete API number from separate columns
-co_prod["api_num"] = '05-' + co_prod['api_county_code'] + '-' + co_prod['api_seq_num'] + '-' + co_prod['sidetrack_num']
-
-# Convert API-12 into API-10
-co_prod['API10'] = co_prod.api_num.astype(str).str[:-3]
-
-# ------------------------------------------------------
-# Handle multiple rows for one API number
-print("Number of unique APIs versus number of records in production data = ", [len(co_prod["api_num"].unique()), co_prod.shape[0]])
-
-# There are a small number of API-12s that report more than one row of
-# production in a single month, due to one of two cases:
-# (A) a row reports a well's production from one of many formations/pools that
-# the API has access to; the well was operated by 1 company for the whole year
-# (B) the well, which draws from a single formation, changed operators part way
-# through the year; each row represents production under a specific ownership
-dupes = co_prod[co_prod.duplicated(subset=['api_num'], keep=False)]
-
-# FIRST, group rows so that there's one row for each API-12 + operator combo
-# for the year. This step prevents Prod_days for wells being double-counted and
-# above 365 in a year
-agg_funcs_1 = {
-    'report_year': 'last',
-    'Prod_days': 'max',  # NOTE that handling of this field differs
-    'oil_prod': 'sum',
-    'gas_prod': 'sum',
-    'flared_vented': 'sum',
-    'gas_used_on_lease': 'sum',
-    'water_prod': 'sum',
-    'API10': 'last'
-}
-co_prod_agg = co_prod.groupby(by=['api_num', 'name'],
-                              as_index=False).agg(agg_funcs_1)
-
-# THEN, group rows so that there's only one API-12 record for the year. The
-# production volumes & producing days from each operator's "stint" are summed.
-agg_funcs_2 = {
-    'report_year': 'last',
-    'Prod_days': 'sum',  # NOTE that handling of this field differs
-    'oil_prod': 'sum',
-    'gas_prod': 'sum',
-    'flared_vented': 'sum',
-    'gas_used_on_lease': 'sum',
-    'water_prod': 'sum',
-    'API10': 'last'
-}
-co_prod_agg = co_prod_agg.groupby(by=['api_num'],
-                                  as_index=False).agg(agg_funcs_2)
-
-# FINALLY, group by API-10s so that you get one record for the 2022 annual
-# production of that surface location.
-agg_funcs_3 = {
-    'report_year': 'last',
-    'Prod_days': 'max',  # NOTE that handling of this field differs
-    'oil_prod': 'sum',
-    'gas_prod': 'sum',
-    'flared_vented': 'sum',
-    'gas_used_on_lease': 'sum',
-    'water_prod': 'sum'
-}
-co_prod_agg = co_prod_agg.groupby(by=['API10'],
-                                  as_index=False).agg(agg_funcs_3)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['COLORADO', 'oil_agg'] = co_prod_agg.oil_prod.sum()
-before_after_table.at['COLORADO', 'gas_agg'] = co_prod_agg.gas_prod.sum()
+# Annual production per API-10, from `rollup_states` above
+co_prod_agg = state_prod['COLORADO']
+print(co_prod_agg.head())
 
 # =============================================================================
 # %% COLORADO - Location data
@@ -1184,11 +1391,10 @@ print(co_wells.head())
 # # =============================================================================
 # %% COLORADO - Merge and clean
 # =============================================================================
-co_prod_merge = pd.merge(co_prod_agg,
-                         co_wells,
+co_prod_merge = pd.merge(co_prod_agg.assign(API10_KEY=api_key(co_prod_agg.API10)),
+                         co_wells.assign(API10_KEY=api_key(co_wells.FAC_ID)),
                          how="left",
-                         left_on='API10',
-                         right_on='FAC_ID').reset_index(drop=True)
+                         on='API10_KEY').reset_index(drop=True)
 
 print("Total # of records in prod data = ", co_prod_agg.shape[0], " VERSUS merged data = ", co_prod_merge.shape[0])
 print("Total # of records with NULL lat values = ", co_prod_merge[co_prod_merge.LATITUDE.isnull()].shape[0])
@@ -1291,80 +1497,15 @@ save_spatial_data(
 # %% KANSAS [2022] - Read + aggregate production data
 # KANSAS production data available at the lease level https://www.kgs.ku.edu/Magellan/Field/lease.html
 # ======================================================
-# Read .txt data
-fp_gas_ks = r"kansas\gas_leases_2020_present.txt"
-ks_gas = pd.read_csv(fp_gas_ks, sep=",", header=0)
-print(ks_gas.head())
-print(ks_gas.columns)
-
-fp_oil_ks = r"kansas\oil_leases_2020_present.txt"
-ks_oil = pd.read_csv(fp_oil_ks, sep=",", header=0)
-print(ks_oil.head())
-print(ks_oil.columns)
-
-# Do both tables have the same columns?
-# NOTE that the column "production" in each table has different meanings and units!!!
-print(ks_gas.columns == ks_oil.columns)  # TRUE
-
-# ------------------------------------------------------
-# Select for 2022 records
-ks_gas["year"] = pd.to_datetime(ks_gas["MONTH-YEAR"]).dt.year
-ks_gas_2022 = ks_gas.query("year == 2022").reset_index(drop=True)
-
-ks_oil["year"] = pd.to_datetime(ks_oil["MONTH-YEAR"]).dt.year
-ks_oil_2022 = ks_oil.query("year == 2022").reset_index(drop=True)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['KANSAS', 'oil_original'] = ks_oil_2022.PRODUCTION.sum()  # NOTE that the column "production" in each table has different meanings and units!!!
-before_after_table.at['KANSAS', 'gas_original'] = ks_gas_2022.PRODUCTION.sum()
-# -----------------------------------------------------------------------------
-
-
-# AGGREGATE Production by Lease ID
-agg_funcs = {
-    'LEASE': 'last',
-    'DOR_CODE': 'last',
-    'API_NUMBER': 'last',
-    'FIELD': 'last',
-    'PRODUCING_ZONE': 'last',
-    'OPERATOR': 'last',
-    # 'COUNTY': 'last',
-    'LATITUDE': 'last',
-    'LONGITUDE': 'last',
-    'PRODUCT': 'last',
-    'WELLS': 'last',
-    'PRODUCTION': 'sum'  # NOTE that the column "production" in each table has different meanings and units!!!
-    # "GAS_MCF": 'sum',
-    # "OIL_BBL": 'sum'
-}
-
-ks_gas_agg = ks_gas_2022.groupby(by="LEASE_KID",
-                                 as_index=False).agg(agg_funcs).reset_index(drop=True)
-
-ks_oil_agg = ks_oil_2022.groupby(by="LEASE_KID",
-                                 as_index=False).agg(agg_funcs).reset_index(drop=True)
-
-
-# Change the col name "production" to to the specific hydrocarbon being reported
-ks_gas_agg["GAS_MCF"] = ks_gas_agg["PRODUCTION"]
-ks_oil_agg["OIL_BBL"] = ks_oil_agg["PRODUCTION"]
+# Annual production per lease and product, from `rollup_states` above.
+ks_prod = state_prod['KANSAS']
+print(ks_prod.head())
 
 print('Are there leases that report both oil AND gas production?')
-print(ks_gas_agg["LEASE_KID"].isin(ks_oil_agg["LEASE_KID"]).value_counts())  # should all be FALSE?
-
-# If there are none, it's safe to simply CONCATENATE BOTH TABLES
-ks_prod = pd.concat([ks_gas_agg, ks_oil_agg]).reset_index(drop=True)
-print(ks_prod.head())
-print("TOTAL # OF RECORDS = ", [ks_prod.shape[0], ks_gas_2022.shape[0], ks_oil_2022.shape[0]])
+print(ks_prod.LEASE_KID.duplicated(keep=False).value_counts())  # should all be FALSE?
 print(f'Unique LEASE_KID in oil and gas = {len(ks_prod.LEASE_KID.unique())}')
 print(f'Number of rows = {len(ks_prod)}')
 
-# After concatenating, fill the null production cells with zero, because if a
-# lease did not report any oil or gas production in a given year, we are assuming
-# it produced none of that hydrocarbon.
-ks_prod["GAS_MCF"] = ks_prod["GAS_MCF"].fillna(0)
-ks_prod["OIL_BBL"] = ks_prod["OIL_BBL"].fillna(0)
-
 
 # Exclude ALL Null LAT and LON
 ks_prod = ks_prod[~ks_prod["LATITUDE"].isnull()].reset_index(drop=True)
@@ -1477,79 +1618,9 @@ save_spatial_data(
 # - Production data available here https://eec.ky.gov/Natural-Resources/Oil-and-Gas/Resources/Pages/Production-Reports.aspx
 # - Includes separate files for oil and gas production for each month in a given year
 # ------------------------------------------------------
-# Read data files and concatenate together into one df.
-# There are separate Excel files for each year and hydrocarbon type
-prod_file_path = "kentucky"
-prod_files_ky = os.listdir(prod_file_path)
-
-ky_prod_dfs = []
-
-for file in tqdm(prod_files_ky):
-    if file.endswith('.xlsx'):
-        print(file)
-        df = pd.read_excel(os.path.join(prod_file_path, file))
-        if "Year 2017" in df.columns:
-            df.rename(columns={'Year 2017': 'Year'}, inplace=True)
-        if "PERMIT" in df.columns:
-            df.rename(columns={'PERMIT': 'Permit'}, inplace=True)
-        if "Oil" in file:
-            # df['prod_type'] = "OIL"
-            ky_prod_oil = df.copy()
-        elif "Gas" in file:
-            # df["prod_type"] = "GAS"
-            ky_prod_gas = df.copy()
-
-# Merge, rather than concatenate, the records, so that wells that report both
-# oil and gas production report those volumes in the same record.
-ky_prod_all = ky_prod_oil.merge(ky_prod_gas,
-                                how='outer',
-                                on=['Year',
-                                    'County',
-                                    'Permit',
-                                    'Company',
-                                    'Lease_NM',
-                                    'Well_No',
-                                    'PoolName',
-                                    'Formation',
-                                    'LAT',
-                                    'LONG'],
-                                suffixes=('_oil', '_gas'))
-
-
-# ky_prod_all = pd.concat(ky_prod_dfs).reset_index(drop=True)
-print(ky_prod_all.head())
-ky_prod_all.columns
-
-
-# Sum the total gas and total oil production for each row (which is a specific
-# lease plus year), and put the results in a new column
-gas_prod_cols = [col for col in ky_prod_all if col.endswith('Gas')]
-ky_prod_all['total_gas_prod'] = ky_prod_all[gas_prod_cols].sum(axis=1)
-oil_prod_cols = [col for col in ky_prod_all if col.endswith('Oil')]
-ky_prod_all['total_oil_prod'] = ky_prod_all[oil_prod_cols].sum(axis=1)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['KENTUCKY', 'oil_original'] = ky_prod_all.total_oil_prod.sum()
-before_after_table.at['KENTUCKY', 'gas_original'] = ky_prod_all.total_gas_prod.sum()
-# -----------------------------------------------------------------------------
-
-# Aggregate production rows by Permit number AND year
-agg_funcs_ky = {
-    'County': 'last',
-    'Company': 'last',
-    'Lease_NM': 'last',
-    'Well_No': 'last',
-    'LAT': 'last',
-    'LONG': 'last',
-    'total_gas_prod': 'sum',
-    'total_oil_prod': 'sum'
-}
-ky_prod_agg = ky_prod_all.groupby(by=["Year", "Permit"], as_index=False).agg(agg_funcs_ky).reset_index(drop=True)
-
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['KENTUCKY', 'oil_agg'] = ky_prod_agg.total_oil_prod.sum()
-before_after_table.at['KENTUCKY', 'gas_agg'] = ky_prod_agg.total_gas_prod.sum()
+# Annual production per Permit number and year, from `rollup_states` above
+ky_prod_agg = state_prod['KENTUCKY']
+print(ky_prod_agg.head())
 
 # ------------------------------------------------------
 # Remove any points with null geometries
@@ -1654,35 +1725,9 @@ save_spatial_data(
 # =============================================================================
 # %% LOUISIANA [2022]
 # =============================================================================
-# fp_la_prod = r'louisiana/Oil and Gas Detail Production by Month.csv'
-la_prod = pd.read_csv(r'louisiana/Oil and Gas Detail Production by Month.csv')  # monthly production table by LUW
-print(la_prod.columns)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['LOUISIANA', 'oil_original'] = la_prod['Oil Production (Barrels)'].sum()
-before_after_table.at['LOUISIANA', 'gas_original'] = la_prod['Gas Production (MCFs)'].sum()
-before_after_table.at['LOUISIANA', 'cond_original'] = la_prod['Condensate Oil'].sum()
-
-
-# Aggregate monthly production into annual production by LUW Code
-agg_funcs = {
-    "Field ID": "first",
-    "Field Name": "first",
-    "Operator Name": "first",
-    "Luw Type Description": "first",
-    "Parish Name": "first",
-    "Well Count": "max",
-    "Oil Production (Barrels)": "sum",
-    "Gas Production (MCFs)": "sum",
-    "Condensate Oil": "sum"
-}
-la_prod_agg = la_prod.groupby(by="LUW Code", as_index=False).agg(agg_funcs)
-
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['LOUISIANA', 'oil_agg'] = la_prod_agg['Oil Production (Barrels)'].sum()
-before_after_table.at['LOUISIANA', 'gas_agg'] = la_prod_agg['Gas Production (MCFs)'].sum()
-before_after_table.at['LOUISIANA', 'cond_agg'] = la_prod_agg['Condensate Oil'].sum()
+# Annual production by LUW Code, from `rollup_states` above
+la_prod_agg = state_prod['LOUISIANA']
+print(la_prod_agg.columns)
 
 # =============================================================================
 # %% LOUISIANA - Read well location and related tables
@@ -1836,53 +1881,17 @@ save_spatial_data(
 # (e.g., `PRU Master` to `PRUMaster`), or else `read_msAccess()` will fail
 # fp = "North_America//United_States_//State_Raw_Data//Michigan//Production//Oil&GasProduction 9-1-2022.accdb"
 fp = r'michigan/Oil&GasProduction 3-1-2023.accdb'
+# (The "Production" table is read and aggregated by `rollup_states` above.)
 tableNamesIdx_mi, tableNames_mi, dfs_mi = read_msAccess(fp,
-                                                        table_subset=['Production',
-                                                                      'PRUWells'])
-
-# Read the "Production" table from the Access DB into its own dataframe.
-# Production volumes are reported monthly for each production reporting
-# unit (PRU), which may include one or multiple wells.
+                                                        table_subset=['PRUWells'])
 name2index = dict(zip(tableNames_mi, tableNamesIdx_mi))
-prod_index = name2index.get('Production')
-mi_prod_all = dfs_mi[prod_index]
-print(mi_prod_all.columns)
-print(mi_prod_all.head())
-
-# Filter for 2022 production records only
-mi_prod_all["report_datetime"] = pd.to_datetime(mi_prod_all["RptDate"])
-mask_2022 = (mi_prod_all['report_datetime'].dt.year == 2022)
-mi_prod = mi_prod_all[mask_2022].reset_index(drop=True)
-# print("Total oil and gas production in mmbarrels and bcf = {} and {} , respectively \n".format((mi_prod["OilProd"].sum() / 1e6 + mi_prod["CondProd"].sum() / 1e6), mi_prod["GasSold"].sum() / 1e6))
 
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['MICHIGAN', 'oil_original'] = mi_prod.OilProd.sum()
-before_after_table.at['MICHIGAN', 'gas_original'] = mi_prod.GasSold.sum()  # FIXME is this field right?
-before_after_table.at['MICHIGAN', 'cond_original'] = mi_prod.CondProd.sum()
-# -----------------------------------------------------------------------------
-
-# Aggregate month-specific rows by PRUNumber to arrive at one row per PRU,
-# containing that PRU's annual production.
-mi_prod["count_months"] = 1  # Add a field to count the months a PRU produced
-agg_funcs = {
-    "OpNo": "first",  # Operator Number
-    "OilProd": "sum",
-    "CondProd": "sum",
-    "NGLProd": "sum",
-    "WtrProd": "sum",
-    "GasSold": "sum",
-    "count_months": "sum"
-}
-mi_prod_agg = mi_prod.groupby(by="PRUNumber", as_index=False).agg(agg_funcs)
+# Annual production per PRU, from `rollup_states` above
+mi_prod_agg = state_prod['MICHIGAN']
 # Estimate production days based on number of months a PRU was producing
 mi_prod_agg["prod_days"] = mi_prod_agg["count_months"] * 30.4
 mi_prod_agg["prod_days"] = mi_prod_agg["prod_days"].round()
 
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['MICHIGAN', 'oil_agg'] = mi_prod_agg.OilProd.sum()
-before_after_table.at['MICHIGAN', 'gas_agg'] = mi_prod_agg.GasSold.sum()
-before_after_table.at['MICHIGAN', 'cond_agg'] = mi_prod_agg.CondProd.sum()
-
 # =============================================================================
 # %% MICHIGAN - Read well location and attribute info
 # =============================================================================
@@ -1901,7 +1910,7 @@ pru_wells = pru_wells[cols2keep]
 pru_wells.head()
 
 # Format API-14 number as a string API-10, no hyphens (for joining with OGIM wells)
-pru_wells['API10'] = pru_wells.API_WellNo.astype(str).str[:10]
+pru_wells['API10'] = normalize_api(pru_wells.API_WellNo, length=10)
 # pru_wells.API_WellNo = pru_wells.API_WellNo.apply(lambda x: '{}-{}-{}-{}-{}'.format(x[0:2], x[2:5], x[5:10], x[10:12], x[12:14]))
 
 # ------------------------------------------------------
@@ -1911,11 +1920,10 @@ print(mi_well_locs.columns)
 print(mi_well_locs.head())
 
 # ------------------------------------------------------
-# Merge well attributes and well locations based on API
-pru_wells_locs = pd.merge(pru_wells,
-                          mi_well_locs,
-                          left_on='API10',
-                          right_on="FAC_ID",
+# Merge well attributes and well locations based on integer API-10 keys
+pru_wells_locs = pd.merge(pru_wells.assign(API10_KEY=api_key(pru_wells.API_WellNo)),
+                          mi_well_locs.assign(API10_KEY=api_key(mi_well_locs.FAC_ID)),
+                          on='API10_KEY',
                           how="left")
 print(pru_wells_locs.head())
 
@@ -1964,7 +1972,7 @@ mi_prod_merge = gpd.GeoDataFrame(mi_prod_merge,
                                  crs='epsg:4326')
 
 print("=================================")
-print("Total oil in original versus merged dataset = {} versus {} million barrels".format((mi_prod["OilProd"].sum() / 1e6 + mi_prod["CondProd"].sum() / 1e6), (mi_prod_merge["OilProd"].sum() / 1e6 + mi_prod_merge["CondProd"].sum() / 1e6)))
+print("Total oil in original versus merged dataset = {} versus {} million barrels".format(((before_after_table.at['MICHIGAN', 'oil_original'] + before_after_table.at['MICHIGAN', 'cond_original']) / 1e6), (mi_prod_merge["OilProd"].sum() / 1e6 + mi_prod_merge["CondProd"].sum() / 1e6)))
 
 # Drop any rows that have a null geometry (i.e., wells where we have a
 # location for them, but no production record to join it to)
@@ -2051,93 +2059,9 @@ save_spatial_data(
 # %% MISSISSIPPI [2022] - Read + aggregate production
 # Mississippi production data available here https://www.ogb.state.ms.us/proddata.php
 # ======================================================
-# Read in production data file
-ms_prod = pd.read_csv('mississippi/QueryResults_2022.csv')
-# Filter production by Year
-ms_prod = ms_prod.query("Year == 2022").reset_index(drop=True)
+# Annual production per API-10, from `rollup_states` above
+ms_prod = state_prod['MISSISSIPPI']
 print(ms_prod.head())
-print(ms_prod.columns)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['MISSISSIPPI', 'oil_original'] = ms_prod.OilProd.sum()  # TODO should we use the SOLD fields?
-before_after_table.at['MISSISSIPPI', 'gas_original'] = ms_prod.GasProd.sum()
-# -----------------------------------------------------------------------------
-
-# Replace production values stored as NaNs with 0s
-cols_with_nulls = ['OilProd', 'GasProd', 'WaterProd', 'ProdDays']
-ms_prod[cols_with_nulls] = ms_prod[cols_with_nulls].fillna(0)
-
-# Create a string API14 column
-ms_prod['API14'] = ms_prod.WellID.astype(str)
-
-# Since well-level data uses API10, create an API10 column
-ms_prod['API10'] = ms_prod.API14.str[:-4]
-
-# ------------------------------------------------------
-# There are some entries with more production days than possible per month
-# (for ex., 31 producing days reported in February)
-# Repair any of these cases so only the maximum days in each month is reported
-
-# If a record is for a month with 30 days AND it reports more than 30 days of
-# production, make it report only 30 days instead
-mask_30_day_month = ms_prod['Month'].isin([4, 6, 9, 11])
-mask_over_30_days_producing = ms_prod.ProdDays > 30
-ms_prod.loc[mask_30_day_month & mask_over_30_days_producing, 'ProdDays'] = 30
-
-# If a record is for a month with 28 days (Feb) AND it reports more than 28 days of
-# production, make it report only 28 days instead
-mask_february = ms_prod['Month'].isin([2])
-mask_over_28_days_producing = ms_prod.ProdDays > 28
-ms_prod.loc[mask_february & mask_over_28_days_producing, 'ProdDays'] = 28
-
-# ------------------------------------------------------
-# FIRST, group production by API-14, so the 12 months of records for a specific
-# API14 are combined
-agg_funcs = {
-    # 'API14': 'first',
-    'API10': 'last',
-    'Year': 'last',
-    'WellNameNumber': 'last',
-    'OperatorName': 'last',
-    'ProdOperatorName': 'last',
-    'FieldName': 'last',
-    'CountyName': 'last',
-    'ProdDays': 'sum',  # NOTE different treatment
-    'OilProd': 'sum',
-    'WaterProd': 'sum',
-    'GasProd': 'sum'
-}
-
-
-ms_prod = ms_prod.groupby(by="API14", as_index=False).agg(agg_funcs)
-print(ms_prod.head())
-
-# See if there are still multiple entries for each API-10. (Yes, there are)
-dupes = ms_prod[ms_prod.API10.duplicated(keep=False)]
-
-# ------------------------------------------------------
-# THEN, group production by API-10, so production from multiple bottom holes
-# are combined
-agg_funcs_2 = {
-    # 'API10': 'last',
-    'Year': 'last',
-    'WellNameNumber': 'last',
-    'OperatorName': 'last',
-    'ProdOperatorName': 'last',
-    'FieldName': 'last',
-    'CountyName': 'last',
-    'ProdDays': 'max',  # NOTE different treatment
-    'OilProd': 'sum',
-    'WaterProd': 'sum',
-    'GasProd': 'sum'
-}
-
-ms_prod = ms_prod.groupby(by="API10", as_index=False).agg(agg_funcs_2)
-print(ms_prod.head())
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['MISSISSIPPI', 'oil_agg'] = ms_prod.OilProd.sum()
-before_after_table.at['MISSISSIPPI', 'gas_agg'] = ms_prod.GasProd.sum()
 
 # ======================================================
 # %% MISSISSIPPI - Location data
@@ -2150,10 +2074,9 @@ print(ms_wells.head())
 # ======================================================
 # %% MISSISSIPPI - Merge and clean
 # ======================================================
-ms_prod_merged = pd.merge(ms_prod,
-                          ms_wells,
-                          left_on='API10',
-                          right_on='FAC_ID',
+ms_prod_merged = pd.merge(ms_prod.assign(API10_KEY=api_key(ms_prod.API10)),
+                          ms_wells.assign(API10_KEY=api_key(ms_wells.FAC_ID)),
+                          on='API10_KEY',
                           how="left").reset_index(drop=True)
 print(ms_prod_merged.head())
 print(ms_prod_merged.columns)
@@ -2259,77 +2182,9 @@ save_spatial_data(
 # =============================================================================
 # %% MONTANA [2022] - Read + aggregate production data
 # =============================================================================
-# Read monthly well-level production data
-mt_prod = pd.read_csv(r'montana/MT_HistoricalWellProduction.tab', sep='\t')
-print(mt_prod.columns)
-print(mt_prod.head())
-mt_prod['datetimes'] = pd.to_datetime(mt_prod['Rpt_Date'], format='%m/%d/%Y', errors='coerce')
-mt_prod['year'] = mt_prod['datetimes'].dt.year
-
-mt_prod_2022 = mt_prod.query("year == 2022")
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['MONTANA', 'oil_original'] = mt_prod_2022.BBLS_OIL_COND.sum()
-before_after_table.at['MONTANA', 'gas_original'] = mt_prod_2022.MCF_GAS.sum()
-
-# Note: Although API-14 values are listed, all of the values end with '0000' so
-# they are equal to API-10 values
-mt_prod_2022['API_str'] = mt_prod_2022.API_WellNo.astype(str)
-mt_prod_2022['API_str'].str.endswith('0000').value_counts()  # TRUE
-
-# -----------------------------------------------------------------------------
-# There are some entries with more production days than possible per month
-# (for ex., 31 producing days reported in June which has 30 days)
-# Repair any of these cases so only the maximum days in each month is reported
-
-# If a record is for a month with 30 days AND it reports more than 30 days of
-# production, make it report only 30 days instead
-mask_30_day_month = mt_prod_2022['datetimes'].dt.month.isin([4, 6, 9, 11])
-mask_over_30_days_producing = mt_prod_2022.DAYS_PROD > 30
-mt_prod_2022.loc[mask_30_day_month & mask_over_30_days_producing, 'DAYS_PROD'] = 30
-
-# If a record is for a month with 28 days (Feb) AND it reports more than 28 days of
-# production, make it report only 28 days instead
-mask_february = mt_prod_2022['datetimes'].dt.month.isin([2])
-mask_over_28_days_producing = mt_prod_2022.DAYS_PROD > 28
-mt_prod_2022.loc[mask_february & mask_over_28_days_producing, 'DAYS_PROD'] = 28
-
-# A small number of monthly production records report an impossible number of
-# production days (like 270 days in a month). Since we can't really know what
-# they intended to write, set these values to n/a instead
-mt_prod_2022.loc[mt_prod_2022.DAYS_PROD > 31, 'DAYS_PROD'] = np.nan
-
-# -----------------------------------------------------------------------------
-# There are a small number of APIs that report more than one row of production
-# in a single month, and that's because each row reports the production from a
-# particular formation/pool that API has access to.
-dupes = mt_prod_2022[mt_prod_2022.duplicated(subset=['API_str',
-                                                     'Rpt_Date'],
-                                             keep=False)]
-
-# FIRST, group the API-14 rows so that there's only one API-14 record per month.
-# This step prevents DaysProduced for wells being double-counted and above 365 in a year
-agg_mt_1 = {'Lease_Unit': 'last',
-            'CoName': 'last',
-            'BBLS_OIL_COND': 'sum',
-            'MCF_GAS': 'sum',
-            'BBLS_WTR': 'sum',
-            'DAYS_PROD': 'max'  # NOTE that handling of this field differs
-            }
-mt_prod_2022 = mt_prod_2022.groupby(by=['API_str', 'Rpt_Date'],
-                                    as_index=False).agg(agg_mt_1)
-
-# THEN, group by API-14s so that you get one record for that well's 2022 annual production
-agg_mt_2 = {'Lease_Unit': 'last',
-            'CoName': 'last',
-            'BBLS_OIL_COND': 'sum',
-            'MCF_GAS': 'sum',
-            'BBLS_WTR': 'sum',
-            'DAYS_PROD': 'sum'  # NOTE that handling of this field differs
-            }
-
-mt_prod_2022_agg = mt_prod_2022.groupby(by=['API_str'],
-                                        as_index=False).agg(agg_mt_2)
+# Annual production per API, from `rollup_states` above
+mt_prod_2022_agg = state_prod['MONTANA']
+print(mt_prod_2022_agg.head())
 
 # =============================================================================
 # %% MONTANA - Location data
@@ -2427,93 +2282,10 @@ save_spatial_data(
 
 # =============================================================================
 # %% NEW MEXICO - Read + aggregate production data
-
-# api_st_cde	American Petroleum Institute unique state identifier
-# api_cnty_cde	American Petroleum Institute county code
-# api_well_idn	American Petroleum Institute unique well code, by county
-# pool_idn	    Identifier code for specific pool
-# prodn_mth	    Month in which production occurred
-# prodn_yr	    Year that production occurred
-# ogrid_cde	    Oil & Gas Reporting ID
-# prd_knd_cde	Product Kind Code (Oil, Gas, or Water)
-# eff_dte	    The date which the RECORD is effective
-# amend_ind	    Identifies submitted form as an amended form
-# c115_wc_stat_cde  Status Code reported on C115
-# prod_amt	    Volume of fluid produced (MCF or BBLS)
-# prodn_day_num	Number of days well completion produced or injected
-# mod_dte	    Last modified
 # =============================================================================
-fp = r'new_mexico\FTP_data_set\nm_2022_production_wells_from_FTP.csv'
-nm_prod = pd.read_csv(fp)
-print(nm_prod.columns)
-print(nm_prod.head)
-
-# Create separate columns for Oil, Gas, and Water production
-nm_prod.prd_knd_cde = nm_prod.prd_knd_cde.str.strip()  # remove trailing spaces
-nm_prod.loc[nm_prod.prd_knd_cde == 'O', 'OIL_BBL'] = nm_prod.prod_amt
-nm_prod.loc[nm_prod.prd_knd_cde == 'G', 'GAS_MCF'] = nm_prod.prod_amt
-nm_prod.loc[nm_prod.prd_knd_cde == 'W', 'WATER_BBL'] = nm_prod.prod_amt
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['NEW MEXICO', 'oil_original'] = nm_prod.OIL_BBL.sum()
-before_after_table.at['NEW MEXICO', 'gas_original'] = nm_prod.GAS_MCF.sum()
-
-# ------------------------------------------------------
-# There are some entries with more production days than possible per month
-# (for ex., 37 producing days reported in July)
-# Repair any of these cases so only the maximum days in each month is reported
-
-# If a record is for a month with 30 days AND it reports more than 30 days of
-# production, make it report only 30 days instead
-mask_30_day_month = nm_prod['prodn_mth'].isin([4, 6, 9, 11])
-mask_over_30_days_producing = nm_prod.prodn_day_num > 30
-nm_prod.loc[mask_30_day_month & mask_over_30_days_producing, 'prodn_day_num'] = 30
-
-# If a record is for a month with 28 days (Feb) AND it reports more than 28 days of
-# production, make it report only 28 days instead
-mask_february = nm_prod['prodn_mth'].isin([2])
-mask_over_28_days_producing = nm_prod.prodn_day_num > 28
-nm_prod.loc[mask_february & mask_over_28_days_producing, 'prodn_day_num'] = 28
-
-# Finally, if there are any remaining records with more than 31 production days
-# reported, set that total to 31 days
-nm_prod.loc[nm_prod.prodn_day_num > 31, 'prodn_day_num'] = 31
-
-# -----------------------------------------------------------------------------
-# Aggregate monthly production to an annual total for each well
-
-# Create API field on which to aggregate
-nm_prod.api_cnty_cde = nm_prod.api_cnty_cde.astype(str).str.zfill(3)
-nm_prod.api_well_idn = nm_prod.api_well_idn.astype(str).str.zfill(5)
-nm_prod['api'] = nm_prod.api_st_cde.astype(str) + '-' + nm_prod.api_cnty_cde + '-' + nm_prod.api_well_idn.astype(str)
-
-# FIRST, group by API *and* Month so that there's only one API record per month.
-# This step prevents DaysProduced for wells being double-counted and above 365 in a year
-agg_funcs_nm_1 = {'OIL_BBL': 'sum',
-                  'GAS_MCF': 'sum',
-                  'WATER_BBL': 'sum',
-                  # 'ogrid_cde': 'first',
-                  'prodn_day_num': 'max'}  # NOTE that handling of this field differs
-nm_prod_agg = nm_prod.groupby(by=['api', 'prodn_mth'],
-                              as_index=False).agg(agg_funcs_nm_1)
-
-# THEN, group by APIs so that you get one record for that well's 2022 annual production
-agg_funcs_nm_2 = {'OIL_BBL': 'sum',
-                  'GAS_MCF': 'sum',
-                  'WATER_BBL': 'sum',
-                  # 'ogrid_cde': 'first',
-                  'prodn_day_num': 'sum'}  # NOTE that handling of this field differs
-nm_prod_agg = nm_prod.groupby(by=['api'],
-                              as_index=False).agg(agg_funcs_nm_2)
-
-# If there are any APIs that produced zero oil, gas, or water all year, drop these records
-mask_no_prod = ((nm_prod_agg.OIL_BBL == 0) & (nm_prod_agg.GAS_MCF == 0) & (nm_prod_agg.WATER_BBL == 0))
-nm_prod_agg = nm_prod_agg[~mask_no_prod].reset_index(drop=True)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['NEW MEXICO', 'oil_agg'] = nm_prod_agg.OIL_BBL.sum()
-before_after_table.at['NEW MEXICO', 'gas_agg'] = nm_prod_agg.GAS_MCF.sum()
-
+# Annual production per API, from `rollup_states` above
+nm_prod_agg = state_prod['NEW MEXICO']
+print(nm_prod_agg.head())
 
 # =============================================================================
 # %% NEW MEXICO - Location data
@@ -2747,73 +2519,9 @@ save_spatial_data(
 # %% NORTH DAKOTA [2022] - Read + aggregate production data (w/ well coords)
 # Production data downloaded from: https://www.dmr.nd.gov/oilgas/mprindex.asp
 # =============================================================================
-fp_xlsx = r"north_dakota//"
-
-# Read individual Excel files
-nd_prod_dfs = []
-files = os.listdir(fp_xlsx)
-for file in files:
-    if file.endswith('.xlsx') and file.startswith('2022'):
-        # print(file)
-        df = pd.read_excel(os.path.join(fp_xlsx, file), sheet_name=0)
-        nd_prod_dfs.append(df)
-
-# Concatenate result
-nd_prod = pd.concat(nd_prod_dfs).reset_index(drop=True)
-print("==============================")
-print(nd_prod.columns)
-print(nd_prod.head())
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['NORTH DAKOTA', 'oil_original'] = nd_prod.Oil.sum()
-before_after_table.at['NORTH DAKOTA', 'gas_original'] = nd_prod.Gas.sum()  # TODO should we use GasSold instead?
-# -----------------------------------------------------------------------------
-# There are a small number of APIs that report more than one row of production
-# in a single month, and that's because each row reports the production from a
-# particular POOL that API has access to.
-dupes = nd_prod[nd_prod.duplicated(subset=['API_WELLNO', 'ReportDate'], keep=False)]
-
-# FIRST, group the rows so that there's only one API-14 record PER MONTH.
-# This sums together production from 2+ different pools.
-# This step prevents Days Produced for wells being double-counted and above 365 in a year
-agg_funcs1 = {
-    'Company': 'last',
-    'WellName': 'last',
-    'County': 'last',
-    # 'FieldName': 'last',
-    # 'Pool': 'last',
-    'Oil': 'sum',
-    'Wtr': 'sum',
-    'Days': 'max',  # different treatment
-    'Gas': 'sum',
-    'GasSold': 'sum',
-    'Flared': 'sum',
-    'Lat': 'last',
-    'Long': 'last'
-}
-nd_prod_ag = nd_prod.groupby(by=['API_WELLNO',
-                                 'ReportDate'],
-                             as_index=False).agg(agg_funcs1)
-
-# Should have zero dupes for API and month now
-dupes = nd_prod_ag[nd_prod_ag.duplicated(subset=['API_WELLNO', 'ReportDate'], keep=False)]
-
-# THEN, group by APIs so that you get one record for that well's 2022 annual
-# production.
-agg_funcs2 = {
-    'Company': 'last',
-    'WellName': 'last',
-    'County': 'last',
-    'Oil': 'sum',
-    'Wtr': 'sum',
-    'Days': 'sum',  # different treatment
-    'Gas': 'sum',
-    'GasSold': 'sum',
-    'Flared': 'sum',
-    'Lat': 'last',
-    'Long': 'last'
-}
-nd_prod_agg = nd_prod_ag.groupby(by=["API_WELLNO"], as_index=False).agg(agg_funcs2)
+# Annual production per API, from `rollup_states` above
+nd_prod_agg = state_prod['NORTH DAKOTA']
+print(nd_prod_agg.head())
 
 # Convert to GDF
 nd_prod_agg = gpd.GeoDataFrame(nd_prod_agg,
@@ -2846,10 +2554,6 @@ figNM = scatterMaps(
     saveFigPath=results_folder + "ND_2022_production.tiff"
 )
 
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['NORTH DAKOTA', 'oil_agg'] = nd_prod_agg.Oil.sum()
-before_after_table.at['NORTH DAKOTA', 'gas_agg'] = nd_prod_agg.Gas.sum()
-
 # =============================================================================
 # %% NORTH DAKOTA - Integration
 # =============================================================================
@@ -2903,40 +2607,26 @@ save_spatial_data(
 # updated weekly
 # Data source: https://ohiodnr.gov/wps/portal/gov/odnr/discover-and-learn/safety-conservation/about-odnr/oil-gas/oil-gas-resources/featured-content-3
 # ======================================================
-# Read MS Access data; takes a long time
+# Read MS Access data. Only the columns I'm interested in, and only the
+# production year(s) I'm interested in, are read from the (large) database.
 # fp = "North_America\\United_States_\\State_Raw_Data\\Ohio\\Rbdmsd97_09.12.2023\\Rbdmsd97.mdb"
 fp = 'ohio\\Rbdmsd97.mdb'
-tableNamesIdx_oh, tableNames_oh, dfs_oh = read_msAccess(fp,
-                                                        table_subset=['Production',
-                                                                      'Well',
-                                                                      'tblLocational'])
-
-# create a dictionary that maps the index (number) of each MS Access table to
-# the table's name, so I can select dataframes from `dfs` by Name instead of
-# just their index number. (The state of Ohio seems to have changed the order...)
-name2index = dict(zip(tableNames_oh, tableNamesIdx_oh))
-
-# What's the index number that refers to the 'Production' table?
-# Read in the production data, and keep only the columns I'm interested in
-prod_index = name2index.get('Production')
-oh_prod = dfs_oh[prod_index][['API_WELLNO',
-                              'PRODUCTION_YEAR',
-                              'OWNER_NAME',
-                              'OIL',
-                              'GAS',
-                              'BRINE',
-                              'DAYS',
-                              'DateFirstProd',
-                              'MaximumStorageCapacity',
-                              'NumberOilStorageTanks']]
-print(oh_prod.dtypes)
-
-# How far back does production data go?
-print(list(sorted(oh_prod.PRODUCTION_YEAR.unique())))
 
 # Extract production data for year(s) you're interested in
 prodyears2keep = ['2022']
-oh_prod = oh_prod[oh_prod.PRODUCTION_YEAR.isin(prodyears2keep)]
+oh_prod = read_access_table(fp, 'Production',
+                            columns=['API_WELLNO',
+                                     'PRODUCTION_YEAR',
+                                     'OWNER_NAME',
+                                     'OIL',
+                                     'GAS',
+                                     'BRINE',
+                                     'DAYS',
+                                     'DateFirstProd',
+                                     'MaximumStorageCapacity',
+                                     'NumberOilStorageTanks'],
+                            where=[('PRODUCTION_YEAR', 'in', prodyears2keep)])
+print(oh_prod.dtypes)
 
 # Record the total oil and gas produced in 2022 before any other data cleaning
 before_after_table.at['OHIO', 'oil_original'] = oh_prod.OIL.sum()
@@ -2951,29 +2641,30 @@ oh_prod.loc[oh_prod.DAYS > 365, 'DAYS'] = 365
 # %% OHIO - Location data
 # =============================================================================
 # Extract Well-Level attribute data, and keep only the columns I need
-well_index = name2index.get('Well')
-oh_wells_noloc = dfs_oh[well_index][['API_WELLNO',
-                                     'WL_STATUS',
-                                     'DT_STATUS',
-                                     'DT_SPUD',
-                                     'DT_COMP',
-                                     'WELL_NM',
-                                     'WELL_TYP',
-                                     'WELL_NO',
-                                     'OPNO']]
+oh_wells_noloc = read_access_table(fp, 'Well',
+                                   columns=['API_WELLNO',
+                                            'WL_STATUS',
+                                            'DT_STATUS',
+                                            'DT_SPUD',
+                                            'DT_COMP',
+                                            'WELL_NM',
+                                            'WELL_TYP',
+                                            'WELL_NO',
+                                            'OPNO'])
 # Reformat ID fields for merging with locational info
 oh_wells_noloc["LOCATION_ID"] = oh_wells_noloc["API_WELLNO"]
 oh_wells_noloc['OPNO'] = oh_wells_noloc['OPNO'].astype('Int64')
 
 
-# Extract Well-Level Location data, and keep only the columns I need
-tbl_loc_index = name2index.get('tblLocational')
-tbl_loc = dfs_oh[tbl_loc_index][["LOCATION_ID",
-                                 "WH_LAT",
-                                 "WH_LONG",
-                                 "SLANT"]]
+# Extract Well-Level Location data, and keep only the columns I need.
 # Only select locations that are not null
-tbl_loc = tbl_loc[(tbl_loc.WH_LAT.notnull() & tbl_loc.WH_LONG.notnull())]
+tbl_loc = read_access_table(fp, 'tblLocational',
+                            columns=["LOCATION_ID",
+                                     "WH_LAT",
+                                     "WH_LONG",
+                                     "SLANT"],
+                            where=[('WH_LAT', 'notna', None),
+                                   ('WH_LONG', 'notna', None)])
 
 # a few longitudes are erroneously positive; fix them
 tbl_loc.loc[tbl_loc.WH_LONG > 0, 'WH_LONG'] = tbl_loc.WH_LONG * -1
@@ -3187,55 +2878,10 @@ save_spatial_data(
 # ======================================================
 # %% PENNSYLVANIA [2022] - Unconventional - Read + aggregate production
 # ======================================================
-# Read production data for Unconventional wells
-pa_u_prod = pd.read_csv("pennsylvania\\OilGasProduction_2022.csv")
-pa_u_prod = pa_u_prod[pa_u_prod.WIRE_LABEL.str.contains('Unconventional')].reset_index(drop=True)
-print(pa_u_prod.head().iloc[:, 0:10])
-print(*pa_u_prod.columns, sep='\n')
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['PENNSYLVANIA_U', 'oil_original'] = pa_u_prod.OIL_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_U', 'gas_original'] = pa_u_prod.GAS_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_U', 'cond_original'] = pa_u_prod.CONDENSATE_QUANTITY.sum()
-# -----------------------------------------------------------------------------
-
-# Data format is rows of monthly well production - group by WELL_PERMIT_NUM
-# to arrive at one row/well with annaul production
-
-# Sort records so that the most recent month of reporting is FIRST, and
-# therefore the most recent status/operator is listed first
-pa_u_prod['PRODUCTION_PERIOD_END_DATE'] = pd.to_datetime(pa_u_prod['PRODUCTION_PERIOD_END_DATE'])
-pa_u_prod_sorted = pa_u_prod.sort_values(by='PRODUCTION_PERIOD_END_DATE',
-                                         ascending=False,
-                                         na_position='last')
-
-agg_f = {
-    'FARM': 'first',  # well name and number
-    'WELL_STATUS': 'first',
-    'WELL_NO': 'first',
-    'SPUD_DATE': 'first',
-    'GAS_QUANTITY': 'sum',
-    'GAS_OPERATING_DAYS': 'sum',
-    'CONDENSATE_QUANTITY': 'sum',
-    'CONDENSATE_OPERATING_DAYS': 'sum',
-    'OIL_QUANTITY': 'sum',
-    'OIL_OPERATING_DAYS': 'sum',
-    'AVERAGE_IND': 'first',
-    'CLIENT': 'first',
-    'COUNTY': 'first',
-    'LATITUDE_DECIMAL': 'first',
-    'LONGITUDE_DECIMAL': 'first',
-    'UNCONVENTIONAL_IND': 'first',
-    'CONFIG_CODE': 'first',
-    'WELL_CODE_DESC': 'first'
-}
-
-pa_u_prod_agg = pa_u_prod_sorted.groupby(by="PERMIT_NUM").agg(agg_f).reset_index(drop=False)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['PENNSYLVANIA_U', 'oil_agg'] = pa_u_prod_agg.OIL_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_U', 'gas_agg'] = pa_u_prod_agg.GAS_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_U', 'cond_agg'] = pa_u_prod_agg.CONDENSATE_QUANTITY.sum()
+# Monthly production of unconventional wells, grouped to one row per
+# PERMIT_NUM with annual production by `rollup_states` above
+pa_u_prod_agg = state_prod['PENNSYLVANIA_U']
+print(pa_u_prod_agg.head().iloc[:, 0:10])
 
 # ======================================================
 # %% PENNSYLVANIA - Unconventional - Clean
@@ -3383,52 +3029,11 @@ save_spatial_data(
 # ======================================================
 # %% PENNSYLVANIA - Conventional - Read + aggregate
 # ======================================================
-pa_c_prod = pd.read_csv("pennsylvania\\OilGasProduction_2022.csv")
-pa_c_prod = pa_c_prod[pa_c_prod.WIRE_LABEL.str.contains('Conventional')].reset_index(drop=True)
-# Select only records that reflect 2022 production
-pa_c_prod = pa_c_prod.query("PERIOD_ID == '2022-0'")
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['PENNSYLVANIA_C', 'oil_original'] = pa_c_prod.OIL_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_C', 'gas_original'] = pa_c_prod.GAS_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_C', 'cond_original'] = pa_c_prod.CONDENSATE_QUANTITY.sum()
-# -----------------------------------------------------------------------------
-
-# There are some instances of duplicated PERMIT_NUMs across rows, with different CLIENT values
-# TODO - if each of these rows have production and we sum them, are we double
-# counting some production volumnes?
-
-# Group by WELL_PERMIT_NUM
-agg_f = {
-    'FARM': 'first',
-    'WELL_STATUS': 'first',
-    'WELL_NO': 'first',
-    'SPUD_DATE': 'first',
-    'GAS_QUANTITY': 'sum',
-    'GAS_OPERATING_DAYS': 'sum',
-    'CONDENSATE_QUANTITY': 'sum',
-    'CONDENSATE_OPERATING_DAYS': 'sum',
-    'OIL_QUANTITY': 'sum',
-    'OIL_OPERATING_DAYS': 'sum',
-    'AVERAGE_IND': 'first',
-    'CLIENT': 'first',
-    'COUNTY': 'first',
-    'LATITUDE_DECIMAL': 'first',
-    'LONGITUDE_DECIMAL': 'first',
-    'UNCONVENTIONAL_IND': 'first',
-    'CONFIG_CODE': 'first',
-    'WELL_CODE_DESC': 'first'
-}
-
-pa_c_prod_agg = pa_c_prod.groupby(by=["PERMIT_NUM", "FARM", "CLIENT"], as_index=False).agg(agg_f).reset_index(drop=False)
-# pa_c_prod_agg = pa_c_prod.groupby(by=["PERMIT_NUM"], as_index=False).agg(agg_f).reset_index(drop=False)
+# Annual production of conventional wells, grouped by PERMIT_NUM, FARM and
+# CLIENT by `rollup_states` above
+pa_c_prod_agg = state_prod['PENNSYLVANIA_C']
 print(pa_c_prod_agg.head())
 
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['PENNSYLVANIA_C', 'oil_agg'] = pa_c_prod_agg.OIL_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_C', 'gas_agg'] = pa_c_prod_agg.GAS_QUANTITY.sum()
-before_after_table.at['PENNSYLVANIA_C', 'cond_agg'] = pa_c_prod_agg.CONDENSATE_QUANTITY.sum()
-
 # ======================================================
 # %% PENNSYLVANIA - Conventional - Clean
 # ======================================================
@@ -3565,74 +3170,9 @@ save_spatial_data(
 # %% UTAH [2022]- Read + aggregate production data
 # Production data available from https://oilgas.ogm.utah.gov/oilgasweb/data-center/dc-main.xhtml
 # =============================================================================
-# Read Utah oil and gas production data, which is reported monthly
-ut_prod = pd.read_csv(r'utah/Production2020To2024.csv')
-print(ut_prod.head())
-print(ut_prod.columns)
-
-ut_prod.API = ut_prod.API.astype(str)
-
-# Query for only 2022 production
-ut_prod["report_date"] = pd.to_datetime(ut_prod["ReportPeriod"])
-ut_prod["report_year"] = pd.to_datetime(ut_prod["ReportPeriod"]).dt.year
-ut_prod_2022 = ut_prod.query("report_year == 2022").reset_index(drop=True)
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['UTAH', 'oil_original'] = ut_prod_2022.Oil.sum()
-before_after_table.at['UTAH', 'gas_original'] = ut_prod_2022.Gas.sum()
-# -----------------------------------------------------------------------------
-
-# Handle multiple rows for one API number
-# Each API-10 in `ut_prod` can appear in 2+ rows, with a row containing
-# that surface location's production from multiple rock formations or multiple
-# well bores.
-
-# FIRST, group the rows so that there's only one API-12 (API + bore) record per month.
-# This step prevents DaysProducing for wells being double-counted and above 365 in a year
-ut_agg_funcs_1 = {
-    'Operator': 'last',
-    'WellType': 'last',
-    'Oil': 'sum',
-    'Gas': 'sum',
-    'Water': 'sum',
-    'report_year': 'last',
-    'DaysProd': 'max'
-}
-ut_prod_agg = ut_prod_2022.groupby(by=['API',
-                                       'WellBore',
-                                       'report_date'],
-                                   as_index=False).agg(ut_agg_funcs_1)
-
-# THEN, group by API-12 so that you get one record for that API-12's 2022 annual production
-ut_agg_funcs_2 = {
-    'Operator': 'last',
-    'WellType': 'last',
-    'Oil': 'sum',
-    'Gas': 'sum',
-    'Water': 'sum',
-    'report_year': 'last',
-    'DaysProd': 'sum'  # sum the volumes produced in each month
-}
-ut_prod_agg = ut_prod_agg.groupby(by=['API', 'WellBore'],
-                                  as_index=False).agg(ut_agg_funcs_2)
-
-
-# FINALLY, group by API-10s so you get one record for the year per surface location
-ut_agg_funcs_3 = {
-    'Operator': 'last',
-    'WellType': 'last',
-    'Oil': 'sum',
-    'Gas': 'sum',
-    'Water': 'sum',
-    'report_year': 'last',
-    'DaysProd': 'max'  # 2+ bores can produce at once, so don't sum them
-}
-ut_prod_agg = ut_prod_agg.groupby(by=['API'],
-                                  as_index=False).agg(ut_agg_funcs_3)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['UTAH', 'oil_agg'] = ut_prod_agg.Oil.sum()
-before_after_table.at['UTAH', 'gas_agg'] = ut_prod_agg.Gas.sum()
+# Annual production per API-10, from `rollup_states` above
+ut_prod_agg = state_prod['UTAH']
+print(ut_prod_agg.head())
 
 # =============================================================================
 # %% UTAH - Read wells
@@ -3661,10 +3201,10 @@ print(ut_prod_merge.columns)
 
 # ------------------------------------------------------
 # Check if volumes remain the same after aggregation
-print("Total oil production in original dataset = ", round(ut_prod_2022["Oil"].sum() / 1e6, 2))
+print("Total oil production in original dataset = ", round(before_after_table.at['UTAH', 'oil_original'] / 1e6, 2))
 print("Total oil production in merged dataset = ", round(ut_prod_merge["Oil"].sum() / 1e6, 2))
 
-print("Total gas production in original dataset = ", round(ut_prod_2022["Gas"].sum() / 1e6, 2))
+print("Total gas production in original dataset = ", round(before_after_table.at['UTAH', 'gas_original'] / 1e6, 2))
 print("Total gas production in merged dataset = ", round(ut_prod_merge["Gas"].sum() / 1e6, 2))
 
 # ------------------------------------------------------
@@ -3745,59 +3285,9 @@ save_spatial_data(
 # Well locations reported separately from oil and gas production data
 # Units used. Gas = MCF (1,000 cubic feet). Oil, Condensate, Water = Barrels (42 gallons).
 # =============================================================================
-fp1 = "west_virginia//2023-07-18 2022 Production File.xlsx"
-wv_2022 = pd.read_excel(fp1)
-
-print(wv_2022.head())
-print(wv_2022.columns)
-
-# Calculate total gas [Mcf] and liquids [bbl]
-wv_2022['total_gas_mcf'] = wv_2022["Total_Gas"]
-wv_2022['total_liq_bbl'] = wv_2022["Total_Oil"]
-wv_2022['total_water_bbl'] = wv_2022["Total_Water"]
-# TODO - should we add NGL into any of these fields? wv_data_prod_all["Total_NGL"]
-
-# Record the total oil and gas produced in 2022 before any other data cleaning
-before_after_table.at['WEST VIRGINIA', 'oil_original'] = wv_2022.total_liq_bbl.sum()
-before_after_table.at['WEST VIRGINIA', 'gas_original'] = wv_2022.total_gas_mcf.sum()
-# -----------------------------------------------------------------------------
-
-# Keep only relevant attributes in the production data table
-wv_prod = wv_2022[['Year',
-                   'API',
-                   'County',
-                   'Reporting_RP',
-                   'Operator',
-                   'Well Type',
-                   'total_gas_mcf',
-                   'total_liq_bbl',
-                   'total_water_bbl']]
-# Convert API from int to string (they will all be API-10)
-wv_prod.API = wv_prod.API.astype(str)
-
-# ------------------------------------------------------
-# Some APIs have multiple records associated with them;
-# Aggregate these records so each API only has one annual production record
-# The multiple records are due to the same well/API reporting production from
-# two or more unique "Reporting_RP" values, whatever that means
-# However, the API always only has one Operator associated with it.
-wv_agg_dict = {
-    'Year': 'first',
-    'Well Type': 'first',
-    'total_gas_mcf': 'sum',
-    'total_liq_bbl': 'sum',
-    'total_water_bbl': 'sum'
-}
-
-wv_prod_agg = wv_prod.groupby(by=['API',
-                                  'Operator'],
-                              as_index=False).agg(wv_agg_dict)
-
-wv_prod_agg.head()
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
-before_after_table.at['WEST VIRGINIA', 'oil_agg'] = wv_prod_agg.total_liq_bbl.sum()
-before_after_table.at['WEST VIRGINIA', 'gas_agg'] = wv_prod_agg.total_gas_mcf.sum()
+# Annual production per API, from `rollup_states` above
+wv_prod_agg = state_prod['WEST VIRGINIA']
+print(wv_prod_agg.head())
 
 # =============================================================================
 # %% WEST VIRGINIA - Read wells
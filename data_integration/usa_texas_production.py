@@ -6,7 +6,8 @@ In Texas, lease numbers are re-used across districts, so a lease number ALONE
 does not uniquely identify a lease in the state. This script uses a
 combination of Lease Number and District Number as a unique identifier for each
 production-reporting lease. This identifier is stored in the field
-`LEASE_NO_DISTRICT_NO_str` and is used for joining disparate tables together.
+`LEASE_NO_DISTRICT_NO_str`; its integer version `LEASE_KEY` (see
+`well_identifiers.texas_lease_key`) is used for joining disparate tables together.
 
 @author: maobrien
 """
@@ -23,6 +24,7 @@ path_to_github = 'C:\\Users\\maobrien\\Documents\\GitHub\\ogim-msat\\'
 os.chdir(path_to_github + 'functions')
 from ogimlib import (get_duplicate_api_records, integrate_production,
                      save_spatial_data, schema_OIL_GAS_PROD)
+from well_identifiers import texas_lease_key
 
 # set cwd to texas data folder
 os.chdir(r'C:\Users\maobrien\Environmental Defense Fund - edf.org\Mark Omara - Infrastructure_Mapping_Project\Bottom-Up-Infra-Inventory\Public_Production_v0\data\texas')
@@ -69,6 +71,9 @@ before_after_table = pd.DataFrame(index=['TEXAS'],
                                            'cond_agg',
                                            'cond_geojson',
                                            'cond_pct_in_geojson',
+                                           'oil_no_key',  # Sum of 2022 prod. values of records without a valid lease ID, dropped when aggregating
+                                           'gas_no_key',
+                                           'cond_no_key',
                                            'units_reporting_production_original',  # Count of how many unique APIs, Leases, etc. report production in the original dataset before any cleaning
                                            'units_reporting_production_geojson'  # Count of how many unique APIs, Leases report production in the integrated dataset
                                            ])
@@ -159,6 +164,10 @@ tx_prod_2022['DISTRICT_NO_str'] = tx_prod_2022['DISTRICT_NO'].astype(str).str.zf
 # Create the new field 'LEASE_NO_DISTRICT_NO', a string that combines the
 # LEASE NO. (string) and DISTRICT NO. into an easily readable ID
 tx_prod_2022['LEASE_NO_DISTRICT_NO_str'] = tx_prod_2022['LEASE_NO_str'] + '-' + tx_prod_2022['DISTRICT_NO_str']
+# Integer version of the same ID, used for grouping and joining. Like the
+# string, it tells oil leases (5 digits) and gas leases (6 digits) apart.
+tx_prod_2022['LEASE_KEY'] = texas_lease_key(tx_prod_2022, 'LEASE_NO_str', 'DISTRICT_NO')
+print(f'{tx_prod_2022.LEASE_KEY.isna().sum()} production records without a valid lease-district ID')
 
 # Aggregate my table of monthly production volumes into one annual volume
 # per row / per lease
@@ -167,7 +176,7 @@ agg_fxns = {'OIL_GAS_CODE': 'first',
             'DISTRICT_NAME': 'first',
             'LEASE_NO': 'first',
             'LEASE_NAME': 'first',
-            # 'LEASE_NO_DISTRICT_NO': 'first',
+            'LEASE_NO_DISTRICT_NO_str': 'first',
             'OPERATOR_NAME': 'first',
             'FIELD_NAME': 'first',
             'FIELD_TYPE': 'first',
@@ -177,10 +186,21 @@ agg_fxns = {'OIL_GAS_CODE': 'first',
             'LEASE_COND_PROD_VOL': 'sum',
             'LEASE_CSGD_PROD_VOL': 'sum'}
 
-tx_prod_2022_agg = tx_prod_2022.groupby(by=['LEASE_NO_DISTRICT_NO_str'],
-                                        as_index=False).agg(agg_fxns)
-
-# Record the total oil and gas produced in 2022 AFTER aggregation
+tx_prod_2022_agg = tx_prod_2022.groupby(by=['LEASE_KEY'],
+                                        as_index=False,
+                                        dropna=False).agg(agg_fxns)
+
+# Records without a valid lease-district ID form one group with a missing
+# LEASE_KEY. They can't be joined to a location, so record their production
+# and drop them.
+no_key = tx_prod_2022_agg.LEASE_KEY.isna()
+before_after_table.at['TEXAS', 'oil_no_key'] = tx_prod_2022_agg.loc[no_key, 'LEASE_OIL_PROD_VOL'].sum()
+before_after_table.at['TEXAS', 'gas_no_key'] = tx_prod_2022_agg.loc[no_key, 'LEASE_GAS_PROD_VOL'].sum() + tx_prod_2022_agg.loc[no_key, 'LEASE_CSGD_PROD_VOL'].sum()
+before_after_table.at['TEXAS', 'cond_no_key'] = tx_prod_2022_agg.loc[no_key, 'LEASE_COND_PROD_VOL'].sum()
+tx_prod_2022_agg = tx_prod_2022_agg[~no_key].reset_index(drop=True)
+
+# Record the total oil and gas produced in 2022 AFTER aggregation (excluding
+# the records without a lease-district ID)
 before_after_table.at['TEXAS', 'oil_agg'] = tx_prod_2022_agg.LEASE_OIL_PROD_VOL.sum()
 before_after_table.at['TEXAS', 'gas_agg'] = tx_prod_2022_agg.LEASE_GAS_PROD_VOL.sum() + tx_prod_2022_agg.LEASE_CSGD_PROD_VOL.sum()
 before_after_table.at['TEXAS', 'cond_agg'] = tx_prod_2022_agg.LEASE_COND_PROD_VOL.sum()
@@ -370,6 +390,8 @@ tx_wells_api.loc[tx_wells_api.DISTRICT_NO.isna(), 'DISTRICT_NO'] = tx_wells_api.
 tx_wells_api.DISTRICT_NO = tx_wells_api.DISTRICT_NO.astype(int)
 tx_wells_api['DISTRICT_NO_str'] = tx_wells_api.DISTRICT_NO.astype(str).str.zfill(2)
 tx_wells_api['LEASE_NO_DISTRICT_NO_str'] = tx_wells_api['GAS_RRCID'] + '-' + tx_wells_api['DISTRICT_NO_str']
+# Wells whose district is unknown ('999') get no key, and no lease geometry
+tx_wells_api['LEASE_KEY'] = texas_lease_key(tx_wells_api, 'GAS_RRCID', 'DISTRICT_NO')
 
 
 # =============================================================================
@@ -419,7 +441,7 @@ lease_agg = {
     'OPERATOR': 'first'}
 
 # Dissolve well records based on lease-district number (TAKES A WHILE)
-lease_geoms = wells_with_leases.dissolve(by='LEASE_NO_DISTRICT_NO_str',
+lease_geoms = wells_with_leases.dissolve(by='LEASE_KEY',
                                          aggfunc=lease_agg)
 lease_geoms = lease_geoms.reset_index(drop=False)
 # CHECK - should be mix of Point and Multipoint, with no null values.
@@ -436,7 +458,7 @@ lease_geoms['geometry'] = single_point_geoms_only
 # =============================================================================
 tx_prod_merge = pd.merge(tx_prod_2022_agg,
                          lease_geoms,
-                         on="LEASE_NO_DISTRICT_NO_str",
+                         on="LEASE_KEY",
                          how="left")
 # The CRS of this table gets dropped during pd.merge(), so recast it as a gdf
 tx_prod_merge = gpd.GeoDataFrame(tx_prod_merge,
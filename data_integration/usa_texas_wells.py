@@ -24,6 +24,7 @@ os.chdir(path_to_github + 'functions')
 from ogimlib import (replace_missing_strings_with_na,
                      create_concatenated_well_name, get_duplicate_api_records,
                      transform_CRS, integrate_facs)
+from sharded_reader import read_sharded
 
 
 def quickmap(gdf, _name):
@@ -66,31 +67,14 @@ states = states[states.admin == 'United States of America'].reset_index(drop=Tru
 print(datetime.datetime.now())
 print('Texas')
 # =============================================================================
-# List all files in my directory, then read well surface locations
-# Will take 5-ish minutes to read and concatenate them all
+# Read all county-specific surface hole ('s.shp') and bottom hole ('b.shp')
+# shapefiles into state-wide gdfs, several counties at a time, converting
+# them from NAD27 to WGS84 as they're read
 fp = 'wells\\'
-files = os.listdir(fp)
+tx_wells_surf = read_sharded(fp + '*s.shp', target_crs='epsg:4326', n_workers=8)
+tx_wells_bot = read_sharded(fp + '*b.shp', target_crs='epsg:4326', n_workers=8)
 
-# Empty dictionary to hold results
-s_wells = {}
-b_wells = {}
-
-for file in tqdm(files):
-    fips = file[4:7]
-    if file.endswith('s.shp'):  # surface hole shapefiles
-        s_wells[fips] = gpd.read_file(fp + file)
-        # print(fips)
-    if file.endswith('b.shp'):  # bottom hole shapefiles
-        b_wells[fips] = gpd.read_file(fp + file)
-        # print(fips)
-
-# Concatenate all county-specific locations into one state-wide gdf
-tx_wells_surf = pd.concat(s_wells.values())
-tx_wells_surf = tx_wells_surf.reset_index(drop=True)
-tx_wells_bot = pd.concat(b_wells.values())
-tx_wells_bot = tx_wells_bot.reset_index(drop=True)
-
-# convert surface and bottom holes from NAD27 to WGS84
+# Append lat-long columns to surface and bottom holes
 tx_wells_surf = transform_CRS(tx_wells_surf,
                               target_epsg_code="epsg:4326",
                               appendLatLon=True)
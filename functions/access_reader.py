@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Cross-platform, streaming reader for MS Access (.mdb / .accdb) databases.
+
+`ogimlib.read_msAccess` used to need the Windows-only Microsoft Access ODBC
+driver and loaded every column of every table it read. The functions here
+work with one of two backends:
+
+    'odbc'      pyodbc + the Microsoft Access ODBC driver (Windows). Column
+                selection and row predicates are sent to the driver as SQL.
+    'mdbtools'  the open-source mdbtools command line tools (`mdb-tables`,
+                `mdb-schema`, `mdb-export`; `apt install mdbtools`,
+                `brew install mdbtools`, or `conda install -c conda-forge
+                mdbtools`). Tables are streamed as CSV from `mdb-export`
+                straight into the pandas parser, with column types taken
+                from the database schema; predicates are applied chunk by
+                chunk.
+
+Either way, `read_access_table` can return the table in chunks, so
+multi-gigabyte state production databases can be processed in bounded
+memory.
+
+Predicates
+---
+`where` is a list of (column, op, value) tuples, all of which must hold:
+    ops: '==', '!=', '<', '<=', '>', '>=', 'in', 'not in',
+         'isna', 'notna' (value ignored)
+
+Example usage
+---
+    tables = list_access_tables('ohio\\Rbdmsd97.mdb')
+    oh_prod = read_access_table('ohio\\Rbdmsd97.mdb', 'Production',
+                                columns=['API_WELLNO', 'PRODUCTION_YEAR', 'OIL', 'GAS'],
+                                where=[('PRODUCTION_YEAR', 'in', ['2022'])])
+    for chunk in read_access_table(fp, 'Production', chunksize=500_000):
+        ...
+
+@author: maobrien
+"""
+import io
+import re
+import shutil
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
+ACCESS_ODBC_DRIVER = 'Microsoft Access Driver (*.mdb, *.accdb)'
+OPS = ['==', '!=', '<', '<=', '>', '>=', 'in', 'not in', 'isna', 'notna']
+
+# Pandas dtypes of the Access column types reported by `mdb-schema`
+_MDB_DTYPES = {'text': 'string',
+               'memo': 'string',
+               'memo/hyperlink': 'string',
+               'byte': 'Int64',
+               'integer': 'Int64',
+               'long integer': 'Int64',
+               'single': 'float64',
+               'double': 'float64',
+               'currency': 'float64',
+               'numeric': 'float64',
+               'replication id': 'string',
+               'boolean': 'boolean',
+               'datetime': 'datetime',
+               'date/time': 'datetime'}
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+def access_backend(backend=None):
+    """Return the backend to use: `backend` if given, else 'odbc' if available, else 'mdbtools'."""
+    if backend is not None:
+        if backend not in ('odbc', 'mdbtools'):
+            raise ValueError("backend must be 'odbc' or 'mdbtools'")
+        return backend
+    if pyodbc is not None and ACCESS_ODBC_DRIVER in pyodbc.drivers():
+        return 'odbc'
+    if shutil.which('mdb-export') is not None:
+        return 'mdbtools'
+    raise ImportError('Reading MS Access files needs either pyodbc with the Microsoft Access '
+                      'ODBC driver, or the mdbtools command line tools')
+
+
+def _odbc_connect(path):
+    conn_str = (r'DRIVER={' + ACCESS_ODBC_DRIVER + '};'
+                r'DBQ=' + str(path) + ";")
+    return pyodbc.connect(conn_str)
+
+
+def _run(args):
+    return subprocess.run(args, check=True, capture_output=True, text=True).stdout
+
+
+# =============================================================================
+# Tables and columns
+# =============================================================================
+def list_access_tables(path, backend=None):
+    """List the (user) table names of an Access database, without reading any rows."""
+    backend = access_backend(backend)
+    if backend == 'odbc':
+        conn = _odbc_connect(path)
+        try:
+            return [t.table_name for t in conn.cursor().tables(tableType='TABLE')]
+        finally:
+            conn.close()
+    return [t for t in _run(['mdb-tables', '-1', str(path)]).splitlines() if t.strip()]
+
+
+def access_table_schema(path, table, backend=None):
+    """Return {column name: pandas dtype} of an Access table, in column order.
+
+    Dtypes are 'string', 'Int64', 'float64', 'boolean' or 'datetime'
+    (other or unknown types are returned as 'string').
+    """
+    backend = access_backend(backend)
+    if backend == 'odbc':
+        conn = _odbc_connect(path)
+        try:
+            schema = {}
+            for col in conn.cursor().columns(table=table):
+                type_name = col.type_name.lower()
+                schema[col.column_name] = _MDB_DTYPES.get(
+                    {'varchar': 'text', 'longchar': 'memo', 'counter': 'long integer',
+                     'bit': 'boolean', 'real': 'single', 'smallint': 'integer',
+                     'tinyint': 'byte'}.get(type_name, type_name), 'string')
+            return schema
+        finally:
+            conn.close()
+
+    ddl = _run(['mdb-schema', '-T', table, str(path)])
+    schema = {}
+    for line in ddl.splitlines():
+        m = re.match(r'^\s*\[(.+?)\]\s+(.+?)\s*,?\s*$', line)
+        if m:
+            type_name = re.sub(r'\s*\(.*\)$', '', m.group(2)).strip().lower()
+            schema[m.group(1)] = _MDB_DTYPES.get(type_name, 'string')
+    return schema
+
+
+# =============================================================================
+# Predicates
+# =============================================================================
+def _check_where(where):
+    where = list(where or [])
+    for cond in where:
+        if len(cond) != 3 or cond[1] not in OPS:
+            raise ValueError(f'Invalid predicate {cond}; expected (column, op, value) with op in {OPS}')
+    return where
+
+
+def _where_sql(where):
+    """Translate predicates to an SQL WHERE clause with ? placeholders, and its parameters."""
+    clauses, params = [], []
+    for col, op, value in where:
+        if op == 'isna':
+            clauses.append(f'[{col}] IS NULL')
+        elif op == 'notna':
+            clauses.append(f'[{col}] IS NOT NULL')
+        elif op in ('in', 'not in'):
+            values = list(value)
+            marks = ', '.join('?' * len(values))
+            clauses.append(f"[{col}] {'NOT IN' if op == 'not in' else 'IN'} ({marks})")
+            params += values
+        else:
+            clauses.append(f"[{col}] {'=' if op == '==' else '<>' if op == '!=' else op} ?")
+            params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _where_mask(df, where):
+    """Evaluate predicates on a DataFrame chunk, vectorized."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in where:
+        s = df[col]
+        if op == 'isna':
+            m = s.isna()
+        elif op == 'notna':
+            m = s.notna()
+        elif op == 'in':
+            m = s.isin(list(value))
+        elif op == 'not in':
+            m = ~s.isin(list(value)) & s.notna()
+        elif op == '==':
+            m = s == value
+        elif op == '!=':
+            m = (s != value) & s.notna()
+        else:
+            m = {'<': s.lt, '<=': s.le, '>': s.gt, '>=': s.ge}[op](value)
+        mask &= m.fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+def _read_odbc(path, table, columns, where, chunksize):
+    select = ', '.join(f'[{c}]' for c in columns) if columns else '*'
+    clause, params = _where_sql(where)
+    conn = _odbc_connect(path)
+    sql = f'SELECT {select} FROM [{table}]{clause}'
+    if chunksize is None:
+        try:
+            return pd.read_sql(sql, conn, params=params or None)
+        finally:
+            conn.close()
+
+    def chunks():
+        try:
+            for chunk in pd.read_sql(sql, conn, params=params or None, chunksize=chunksize):
+                yield chunk
+        finally:
+            conn.close()
+    return chunks()
+
+
+def _iter_mdbtools(path, table, columns, where, chunksize, schema):
+    needed = list(columns) if columns else list(schema)
+    read_cols = needed + [c for c, _, _ in where if c not in needed]
+    # mdb-export writes booleans as 1/0, so they are read as integers first
+    dtypes = {c: 'Int64' if schema[c] == 'boolean' else schema[c]
+              for c in read_cols if schema[c] != 'datetime'}
+    dates = [c for c in read_cols if schema[c] == 'datetime']
+    booleans = [c for c in needed if schema[c] == 'boolean']
+
+    proc = subprocess.Popen(['mdb-export', '-D', '%Y-%m-%d %H:%M:%S', '-b', 'strip', str(path), table],
+                            stdout=subprocess.PIPE)
+    try:
+        stream = io.TextIOWrapper(proc.stdout, encoding='utf-8', newline='')
+        reader = pd.read_csv(stream, usecols=read_cols, dtype=dtypes,
+                             parse_dates=dates, chunksize=chunksize or 500_000)
+        for chunk in reader:
+            if where:
+                chunk = chunk[_where_mask(chunk, where)]
+            chunk = chunk[needed].reset_index(drop=True)
+            if booleans:
+                chunk[booleans] = chunk[booleans].astype('boolean')
+            yield chunk
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def read_access_table(path, table, columns=None, where=None, chunksize=None, backend=None):
+    """Read a table of an Access database, optionally only some columns and rows.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .mdb / .accdb file.
+    table : str
+        Table name (may contain spaces).
+    columns : list of str, optional
+        Columns to read. Default all.
+    where : list of tuple, optional
+        Row predicates (column, op, value); see the module docstring.
+        Predicate columns don't need to be in `columns`.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames of at most `chunksize`
+        rows (before predicates are applied, with the mdbtools backend).
+    backend : str, optional
+        'odbc' or 'mdbtools'; default picks what's available.
+
+    Returns
+    -------
+    df : DataFrame, or an iterator of DataFrames if `chunksize` is given
+    """
+    backend = access_backend(backend)
+    where = _check_where(where)
+    if backend == 'odbc':
+        return _read_odbc(path, table, columns, where, chunksize)
+
+    schema = access_table_schema(path, table, backend)
+    missing = [c for c in list(columns or []) + [c for c, _, _ in where] if c not in schema]
+    if missing:
+        raise KeyError(f'Columns not in table {table}: {missing}')
+    chunks = _iter_mdbtools(path, table, columns, where, chunksize, schema)
+    if chunksize is not None:
+        return chunks
+    frames = list(chunks)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns or list(schema))
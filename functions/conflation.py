@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Cross-source conflation of overlapping facility datasets.
+
+Finds records from *different* sources that describe the same facility (e.g.
+an HIFLD compressor station and the state-sourced record of the same
+station), in three steps:
+
+    1. Blocking: records are hashed to cells of a 3D grid on the Earth's
+       surface (cell size = match radius), and only records of the same
+       CATEGORY in the same or neighbouring cells are compared. Candidate
+       generation is a handful of hash joins, so it runs in near-linear
+       time, anywhere on the globe.
+    2. Scoring: each candidate pair gets a score from 0 to 1, the weighted
+       mean of distance, name, operator and facility type similarity. Names
+       and operators are compared by the Jaccard similarity of their
+       character trigrams, computed for all pairs at once with joins on a
+       (string, trigram) table. Attributes missing in either record (N/A)
+       are left out of the mean.
+    3. Linking: pairs scoring at least `threshold` are linked, and linked
+       records form match groups (connected components).
+
+Example usage
+---
+    midstream = pd.concat([hifld_cs, state_cs], ignore_index=True)
+    groups, pairs = conflate(midstream, radius_m=1000, name_col='FAC_NAME',
+                             radius_by_category={'NATURAL GAS COMPRESSOR STATIONS': 2000})
+    midstream['MATCH_GROUP'] = groups
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6_371_008.8
+NA_VALUES = ['N/A', 'NAN', 'NONE', '', '-999']
+DEFAULT_WEIGHTS = {'distance': 0.3, 'name': 0.35, 'operator': 0.2, 'type': 0.15}
+
+# Offsets of a grid cell's 26 neighbours, and the cell itself
+_NEIGHBOURS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)])
+
+
+# =============================================================================
+# String similarity
+# =============================================================================
+def normalize_text(series):
+    """Upper-case, replace punctuation by spaces and collapse whitespace (vectorized)."""
+    s = pd.Series(series, dtype='string').str.upper().str.strip()
+    s = s.where(~s.isin(NA_VALUES))
+    return s.str.replace(r'[^\w\s]', ' ', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def trigram_table(strings):
+    """Return a DataFrame of (string position 'id', 'gram') rows: the distinct character trigrams of each string.
+
+    Strings are padded with a space on each side, so short strings and word
+    starts count; missing strings have no trigrams.
+    """
+    s = pd.Series(strings, dtype='string').reset_index(drop=True)
+    padded = (' ' + s + ' ').dropna()
+    lengths = padded.str.len().to_numpy()
+    n_grams = np.maximum(lengths - 2, 0)
+    ids = np.repeat(padded.index.to_numpy(), n_grams)
+    starts = np.arange(n_grams.sum()) - np.repeat(np.cumsum(n_grams) - n_grams, n_grams)
+    text = np.repeat(padded.to_numpy(dtype=object), n_grams)
+    grams = [t[i:i + 3] for t, i in zip(text, starts)]
+    return pd.DataFrame({'id': ids, 'gram': grams}).drop_duplicates()
+
+
+def trigram_similarity(a_ids, b_ids, grams):
+    """Jaccard similarity of the trigram sets of pairs of strings.
+
+    Parameters
+    ----------
+    a_ids, b_ids : array-like of int
+        Positions of the two strings of each pair in the table `grams` was
+        built from.
+    grams : DataFrame
+        Output of `trigram_table`.
+
+    Returns
+    -------
+    similarity : numpy array of float
+        NaN where either string is missing.
+    """
+    pairs = pd.DataFrame({'a': np.asarray(a_ids), 'b': np.asarray(b_ids)})
+    pairs['pair'] = np.arange(len(pairs))
+    counts = grams.groupby('id').size()
+    n_a = counts.reindex(pairs.a).to_numpy(dtype=float)
+    n_b = counts.reindex(pairs.b).to_numpy(dtype=float)
+
+    ga = pairs[['pair', 'a']].merge(grams, left_on='a', right_on='id')[['pair', 'gram']]
+    gb = pairs[['pair', 'b']].merge(grams, left_on='b', right_on='id')[['pair', 'gram']]
+    shared = ga.merge(gb, on=['pair', 'gram']).groupby('pair').size()
+    inter = shared.reindex(pairs.pair, fill_value=0).to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return inter / (n_a + n_b - inter)
+
+
+def _column_similarity(values, i, j):
+    """Trigram similarity of column values of record pairs (i, j), computed once per distinct pair of strings."""
+    norm = normalize_text(values)
+    codes, uniques = pd.factorize(norm)
+    a, b = codes[i], codes[j]
+    sim = np.full(len(i), np.nan)
+    ok = (a >= 0) & (b >= 0)
+    if ok.any():
+        pair_codes, pair_uniques = pd.factorize(a[ok].astype(np.int64) * len(uniques) + b[ok])
+        ua, ub = np.divmod(pair_uniques, len(uniques))
+        sim[ok] = trigram_similarity(ua, ub, trigram_table(uniques))[pair_codes]
+    return sim
+
+
+# =============================================================================
+# Blocking
+# =============================================================================
+def lonlat_to_xyz(lon, lat):
+    """Unit vectors (n x 3 array) of longitudes and latitudes in degrees; scale by EARTH_RADIUS_M for meters."""
+    lon, lat = np.radians(lon), np.radians(lat)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def candidate_pairs(gdf, radius_m, source_col='SRC_REF_ID', category_col='CATEGORY',
+                    radius_by_category=None):
+    """Pairs of records from different sources within a distance of each other.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame
+        Point records (other geometries are represented by a point on their
+        surface), in any CRS.
+    radius_m : float
+        Maximum distance between two records of a match, in meters.
+    source_col : str, optional (default 'SRC_REF_ID')
+        Records with the same value are never paired. None to pair any.
+    category_col : str, optional (default 'CATEGORY')
+        Only records of the same category are paired. None to ignore.
+    radius_by_category : dict, optional
+        {category: radius in meters}, overriding `radius_m`.
+
+    Returns
+    -------
+    pairs : DataFrame
+        'i' and 'j' (positions in `gdf`, i < j) and 'distance_m'.
+    """
+    pts = gdf.geometry
+    if pts.crs is not None and not pts.crs.equals('epsg:4326'):
+        pts = pts.to_crs('epsg:4326')
+    pts = pts.representative_point()
+    xyz = lonlat_to_xyz(pts.x.to_numpy(), pts.y.to_numpy()) * EARTH_RADIUS_M
+
+    category = gdf[category_col].to_numpy() if category_col else np.zeros(len(gdf))
+    source = gdf[source_col].to_numpy() if source_col else None
+    out = []
+    for cat in pd.unique(category):
+        members = np.flatnonzero((category == cat) & ~np.isnan(xyz[:, 0]))
+        radius = (radius_by_category or {}).get(cat, radius_m)
+        cells = np.floor(xyz[members] / radius).astype(np.int64)
+        base = pd.DataFrame({'cx': cells[:, 0], 'cy': cells[:, 1], 'cz': cells[:, 2], 'i': members})
+        for dx, dy, dz in _NEIGHBOURS:
+            shifted = base.assign(cx=base.cx + dx, cy=base.cy + dy, cz=base.cz + dz).rename(columns={'i': 'j'})
+            pairs = base.merge(shifted, on=['cx', 'cy', 'cz'])[['i', 'j']]
+            pairs = pairs[pairs.i < pairs.j]
+            if source is not None:
+                pairs = pairs[source[pairs.i.to_numpy()] != source[pairs.j.to_numpy()]]
+            # Straight-line (chord) distance; equal to the great-circle
+            # distance to within millimetres at these ranges
+            d = np.linalg.norm(xyz[pairs.i.to_numpy()] - xyz[pairs.j.to_numpy()], axis=1)
+            out.append(pairs.assign(distance_m=d, radius_m=radius)[d <= radius])
+    if not out:
+        return pd.DataFrame(columns=['i', 'j', 'distance_m', 'radius_m'])
+    return pd.concat(out, ignore_index=True)
+
+
+# =============================================================================
+# Scoring and linking
+# =============================================================================
+def score_pairs(gdf, pairs, name_col='FAC_NAME', operator_col='OPERATOR', type_col='FAC_TYPE',
+                weights=DEFAULT_WEIGHTS):
+    """Add similarity columns and a combined 'score' (0-1) to candidate pairs.
+
+    Columns added: 'distance_sim' (1 at the same location, 0 at the radius),
+    'name_sim', 'operator_sim' (trigram Jaccard), 'type_sim' (1 if the
+    normalized types are equal, else 0) and 'score', the weighted mean of
+    the similarities that are known for the pair.
+    """
+    pairs = pairs.copy()
+    i, j = pairs.i.to_numpy(), pairs.j.to_numpy()
+    sims = {'distance': 1 - pairs.distance_m.to_numpy() / pairs.radius_m.to_numpy()}
+    if name_col in gdf:
+        sims['name'] = _column_similarity(gdf[name_col], i, j)
+    if operator_col in gdf:
+        sims['operator'] = _column_similarity(gdf[operator_col], i, j)
+    if type_col in gdf:
+        types = normalize_text(gdf[type_col]).to_numpy(dtype=object)
+        known = pd.notna(types[i]) & pd.notna(types[j])
+        sims['type'] = np.where(known, (types[i] == types[j]).astype(float), np.nan)
+
+    total, weight = np.zeros(len(pairs)), np.zeros(len(pairs))
+    for key, sim in sims.items():
+        pairs[f'{key}_sim'] = sim
+        known = ~np.isnan(sim)
+        total[known] += weights.get(key, 0) * sim[known]
+        weight[known] += weights.get(key, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pairs['score'] = np.where(weight > 0, total / weight, 0)
+    return pairs
+
+
+def link_matches(n, pairs):
+    """Match group of each of `n` records, from the (i, j) pairs that were linked.
+
+    Returns an int array; records without a match get their own group.
+    Groups are numbered by their smallest record position.
+    """
+    labels = np.arange(n)
+    i, j = pairs.i.to_numpy(), pairs.j.to_numpy()
+    # Label propagation with pointer jumping: every record ends up labelled
+    # with the smallest position in its connected component
+    while len(i):
+        low = np.minimum(labels[i], labels[j])
+        np.minimum.at(labels, i, low)
+        np.minimum.at(labels, j, low)
+        jumped = labels[labels]
+        while not np.array_equal(jumped, labels):
+            labels = jumped
+            jumped = labels[labels]
+        if np.array_equal(labels[i], labels[j]):
+            break
+    return labels
+
+
+def conflate(gdf, radius_m=500, threshold=0.6, source_col='SRC_REF_ID', category_col='CATEGORY',
+             name_col='FAC_NAME', operator_col='OPERATOR', type_col='FAC_TYPE',
+             radius_by_category=None, weights=DEFAULT_WEIGHTS):
+    """Find records of different sources that describe the same facility.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame
+        Records of all sources, e.g. the compressor stations of HIFLD and of
+        the states.
+    radius_m : float, optional (default 500)
+        Maximum distance between matching records, in meters.
+    threshold : float, optional (default 0.6)
+        Minimum score of a match.
+    source_col, category_col : str, optional
+        See `candidate_pairs`.
+    name_col, operator_col, type_col : str, optional
+        Attributes compared; skipped if not columns of `gdf`.
+    radius_by_category : dict, optional
+        {category: radius in meters}, overriding `radius_m`.
+    weights : dict, optional
+        Weights of 'distance', 'name', 'operator' and 'type' similarity.
+
+    Returns
+    -------
+    groups : pandas Series of int
+        Match group of every record (same index as `gdf`); records that match
+        nothing are in a group of their own.
+    pairs : DataFrame
+        Every scored candidate pair, with 'matched' True for links.
+    """
+    pairs = candidate_pairs(gdf, radius_m, source_col, category_col, radius_by_category)
+    pairs = score_pairs(gdf, pairs, name_col, operator_col, type_col, weights)
+    pairs['matched'] = pairs.score >= threshold
+    groups = link_matches(len(gdf), pairs[pairs.matched])
+    print(f'{len(gdf)} records, {len(pairs)} candidate pairs, {int(pairs.matched.sum())} matches; '
+          f'{len(gdf) - len(np.unique(groups))} records merged into other groups')
+    return pd.Series(groups, index=gdf.index, name='MATCH_GROUP'), pairs
@@ -1,92 +1,259 @@
 # -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
 
+Conversion of NetCDF grids (e.g. MethaneSAT area-flux files) to GeoTIFF.
+
+The variable is streamed in windows: one band (time slice) at a time, and
+within it in strips of rows no larger than `max_chunk_mb`, so a file of any
+size is converted with bounded memory. Every time slice becomes a band of
+the output, with its time value as the band description and tags. Outputs
+are tiled, compressed and have overviews. `batch_netcdf_to_geotiff` converts
+a whole folder of files on several processes.
+
+Example usage
+---
+    output_file = netcdf_to_geotiff('AMU_DARYA_area_weighted_flux_066.nc',
+                                    output_file='AMU_DARYA_area_weighted_flux_066.tif')
+    summary = batch_netcdf_to_geotiff('area_flux_nc', output_dir='area_flux_tif', n_workers=4)
+
+From the command line:
+    python convert_netcdf_to_geotiff.py area_flux_nc --output-dir area_flux_tif --workers 4
+
+@author: maobrien
+"""
+import glob
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
+import pandas as pd
 import xarray as xr
 import rasterio
-from rasterio.transform import from_bounds
 from rasterio.crs import CRS
-import argparse
-import os
+from rasterio.enums import Resampling
+from rasterio.transform import from_bounds
+from rasterio.windows import Window
 
-def netcdf_to_geotiff(input_file, output_file=None, variable_name=None):
-    """Convert NetCDF file to GeoTIFF
-    
-    Example usage:
-        output_file = netcdf_to_geotiff('AMU_DARYA_area_weighted_flux_066.nc',
-                                        output_file='AMU_DARYA_area_weighted_flux_066.tif')
-    
+NODATA = -9999.0
+
+
+# =============================================================================
+# Grid description
+# =============================================================================
+def _grid(ds, variable_name=None):
+    """Find the lat/lon coordinates of a dataset and the dimensions of its variable.
+
+    Returns
+    -------
+    variable_name, lats, lons, y_dim, x_dim, band_dim
+        `band_dim` is the remaining dimension of the variable (e.g. time), or
+        None for 2-D variables.
     """
-    
-    # Open NetCDF file
-    ds = xr.open_dataset(input_file)
-    
-    # Find lat/lon variables
     lat_var = next((name for name in ['lat', 'latitude', 'y'] if name in ds.variables), None)
     lon_var = next((name for name in ['lon', 'longitude', 'x'] if name in ds.variables), None)
-    
     if not lat_var or not lon_var:
         raise ValueError(f"Could not find lat/lon variables in: {list(ds.variables.keys())}")
-    
-    # Get coordinates and data
-    lats, lons = ds[lat_var].values, ds[lon_var].values
+
     data_vars = [var for var in ds.data_vars if var not in {lat_var, lon_var}]
-    
     if not data_vars:
         raise ValueError("No data variables found")
-    
     variable_name = variable_name or data_vars[0]
-    data = ds[variable_name].values
-    
-    # Handle 3D data (take first layer)
-    if data.ndim == 3:
-        data = data[0]
-    
-    # Ensure correct orientation
-    if data.shape != (len(lats), len(lons)):
-        data = data.T
-    
-    # Don't flip - use data as-is from NetCDF
-    
-    # Create geospatial transform
+    var = ds[variable_name]
+
+    lats, lons = ds[lat_var].values, ds[lon_var].values
+    if lats.ndim != 1 or lons.ndim != 1:
+        raise ValueError(f"{lat_var}/{lon_var} must be 1-D coordinates of a regular grid")
+    y_dim, x_dim = ds[lat_var].dims[0], ds[lon_var].dims[0]
+    if y_dim not in var.dims or x_dim not in var.dims:
+        raise ValueError(f"{variable_name} has dimensions {var.dims}, not ({y_dim}, {x_dim})")
+
+    others = [d for d in var.dims if d not in (y_dim, x_dim)]
+    if len(others) > 1:
+        raise ValueError(f"{variable_name} has more than one non-spatial dimension: {others}")
+    return variable_name, lats, lons, y_dim, x_dim, (others[0] if others else None)
+
+
+def _transform(lats, lons):
+    """Affine transform of a regular grid of pixel centres, north up."""
     lon_min, lon_max = float(lons.min()), float(lons.max())
     lat_min, lat_max = float(lats.min()), float(lats.max())
-    
-    # Calculate pixel size
+
+    # Pixel size
     lon_res = (lon_max - lon_min) / (len(lons) - 1)
     lat_res = (lat_max - lat_min) / (len(lats) - 1)
-    
-    # Adjust bounds to pixel edges (shift by half pixel)
-    west = lon_min - lon_res / 2
-    east = lon_max + lon_res / 2
-    south = lat_min - lat_res / 2
-    north = lat_max + lat_res / 2
-    
-    transform = from_bounds(west, south, east, north, len(lons), len(lats))
-    
-    # Handle output filename
-    if not output_file:
-        base_name = os.path.splitext(input_file)[0]
-        output_file = f"{base_name}_{variable_name}.tif"
-    
-    # Handle NaN values
-    nodata_value = None
-    if np.isnan(data).any():
-        nodata_value = -9999.0
-        data = np.where(np.isnan(data), nodata_value, data)
-    
-    # Write GeoTIFF
-    with rasterio.open(
-        output_file, 'w',
-        driver='GTiff',
-        height=data.shape[0], width=data.shape[1], count=1,
-        dtype=rasterio.float32,
-        crs=CRS.from_epsg(4326),
-        transform=transform,
-        nodata=nodata_value,
-        compress='lzw'
-    ) as dst:
-        dst.write(data.astype(np.float32), 1)
-    
-    ds.close()
+
+    # Bounds at the pixel edges (shift by half a pixel)
+    return from_bounds(lon_min - lon_res / 2, lat_min - lat_res / 2,
+                       lon_max + lon_res / 2, lat_max + lat_res / 2,
+                       len(lons), len(lats))
+
+
+def _overview_factors(height, width, min_size=256):
+    factors, f = [], 2
+    while max(height, width) / f >= min_size:
+        factors.append(f)
+        f *= 2
+    return factors
+
+
+def _windows(height, width, max_pixels):
+    """Windows of whole rows (or, for very wide grids, parts of rows) of at most `max_pixels`."""
+    col_step = min(width, max_pixels)
+    row_step = max(1, max_pixels // col_step)
+    for row in range(0, height, row_step):
+        for col in range(0, width, col_step):
+            yield Window(col, row, min(col_step, width - col), min(row_step, height - row))
+
+
+# =============================================================================
+# Conversion
+# =============================================================================
+def netcdf_to_geotiff(input_file, output_file=None, variable_name=None, max_chunk_mb=64,
+                      compress='lzw', blocksize=256, overviews=True):
+    """Convert a NetCDF variable to a GeoTIFF, with one band per time slice.
+
+    Parameters
+    ----------
+    input_file : str
+        Path to the NetCDF file.
+    output_file : str, optional
+        Path of the GeoTIFF. Default '<input file name>_<variable>.tif'.
+    variable_name : str, optional
+        Variable to convert. Default the first data variable.
+    max_chunk_mb : float, optional (default 64)
+        Maximum size of the part of the variable held in memory at once.
+    compress : str, optional (default 'lzw')
+        GeoTIFF compression.
+    blocksize : int, optional (default 256)
+        Tile size of the GeoTIFF.
+    overviews : bool, optional (default True)
+        Build averaged overviews, down to about `blocksize` pixels.
+
+    Returns
+    -------
+    output_file : str
+        Path of the GeoTIFF.
+
+    Example usage:
+        output_file = netcdf_to_geotiff('AMU_DARYA_area_weighted_flux_066.nc',
+                                        output_file='AMU_DARYA_area_weighted_flux_066.tif')
+
+    """
+    # Variables are read lazily: only the windows selected below are loaded
+    with xr.open_dataset(input_file) as ds:
+        variable_name, lats, lons, y_dim, x_dim, band_dim = _grid(ds, variable_name)
+        var = ds[variable_name]
+        height, width = len(lats), len(lons)
+        n_bands = var.sizes[band_dim] if band_dim else 1
+        # GeoTIFF rows run north to south
+        north_first = lats[0] > lats[-1]
+
+        if not output_file:
+            base_name = os.path.splitext(input_file)[0]
+            output_file = f"{base_name}_{variable_name}.tif"
+
+        max_pixels = max(1, int(max_chunk_mb * 2 ** 20 // max(var.dtype.itemsize, 4)))
+        profile = dict(driver='GTiff', height=height, width=width, count=n_bands,
+                       dtype=rasterio.float32, crs=CRS.from_epsg(4326),
+                       transform=_transform(lats, lons), nodata=NODATA,
+                       compress=compress, predictor=3, tiled=True,
+                       blockxsize=blocksize, blockysize=blocksize, BIGTIFF='IF_SAFER')
+
+        with rasterio.open(output_file, 'w', **profile) as dst:
+            dst.update_tags(VARIABLE=variable_name, SOURCE_FILE=os.path.basename(input_file),
+                            **{k.upper(): str(v) for k, v in var.attrs.items()})
+            for band in range(n_bands):
+                selection = {band_dim: band} if band_dim else {}
+                for window in _windows(height, width, max_pixels):
+                    row_off = window.row_off if north_first else height - window.row_off - window.height
+                    chunk = var.isel({**selection,
+                                      y_dim: slice(row_off, row_off + window.height),
+                                      x_dim: slice(window.col_off, window.col_off + window.width)})
+                    data = chunk.transpose(y_dim, x_dim).values.astype(np.float32)
+                    if not north_first:
+                        data = data[::-1]
+                    dst.write(np.where(np.isnan(data), NODATA, data), band + 1, window=window)
+
+                if band_dim:
+                    label = str(var[band_dim].values[band]) if band_dim in var.coords else str(band)
+                    dst.set_band_description(band + 1, f'{variable_name} {band_dim}={label}')
+                    dst.update_tags(band + 1, **{band_dim.upper(): label})
+                else:
+                    dst.set_band_description(band + 1, variable_name)
+
+            if overviews:
+                factors = _overview_factors(height, width, blocksize)
+                if factors:
+                    dst.build_overviews(factors, Resampling.average)
+                    dst.update_tags(ns='rio_overview', resampling='average')
+
     return output_file
+
+
+def batch_netcdf_to_geotiff(inputs, output_dir=None, variable_name=None, n_workers=4,
+                            pattern='*.nc', **kwargs):
+    """Convert many NetCDF files to GeoTIFF on several processes.
+
+    Each process converts one file at a time, so memory use is about
+    `n_workers` * `max_chunk_mb`.
+
+    Parameters
+    ----------
+    inputs : str or list of str
+        Folder of NetCDF files (matched by `pattern`), or a list of paths.
+    output_dir : str, optional
+        Folder of the GeoTIFFs; created if needed. Default next to each input.
+    variable_name : str, optional
+        Variable to convert; see `netcdf_to_geotiff`.
+    n_workers : int, optional (default 4)
+        Number of processes.
+    **kwargs
+        Passed to `netcdf_to_geotiff` (max_chunk_mb, compress, ...).
+
+    Returns
+    -------
+    summary : DataFrame
+        'input', 'output' and 'error' (None if converted) of each file.
+
+    Note: on Windows, call this under `if __name__ == '__main__':`.
+    """
+    paths = sorted(glob.glob(os.path.join(inputs, pattern))) if isinstance(inputs, str) else list(inputs)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _output(path):
+        if not output_dir:
+            return None
+        return os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + '.tif')
+
+    records = []
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {pool.submit(netcdf_to_geotiff, path, _output(path), variable_name, **kwargs): path
+                   for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                records.append((path, future.result(), None))
+            except Exception as e:
+                print(f'!!! {os.path.basename(path)}: {e}')
+                records.append((path, None, str(e)))
+
+    summary = pd.DataFrame(records, columns=['input', 'output', 'error'])
+    print(f'{len(paths)} files: {summary.error.isna().sum()} converted')
+    return summary.sort_values('input').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert NetCDF files to multi-band GeoTIFFs')
+    parser.add_argument('inputs', nargs='+', help='NetCDF files, or a folder of them')
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--variable', default=None)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-chunk-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    inputs = args.inputs[0] if len(args.inputs) == 1 and os.path.isdir(args.inputs[0]) else args.inputs
+    batch_netcdf_to_geotiff(inputs, output_dir=args.output_dir, variable_name=args.variable,
+                            n_workers=args.workers, max_chunk_mb=args.max_chunk_mb)
@@ -13,6 +13,7 @@ import geopandas as gpd
 import glob
 import numpy as np
 import datetime
+from ogim_dtypes import replace_missing_dates
 
 
 def read_files_by_keyword(folderpath, file_suffix, keyword):
@@ -114,7 +115,11 @@ def replace_missing_dates_with_na(gdf, columns2check):
 
         if column in acceptable_columns and column in gdf.columns:
 
-            gdf[column] = gdf[column].replace(possible_missing_values, '1900-01-01')
+            if pd.api.types.is_datetime64_any_dtype(gdf[column]):
+                # Dates already parsed by `apply_dtype_policy`; NaT and sentinel dates are missing
+                gdf[column] = replace_missing_dates(gdf[column])
+            else:
+                gdf[column] = gdf[column].replace(possible_missing_values, '1900-01-01')
 
     return gdf
 
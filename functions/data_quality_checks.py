@@ -10,6 +10,7 @@ import pandas as pd
 from tqdm import tqdm
 import pprint
 from sigfig import round
+from ogim_dtypes import remap_values, replace_missing_dates
 
 def check_invalid_geoms(
     gdf, 
@@ -60,7 +61,11 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     """Check for consistency in:
         data types [OGIM_ID, SPUD_DATE, INSTALL_DATE, COMP_DATE]
         latitude, longitude significant figure digits
+
+    The input `gdf` is not modified; a checked copy is returned.
     """
+    gdf = gdf.copy()
+
     # Check OGIM_ID to make sure format is int
     gdf['OGIM_ID'] = gdf['OGIM_ID'].astype(int)
     
@@ -71,7 +76,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
         unique_ids = gdf['FAC_ID'].unique()
     
         if 'UNKNOWN' in unique_ids or 'NOT AVAILABLE' in unique_ids or None in unique_ids:
-            gdf = gdf.replace({'FAC_ID': {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A'}})
+            gdf['FAC_ID'] = remap_values(gdf['FAC_ID'], {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A'})
     except:
         pass
         
@@ -81,7 +86,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
         unique_status = gdf.FAC_STATUS.unique()
     
         if 'UNKNOWN' in unique_status or 'NOT AVAILABLE' in unique_status or "NA" in unique_status or None in unique_status or "NAN" in unique_status:
-            gdf = gdf.replace({'FAC_STATUS': {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', "NA": "N/A", None: 'N/A', 'NAN': 'N/A'}})
+            gdf['FAC_STATUS'] = remap_values(gdf['FAC_STATUS'], {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', "NA": "N/A", None: 'N/A', 'NAN': 'N/A'})
     except:
         pass
         
@@ -91,7 +96,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
         unique_operator = gdf.OPERATOR.unique()
     
         if 'UNKNOWN' in unique_operator or 'NOT AVAILABLE' in unique_operator or None in unique_operator:
-            gdf = gdf.replace({'OPERATOR': {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A'}})
+            gdf['OPERATOR'] = remap_values(gdf['OPERATOR'], {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A'})
     except:
         pass
     
@@ -101,34 +106,46 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
         unique_commodity = gdf.COMMODITY.unique()
     
         if 'UNKNOWN' in unique_commodity or 'NOT AVAILABLE' in unique_commodity or None in unique_commodity or "NAN" in unique_commodity:
-            gdf = gdf.replace({'COMMODITY': {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A', 'NAN': 'N/A'}})
+            gdf['COMMODITY'] = remap_values(gdf['COMMODITY'], {'UNKNOWN':'N/A', 'NOT AVAILABLE': 'N/A', None: 'N/A', 'NAN': 'N/A'})
     except:
         pass
         
     # SPUD DATE
     # =====================================================================
     try:
-        unique_spud = gdf.SPUD_DATE.unique()
-        if 'UNKNOWN' in unique_spud or 'NOT AVAILABLE' in unique_spud or "1800-01-01" in unique_spud or "NA" in unique_spud or "1901-01-01" in unique_spud or None in unique_spud:
-            gdf = gdf.replace({'SPUD_DATE': {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'}})
+        if pd.api.types.is_datetime64_any_dtype(gdf['SPUD_DATE']):
+            # Parsed by `apply_dtype_policy`: compare with Timestamps, not strings
+            gdf['SPUD_DATE'] = replace_missing_dates(gdf['SPUD_DATE'])
+        else:
+            unique_spud = gdf.SPUD_DATE.unique()
+            if 'UNKNOWN' in unique_spud or 'NOT AVAILABLE' in unique_spud or "1800-01-01" in unique_spud or "NA" in unique_spud or "1901-01-01" in unique_spud or None in unique_spud:
+                gdf['SPUD_DATE'] = remap_values(gdf['SPUD_DATE'], {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'})
     except:
         pass
     
     # COMPLETION DATE
     # =====================================================================
     try:
-        unique_comp = gdf.COMP_DATE.unique()
-        if 'UNKNOWN' in unique_comp or 'NOT AVAILABLE' in unique_comp or "1800-01-01" in unique_comp or "NA" in unique_comp or "1901-01-01" in unique_comp or None in unique_comp:
-            gdf = gdf.replace({'COMP_DATE': {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'}})
+        if pd.api.types.is_datetime64_any_dtype(gdf['COMP_DATE']):
+            # Parsed by `apply_dtype_policy`: compare with Timestamps, not strings
+            gdf['COMP_DATE'] = replace_missing_dates(gdf['COMP_DATE'])
+        else:
+            unique_comp = gdf.COMP_DATE.unique()
+            if 'UNKNOWN' in unique_comp or 'NOT AVAILABLE' in unique_comp or "1800-01-01" in unique_comp or "NA" in unique_comp or "1901-01-01" in unique_comp or None in unique_comp:
+                gdf['COMP_DATE'] = remap_values(gdf['COMP_DATE'], {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'})
     except:
         pass
     
     # INSTALLATION DATE
     # =====================================================================
     try:
-        unique_instl = gdf.INSTALL_DATE.unique()
-        if 'UNKNOWN' in unique_instl or 'NOT AVAILABLE' in unique_instl or "1800-01-01" in unique_instl or "NA" in unique_instl or "1901-01-01" in unique_instl or None in unique_instl:
-            gdf = gdf.replace({'COMP_DATE': {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'}})
+        if pd.api.types.is_datetime64_any_dtype(gdf['INSTALL_DATE']):
+            # Parsed by `apply_dtype_policy`: compare with Timestamps, not strings
+            gdf['INSTALL_DATE'] = replace_missing_dates(gdf['INSTALL_DATE'])
+        else:
+            unique_instl = gdf.INSTALL_DATE.unique()
+            if 'UNKNOWN' in unique_instl or 'NOT AVAILABLE' in unique_instl or "1800-01-01" in unique_instl or "NA" in unique_instl or "1901-01-01" in unique_instl or None in unique_instl:
+                gdf['COMP_DATE'] = remap_values(gdf['COMP_DATE'], {'UNKNOWN':'1900-01-01', 'NOT AVAILABLE': '1900-01-01', "1800-01-01": "1900-01-01", "NA": "1900-01-01", None: '1900-01-01'})
     except:
         pass
 
@@ -137,7 +154,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_liq_capacity = gdf.LIQ_CAPACITY_BPD.unique()
         if 9999 in unique_liq_capacity or 999 in unique_liq_capacity or "9999" in unique_liq_capacity or "999" in unique_liq_capacity or "-999" in unique_liq_capacity or None in unique_liq_capacity:
-            gdf = gdf.replace({'LIQ_CAPACITY_BPD': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['LIQ_CAPACITY_BPD'] = remap_values(gdf['LIQ_CAPACITY_BPD'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -146,7 +163,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_liq_thru = gdf.LIQ_THROUGHPUT_BPD.unique()
         if 9999 in unique_liq_thru or 999 in unique_liq_thru or "9999" in unique_liq_thru or "999" in unique_liq_thru or "-999" in unique_liq_thru or None in unique_liq_thru:
-            gdf = gdf.replace({'LIQ_THROUGHPUT_BPD': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['LIQ_THROUGHPUT_BPD'] = remap_values(gdf['LIQ_THROUGHPUT_BPD'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -155,7 +172,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_gas_cap = gdf.GAS_CAPACITY_MMCFD.unique()
         if 9999 in unique_gas_cap or 999 in unique_gas_cap or "9999" in unique_gas_cap or "999" in unique_gas_cap or "-999" in unique_gas_cap or None in unique_gas_cap:
-            gdf = gdf.replace({'GAS_CAPACITY_MMCFD': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['GAS_CAPACITY_MMCFD'] = remap_values(gdf['GAS_CAPACITY_MMCFD'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -164,7 +181,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_gas_thru = gdf.GAS_THROUGHPUT_MMCFD.unique()
         if 9999 in unique_gas_thru or 999 in unique_gas_thru or "9999" in unique_gas_thru or "999" in unique_gas_thru or "-999" in unique_gas_thru or None in unique_gas_thru:
-            gdf = gdf.replace({'GAS_THROUGHPUT_MMCFD': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['GAS_THROUGHPUT_MMCFD'] = remap_values(gdf['GAS_THROUGHPUT_MMCFD'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -173,7 +190,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_num_compr = gdf.NUM_COMPR_UNITS.unique()
         if 9999 in unique_num_compr or 999 in unique_num_compr or "9999" in unique_num_compr or "999" in unique_num_compr or "-999" in unique_num_compr or None in unique_num_compr:
-            gdf = gdf.replace({'NUM_COMPR_UNITS': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['NUM_COMPR_UNITS'] = remap_values(gdf['NUM_COMPR_UNITS'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -182,7 +199,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_site_hp = gdf.SITE_HP.unique()
         if 9999 in unique_site_hp or 999 in unique_site_hp or "9999" in unique_site_hp or "999" in unique_site_hp or "-999" in unique_site_hp or None in unique_site_hp:
-            gdf = gdf.replace({'SITE_HP': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['SITE_HP'] = remap_values(gdf['SITE_HP'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
     
@@ -191,7 +208,7 @@ def data_quality_checks(gdf, starting_ogim_id=1, check_attributes=True):
     try:
         unique_num_stor = gdf.NUM_STORAGE_TANKS.unique()
         if 9999 in unique_num_stor or 999 in unique_num_stor or "9999" in unique_num_stor or "999" in unique_num_stor or "-999" in unique_num_stor or None in unique_num_stor:
-            gdf = gdf.replace({'NUM_STORAGE_TANKS': {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999}})
+            gdf['NUM_STORAGE_TANKS'] = remap_values(gdf['NUM_STORAGE_TANKS'], {9999:-999, '9999':-999, "999":-999, "-999":-999, 999:-999, None: -999})
     except:
         pass
 
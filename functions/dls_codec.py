@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Dominion Land Survey (DLS) codec and LSD-to-coordinate index for the
+Prairie provinces (Alberta, Saskatchewan and Manitoba).
+
+Facility and well locations in the Prairies are often reported only as a
+DLS Legal Subdivision (LSD), e.g. '12-10-071-23W3'
+(LSD - Section - Township - Range + W + Meridian), or, in the Saskatchewan
+cadastre, as a Legal Land Description (LLD), e.g. '12-NW-10-71-23-3'
+(LSD - Quarter - Section - Township - Range - Meridian).
+
+This module parses and formats both with vectorized pandas string
+operations, and packs each LSD into a single int64 key:
+
+    key = LSD + 100 * Section + 10^4 * Township + 10^7 * Range
+          + 10^9 * (Meridian + 10 * direction)    (direction 0 = W, 1 = E)
+
+Integer keys are much cheaper to join on than strings, and don't depend on
+whether a source zero-pads its numbers. `build_lsd_index` combines the LSD
+grids of AB, SK and MB into one on-disk (GeoParquet) index of LSD centroids
+and polygons, and `geolocate_by_lsd` geolocates a whole table of facilities
+against that index with a single join.
+
+Example usage
+---
+    index = load_lsd_index('..\\dls_index\\prairie_lsd_index.parquet', provinces=['MB'])
+    facs = geolocate_by_lsd(fac_data, 'Location', index)
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+# Regular expressions for the two location formats. Numbers may or may not
+# be zero-padded, and an LSD may be embedded in a longer string (e.g. the
+# UWI '100/12-10-071-23W3/00').
+LSD_PATTERN = r'(\d{1,2})-(\d{1,2})-(\d{1,3})-(\d{1,2})\s*([WE])\s*(\d)'
+LLD_PATTERN = r'^\s*(\d{1,2})-[A-Z]{0,2}-(\d{1,2})-(\d{1,3})-(\d{1,2})-(\d)'
+
+COMPONENTS = ['LSD', 'SECTION', 'TOWNSHIP', 'RANGE', 'MERIDIAN', 'DIRECTION']
+
+# Valid range of each numeric component
+_LIMITS = {'LSD': (1, 16),
+           'SECTION': (1, 36),
+           'TOWNSHIP': (1, 126),
+           'RANGE': (1, 34),
+           'MERIDIAN': (1, 6)}
+
+# Position (factor) and number of digits (modulus) of each component in a key
+_FACTORS = {'LSD': 1,
+            'SECTION': 100,
+            'TOWNSHIP': 10**4,
+            'RANGE': 10**7,
+            'MERIDIAN': 10**9}
+_MODULI = {'LSD': 100,
+           'SECTION': 100,
+           'TOWNSHIP': 1000,
+           'RANGE': 100,
+           'MERIDIAN': 10}
+
+
+# =============================================================================
+# Parsing, packing and formatting
+# =============================================================================
+def _clean_components(parts):
+    """Convert extracted string components to nullable ints, with out-of-range values as <NA>."""
+    out = pd.DataFrame(index=parts.index)
+    valid = pd.Series(True, index=parts.index)
+    for col, (lo, hi) in _LIMITS.items():
+        out[col] = pd.to_numeric(parts[col], errors='coerce').astype('Int64')
+        valid &= out[col].between(lo, hi).fillna(False)
+    out['DIRECTION'] = parts['DIRECTION'].str.upper()
+    out.loc[~valid, :] = pd.NA
+    return out
+
+
+def parse_lsd(series):
+    """Split LSD strings like '12-10-071-23W3' into their numeric components.
+
+    Parameters
+    ----------
+    series : pandas Series of str
+        LSD locations, zero-padded or not. Values that can't be parsed (or
+        have an out-of-range component) give a row of <NA>.
+
+    Returns
+    -------
+    components : DataFrame
+        Columns 'LSD', 'SECTION', 'TOWNSHIP', 'RANGE', 'MERIDIAN' (Int64) and
+        'DIRECTION' ('W' or 'E'), with the same index as `series`.
+
+    """
+    parts = series.astype('string').str.upper().str.extract(LSD_PATTERN)
+    parts.columns = ['LSD', 'SECTION', 'TOWNSHIP', 'RANGE', 'DIRECTION', 'MERIDIAN']
+    return _clean_components(parts)
+
+
+def parse_lld(series):
+    """Split Saskatchewan LLD strings like '12-NW-10-71-23-3' into their numeric components.
+
+    The quarter-section part is skipped, and any letter 'a' in the LLD is
+    removed first (some Saskatchewan LLDs contain one). All Saskatchewan meridians are
+    west of Greenwich, so 'DIRECTION' is always 'W'.
+    """
+    cleaned = series.astype('string').str.replace(r'[aA]', '', regex=True).str.upper()
+    parts = cleaned.str.extract(LLD_PATTERN)
+    parts.columns = ['LSD', 'SECTION', 'TOWNSHIP', 'RANGE', 'MERIDIAN']
+    parts['DIRECTION'] = parts['MERIDIAN'].where(parts['MERIDIAN'].isna(), 'W')
+    return _clean_components(parts)
+
+
+def components_to_keys(components):
+    """Pack a DataFrame of LSD components (as returned by `parse_lsd`) into int64 keys (Int64, <NA> if invalid)."""
+    keys = pd.Series(0, index=components.index, dtype='Int64')
+    for col, factor in _FACTORS.items():
+        keys += pd.to_numeric(components[col], errors='coerce').astype('Int64') * factor
+    direction = components['DIRECTION'].map({'W': 0, 'E': 1}).astype('Int64')
+    return keys + direction * 10 * _FACTORS['MERIDIAN']
+
+
+def keys_to_components(keys):
+    """Unpack int64 LSD keys into a DataFrame of components; the inverse of `components_to_keys`."""
+    keys = pd.Series(keys).astype('Int64')
+    out = pd.DataFrame(index=keys.index)
+    for col, factor in _FACTORS.items():
+        out[col] = (keys // factor) % _MODULI[col]
+    out['DIRECTION'] = (keys // (10 * _FACTORS['MERIDIAN'])).map({0: 'W', 1: 'E'})
+    return out[COMPONENTS]
+
+
+def format_lsd(components):
+    """Format LSD components (or int64 keys) as zero-padded 'XX-XX-XXX-XXWX' strings (<NA> if invalid)."""
+    if not isinstance(components, pd.DataFrame):
+        components = keys_to_components(components)
+    s = lambda col, width: components[col].astype('string').str.zfill(width)
+    return (s('LSD', 2) + '-' + s('SECTION', 2) + '-' + s('TOWNSHIP', 3) + '-'
+            + s('RANGE', 2) + components['DIRECTION'].astype('string')
+            + components['MERIDIAN'].astype('string'))
+
+
+def lsd_to_keys(series):
+    """Return the int64 key of every LSD string in `series`."""
+    return components_to_keys(parse_lsd(series))
+
+
+def lld_to_keys(series):
+    """Return the int64 LSD key of every Saskatchewan LLD string in `series`."""
+    return components_to_keys(parse_lld(series))
+
+
+def standardize_dls(df, lsd_col, section_col, township_col, range_col, meridian_col):
+    """Build zero-padded 'XX-XX-XXX-XXWX' LSD strings from separate component columns.
+
+    Returns a DataFrame with the columns ('LegalSubDivision', 'Section',
+    'Township', 'Range', 'Meridian', 'FacilityLocation') and the same index
+    as `df`. The meridian column may hold '4' or 'W4'.
+    """
+    text = lambda col: df[col].astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    meridian = text(meridian_col).str.upper()
+    direction = meridian.str.extract(r'([WE])', expand=False).fillna('W')
+    meridian = meridian.str.replace(r'[WE]', '', regex=True)
+
+    df2 = pd.DataFrame(index=df.index)
+    df2['LegalSubDivision'] = text(lsd_col).str.zfill(2)
+    df2['Section'] = text(section_col).str.zfill(2)
+    df2['Township'] = text(township_col).str.zfill(3)
+    df2['Range'] = text(range_col).str.zfill(2)
+    df2['Meridian'] = meridian
+    df2['FacilityLocation'] = (df2.LegalSubDivision + '-' + df2.Section + '-'
+                               + df2.Township + '-' + df2.Range + direction + meridian)
+    return df2
+
+
+# =============================================================================
+# On-disk LSD index
+# =============================================================================
+def build_lsd_index(sources, out_fp=None):
+    """Combine LSD grids from several provinces into one LSD centroid/polygon index.
+
+    Parameters
+    ----------
+    sources : list of dict
+        One dict per source, with keys
+          'province'     : e.g. 'AB', 'SK' or 'MB'
+          'data'         : GeoDataFrame of LSD polygons or centroid points,
+                           or a DataFrame of centroid coordinates
+          'location_col' : column holding the LSD (or LLD) string
+          'format'       : 'lsd' (default) or 'lld'
+          'lon_col', 'lat_col' : for a plain DataFrame only, the columns
+                           holding centroid longitude and latitude (EPSG:4326)
+    out_fp : str, optional
+        If given, the index is also written to this GeoParquet file.
+
+    Returns
+    -------
+    index : GeoDataFrame
+        One row per LSD, in EPSG:4326, with columns 'DLS_KEY' (int64),
+        'LSD' ('XX-XX-XXX-XXWX'), 'PROVINCE', 'CENTROID_LON', 'CENTROID_LAT'
+        and a geometry column holding the LSD polygon where the source had
+        one, or the centroid point otherwise. Where an LSD appears more than
+        once, the first record is kept.
+
+    """
+    pieces = []
+    for src in sources:
+        data = src['data']
+        to_keys = lld_to_keys if src.get('format', 'lsd') == 'lld' else lsd_to_keys
+        keys = to_keys(data[src['location_col']])
+
+        if isinstance(data, gpd.GeoDataFrame):
+            geoms = data.geometry
+            # Centroids in the source CRS, then converted to lat-long
+            centroids = geoms.centroid.to_crs(4326)
+            geoms = geoms.to_crs(4326)
+            lon, lat = centroids.x.to_numpy(), centroids.y.to_numpy()
+        else:
+            lon = pd.to_numeric(data[src['lon_col']], errors='coerce').to_numpy()
+            lat = pd.to_numeric(data[src['lat_col']], errors='coerce').to_numpy()
+            geoms = gpd.GeoSeries(gpd.points_from_xy(lon, lat), index=data.index, crs=4326)
+
+        piece = gpd.GeoDataFrame({'DLS_KEY': keys.to_numpy(),
+                                  'PROVINCE': src['province'],
+                                  'CENTROID_LON': lon,
+                                  'CENTROID_LAT': lat},
+                                 geometry=geoms.to_numpy(),
+                                 crs=4326)
+        n_bad = piece.DLS_KEY.isna().sum()
+        if n_bad:
+            print(f"{src['province']}: {n_bad} of {len(piece)} records have no valid LSD and were skipped")
+        pieces.append(piece[piece.DLS_KEY.notna()])
+
+    index = pd.concat(pieces, ignore_index=True)
+    index['DLS_KEY'] = index.DLS_KEY.astype('int64')
+    n_dupes = index.DLS_KEY.duplicated().sum()
+    if n_dupes:
+        print(f'{n_dupes} duplicate LSDs dropped (first record kept)')
+        index = index.drop_duplicates(subset='DLS_KEY', keep='first')
+    index.insert(1, 'LSD', format_lsd(index.DLS_KEY).to_numpy())
+    index = index.sort_values('DLS_KEY').reset_index(drop=True)
+
+    if out_fp is not None:
+        index.to_parquet(out_fp, index=False)
+        print(f'LSD index with {len(index)} records saved to {out_fp}')
+    return index
+
+
+def load_lsd_index(fp, provinces=None, columns=None):
+    """Read an LSD index written by `build_lsd_index`, optionally only some provinces and columns."""
+    filters = [('PROVINCE', 'in', list(provinces))] if provinces else None
+    return gpd.read_parquet(fp, columns=columns, filters=filters)
+
+
+def geolocate_by_lsd(df, location_col, index, location_format='lsd',
+                     geometry='centroid', geometry_name='geometry'):
+    """Attach LSD geometry to every record of `df`, with one join on int64 keys.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Records (e.g. Petrinex facilities) with an LSD or LLD location column.
+    location_col : str
+        Name of the location column in `df`.
+    index : GeoDataFrame
+        LSD index from `build_lsd_index` / `load_lsd_index`.
+    location_format : str, optional (default 'lsd')
+        'lsd' for '12-10-071-23W3' style locations, 'lld' for Saskatchewan
+        '12-NW-10-71-23-3' style locations.
+    geometry : str, optional (default 'centroid')
+        'centroid' to geolocate records at the LSD centroid point, or
+        'polygon' for the LSD polygon (where the index has one).
+    geometry_name : str, optional (default 'geometry')
+        Name of the new geometry column. Use another name if `df` is a
+        GeoDataFrame whose own geometry should be kept.
+
+    Returns
+    -------
+    gdf : GeoDataFrame
+        All records of `df` (same index and order), plus 'DLS_KEY',
+        'CENTROID_LON' and 'CENTROID_LAT' columns and the LSD geometry (in
+        EPSG:4326) as the active geometry column. Records whose location is
+        invalid or not in the index have a None geometry.
+
+    """
+    to_keys = lld_to_keys if location_format == 'lld' else lsd_to_keys
+    keys = to_keys(df[location_col])
+
+    lookup = index.set_index('DLS_KEY')
+    pos = lookup.index.get_indexer(keys.fillna(-1).astype('int64'))
+    found = pos >= 0
+    print(f'{found.sum()} of {len(df)} records matched an LSD in the index')
+
+    gdf = df.copy()
+    gdf['DLS_KEY'] = keys.to_numpy()
+    for col in ['CENTROID_LON', 'CENTROID_LAT']:
+        gdf[col] = np.where(found, lookup[col].to_numpy()[np.maximum(pos, 0)], np.nan)
+
+    if geometry == 'polygon':
+        geoms = np.where(found, lookup.geometry.to_numpy()[np.maximum(pos, 0)], None)
+    else:
+        geoms = gpd.points_from_xy(gdf.CENTROID_LON, gdf.CENTROID_LAT)
+        geoms = np.where(found, np.asarray(geoms), None)
+
+    gdf[geometry_name] = gpd.GeoSeries(geoms, index=gdf.index, crs=4326)
+    return gpd.GeoDataFrame(gdf, geometry=geometry_name)
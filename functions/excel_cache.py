@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Content-hashed cache for slow Excel source workbooks.
+
+Parsing .xlsx files is one of the slowest steps of data integration, and
+most workbooks don't change between runs. `read_excel_cached` parses each
+(workbook, sheet, header, dtype, ...) combination once and saves the result
+as a Parquet file, named after a hash of the workbook's *content* and of the
+read arguments, in a `.excel_cache` folder next to the workbook. Later calls
+load the Parquet file instead, unless the workbook's content changed. (Files
+whose size and modification time are unchanged aren't even re-hashed.)
+
+`read_excel_many` parses several uncached workbooks at once, each in its own
+Python process, so a folder of monthly workbooks uses all cores.
+
+*NOTE* The worker processes are started with `subprocess` running this file,
+rather than with `multiprocessing`, because our integration scripts are run
+top to bottom without an `if __name__ == '__main__'` guard, and
+`multiprocessing` would re-run the calling script in every worker.
+
+Example usage
+---
+    sk_fac = read_excel_cached(fp_, sheet_name=0, header=3, dtype={'Built \\nDate': str})
+    ky_oil, ky_gas = read_excel_many([{'path': 'kentucky\\2022 Oil.xlsx'},
+                                      {'path': 'kentucky\\2022 Gas.xlsx'}])
+
+@author: maobrien
+"""
+import os
+import sys
+import json
+import hashlib
+import pickle
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+CACHE_DIR_NAME = '.excel_cache'
+_INDEX_FILE = 'index.json'
+
+
+# =============================================================================
+# Cache keys
+# =============================================================================
+def _normalize_kwargs(kwargs):
+    """Turn read_excel arguments into JSON-serializable values (types by name)."""
+    def norm(value):
+        if isinstance(value, type):
+            return value.__name__
+        if isinstance(value, dict):
+            return {str(k): norm(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [norm(v) for v in value]
+        return value
+    return {k: norm(v) for k, v in kwargs.items()}
+
+
+def _json_safe(kwargs):
+    """Return True if `kwargs` survive a round trip through JSON (e.g. no converters)."""
+    try:
+        return json.loads(json.dumps(kwargs)) == kwargs
+    except (TypeError, ValueError):
+        return False
+
+
+def _cache_dir(path, cache_dir):
+    return cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, _INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir, index):
+    tmp = os.path.join(cache_dir, f'{_INDEX_FILE}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(cache_dir, _INDEX_FILE))
+
+
+def content_hash(path, cache_dir=None):
+    """Return the SHA-256 of a file's content.
+
+    The hash is remembered in the cache index with the file's size and
+    modification time, and only recomputed if either changed.
+    """
+    cache_dir = _cache_dir(path, cache_dir)
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    index = _load_index(cache_dir)
+    entry = index.get(name)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index = _load_index(cache_dir)
+    index[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    _save_index(cache_dir, index)
+    return digest
+
+
+def _cache_stem(path, kwargs, cache_dir):
+    """Cache file path (without extension) of one workbook + read arguments."""
+    args = json.dumps(_normalize_kwargs(kwargs), sort_keys=True, default=str)
+    args_hash = hashlib.sha256(args.encode('utf-8')).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(_cache_dir(path, cache_dir),
+                        f'{name}.{content_hash(path, cache_dir)[:16]}.{args_hash}')
+
+
+# =============================================================================
+# Parsing and storing
+# =============================================================================
+def _store(df, stem):
+    """Save `df` as Parquet, or as a pickle if it can't be (e.g. mixed-type or non-string columns)."""
+    tmp = f'{stem}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp, index=True)
+        os.replace(tmp, stem + '.parquet')
+    except Exception as e:  # pyarrow raises several types for unsupported data
+        print(f'{os.path.basename(stem)}: not storable as Parquet ({type(e).__name__}), cached as pickle')
+        with open(tmp, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, stem + '.pkl')
+
+
+def _load(stem):
+    """Load a cached sheet, or return None if it isn't cached."""
+    if os.path.exists(stem + '.parquet'):
+        return pd.read_parquet(stem + '.parquet')
+    if os.path.exists(stem + '.pkl'):
+        with open(stem + '.pkl', 'rb') as f:
+            return pickle.load(f)
+    return None
+
+
+def _parse_to_cache(path, kwargs, cache_dir=None):
+    """Parse one sheet with pd.read_excel and save it in the cache."""
+    stem = _cache_stem(path, kwargs, cache_dir)
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    df = pd.read_excel(path, **kwargs)
+    _store(df, stem)
+    return df
+
+
+def read_excel_cached(path, cache_dir=None, refresh=False, **read_excel_kwargs):
+    """Read one sheet of a workbook through the cache.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .xlsx / .xls workbook.
+    cache_dir : str, optional
+        Folder of the cache. Default is a `.excel_cache` folder next to the
+        workbook.
+    refresh : bool, optional (default False)
+        Re-parse the workbook even if it's cached.
+    **read_excel_kwargs
+        Passed on to `pd.read_excel`, and part of the cache key (e.g.
+        `sheet_name`, `header`, `dtype`, `usecols`). `sheet_name` must name
+        a single sheet.
+
+    Returns
+    -------
+    df : DataFrame
+    """
+    if isinstance(read_excel_kwargs.get('sheet_name', 0), list) or \
+            ('sheet_name' in read_excel_kwargs and read_excel_kwargs['sheet_name'] is None):
+        raise ValueError('read_excel_cached reads one sheet at a time; use read_excel_many for several')
+    stem = _cache_stem(path, read_excel_kwargs, cache_dir)
+    df = None if refresh else _load(stem)
+    if df is None:
+        df = _parse_to_cache(path, read_excel_kwargs, cache_dir)
+    return df
+
+
+def read_excel_many(specs, n_workers=None, cache_dir=None):
+    """Read several sheets through the cache, parsing uncached ones in parallel processes.
+
+    Parameters
+    ----------
+    specs : list of dict
+        One dict per sheet to read, with a 'path' key and any `pd.read_excel`
+        arguments, e.g. {'path': 'Layout.xlsx', 'sheet_name': 'OPERATOR'}.
+    n_workers : int, optional
+        Number of workbooks parsed at once. Default is the number of CPUs.
+    cache_dir : str, optional
+        Folder of the cache; see `read_excel_cached`.
+
+    Returns
+    -------
+    dfs : list of DataFrames
+        In the order of `specs`.
+    """
+    specs = [dict(s) for s in specs]
+    paths = [s.pop('path') for s in specs]
+    stems = [_cache_stem(p, s, cache_dir) for p, s in zip(paths, specs)]
+    dfs = [_load(stem) for stem in stems]
+
+    todo = [i for i, df in enumerate(dfs) if df is None]
+    # Arguments that can't be passed to another process as JSON (e.g.
+    # `converters` functions) are parsed in this process
+    local = [i for i in todo if not _json_safe(_normalize_kwargs(specs[i]))]
+    remote = [i for i in todo if i not in local]
+    for i in local:
+        dfs[i] = _parse_to_cache(paths[i], specs[i], cache_dir)
+
+    def run_worker(i):
+        job = json.dumps({'path': os.path.abspath(paths[i]),
+                          'kwargs': _normalize_kwargs(specs[i]),
+                          'cache_dir': cache_dir})
+        subprocess.run([sys.executable, os.path.abspath(__file__), job], check=True)
+
+    if remote:
+        print(f'Parsing {len(remote)} sheets in parallel, {len(dfs) - len(todo)} read from cache')
+        with ThreadPoolExecutor(max_workers=n_workers or os.cpu_count()) as pool:
+            list(pool.map(run_worker, remote))
+        for i in remote:
+            dfs[i] = _load(stems[i])
+    return dfs
+
+
+def clear_cache(path, cache_dir=None):
+    """Delete every cached sheet of a workbook (all versions and read arguments)."""
+    cache_dir = _cache_dir(path, cache_dir)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if not os.path.isdir(cache_dir):
+        return
+    for f in os.listdir(cache_dir):
+        if f.startswith(name + '.') and f.endswith(('.parquet', '.pkl')):
+            os.remove(os.path.join(cache_dir, f))
+
+
+if __name__ == '__main__':
+    # Worker process of `read_excel_many`
+    job = json.loads(sys.argv[1])
+    _parse_to_cache(job['path'], job['kwargs'], job['cache_dir'])
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Vectorized length and area of OGIM features on the WGS84 ellipsoid.
+
+`calculate_pipeline_length_km` and `calculate_basin_area_km2` used to
+reproject a whole layer to Eckert IV, loop over every row to read `.length`
+or `.area`, and reproject the layer back again. The functions here compute
+the same quantities directly from the coordinate arrays of the layer, without
+modifying (or copying) its geometries:
+
+    * Lengths are true geodesic distances on the WGS84 ellipsoid, summed
+      segment by segment with `pyproj.Geod.inv` over every segment at once.
+    * Areas are geodesic areas on the WGS84 ellipsoid (edges are
+      geodesics), computed ring by ring with GeographicLib, as
+      `pyproj.Geod.geometry_area_perimeter` does for a single geometry.
+    * `method='authalic'` is a faster approximation of the area: the
+      shoelace formula is applied in the equal-area cylindrical (authalic)
+      space of the WGS84 ellipsoid, over every ring at once. Edges are
+      straight lines in that space rather than geodesics (and parallels),
+      so polygons with long edges can be off by several percent; only use
+      it for densely digitized boundaries.
+
+Coordinates in a CRS other than EPSG:4326 are converted to longitude and
+latitude in memory only. Large layers are split into chunks that can be
+processed on several threads.
+
+`method='eckert_iv'` reproduces the numbers of previous OGIM releases, by
+measuring a temporary Eckert IV copy of the geometries with vectorized
+`.length` / `.area`.
+
+*NOTE* requires Shapely 2.0 or later.
+
+@author: maobrien
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import pyproj
+import shapely
+
+ECKERT_IV_STR = "+proj=eck4 +lon_0=0 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs"
+
+GEOD = pyproj.Geod(ellps='WGS84')
+
+# Shapely type ID of a Polygon
+_POLYGON_ID = 3
+
+
+def _lonlat(coords, crs):
+    """Return longitude and latitude arrays (degrees) for an (n, 2) coordinate array in `crs`."""
+    crs = pyproj.CRS.from_user_input(crs)
+    if crs.to_epsg() == 4326:
+        return coords[:, 0], coords[:, 1]
+    # Transformers are not thread-safe, so each chunk builds its own
+    transformer = pyproj.Transformer.from_crs(crs, 'EPSG:4326', always_xy=True)
+    return transformer.transform(coords[:, 0], coords[:, 1])
+
+
+def _authalic_y(lat):
+    """Return y (m) of the WGS84 equal-area cylindrical projection for latitudes in degrees.
+
+    y = a * q / 2, where q is the authalic latitude function. An area
+    measured in (a * longitude, y) space is the area on the ellipsoid.
+    """
+    e2 = GEOD.es
+    e = np.sqrt(e2)
+    sinphi = np.sin(np.radians(lat))
+    q = (1 - e2) * (sinphi / (1 - e2 * sinphi**2)
+                    - np.log((1 - e * sinphi) / (1 + e * sinphi)) / (2 * e))
+    return GEOD.a * q / 2
+
+
+def _geodesic_length_chunk(geoms, crs):
+    """Return the geodesic length in m of each geometry in one chunk (perimeter for polygons)."""
+    n = len(geoms)
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+
+    # Measure polygons along their exterior and interior rings
+    is_poly = shapely.get_type_id(parts) == _POLYGON_ID
+    if is_poly.any():
+        rings, ring_part = shapely.get_rings(parts[is_poly], return_index=True)
+        lines = np.concatenate([parts[~is_poly], rings])
+        line_geom = np.concatenate([part_geom[~is_poly],
+                                    part_geom[is_poly][ring_part]])
+    else:
+        lines, line_geom = parts, part_geom
+
+    coords, coord_line = shapely.get_coordinates(lines, return_index=True)
+    lengths = np.zeros(n)
+    if len(coords) > 1:
+        lon, lat = _lonlat(coords, crs)
+        lon, lat = np.asarray(lon), np.asarray(lat)
+        # A segment joins two consecutive coordinates of the same line
+        same_line = coord_line[1:] == coord_line[:-1]
+        start, end = np.flatnonzero(same_line), np.flatnonzero(same_line) + 1
+        _, _, dist = GEOD.inv(lon[start], lat[start], lon[end], lat[end])
+        lengths = np.bincount(line_geom[coord_line[start]],
+                              weights=np.asarray(dist), minlength=n)
+
+    lengths[shapely.is_missing(geoms)] = np.nan
+    return lengths
+
+
+def _polygon_rings(geoms, crs):
+    """Return the ring coordinates of the polygons in one chunk.
+
+    Returns longitude and latitude arrays, the ring of each coordinate, the
+    number of rings, and for each ring whether it is an exterior and the
+    geometry (position in `geoms`) it belongs to.
+    """
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+    is_poly = shapely.get_type_id(parts) == _POLYGON_ID
+    parts, part_geom = parts[is_poly], part_geom[is_poly]
+
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    lon, lat = _lonlat(coords, crs)
+    # get_rings returns each polygon's exterior first, then its holes
+    is_exterior = np.r_[True, ring_part[1:] != ring_part[:-1]][:len(rings)]
+    return (np.asarray(lon), np.asarray(lat), coord_ring, len(rings),
+            is_exterior, part_geom[ring_part])
+
+
+def _sum_rings(ring_area, is_exterior, ring_geom, geoms):
+    """Add up unsigned ring areas per geometry, subtracting holes; null geometries are NaN."""
+    ring_area = np.where(is_exterior, ring_area, -ring_area)
+    areas = np.bincount(ring_geom, weights=ring_area, minlength=len(geoms))
+    areas[shapely.is_missing(geoms)] = np.nan
+    return areas
+
+
+def _geodesic_area_chunk(geoms, crs):
+    """Return the area in m2 of each geometry in one chunk, with geodesic edges on the WGS84 ellipsoid."""
+    lon, lat, coord_ring, n_rings, is_exterior, ring_geom = _polygon_rings(geoms, crs)
+    ring_area = np.zeros(n_rings)
+    # Coordinates are grouped by ring; each ring is measured by GeographicLib
+    # (the same computation as `pyproj.Geod.geometry_area_perimeter`)
+    bounds = np.r_[0, np.flatnonzero(np.diff(coord_ring)) + 1, len(coord_ring)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end - start > 2:
+            area, _ = GEOD.polygon_area_perimeter(lon[start:end], lat[start:end])
+            ring_area[coord_ring[start]] = abs(area)
+    return _sum_rings(ring_area, is_exterior, ring_geom, geoms)
+
+
+def _authalic_area_chunk(geoms, crs):
+    """Return the area in m2 of each geometry in one chunk, in authalic cylindrical space."""
+    lon, lat, coord_ring, n_rings, is_exterior, ring_geom = _polygon_rings(geoms, crs)
+    ring_area = np.zeros(n_rings)
+    if len(coord_ring) > 1:
+        x = np.radians(lon) * GEOD.a
+        y = _authalic_y(lat)
+
+        # Shoelace formula, written with the longitude *difference* of each
+        # segment (wrapped to +/-180 degrees) so rings crossing the
+        # antimeridian are measured correctly
+        same_ring = coord_ring[1:] == coord_ring[:-1]
+        start = np.flatnonzero(same_ring)
+        dx = np.diff(x)[start]
+        half_circ = np.pi * GEOD.a
+        dx = (dx + half_circ) % (2 * half_circ) - half_circ
+        seg = dx * (y[start] + y[start + 1]) / 2
+        ring_area = np.abs(np.bincount(coord_ring[start], weights=seg,
+                                       minlength=n_rings))
+    return _sum_rings(ring_area, is_exterior, ring_geom, geoms)
+
+
+def _measure(geoseries, chunk_func, n_workers, chunk_size):
+    """Apply `chunk_func` to chunks of a GeoSeries' geometry array, in parallel if requested."""
+    geoms = geoseries.to_numpy()
+    crs = geoseries.crs
+    n = len(geoms)
+    bounds = list(range(0, n, chunk_size)) + [n]
+    chunks = [geoms[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    if n_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(lambda c: chunk_func(c, crs), chunks))
+    else:
+        results = [chunk_func(c, crs) for c in chunks]
+    if not results:
+        return np.array([], dtype=float)
+    return np.concatenate(results)
+
+
+def _check_crs(geoseries):
+    if geoseries.crs is None:
+        raise ValueError("!! CRS of gdf is not set !!")
+
+
+def line_lengths_km(geoseries, method='geodesic', n_workers=1, chunk_size=250_000):
+    """Return the length in km of every geometry in a GeoSeries.
+
+    Parameters
+    ----------
+    geoseries : GeoSeries
+        Line (or polygon, in which case the perimeter is measured) geometries
+        with a CRS set. It is not modified.
+    method : str, optional (default 'geodesic')
+        'geodesic' for the length along the WGS84 ellipsoid, or 'eckert_iv'
+        for the planar length in Eckert IV, as in previous OGIM releases.
+    n_workers : int, optional (default 1)
+        Number of threads to process chunks of `chunk_size` geometries on.
+    chunk_size : int, optional (default 250,000)
+        Number of geometries per chunk.
+
+    Returns
+    -------
+    lengths : pandas Series
+        Length in km, with the same index as `geoseries`. Null geometries
+        have a length of NaN.
+
+    Example
+    -------
+    pipes['PIPELINE_LENGTH_KM'] = line_lengths_km(pipes.geometry, n_workers=4)
+
+    """
+    _check_crs(geoseries)
+    if method == 'eckert_iv':
+        lengths_m = gpd.GeoSeries(geoseries.to_numpy(), crs=geoseries.crs).to_crs(ECKERT_IV_STR).length.to_numpy()
+    elif method == 'geodesic':
+        lengths_m = _measure(geoseries, _geodesic_length_chunk, n_workers, chunk_size)
+    else:
+        raise ValueError(f"method must be 'geodesic' or 'eckert_iv', not {method!r}")
+    return pd.Series(lengths_m / 1000, index=geoseries.index)
+
+
+def polygon_areas_km2(geoseries, method='geodesic', n_workers=1, chunk_size=250_000):
+    """Return the area in km2 of every geometry in a GeoSeries.
+
+    Parameters
+    ----------
+    geoseries : GeoSeries
+        Polygon or MultiPolygon geometries with a CRS set. It is not
+        modified. Other geometry types have an area of 0.
+    method : str, optional (default 'geodesic')
+        'geodesic' for the area on the WGS84 ellipsoid, 'authalic' for a
+        faster approximation of it (see the module docstring), or
+        'eckert_iv' for the planar area in Eckert IV, as in previous OGIM
+        releases.
+    n_workers : int, optional (default 1)
+        Number of threads to process chunks of `chunk_size` geometries on.
+    chunk_size : int, optional (default 250,000)
+        Number of geometries per chunk.
+
+    Returns
+    -------
+    areas : pandas Series
+        Area in km2, with the same index as `geoseries`. Null geometries have
+        an area of NaN.
+
+    Example
+    -------
+    basins['AREA_KM2'] = polygon_areas_km2(basins.geometry)
+
+    """
+    _check_crs(geoseries)
+    if method == 'eckert_iv':
+        areas_m2 = gpd.GeoSeries(geoseries.to_numpy(), crs=geoseries.crs).to_crs(ECKERT_IV_STR).area.to_numpy()
+    elif method == 'geodesic':
+        areas_m2 = _measure(geoseries, _geodesic_area_chunk, n_workers, chunk_size)
+    elif method == 'authalic':
+        areas_m2 = _measure(geoseries, _authalic_area_chunk, n_workers, chunk_size)
+    else:
+        raise ValueError(f"method must be 'geodesic', 'authalic' or 'eckert_iv', not {method!r}")
+    return pd.Series(areas_m2 / 1e6, index=geoseries.index)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Vectorized geometry normalization for OGIM layers: drop Z coordinates,
+flag null / empty / non-finite geometries, repair invalid geometries, and
+explode multi-part geometries, all in a single pass over the geometry array.
+
+This replaces running `transform_geom_3d_2d` (or `strip_z_coord`),
+`check_invalid_geoms`, `repair_invalid_polygon_geometries` and
+`explode_multi_geoms` one after another, each of which loops over every row.
+Everything here is built on Shapely 2.0 array functions, which run in C and
+release the GIL, so large layers can also be split into chunks that are
+processed on several threads at once.
+
+*NOTE* requires Shapely 2.0 or later.
+
+@author: maobrien
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+# Shapely type IDs of a MultiPoint (the first multi-part type) and a
+# GeometryCollection
+_MULTIPOINT_ID = 4
+_COLLECTION_ID = 7
+
+
+def _keep_same_dimension_parts(repaired, dimensions):
+    """Reduce GeometryCollections returned by make_valid to parts of the original dimension.
+
+    `make_valid` can turn an invalid polygon into a GeometryCollection of
+    polygons plus stray lines or points. Like
+    `repair_invalid_polygon_geometries`, keep only the parts with the same
+    dimension as the original geometry (e.g. only the polygons), rebuilt as a
+    Polygon or MultiPolygon.
+    """
+    out = repaired.copy()
+    is_collection = shapely.get_type_id(repaired) == _COLLECTION_ID
+    if not is_collection.any():
+        return out
+
+    collections = repaired[is_collection]
+    wanted_dim = dimensions[is_collection]
+    parts, part_ix = shapely.get_parts(collections, return_index=True)
+    # Parts can be multi-part geometries (or collections) themselves; split
+    # them until only single parts are left
+    while True:
+        is_multi = shapely.get_type_id(parts) >= _MULTIPOINT_ID
+        if not is_multi.any():
+            break
+        sub, sub_ix = shapely.get_parts(parts[is_multi], return_index=True)
+        parts = np.concatenate([parts[~is_multi], sub])
+        part_ix = np.concatenate([part_ix[~is_multi], part_ix[is_multi][sub_ix]])
+    order = np.argsort(part_ix, kind='stable')
+    parts, part_ix = parts[order], part_ix[order]
+    keep = shapely.get_dimensions(parts) == wanted_dim[part_ix]
+    parts, part_ix = parts[keep], part_ix[keep]
+
+    rebuilt = np.full(len(collections), None, dtype=object)
+    builders = {0: shapely.multipoints, 1: shapely.multilinestrings,
+                2: shapely.multipolygons}
+    for dim, builder in builders.items():
+        sel = wanted_dim[part_ix] == dim
+        if not sel.any():
+            continue
+        groups = np.unique(part_ix[sel])
+        # Re-number the group indices 0..n-1, as the shapely constructors expect
+        multi = builder(parts[sel], indices=np.searchsorted(groups, part_ix[sel]))
+        rebuilt[groups] = multi
+
+    # A multi-part geometry with only one part is stored as its single part
+    single = shapely.get_num_geometries(rebuilt) == 1
+    rebuilt[single] = shapely.get_geometry(rebuilt[single], 0)
+    # If no part had the original dimension, keep the whole collection
+    nothing_kept = shapely.is_missing(rebuilt)
+    rebuilt[nothing_kept] = collections[nothing_kept]
+
+    out[is_collection] = rebuilt
+    return out
+
+
+def _normalize_chunk(geoms, force_2d=True, repair=True):
+    """Normalize one chunk of a geometry array.
+
+    Returns the normalized geometries plus per-geometry flags used to build
+    the repair log. Null, empty and non-finite geometries are returned as
+    None.
+    """
+    n = len(geoms)
+    type_in = np.asarray(shapely.get_type_id(geoms))
+    is_null = shapely.is_missing(geoms)
+    is_empty = shapely.is_empty(geoms) & ~is_null
+    had_z = shapely.has_z(geoms)
+
+    # Find geometries with any NaN or +/-inf coordinate
+    coords, coord_ix = shapely.get_coordinates(geoms, include_z=False,
+                                               return_index=True)
+    non_finite = np.zeros(n, dtype=bool)
+    non_finite[coord_ix[~np.isfinite(coords).all(axis=1)]] = True
+
+    out = shapely.force_2d(geoms) if force_2d else geoms.copy()
+    unusable = is_null | is_empty | non_finite
+    out[unusable] = None
+
+    invalid = ~shapely.is_valid(out) & ~unusable
+    reason = np.full(n, None, dtype=object)
+    if invalid.any():
+        reason[invalid] = shapely.is_valid_reason(out[invalid])
+        if repair:
+            dims = shapely.get_dimensions(out[invalid])
+            repaired = shapely.make_valid(out[invalid])
+            out[invalid] = _keep_same_dimension_parts(repaired, dims)
+
+    return out, {'type_in': type_in,
+                 'null': is_null,
+                 'empty': is_empty,
+                 'non_finite': non_finite,
+                 'had_z': had_z,
+                 'invalid': invalid,
+                 'invalid_reason': reason}
+
+
+def normalize_geometries(gdf,
+                         force_2d=True,
+                         repair=True,
+                         explode=True,
+                         drop_unusable=True,
+                         n_workers=1,
+                         chunk_size=250_000):
+    """Force 2D, validate, repair and explode the geometries of a GeoDataFrame in one pass.
+
+    Each geometry is checked for being null, empty, or having non-finite
+    (NaN or inf) coordinates; Z coordinates are dropped; invalid geometries
+    are repaired with `make_valid` (keeping only parts with the same
+    dimension as the original, e.g. only the polygons of a repaired polygon);
+    and multi-part geometries are exploded into one row per part.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame
+        Layer of any geometry type. The input is not modified.
+    force_2d : bool, optional (default True)
+        Drop Z (and M) coordinates from every geometry.
+    repair : bool, optional (default True)
+        Run `make_valid` on invalid geometries. If False, invalid geometries
+        are only reported in the repair log.
+    explode : bool, optional (default True)
+        Explode MultiPoint, MultiLineString, MultiPolygon and
+        GeometryCollection geometries into one row per part. Attributes are
+        repeated for every part, like `explode_multi_geoms`.
+    drop_unusable : bool, optional (default True)
+        Drop rows whose geometry is null, empty or has non-finite
+        coordinates. If False, those rows are kept with a None geometry.
+    n_workers : int, optional (default 1)
+        Number of threads to process chunks of `chunk_size` geometries on.
+        Shapely releases the GIL, so more workers help on large layers.
+    chunk_size : int, optional (default 250,000)
+        Number of geometries per chunk.
+
+    Returns
+    -------
+    gdf_out : GeoDataFrame
+        Normalized copy of `gdf`, with a fresh RangeIndex.
+    repair_log : DataFrame
+        One row per input record that was changed or flagged, with columns
+        'input_index' (index label in `gdf`), 'geom_type_in', 'null',
+        'empty', 'non_finite', 'had_z', 'invalid', 'invalid_reason',
+        'n_parts_out' and 'action' (semicolon-separated list of what was
+        done: 'dropped', 'force_2d', 'repaired', 'exploded').
+
+    Example
+    -------
+    pipes, pipes_log = normalize_geometries(pipes, n_workers=4)
+    print(pipes_log.action.value_counts())
+
+    """
+    geom_col = gdf.geometry.name
+    geoms = gdf.geometry.to_numpy()
+    n = len(geoms)
+
+    # Split the geometry array into chunks and normalize them, in parallel
+    # if requested
+    bounds = list(range(0, n, chunk_size)) + [n]
+    chunks = [geoms[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    if n_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(lambda c: _normalize_chunk(c, force_2d, repair), chunks))
+    else:
+        results = [_normalize_chunk(c, force_2d, repair) for c in chunks]
+
+    if results:
+        out = np.concatenate([r[0] for r in results])
+        flags = {k: np.concatenate([r[1][k] for r in results])
+                 for k in results[0][1]}
+    else:
+        out = np.array([], dtype=object)
+        flags = {k: np.array([], dtype=object if k == 'invalid_reason' else bool)
+                 for k in ['type_in', 'null', 'empty', 'non_finite', 'had_z',
+                           'invalid', 'invalid_reason']}
+
+    unusable = flags['null'] | flags['empty'] | flags['non_finite']
+
+    # Explode multi-part geometries: `get_parts` returns every part plus the
+    # position of the input geometry it came from
+    if explode:
+        parts, row_ix = shapely.get_parts(out, return_index=True)
+        if not drop_unusable:
+            # get_parts skips None; add those rows back with a None geometry
+            missing_ix = np.flatnonzero(unusable)
+            parts = np.concatenate([parts, np.full(len(missing_ix), None, dtype=object)])
+            row_ix = np.concatenate([row_ix, missing_ix])
+            order = np.argsort(row_ix, kind='stable')
+            parts, row_ix = parts[order], row_ix[order]
+        n_parts = np.bincount(row_ix, minlength=n)
+    else:
+        keep = ~unusable if drop_unusable else np.ones(n, dtype=bool)
+        row_ix = np.flatnonzero(keep)
+        parts = out[row_ix]
+        n_parts = keep.astype(int)
+
+    gdf_out = gdf.iloc[row_ix].reset_index(drop=True)
+    gdf_out[geom_col] = gpd.GeoSeries(parts, crs=gdf.crs).values
+
+    # Build the repair log, for records that were changed or flagged only
+    actions = np.full(n, '', dtype=object)
+    if drop_unusable:
+        actions[unusable] += 'dropped;'
+    if force_2d:
+        actions[flags['had_z'] & ~unusable] += 'force_2d;'
+    if repair:
+        actions[flags['invalid']] += 'repaired;'
+    if explode:
+        actions[n_parts > 1] += 'exploded;'
+    flagged = (actions != '') | unusable | flags['invalid']
+
+    type_names = np.array(['Point', 'LineString', 'LinearRing', 'Polygon',
+                           'MultiPoint', 'MultiLineString', 'MultiPolygon',
+                           'GeometryCollection', None], dtype=object)
+    repair_log = pd.DataFrame({
+        'input_index': gdf.index[flagged],
+        'geom_type_in': type_names[flags['type_in'][flagged]],
+        'null': flags['null'][flagged],
+        'empty': flags['empty'][flagged],
+        'non_finite': flags['non_finite'][flagged],
+        'had_z': flags['had_z'][flagged],
+        'invalid': flags['invalid'][flagged],
+        'invalid_reason': flags['invalid_reason'][flagged],
+        'n_parts_out': n_parts[flagged],
+        'action': pd.Series(actions[flagged], dtype=object).str.rstrip(';').to_numpy(),
+    })
+
+    print(f'Geometries in: {n}, rows out: {len(gdf_out)}')
+    print(f'Dropped (null/empty/non-finite): {int(unusable.sum()) if drop_unusable else 0}')
+    print(f'Z coordinates dropped: {int((flags["had_z"] & ~unusable).sum()) if force_2d else 0}')
+    print(f'Invalid geometries {"repaired" if repair else "found"}: {int(flags["invalid"].sum())}')
+
+    return gdf_out, repair_log
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Streaming reader of KML and KMZ files, with all folders (layers) in one pass.
+
+The KML is iterparsed (straight out of the zip member for a KMZ), and each
+Placemark is cleared once it's read, so memory stays proportional to the
+attributes and coordinates, not to the XML tree. The coordinate strings of
+all Placemarks are parsed into one NumPy array in a single call, and the
+geometries are built from it with shapely's vectorized constructors: points,
+lines, polygons with holes, and multi-geometries (MultiGeometry elements,
+mixed ones become GeometryCollections). Z values are dropped.
+
+The result has the columns of GDAL's KML driver, Name and Description, plus
+Layer (the top-level Folder of the Placemark, as GDAL names layers),
+FolderPath (all nested Folders, joined with '/') and one column per
+ExtendedData field.
+
+Example usage
+---
+    fields = read_kml('Gas_Fields_Azerbajan.kml')
+    layers = read_kml_layers('titoli-idrocarburi.kmz')  # {layer name: GeoDataFrame}
+
+@author: maobrien
+"""
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+_POINT, _LINE, _POLYGON = 0, 1, 2
+
+
+def _local(tag):
+    """Tag name without its namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+@contextmanager
+def _open_kml(path, member=None):
+    """Open the KML of a .kml file, or of a .kmz (doc.kml, else the first .kml member).
+
+    A context manager; a .kmz archive is closed together with its member.
+    """
+    if not zipfile.is_zipfile(path):
+        with open(path, 'rb') as stream:
+            yield stream
+        return
+    with zipfile.ZipFile(path) as kmz:
+        if member is None:
+            kml_members = [n for n in kmz.namelist() if n.lower().endswith('.kml')]
+            if not kml_members:
+                raise ValueError(f'No .kml file in {path}')
+            member = 'doc.kml' if 'doc.kml' in kml_members else kml_members[0]
+        with kmz.open(member) as stream:
+            yield stream
+
+
+# =============================================================================
+# Placemark parsing
+# =============================================================================
+def _child_text(elem, name):
+    for child in elem:
+        if _local(child.tag) == name:
+            return (child.text or '').strip()
+    return None
+
+
+def _extended_data(placemark):
+    """{field: value} of the Data and SchemaData/SimpleData of a Placemark."""
+    fields = {}
+    for elem in placemark.iter():
+        tag = _local(elem.tag)
+        if tag == 'Data':
+            fields[elem.get('name')] = _child_text(elem, 'value')
+        elif tag == 'SimpleData':
+            fields[elem.get('name')] = (elem.text or '').strip()
+    return fields
+
+
+def _geometry_parts(elem, parts):
+    """Append the (kind, [coordinate strings]) parts of the geometries under `elem`."""
+    for child in elem:
+        tag = _local(child.tag)
+        if tag == 'Point':
+            parts.append((_POINT, [_child_text(child, 'coordinates') or '']))
+        elif tag in ('LineString', 'LinearRing'):
+            parts.append((_LINE, [_child_text(child, 'coordinates') or '']))
+        elif tag == 'Polygon':
+            rings = []
+            for boundary in ('outerBoundaryIs', 'innerBoundaryIs'):
+                for b in child:
+                    if _local(b.tag) == boundary:
+                        rings += [_child_text(r, 'coordinates') or '' for r in b
+                                  if _local(r.tag) == 'LinearRing']
+            parts.append((_POLYGON, rings))
+        elif tag == 'MultiGeometry':
+            _geometry_parts(child, parts)
+
+
+def _iter_placemarks(stream):
+    """Yield (attributes, geometry parts) of every Placemark, in document order."""
+    path = []  # [tag, name, depth] of the open Document and Folder elements
+    depth = 0
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        tag = _local(elem.tag)
+        if event == 'start':
+            depth += 1
+            if tag in ('Document', 'Folder'):
+                path.append([tag, None, depth])
+            continue
+
+        depth -= 1
+        if tag == 'name' and path and path[-1][1] is None and path[-1][2] == depth:
+            path[-1][1] = (elem.text or '').strip()
+        elif tag in ('Document', 'Folder'):
+            path.pop()
+            elem.clear()
+        elif tag == 'Placemark':
+            folders = [name or '' for t, name, _ in path if t == 'Folder']
+            document = next((name for t, name, _ in path if t == 'Document' and name), None)
+            attributes = {'Name': _child_text(elem, 'name'),
+                          'Description': _child_text(elem, 'description'),
+                          'Layer': folders[0] if folders else document,
+                          'FolderPath': '/'.join(folders)}
+            attributes.update(_extended_data(elem))
+            parts = []
+            _geometry_parts(elem, parts)
+            yield attributes, parts
+            elem.clear()
+
+
+# =============================================================================
+# Geometry construction
+# =============================================================================
+def parse_coordinates(strings):
+    """Parse KML coordinate strings ('x,y[,z] x,y[,z] ...') into one array.
+
+    Returns
+    -------
+    coords : ndarray of shape (n, 2)
+        x, y of all tuples of all strings.
+    counts : ndarray of int
+        Number of tuples of each string.
+    """
+    tuples = [s.split() for s in strings]
+    counts = np.array([len(t) for t in tuples], dtype=np.int64)
+    dims = np.array([t[0].count(',') + 1 if t else 2 for t in tuples], dtype=np.int64)
+    flat = np.fromstring(','.join(','.join(t) for t in tuples if t), dtype=float, sep=',')
+    if len(flat) != (counts * dims).sum():
+        raise ValueError('Coordinate tuples of a KML string have different numbers of values')
+
+    # Position of the x value of every tuple in the flat array
+    starts = np.cumsum(counts * dims) - counts * dims
+    first = np.cumsum(counts) - counts
+    within = np.arange(counts.sum()) - np.repeat(first, counts)
+    x = np.repeat(starts, counts) + within * np.repeat(dims, counts)
+    return np.column_stack([flat[x], flat[x + 1]]), counts
+
+
+def _dense(ids):
+    """Distinct values of `ids`, and `ids` renumbered 0, 1, ... (for shapely's `indices`)."""
+    return np.unique(ids, return_inverse=True)
+
+
+def _build_geometries(kinds, rings, n_placemarks, part_placemark):
+    """Geometry of each Placemark from its parts (see `_geometry_parts`)."""
+    coords, counts = parse_coordinates([s for part_rings in rings for s in part_rings])
+    ring_part = np.repeat(np.arange(len(rings)), np.array([len(r) for r in rings], dtype=np.int64))
+    coord_ring = np.repeat(np.arange(len(counts)), counts)
+    coord_part = ring_part[coord_ring]
+
+    # Geometry of each part; parts without coordinates stay None
+    part_geoms = np.full(len(kinds), None, dtype=object)
+    for kind in (_POINT, _LINE, _POLYGON):
+        sel = kinds[coord_part] == kind
+        if not sel.any():
+            continue
+        if kind == _POINT:
+            first = np.flatnonzero(sel & np.r_[True, coord_part[1:] != coord_part[:-1]])
+            part_geoms[coord_part[first]] = shapely.points(coords[first])
+        elif kind == _LINE:
+            parts, idx = _dense(coord_part[sel])
+            part_geoms[parts] = shapely.linestrings(coords[sel], indices=idx)
+        else:
+            # The first ring of each polygon is its shell, the others are holes
+            ring_ids, idx = _dense(coord_ring[sel])
+            linear_rings = shapely.linearrings(coords[sel], indices=idx)
+            parts, idx = _dense(ring_part[ring_ids])
+            part_geoms[parts] = shapely.polygons(linear_rings, indices=idx)
+
+    has_geom = np.flatnonzero(part_geoms != None)  # noqa: E711
+    owners = part_placemark[has_geom]
+    geoms = np.full(n_placemarks, None, dtype=object)
+    n_parts = np.bincount(owners, minlength=n_placemarks)
+    single = n_parts[owners] == 1
+    geoms[owners[single]] = part_geoms[has_geom[single]]
+
+    # Placemarks of several parts (MultiGeometry): Multi* if all parts are of
+    # one kind, else a GeometryCollection
+    multi, owners = has_geom[~single], owners[~single]
+    if len(multi):
+        n_kinds = pd.Series(kinds[multi]).groupby(owners).transform('nunique').to_numpy()
+        makers = [(kinds[multi] == _POINT) & (n_kinds == 1), shapely.multipoints], \
+                 [(kinds[multi] == _LINE) & (n_kinds == 1), shapely.multilinestrings], \
+                 [(kinds[multi] == _POLYGON) & (n_kinds == 1), shapely.multipolygons], \
+                 [n_kinds > 1, shapely.geometrycollections]
+        for sel, maker in makers:
+            if sel.any():
+                placemarks, idx = _dense(owners[sel])
+                geoms[placemarks] = maker(part_geoms[multi[sel]], indices=idx)
+    return geoms
+
+
+# =============================================================================
+# Reading
+# =============================================================================
+def read_kml(path, member=None, crs=4326):
+    """Read all Placemarks of a KML or KMZ file, of all folders, in one pass.
+
+    Parameters
+    ----------
+    path : str
+        Path to a .kml or .kmz file.
+    member : str, optional
+        KML file inside a KMZ to read. Default doc.kml, else the first one.
+    crs : optional (default 4326)
+
+    Returns
+    -------
+    gdf : GeoDataFrame
+        One row per Placemark, with Name, Description, Layer, FolderPath,
+        the ExtendedData fields and geometry (None for Placemarks without
+        one).
+    """
+    records, kinds, rings, part_placemark = [], [], [], []
+    with _open_kml(path, member) as stream:
+        for i, (attributes, parts) in enumerate(_iter_placemarks(stream)):
+            records.append(attributes)
+            for kind, part_rings in parts:
+                kinds.append(kind)
+                rings.append(part_rings)
+                part_placemark.append(i)
+
+    geoms = _build_geometries(np.array(kinds, dtype=int), rings, len(records),
+                              np.array(part_placemark, dtype=np.int64))
+    gdf = gpd.GeoDataFrame(pd.DataFrame(records, columns=None if records else
+                                        ['Name', 'Description', 'Layer', 'FolderPath']),
+                           geometry=gpd.GeoSeries(geoms, crs=crs), crs=crs)
+    print(f'{os.path.basename(path)}: {len(gdf)} placemarks in {gdf.Layer.nunique()} layers')
+    return gdf
+
+
+def read_kml_layers(path, member=None, crs=4326):
+    """Read a KML or KMZ file in one pass, as {layer name: GeoDataFrame}."""
+    gdf = read_kml(path, member=member, crs=crs)
+    return {layer: g.drop(columns='Layer').reset_index(drop=True)
+            for layer, g in gdf.groupby(gdf.Layer.fillna(''), sort=False)}
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Nearest-infrastructure attribution, e.g. of VIIRS flaring detections.
+
+For every query point (flare), `nearest_facilities` finds the k nearest OGIM
+facilities of selected categories within a distance cutoff per category,
+with haversine distances. Facilities of all layers are indexed together: each
+category's facilities are hashed to cells of a 3D grid on the Earth's
+surface whose size is that category's cutoff, so the facilities within the
+cutoff of a flare are all in the 27 cells around it. The candidates are found
+with one hash join per category, and only they are measured. This takes
+seconds for ~10k flares against millions of facilities, needs no
+spatial-index library, and works across the antimeridian and near the poles.
+
+Example usage
+---
+    facilities = load_facility_points('OGIM_v2.7.gpkg', layers=['Oil_and_Natural_Gas_Wells',
+                                                                'Gathering_and_Processing',
+                                                                'Crude_Oil_Refineries'])
+    links = nearest_facilities(flares, facilities, k=3, max_distance_km=2,
+                               max_distance_by_category={'OIL AND NATURAL GAS WELLS': 1})
+    flares = flares.join(links_to_columns(links, k=3))
+    flares['SEGMENT_NEAREST_FACILITY'] = nearest_segment(links)
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from conflation import EARTH_RADIUS_M, lonlat_to_xyz
+from target_extraction import layer_columns
+
+# Segment of the flaring source implied by the category of the nearest facility
+CATEGORY_SEGMENT = {'OIL AND NATURAL GAS WELLS': 'UPSTREAM',
+                    'TANK BATTERIES': 'UPSTREAM',
+                    'OFFSHORE PLATFORMS': 'UPSTREAM',
+                    'NATURAL GAS COMPRESSOR STATIONS': 'GAS DOWNSTREAM',
+                    'GATHERING AND PROCESSING': 'GAS DOWNSTREAM',
+                    'LNG FACILITIES': 'GAS DOWNSTREAM',
+                    'CRUDE OIL REFINERIES': 'OIL DOWNSTREAM',
+                    'PETROLEUM TERMINALS': 'OIL DOWNSTREAM'}
+
+_NEIGHBOURS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)])
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """Great-circle distance in km between arrays of points (degrees)."""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M / 1000 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _lonlat(gdf):
+    """Longitude and latitude of a point on each geometry."""
+    geoms = gdf.geometry
+    if geoms.crs is not None and not geoms.crs.equals('epsg:4326'):
+        geoms = geoms.to_crs('epsg:4326')
+    if not geoms.geom_type.isin(['Point']).all():
+        geoms = geoms.representative_point()
+    return geoms.x.to_numpy(), geoms.y.to_numpy()
+
+
+def load_facility_points(gpkg_path, layers, columns=('OGIM_ID', 'CATEGORY', 'FAC_TYPE', 'OPERATOR')):
+    """Read several OGIM layers as one table of facility points.
+
+    Only `columns` are read; lines and polygons are represented by a point
+    on their surface; columns a layer doesn't have are left empty. A LAYER
+    column names the layer of each facility.
+    """
+    frames = []
+    for layer in layers:
+        present = layer_columns(gpkg_path, layer)
+        gdf = gpd.read_file(gpkg_path, layer=layer, columns=[c for c in columns if c in present])
+        lon, lat = _lonlat(gdf)
+        frames.append(pd.DataFrame(gdf).reindex(columns=list(columns)).assign(LAYER=layer, LON=lon, LAT=lat))
+    facilities = pd.concat(frames, ignore_index=True)
+    return gpd.GeoDataFrame(facilities, geometry=gpd.points_from_xy(facilities.LON, facilities.LAT),
+                            crs='epsg:4326').drop(columns=['LON', 'LAT'])
+
+
+def _pairs_within(q_xyz, f_xyz, radius_m):
+    """(query, facility) position pairs whose chord distance is within `radius_m`."""
+    f_cells = pd.DataFrame(np.floor(f_xyz / radius_m).astype(np.int64), columns=['cx', 'cy', 'cz'])
+    f_cells['f'] = np.arange(len(f_xyz))
+    q_cells = np.floor(q_xyz / radius_m).astype(np.int64)
+    # Every query point looks in its own cell and the 26 around it
+    expanded = (q_cells[:, None, :] + _NEIGHBOURS[None, :, :]).reshape(-1, 3)
+    q_expanded = pd.DataFrame(expanded, columns=['cx', 'cy', 'cz'])
+    q_expanded['q'] = np.repeat(np.arange(len(q_xyz)), len(_NEIGHBOURS))
+    pairs = q_expanded.merge(f_cells, on=['cx', 'cy', 'cz'])[['q', 'f']]
+    q, f = pairs.q.to_numpy(), pairs.f.to_numpy()
+    within = np.linalg.norm(q_xyz[q] - f_xyz[f], axis=1) <= radius_m
+    return q[within], f[within]
+
+
+def nearest_facilities(points, facilities, k=3, max_distance_km=5.0, category_col='CATEGORY',
+                       categories=None, max_distance_by_category=None, per_category=False,
+                       columns=('OGIM_ID', 'CATEGORY', 'FAC_TYPE')):
+    """The k nearest facilities of each point, within distance cutoffs.
+
+    Parameters
+    ----------
+    points : GeoDataFrame
+        Query points, e.g. flares, in any CRS.
+    facilities : GeoDataFrame
+        Facilities of all layers (see `load_facility_points`).
+    k : int, optional (default 3)
+        Number of facilities per point.
+    max_distance_km : float, optional (default 5)
+        Cutoff distance, for categories not in `max_distance_by_category`.
+    category_col : str, optional (default 'CATEGORY')
+        Category column of `facilities`.
+    categories : list of str, optional
+        Only link facilities of these categories. Default all.
+    max_distance_by_category : dict, optional
+        {category: cutoff in km}.
+    per_category : bool, optional (default False)
+        Return the k nearest of *each* category instead of overall.
+    columns : list of str, optional
+        Columns of `facilities` to return for each linked facility.
+
+    Returns
+    -------
+    links : DataFrame
+        One row per (point, facility) link, indexed by the index of
+        `points`, with RANK (1 = nearest), DISTANCE_KM and `columns`
+        prefixed with 'NEAR_'. Points with no facility within the cutoff
+        have no rows.
+    """
+    q_lon, q_lat = _lonlat(points)
+    f_lon, f_lat = _lonlat(facilities)
+    q_xyz = lonlat_to_xyz(q_lon, q_lat) * EARTH_RADIUS_M
+    f_xyz = lonlat_to_xyz(f_lon, f_lat) * EARTH_RADIUS_M
+    cats = facilities[category_col].to_numpy()
+    q_ok = ~np.isnan(q_xyz[:, 0])
+
+    found = []
+    for cat in (categories or pd.unique(cats)):
+        members = np.flatnonzero((cats == cat) & ~np.isnan(f_xyz[:, 0]))
+        if not len(members):
+            continue
+        cutoff_km = (max_distance_by_category or {}).get(cat, max_distance_km)
+        q_pos = np.flatnonzero(q_ok)
+        q, f = _pairs_within(q_xyz[q_pos], f_xyz[members], cutoff_km * 1000)
+        q, f = q_pos[q], members[f]
+        dist = haversine_km(q_lon[q], q_lat[q], f_lon[f], f_lat[f])
+        keep = dist <= cutoff_km
+        found.append(pd.DataFrame({'q': q[keep], 'f': f[keep], 'DISTANCE_KM': dist[keep], 'cat': cat}))
+
+    cols = ['RANK', 'DISTANCE_KM'] + [f'NEAR_{c}' for c in columns]
+    if not found:
+        return pd.DataFrame(columns=cols, index=points.index[:0])
+    links = pd.concat(found, ignore_index=True).sort_values(['q', 'DISTANCE_KM'], kind='stable')
+    group = ['q', 'cat'] if per_category else ['q']
+    links['RANK'] = links.groupby(group).cumcount() + 1
+    links = links[links.RANK <= k]
+    for c in columns:
+        links[f'NEAR_{c}'] = facilities[c].to_numpy()[links.f.to_numpy()]
+    links.index = points.index[links.q.to_numpy()]
+    print(f'{len(points)} points: {links.q.nunique()} linked to a facility, '
+          f'{len(links)} links in total')
+    return links[cols]
+
+
+def links_to_columns(links, k=1):
+    """Turn `nearest_facilities` links into columns NEAR1_..., NEAR2_... (one row per point).
+
+    Only works for links computed with per_category=False.
+    """
+    wide = links[links.RANK <= k].copy()
+    wide['_point'] = wide.index
+    wide = wide.set_index(['_point', 'RANK']).unstack('RANK')
+    wide.columns = [f'NEAR{rank}_{col.replace("NEAR_", "")}' for col, rank in wide.columns]
+    wide.index.name = links.index.name
+    return wide[sorted(wide.columns, key=lambda c: int(c.split('_')[0][4:]))]
+
+
+def nearest_segment(links, segments=None):
+    """Flaring segment of each point, implied by its nearest linked facility.
+
+    Parameters
+    ----------
+    links : DataFrame
+        Output of `nearest_facilities`, with its NEAR_CATEGORY column.
+    segments : dict, optional
+        {facility category: segment}. Default CATEGORY_SEGMENT.
+
+    Returns
+    -------
+    segment : pandas Series
+        Segment of the nearest linked facility whose category has one,
+        indexed like `links`; points without such a facility are absent.
+    """
+    segment = links['NEAR_CATEGORY'].map(segments or CATEGORY_SEGMENT)
+    known = links.assign(SEGMENT=segment.to_numpy())[segment.notna().to_numpy()].sort_values('RANK', kind='stable')
+    return known.SEGMENT[~known.index.duplicated()]
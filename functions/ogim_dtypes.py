@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Compact in-memory dtype policy for OGIM layers.
+
+Integrated OGIM layers hold low-cardinality attributes (COUNTRY, STATE_PROV,
+CATEGORY, FAC_STATUS, OPERATOR, SRC_REF_ID, ...) as Python object strings,
+and dates as strings, which makes the North America wells layer use many
+gigabytes during consolidation. The functions in this module convert a
+layer to categorical, nullable-numeric and datetime64 dtypes right after
+integration, keep it that way through consolidation, and convert it back to
+plain strings/floats just before writing, so that our missing-data markers
+('N/A', -999, '1900-01-01') are written exactly as before.
+
+Our missing-data markers are kept as real values ('N/A' is a category,
+-999 a number, 1900-01-01 a date) rather than converted to NaN/NaT, so every
+existing comparison like `gdf.FAC_STATUS == 'N/A'` still works on a compact
+layer.
+
+Example usage
+---
+    gdf = apply_dtype_policy(gdf)           # after integration
+    gdf = data_quality_checks(gdf)          # representation is preserved
+    gdf_out = to_export_dtypes(gdf)         # just before gdf_out.to_file()
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import (is_datetime64_any_dtype, is_object_dtype,
+                              is_string_dtype)
+
+# Missing-data markers, identical to those defined in ogimlib
+NULL_STRING = 'N/A'
+NULL_NUMERIC = -999
+NULL_DATE = '1900-01-01'
+
+# Placeholder dates some sources use for a missing date; replaced by NULL_DATE
+SENTINEL_DATES = ['1800-01-01', '1901-01-01']
+
+# Low-cardinality string attributes stored as pandas Categoricals.
+# FAC_ID and FAC_NAME are nearly unique per record, so they stay as strings.
+CATEGORICAL_COLUMNS = ['CATEGORY',
+                       'COUNTRY',
+                       'STATE_PROV',
+                       'REGION',
+                       'SRC_REF_ID',
+                       'ON_OFFSHORE',
+                       'FAC_TYPE',
+                       'FAC_STATUS',
+                       'OGIM_STATUS',
+                       'OPERATOR',
+                       'DRILL_TYPE',
+                       'COMMODITY',
+                       'PIPE_MATERIAL',
+                       'RESERVOIR_TYPE',
+                       'ENTITY_TYPE',
+                       'SEGMENT_TYPE']
+
+# Date attributes stored as datetime64 (YYYY-MM-DD strings on export)
+DATE_COLUMNS = ['SRC_DATE',
+                'SPUD_DATE',
+                'COMP_DATE',
+                'INSTALL_DATE']
+
+# Numeric attributes and their in-memory (nullable) dtype. LATITUDE and
+# LONGITUDE stay float64; float32 can't hold 5 decimal places of longitude.
+NUMERIC_DTYPES = {'OGIM_ID': 'Int64',
+                  'LATITUDE': 'float64',
+                  'LONGITUDE': 'float64',
+                  'LIQ_CAPACITY_BPD': 'Float64',
+                  'LIQ_THROUGHPUT_BPD': 'Float64',
+                  'GAS_CAPACITY_MMCFD': 'Float64',
+                  'GAS_THROUGHPUT_MMCFD': 'Float64',
+                  'NUM_COMPR_UNITS': 'Int32',
+                  'NUM_STORAGE_TANKS': 'Int32',
+                  'SITE_HP': 'Float64',
+                  'PIPE_DIAMETER_MM': 'Float64',
+                  'PIPE_LENGTH_KM': 'Float64',
+                  'AREA_KM2': 'Float64',
+                  'OIL_BBL': 'Float64',
+                  'GAS_MCF': 'Float64',
+                  'WATER_BBL': 'Float64',
+                  'CONDENSATE_BBL': 'Float64',
+                  'PROD_DAYS': 'Int16',
+                  'PROD_YEAR': 'Int16',
+                  'FLARE_YEAR': 'Int16',
+                  'GAS_FLARED_MMCF': 'Float64',
+                  'AVERAGE_FLARE_TEMP_K': 'Float64',
+                  'DAYS_CLEAR_OBSERVATIONS': 'Int16'}
+
+# Above this ratio of unique values to rows, a column isn't worth storing as
+# a categorical (it would use *more* memory than object strings)
+MAX_CATEGORICAL_RATIO = 0.5
+
+
+def _to_categorical(series):
+    """Convert a string-like series to categorical, with nulls as NULL_STRING."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if series.isna().any():
+            if NULL_STRING not in series.cat.categories:
+                series = series.cat.add_categories([NULL_STRING])
+            series = series.fillna(NULL_STRING)
+        return series
+    return series.fillna(NULL_STRING).astype(str).astype('category')
+
+
+def replace_missing_dates(series):
+    """Replace NaT and SENTINEL_DATES in a datetime64 series by NULL_DATE."""
+    series = series.fillna(pd.Timestamp(NULL_DATE))
+    return series.mask(series.isin(pd.to_datetime(SENTINEL_DATES)), pd.Timestamp(NULL_DATE))
+
+
+# Strings that mean a missing date (compared in upper case)
+_MISSING_DATE_STRINGS = {'', 'N/A', 'NA', 'NAN', 'NAT', 'NONE', 'NULL', '-999'}
+
+
+def _to_datetime(series):
+    """Parse a date series into datetime64, with missing and sentinel values as NULL_DATE.
+
+    Strings are parsed as ISO dates first, and the others in any format
+    pandas recognizes ('2015/03/04', '03/04/2015', '2015' -> 2015-01-01).
+    The number of non-missing values that still can't be parsed, and so
+    become NULL_DATE, is printed.
+    """
+    if not is_datetime64_any_dtype(series.dtype):
+        strings = series.astype('string').str.strip()
+        # Keep only the YYYY-MM-DD part of any 'YYYY-MM-DDTHH:MM:SS' strings
+        parsed = pd.to_datetime(strings.str[:10], format='%Y-%m-%d', errors='coerce')
+        missing = strings.isna() | strings.str.upper().isin(_MISSING_DATE_STRINGS)
+        retry = parsed.isna() & ~missing
+        if retry.any():
+            parsed[retry] = pd.to_datetime(strings[retry], format='mixed', errors='coerce')
+            n_lost = int((parsed.isna() & ~missing).sum())
+            if n_lost:
+                examples = strings[parsed.isna() & ~missing].unique()[:5].tolist()
+                print(f'{series.name}: {n_lost} values not recognized as dates, replaced by '
+                      f'{NULL_DATE} (e.g. {examples})')
+        series = parsed
+    return replace_missing_dates(series)
+
+
+def apply_dtype_policy(gdf, categorical_columns=None, date_columns=None,
+                       numeric_dtypes=None, inplace=False):
+    """Convert an OGIM layer to a compact in-memory representation.
+
+    String attributes in `categorical_columns` become pandas Categoricals,
+    attributes in `date_columns` become datetime64, and attributes in
+    `numeric_dtypes` are cast to the (nullable) numeric dtype listed there.
+    Missing values are filled with the matching OGIM missing-data marker, so
+    no NaN/NaT is introduced. Columns absent from `gdf` are skipped, and the
+    function is safe to call repeatedly (e.g. after a step that turned a
+    categorical back into object strings).
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame or DataFrame
+        An integrated OGIM layer.
+    categorical_columns : list of str, optional
+        Defaults to `CATEGORICAL_COLUMNS`. A column is only converted if its
+        share of unique values is below `MAX_CATEGORICAL_RATIO`.
+    date_columns : list of str, optional
+        Defaults to `DATE_COLUMNS`.
+    numeric_dtypes : dict, optional
+        Mapping of column name to dtype; defaults to `NUMERIC_DTYPES`.
+    inplace : bool, optional (default False)
+        If True, modify `gdf` itself instead of a copy.
+
+    Returns
+    -------
+    gdf : GeoDataFrame or DataFrame
+        Same records as the input, with compact dtypes.
+
+    Example
+    -------
+    wells = gpd.read_file('integrated_results\\usa_wells.geojson')
+    wells = apply_dtype_policy(wells)
+    print(memory_usage_mb(wells))
+
+    """
+    if not inplace:
+        gdf = gdf.copy()
+    categorical_columns = CATEGORICAL_COLUMNS if categorical_columns is None else categorical_columns
+    date_columns = DATE_COLUMNS if date_columns is None else date_columns
+    numeric_dtypes = NUMERIC_DTYPES if numeric_dtypes is None else numeric_dtypes
+
+    n_rows = max(len(gdf), 1)
+
+    for col in categorical_columns:
+        if col not in gdf.columns:
+            continue
+        if isinstance(gdf[col].dtype, pd.CategoricalDtype):
+            gdf[col] = _to_categorical(gdf[col])
+        elif is_object_dtype(gdf[col].dtype) or is_string_dtype(gdf[col].dtype):
+            if gdf[col].nunique(dropna=False) / n_rows <= MAX_CATEGORICAL_RATIO:
+                gdf[col] = _to_categorical(gdf[col])
+
+    for col in date_columns:
+        if col in gdf.columns:
+            gdf[col] = _to_datetime(gdf[col])
+
+    for col, dtype in numeric_dtypes.items():
+        if col not in gdf.columns:
+            continue
+        values = pd.to_numeric(gdf[col], errors='coerce')
+        if dtype.startswith('float'):
+            gdf[col] = values.astype(dtype)
+            continue
+        values = values.fillna(NULL_NUMERIC)
+        if dtype.startswith('Int') and not (values % 1 == 0).all():
+            # Fractional values in a count column; don't truncate them
+            dtype = 'Float64'
+        gdf[col] = values.astype(dtype)
+
+    return gdf
+
+
+def to_export_dtypes(gdf, date_format='%Y-%m-%d'):
+    """Convert a compact OGIM layer back to the plain dtypes we write to file.
+
+    Categoricals become object strings, datetime64 columns become
+    'YYYY-MM-DD' strings (with NaT written as '1900-01-01'), and nullable
+    numeric columns become plain numpy dtypes with <NA> written as -999:
+    nullable integers (Int64, Int32, ...) become int64 and nullable floats
+    become float64. The result is
+    byte-for-byte what our export code produced before the dtype policy
+    existed. The input `gdf` is not modified.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame or DataFrame
+        A layer that has been through `apply_dtype_policy`.
+    date_format : str, optional (default '%Y-%m-%d')
+        strftime format used to render datetime64 columns.
+
+    Returns
+    -------
+    gdf_out : GeoDataFrame or DataFrame
+        Copy of `gdf` ready for `to_file()` or `to_excel()`.
+
+    """
+    gdf_out = gdf.copy()
+    for col in gdf_out.columns:
+        dtype = gdf_out[col].dtype
+        if str(dtype) == 'geometry':
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            gdf_out[col] = gdf_out[col].astype(object).fillna(NULL_STRING)
+        elif is_datetime64_any_dtype(dtype):
+            gdf_out[col] = gdf_out[col].dt.strftime(date_format).fillna(NULL_DATE)
+        elif isinstance(dtype, (pd.Int64Dtype, pd.Int32Dtype, pd.Int16Dtype,
+                                pd.Int8Dtype)):
+            gdf_out[col] = gdf_out[col].fillna(NULL_NUMERIC).astype('int64')
+        elif isinstance(dtype, (pd.Float64Dtype, pd.Float32Dtype)):
+            gdf_out[col] = gdf_out[col].fillna(NULL_NUMERIC).astype('float64')
+    return gdf_out
+
+
+def remap_values(series, mapping):
+    """Replace values in a series via `mapping`, without losing a categorical dtype.
+
+    For categorical series, only the (few) categories are remapped, rather
+    than every row, and categories that collapse onto the same new value are
+    merged. A `None` or `np.nan` key in `mapping` fills missing values. For
+    any other dtype, this is equivalent to `series.replace(mapping)`.
+
+    Parameters
+    ----------
+    series : pandas Series
+    mapping : dict or callable
+        Old value -> new value. If callable, it is applied to every unique
+        value (including NaN) and its result used as the new value.
+
+    Returns
+    -------
+    series : pandas Series
+        Same index and name as the input.
+
+    Example
+    -------
+    gdf['FAC_STATUS'] = remap_values(gdf['FAC_STATUS'], {'UNKNOWN': 'N/A', None: 'N/A'})
+
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        if callable(mapping):
+            return series.map(mapping)
+        return series.replace(mapping)
+
+    if callable(mapping):
+        func = mapping
+    else:
+        na_keys = [k for k in mapping if k is None or (isinstance(k, float) and np.isnan(k))]
+
+        def func(value):
+            if pd.isna(value):
+                return mapping[na_keys[0]] if na_keys else value
+            return mapping.get(value, value)
+
+    old_categories = series.cat.categories
+    mapped = pd.Index([func(c) for c in old_categories], dtype=object)
+    na_value = func(np.nan)
+    new_categories = pd.Index(pd.unique(mapped[~pd.isna(mapped)]), dtype=object)
+    if not pd.isna(na_value) and na_value not in new_categories:
+        new_categories = new_categories.append(pd.Index([na_value], dtype=object))
+
+    # Translate each old category code to its new category code
+    code_map = new_categories.get_indexer(mapped)
+    codes = series.cat.codes.to_numpy()
+    na_code = -1 if pd.isna(na_value) else new_categories.get_loc(na_value)
+    new_codes = np.where(codes >= 0, code_map[np.maximum(codes, 0)], na_code)
+
+    return pd.Series(pd.Categorical.from_codes(new_codes, new_categories),
+                     index=series.index,
+                     name=series.name)
+
+
+def memory_usage_mb(gdf):
+    """Return a Series of each column's in-memory size in MB, largest first, plus a TOTAL."""
+    usage = gdf.drop(columns=[gdf.geometry.name], errors='ignore') if hasattr(gdf, 'geometry') else gdf
+    usage = usage.memory_usage(deep=True, index=False) / 1024**2
+    usage = usage.sort_values(ascending=False)
+    usage['TOTAL'] = usage.sum()
+    return usage
@@ -580,22 +580,14 @@ def read_shpFile(path_to_shp,
 def read_kmzFile(path_to_kmz):
     
     """
-    One disadvantage of this function is that it will only read the first layer of the .kmz. 
-    ---
-    TO-DO: Modify script to read multiple layers of the .kmz file
+    Read all layers of a .kmz file in one pass (see kml_reader.read_kml);
+    the 'Layer' column holds the layer of each feature.
     """
     
-    import fiona
-    from zipfile import ZipFile
-    import geopandas as gpd
+    from kml_reader import read_kml
 
-    fiona.drvsupport.supported_drivers['libkml'] = 'rw' # enable KML support which is disabled by default
-    fiona.drvsupport.supported_drivers['LIBKML'] = 'rw' # enable KML support which is disabled by default
-    
     # Read
-    kmz = ZipFile(path_to_kmz, 'r')
-    kml_name = path_to_kmz.split("\\")[3].strip().split('.')[0] + '.kml'
-    gdf = gpd.read_file(kmz.open(kml_name, 'r'), driver='KML')
+    gdf = read_kml(path_to_kmz)
     print ('---------------------------------------')
     print ('Total # of features in dataset = %d' % gdf.shape[0])
     print (gdf.columns)
@@ -643,19 +635,19 @@ def read_kmlFile(path_to_kml, layer_names,
     
     # Read kml
     if read_layer_by_layer == True:
+        # All layers are read in one pass over the file
+        from kml_reader import read_kml_layers
+        layers = read_kml_layers(path_to_kml)
         all_data = []
     
         for layer in range(len(layer_names)):
+            layer_name = str (layer_names[layer])
+            kml_ = layers[layer_name]
             if return_outputs == True:
                 print ('---------------------------------------')
-                print ("Now reading layer = ", layer_names[layer])
-                layer_name = str (layer_names[layer])
-                kml_ = gpd.read_file(path_to_kml, driver="KML", layer=str(layer_name))
+                print ("Now reading layer = ", layer_name)
                 print ('---------------------------------------')
                 print ('Total # of features in dataset = %d' % kml_.shape[0])
-            else:
-                layer_name = str (layer_names[layer])
-                kml_ = gpd.read_file(path_to_kml, driver="KML", layer=str(layer_name))
             # Append results to all_data
             all_data.append(kml_)
             
@@ -1371,8 +1363,6 @@ def summarize_geodb(df,
     Return summary stats for feature count
     and boolean for key attributes in the geodataframe
     """
-    cnt1, attr1, attr2, attr3, attr4, attr5, attr6, attr7, attr8, attr9, attr10, attr11 = [], [], [], [], [], [], [], [], [], [], [], []
-    
     cols = ['COUNTRY', 'DATA_SOURCE', 'NUM_DATA_SOURCES', 'AVG_RANK', 'FACILITY_CATEGORY','FEATURE_COUNT','OPER_NAME', 'FAC_TYPE', 'DRILL_TYPE','FAC_STATUS','INSTL_DATE', 
             'CAPACITY', 'THROUGHPUT', 'PIPE_LEN', 'PIPE_MATER', 'BASIN', 'FIELD'
            ]
@@ -1383,76 +1373,11 @@ def summarize_geodb(df,
     cnt1 = df.shape[0]
     print ("====================")
     
-    print (df.OPER_NAME.unique())
-    if len(df.OPER_NAME.unique()) != 1:
-        attr1 = "YES"
-    else:
-        attr1 = "NO"
-    print ("====================")
-    print (df.FAC_TYPE.unique())
-    if len(df.FAC_TYPE.unique()) != 1:
-        attr2 = "YES"
-    else:
-        attr2 = "NO"
-    print ("====================")
-    print (df.DRILL_TYPE.unique())
-    if len(df.DRILL_TYPE.unique()) != 1:
-        attr3 = "YES"
-    else:
-        attr3 = "NO"
-    print ("====================")
-    print (df.FAC_STATUS.unique())
-    if len(df.FAC_STATUS.unique()) != 1:
-        attr4 = "YES"
-    else:
-        attr4 = "NO"
-    print ("====================")
-    print (df.INSTL_DATE.unique())
-    if len(df.INSTL_DATE.unique()) != 1:
-        attr5 = "YES"
-    else:
-        attr5 = "NO"
-    print ("====================")
-    print (df.CAPACITY.unique())
-    if len(df.CAPACITY.unique()) != 1:
-        attr6 = "YES"
-    else:
-        attr6 = "NO"
-    print ("====================")
-    print (df.THROUGHPUT.unique())
-    if len(df.THROUGHPUT.unique()) != 1:
-        attr7 = "YES"
-    else:
-        attr7 = "NO"
-    print ("====================")
-    print (df.PIPE_LEN.unique())
-    if len(df.PIPE_LEN.unique()) != 1:
-        attr8 = "YES"
-    else:
-        attr8 = "NO"
-    print ("====================")
-    print (df.PIPE_MATER.unique())
-    if len(df.PIPE_MATER.unique()) != 1:
-        attr9 = "YES"
-    else:
-        attr9 = "NO"
-    print ("====================")
-    print (df.BASIN.unique())
-    if len(df.BASIN.unique()) != 1:
-        attr10 = "YES"
-    else:
-        attr10 = "NO"
-    print ("====================")
-    
-    print (df.FIELD.unique())
-    if len(df.FIELD.unique()) != 1:
-        attr11 = "YES"
-    else:
-        attr11 = "NO"
-    print ("====================")
+    # An attribute is present if it has more than one distinct value (NaN included)
+    attrs = ["YES" if df[col].nunique(dropna=False) != 1 else "NO" for col in cols[6:]]
     
     # Create summary dataframe
-    data1 = [country, data_source, num_data_sources, avg_rank, fac_category, cnt1, attr1, attr2, attr3, attr4, attr5, attr6, attr7, attr8, attr9, attr10, attr11]
+    data1 = [country, data_source, num_data_sources, avg_rank, fac_category, cnt1] + attrs
     
     df_ = pd.DataFrame(data1, index=cols).T
     
@@ -10,6 +10,8 @@ TODO as of June 23: Add WAY more documentation to each of these functions. -MAO
 """
 import pandas as pd
 
+from pipeline_attribution import pipeline_km_by_unit
+
 
 def get_uniques(geopackage, column_name, which_layers=None):
     '''
@@ -33,110 +35,66 @@ def get_uniques(geopackage, column_name, which_layers=None):
 # test_outdf = get_uniques(gpkg,'SRC_URL',test_lyrlist)
 
 
+def _count_by(data, column, counts_field, counts):
+    # One value_counts pass instead of rescanning `data` for every value
+    values = data[column].value_counts(dropna=True)
+    for value, n in values.items():
+        counts.at[value, counts_field] = n
+    counts.at['TOTAL', counts_field] = int(values.sum())
+
+
 def countbycountry(data, counts_field, countrycounts):
-    countries = data.COUNTRY.unique()
-    countries = [x for x in countries if x is not None]
-    for country in countries:   # Per country, calculate total number of features
-        value = len(data[data.COUNTRY == country])
-        countrycounts.at[country, counts_field] = value
-        print(country + " has " + str(value) + " " + counts_field)
-    countrycounts.at['TOTAL', counts_field] = int(countrycounts[counts_field].sum())
+    _count_by(data, 'COUNTRY', counts_field, countrycounts)
 
 
 def countbystateprov(data, counts_field, provcounts):
-    provs = data.STATE_PROV.unique()
-    provs = [x for x in provs if x is not None]
-    for prov in provs:   # Per prov, calculate total number of features
-        value = len(data[data.STATE_PROV == prov])
-        provcounts.at[prov, counts_field] = value
-        print(prov + " has " + str(value) + " " + counts_field)
-    provcounts.at['TOTAL', counts_field] = int(provcounts[counts_field].sum())
+    _count_by(data, 'STATE_PROV', counts_field, provcounts)
 
 
 def countbyregion(data, counts_field, regcounts):
-    regs = data.REGION.unique()
-    regs = [x for x in regs if x is not None]
-    for reg in regs:   # Per prov, calculate total number of features
-        value = len(data[data.REGION == reg])
-        regcounts.at[reg, counts_field] = value
-        print(reg + " has " + str(value) + " " + counts_field)
-    regcounts.at['TOTAL', counts_field] = int(regcounts[counts_field].sum())
+    _count_by(data, 'REGION', counts_field, regcounts)
+
+
+def _count_with_values(data, column, countrycounts, nodatavals, count_col, pct_col):
+    if column not in data:
+        print(f'No {column} column; skipped')
+        return
+    has_value = ~data[column].isin(nodatavals) & data[column].notna()
+    by_country = has_value.groupby(data.COUNTRY).agg(['sum', 'size'])
+    for country, row in by_country.iterrows():
+        countrycounts.at[country, count_col] = row['sum']
+        countrycounts.at[country, pct_col] = row['sum'] / row['size']
+    countrycounts.at['TOTAL', count_col] = int(by_country['sum'].sum())
+    countrycounts.at['TOTAL', pct_col] = by_country['sum'].sum() / by_country['size'].sum()
 
 
 def howmanyoperator(data, counts_field, countrycounts, nodatavals):
     '''
     How many records have a non-null 'OPER_NAME' field, by country and by infra category
-    
-    NOTE: this function needs work, doesn't run as expected right now
-    '''
-    countries = data.COUNTRY.unique()
-    countries = [x for x in countries if x is not None]
-    for country in countries:
-        try:
-            numops = len(data[(-data.OPER_NAME.isin(nodatavals)) & (data.COUNTRY==country)])
-            countrycounts.at[country, counts_field+'_op'] = numops
-            print(country+" has "+str(numops)+" "+counts_field+" records with operator info")
-            
-            value = len(data[data.COUNTRY==country])
-            pctops = numops / value
-            countrycounts.at[country, counts_field+'_op_pct'] = pctops
-            
-        except AttributeError as e:
-            print(e)
-            print(country+" "+counts_field+" skipped")
-            continue
-        
-    countrycounts.at['TOTAL', counts_field+'_op'] = int(countrycounts[counts_field+'_op'].sum())
-    countrycounts.at['TOTAL', counts_field+'_op_pct'] = int(countrycounts[counts_field+'_op_pct'].sum())
 
+    See `summary_cube` to compute this (and other counts) for all layers at once.
+    '''
+    _count_with_values(data, 'OPER_NAME', countrycounts, nodatavals,
+                       counts_field + '_op', counts_field + '_op_pct')
 
 
 def howmanystatus(data, counts_field, countrycounts, nodatavals):
     '''
     How many records have a non-null 'FAC_STATUS' field, by country and by infra category
-    
-    NOTE: this function needs work, doesn't run as expected right now
+
+    See `summary_cube` to compute this (and other counts) for all layers at once.
     '''
-    countries = data.COUNTRY.unique()
-    countries = [x for x in countries if x is not None]
-    for country in countries:
-        try:
-            numstat = len(data[(-data.FAC_STATUS.isin(nodatavals)) & (data.COUNTRY==country)])
-            countrycounts.at[country, counts_field+'_status'] = numstat
-            print(country+" has "+str(numstat)+" "+counts_field+" records with status info")
-            
-            value = len(data[data.COUNTRY==country])
-            pctstat = numstat / value
-            countrycounts.at[country, counts_field+'_st_pct'] = pctstat
-            
-        except AttributeError as e:
-            print(e)
-            print(country+" "+counts_field+" skipped")
-            continue
-    
-    countrycounts.at['TOTAL', counts_field+'_status'] = int(countrycounts[counts_field+'_status'].sum())
-    countrycounts.at['TOTAL', counts_field+'_st_pct'] = int(countrycounts[counts_field+'_st_pct'].sum())
-       
-        
-        
+    _count_with_values(data, 'FAC_STATUS', countrycounts, nodatavals,
+                       counts_field + '_status', counts_field + '_st_pct')
+
+
 def howmuchpipe(pipes, borders, country_field, countrycounts):
     '''
     Measures how many KM of pipeline exists within the geospatial borders of different countries
+
+    Pipelines are split at the borders they cross in one pass and measured
+    geodesically; see `pipeline_attribution.pipeline_km_by_unit`.
     '''
-    print("CRS of input pipelines: ")
-    print(pipes.crs)
-    print("CRS of input country borders: ")
-    print(borders.crs)
-    # get list of what countries have pipes in them
-    countries = pipes.COUNTRY.unique().tolist()
-    # Use that list of countries as iterator in next step
-    for country in countries:
-        try:
-            print(country+" pipeline count started at "+str(datetime.now().time()))
-            pipeclip = gpd.clip(pipes, borders[borders[country_field]==country])
-            sumlengthkm = np.sum(pipeclip.geometry.length) / 1000
-            countrycounts.at[country, "pipeline_km"] = sumlengthkm
-            print(country+" has "+str(sumlengthkm)+" kilometers of pipeline")
-        except KeyError:
-            print(country+" - Region skipped")
-            pass
\ No newline at end of file
+    km = pipeline_km_by_unit(pipes, borders, unit_cols=[country_field])
+    for country, sumlengthkm in zip(km[country_field], km.PIPELINE_KM):
+        countrycounts.at[country, "pipeline_km"] = sumlengthkm
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 #====================================================================================================================
 
-def create_translation_dict(df, vars2trans, api_key, target, source = None):
+def create_translation_dict(df, vars2trans, api_key, target, source = None,
+                            cache_path = None, batch_size = 100):
     """Translates string phrases from within a dataframe into a target language 
     using Google Translate API (Basic Edition), and returns a dictionary of 
     translated phrase pairs.
@@ -10,6 +11,10 @@ def create_translation_dict(df, vars2trans, api_key, target, source = None):
     Requires'google-cloud-translation' Python client library to be installed. 
     See https://cloud.google.com/translate/docs/reference/libraries/v2/python
     
+    Phrases are looked up in the local translation cache first (see
+    `translation_cache`); only phrases that have never been translated are
+    sent to the API, in batches of `batch_size`, and added to the cache.
+    
     PARAMETERS:
         df = dataframe, in original langauge
         vars2trans = list of variable names in the specified dataframe that contain values to translate
@@ -17,9 +22,11 @@ def create_translation_dict(df, vars2trans, api_key, target, source = None):
         api_key = filepath to location of Google API key on user's machine
         source = *optional* (string) source language code; "es" for Spanish, "fr" for French, etc.
             If no value is provided, language will be auto-detected by the API. 
-            (The detected language is printed to the console.)
             *NOTE that it is possible for different languages to be detected for each phrase,
             so use auto-detection with caution.*
+        cache_path = *optional* path to the translation cache (SQLite file);
+            default is translation_cache.DEFAULT_CACHE_PATH
+        batch_size = *optional* number of phrases sent to the API at once
         
         'target' and 'source' parameters must be an ISO 639-1 language code.
         For codes, see https://en.wikipedia.org/wiki/List_of_ISO_639-1_codes
@@ -28,53 +35,30 @@ def create_translation_dict(df, vars2trans, api_key, target, source = None):
     OUTPUT:
         Dictionary object, where keys contain strings from original 
         dataset/language, and values contain translated version
-        
-    TO DO as of March 25 2022:
-    (1) Add better error handling / error messages
-    (2) Skip the attempted translation of NoneType objects (DONE)
-    (3) Error handling of attempted translation of NaN cells
     """
-    import six
-    import os
     from datetime import datetime
-    from google.cloud import translate_v2 as translate
     import pandas as pd
+    from translation_cache import GoogleCloudBackend, translate_values
     
     starttime = datetime.now()
-
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = api_key
-    # "C:\\Users\\maobrien\\OneDrive - MethaneSAT, LLC\\assets\\inlaid-fx-323500-c652a9545194.json"
-    # instantiates a google cloud client
-    translate_client = translate.Client()
-    
-    # create an empty dictionary, to fill with keys to translate
-    outdict = {}
     
     # if vars2trans is only one attribute (string), convert the string to a one-item list for looping
     if type(vars2trans) != list:
         vars2trans = [vars2trans]
     
     # record all unique string values within desired attribute columns
-    for v in vars2trans: # for each column...
-        for u in df[v].unique(): #unique() returns a numpy array
-            if pd.isnull(u) == False: 
-                outdict[u] = None  #adds a new key to the dictionary, with value pair 'None'
-            else:
-                continue
+    values = pd.concat([df[v] for v in vars2trans], ignore_index=True)
     
-    # Use Google Translate API to add a value (translated text) 
-    #  to each key (original language text) in dictionary
-    for key in outdict.keys():
-        # Converts key text to Unicode (if it's not already), assuming utf-8 input
-        if isinstance(key, six.binary_type): 
-            key = key.decode("utf-8")
-        # **THE TRANSLATION STEP... This is the one that costs money **
-        result = translate_client.translate(key, target_language=target, source_language=source)
-        outdict[key] = result["translatedText"]
+    # **THE TRANSLATION STEP... This is the one that costs money **
+    # (only for phrases that aren't in the cache yet)
+    outdict = translate_values(values, source, target,
+                               backend=GoogleCloudBackend(api_key),
+                               cache=cache_path,
+                               batch_size=batch_size)
     
     print("Dictionary created")
     if source==None:
-        print(u'Detected source language: {}'.format(result['detectedSourceLanguage']))
+        print("Source language auto-detected")
     else:
         print("Specified source language: "+source)
     print("Runtime H:M:S")
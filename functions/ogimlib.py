@@ -15,6 +15,7 @@ import matplotlib.pyplot as plt
 plt.rcParams["font.family"] = "Arial"
 from shapely.geometry import Polygon, Point, shape, mapping, MultiPoint
 from shapely.validation import make_valid
+import shapely
 import shapely.wkt
 import matplotlib
 import matplotlib.ticker as mtick
@@ -44,9 +45,14 @@ import folium
 # ===========================================================================
 import leafmap.leafmap as leafmap
 
-# pyodbc
+# MS Access (pyodbc on Windows, or mdbtools)
 # ===========================================================================
-import pyodbc
+from access_reader import list_access_tables, read_access_table
+
+# OGIM dtype policy
+# ===========================================================================
+from ogim_dtypes import remap_values
+from geodesic_measures import line_lengths_km, polygon_areas_km2
 
 # Python Class Object for Oil and Gas facilities
 # Encoding
@@ -55,6 +61,7 @@ UNICODE_ENCODING = 'utf-8'
 NULL_STRING = u'N/A'   # used to indicate null data for a string-type attribute in the facility class
 NULL_NUMERIC = -999  # used to indicate null data for numeric-type attribute in facility class
 NULL_DATE = "1900-01-01"   # used to indicate null data for date attribute in facility class
+VERBOSE = True  # set `ogimlib.VERBOSE = False` to silence progress bars and gdf previews in production runs
 
 class OGIMFacs(object):
     """
@@ -426,7 +433,7 @@ def integrate_facs(
     # =========================================================
     error_logs_, error_log_desc = [], [] # For storing possible errors in data entries
     
-    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
+    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0], disable=not VERBOSE):
         # Specify attributes
         # CATEGORY
         try:
@@ -897,7 +904,8 @@ def integrate_facs(
         final_gdf = all_facs_gdf3[attrs_OTHER]
         
     # Preview
-    print(final_gdf.head())
+    if VERBOSE:
+        print(final_gdf.head())
     
     return final_gdf, error_logs2
 
@@ -1578,29 +1586,19 @@ def unzip_files_in_folder(
 # =========================================================================
 # Transform 3D geometries to 2D geometries
 def transform_geom_3d_2d(gdf):
-    """ Transform 3D geometries in a GeoDataFrame (e.g., POINT Z) to 2D (e.g., POINT)"""
-    
-    geoms_ = []
-    
-    # A copy of the original GeoDataFrame
-    gdf2 = gdf.copy()
-    
-    # Iterate through each row in the dataset
-    for idx, row in tqdm(gdf2.iterrows(), total=gdf2.shape[0]):
-        new_geom = shapely.ops.transform(lambda x, y, z=None: (x,y), row.geometry).wkt
-        geoms_.append(new_geom)
-        
-    geoms2_ = []
-    for ptt in geoms_:
-        geomX = shapely.wkt.loads(ptt)
-        geoms2_.append(geomX)
-        
-    # =================================
-    gdf3 = gdf2.set_geometry(geoms2_, crs=gdf2.crs)
-    
+    """ Transform 3D geometries in a GeoDataFrame (e.g., POINT Z) to 2D (e.g., POINT)
+
+    Works for all geometry types. See `geometry_normalization.normalize_geometries`
+    to also repair, validate and explode geometries in the same pass.
+    """
+    # A copy of the original GeoDataFrame, with Z coordinates dropped from
+    # every geometry at once (no WKT round trip, so no loss of precision)
+    gdf3 = gdf.set_geometry(shapely.force_2d(gdf.geometry.to_numpy()), crs=gdf.crs)
+
     # Preview
-    print(gdf3.head())
-    
+    if VERBOSE:
+        print(gdf3.head())
+
     return gdf3
 
 # Explode multipart geometries
@@ -1850,15 +1848,20 @@ def reproject_eckiv(
 
 def calculate_pipeline_length_km(
     gdf: 'GeoDataFrame', 
-    attrName: 'str' = "PIPELINE_LENGTH_KM"
+    attrName: 'str' = "PIPELINE_LENGTH_KM",
+    method: 'str' = "geodesic",
+    n_workers: 'int' = 1
     ):
 
     """ Function for calculating length of pipeline segment in km, if not available in the dataframe
-    The function transforms the CRS to ECKERT_IV for spatial data manipulation,
-    and then iterates through each rowm calculating the segment length in km, before transforming the CRS back to EPSG:4326
+    Lengths are computed with `geodesic_measures.line_lengths_km` directly from the coordinates of the
+    geometries, which are left untouched. The returned gdf is in EPSG:4326, as before.
     
     Inputs: 
         attrName: is the name of the attribute for pipeline length, e.g., PIPELINE_LENGTH_KM. This will be appended to gdf
+        method: 'geodesic' (length along the WGS84 ellipsoid, default) or 'eckert_iv' (planar length in
+            Eckert IV, matching previous OGIM releases)
+        n_workers: number of threads used to process large layers in chunks
     """
     # Check if CRS is defined
     
@@ -1866,36 +1869,31 @@ def calculate_pipeline_length_km(
         print ("***CRS of gdf is not set!*** \n ==> Please set CRS first::: \n Terminating program...")
         sys.exit()
     
-    # Reporject to Eckert IV
-    gdf_eckIV = reproject_eckiv(gdf)
-    
-    # Calculation of pipeline lengths
-    pipe_lengths = []
-    
-    for idx3, row3 in gdf_eckIV.iterrows():
-        pipe_len = row3.geometry.length #m
-        pipe_lengths.append(pipe_len/1000) # Convert to km
-        
-        
-    # Append results to geodataframe
-    gdf_eckIV[attrName] = pipe_lengths
+    gdf = gdf.copy()
+    gdf[attrName] = line_lengths_km(gdf.geometry, method=method, n_workers=n_workers)
     
-    # Then convert back to EPSG 4326
-    gdf_4326 = transform_CRS(gdf_eckIV, appendLatLon=False)
+    # Return results in EPSG 4326
+    if gdf.crs.to_epsg() != 4326:
+        gdf = transform_CRS(gdf, appendLatLon=False)
     
-    return gdf_4326
+    return gdf
 
 def calculate_basin_area_km2(
     gdf: 'GeoDataFrame', 
-    attrName: 'str' = "AREA_KM2"
+    attrName: 'str' = "AREA_KM2",
+    method: 'str' = "geodesic",
+    n_workers: 'int' = 1
     ):
 
     """ Function for calculating area of basin, shale play, or field in km2
-    The function transforms the CRS to ECKERT_IV for spatial data manipulation,
-    and then iterates through each row calculating the area in km2, before transforming the CRS back to EPSG:4326
+    Areas are computed with `geodesic_measures.polygon_areas_km2` directly from the coordinates of the
+    geometries, which are left untouched. The returned gdf is in EPSG:4326, as before.
     
     Inputs: 
         attrName: is the name of the attribute for area, e.g., AREA_KM2. This will be appended to gdf
+        method: 'geodesic' (area on the WGS84 ellipsoid, default), 'authalic' (faster approximation of it)
+            or 'eckert_iv' (planar area in Eckert IV, matching previous OGIM releases)
+        n_workers: number of threads used to process large layers in chunks
     """
     # Check if CRS is defined
     
@@ -1903,23 +1901,14 @@ def calculate_basin_area_km2(
         print ("***CRS of gdf is not set!*** \n ==> Please set CRS first::: \n Terminating program...")
         sys.exit()
     
-    # Reporject to Eckert IV
-    gdf_eckIV = reproject_eckiv(gdf)
-    
-    # Calculation of pipeline lengths
-    _areas = []
+    gdf = gdf.copy()
+    gdf[attrName] = polygon_areas_km2(gdf.geometry, method=method, n_workers=n_workers)
     
-    for idx3, row3 in gdf_eckIV.iterrows():
-        _area = row3.geometry.area #m2
-        _areas.append(_area/(1000*1000)) # Convert to km
-        
-    # Append results to geodataframe
-    gdf_eckIV[attrName] = _areas
+    # Return results in EPSG 4326
+    if gdf.crs.to_epsg() != 4326:
+        gdf = transform_CRS(gdf, appendLatLon=False)
     
-    # Then convert back to EPSG 4326
-    gdf_4326 = transform_CRS(gdf_eckIV, appendLatLon=False)
-    
-    return gdf_4326
+    return gdf
 
 # ===============================================================================
 # OGIM pipeline data integration 
@@ -2188,7 +2177,7 @@ def integrate_pipelines(
     # =========================================================
     error_logs_, error_log_desc = [], [] # For storing possible errors in data entries
     
-    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
+    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0], disable=not VERBOSE):
         # Specify attributes
         # Specify attributes
         # CATEGORY
@@ -2531,7 +2520,8 @@ def integrate_pipelines(
         print ("*** There are possible errors in assigned attribute names! \n Please check error_logs *** \n =========== \n {} for attributes {}".format(error_logs2, error_logs_desc2))
         
     # Preview
-    print(final_gdf2.head())
+    if VERBOSE:
+        print(final_gdf2.head())
     
     return final_gdf2, error_logs2
 
@@ -2724,7 +2714,7 @@ def integrate_basins(
     # =========================================================
     error_logs_, error_log_desc = [], [] # For storing possible errors in data entries
     
-    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
+    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0], disable=not VERBOSE):
         # Specify attributes
         # Specify attributes
         # CATEGORY
@@ -2898,7 +2888,8 @@ def integrate_basins(
         print ("*** There are possible errors in assigned attribute names! \n Please check error_logs *** \n =========== \n {} for attributes {}".format(error_logs2, error_logs_desc2))
         
     # Preview
-    print(final_gdf2.head())
+    if VERBOSE:
+        print(final_gdf2.head())
     
     return final_gdf2, error_logs2
 
@@ -3180,7 +3171,7 @@ def integrate_production(
     # =========================================================
     error_logs_, error_log_desc = [], [] # For storing possible errors in data entries
     
-    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
+    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0], disable=not VERBOSE):
         # Specify attributes
         # CATEGORY
         try:
@@ -3558,7 +3549,8 @@ def integrate_production(
         print ("*** There are possible errors in assigned attribute names! \n Please check error_logs *** \n =========== \n {} for attributes {}".format(error_logs2, error_logs_desc2))
         
     # Preview
-    print(all_facs_gdf3.head())
+    if VERBOSE:
+        print(all_facs_gdf3.head())
     
     return all_facs_gdf3, error_logs2
 
@@ -3587,31 +3579,27 @@ def read_msAccess(pathToFile, table_subset=None):
 
     Dependencies:
     ---
-        pyodbc (conda install -c anaconda pyodbc)
+        pyodbc and the MS Access ODBC driver (Windows), OR mdbtools
+        (any platform); see `access_reader`
         pandas
 
-    """
-    # Create connection to file
-    conn_str = (r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
-                r'DBQ=' + pathToFile + ";")
-    conn = pyodbc.connect(conn_str)
+    *NOTE* To read only some columns or rows of a large table, or to read
+    it in chunks, use `access_reader.read_access_table` instead.
 
+    """
     # Find all tables in database
-    cursor = conn.cursor()
-    tableNames = []
-    for i in cursor.tables(tableType='TABLE'):
-        print("====================")
-        print("+++ Table Names +++")
-        print(i.table_name)
-        tableNames.append(i.table_name)
+    tableNames = list_access_tables(pathToFile)
+    print("====================")
+    print("+++ Table Names +++")
+    for name in tableNames:
+        print(name)
 
     # If user provides a list of specific tables they want to be read,
     # re-define the list of tableNames that will be iterated over and loaded
     # into dataframes by this function
     if table_subset:
         if type(table_subset) == str:
-            list_ = []
-            table_subset = list_.append(table_subset)
+            table_subset = [table_subset]
         if type(table_subset) == list:
             tableNames = table_subset
 
@@ -3619,7 +3607,7 @@ def read_msAccess(pathToFile, table_subset=None):
     dfs = []
     tableNamesIdx = []
     for idx in range(len(tableNames)):
-        df = pd.read_sql('select * from ' + tableNames[idx], conn)
+        df = read_access_table(pathToFile, tableNames[idx])
         dfs.append(df)
         tableNamesIdx.append(idx)
 
@@ -3639,23 +3627,11 @@ def get_msAccess_table_names(pathToFile):
 
     Dependencies:
     ---
-        pyodbc (conda install -c anaconda pyodbc)
-        pandas
+        pyodbc and the MS Access ODBC driver (Windows), OR mdbtools
+        (any platform); see `access_reader`
 
     """
-    # Create connection to file
-    conn_str = (r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
-                r'DBQ=' + pathToFile + ";")
-    conn = pyodbc.connect(conn_str)
-
-    # Find all tables in database
-    cursor = conn.cursor()
-    tableNames = []
-    for i in cursor.tables(tableType='TABLE'):
-        # print(i.table_name)
-        tableNames.append(i.table_name)
-
-    return tableNames
+    return list_access_tables(pathToFile)
 
 
 # =========================================================
@@ -3798,17 +3774,21 @@ def translate_espanol(
     listToTranslate: list = None,
     gdf: 'GeoDataFrame' = None,
     attrName: 'GeoDataFrame attribute' = None,
-    printTranslations: bool = True
+    printTranslations: bool = True,
+    cache_path: str = None
     ):
     
     """ Return a dictionary for unique features in `attrName` or `listToTranslate` indicating ES-EN translations
     
+    Translations are read from the local translation cache, and only phrases
+    that were never translated before are sent to googletrans, in batches
+    (see `translation_cache`).
+    
     Dependencies: 
     ---
-        googletrans (pip install googletrans)
-        then: import googletrans
-              from googletrans import Translator
+        googletrans (pip install googletrans), only if some phrases aren't cached
     """
+    from translation_cache import GoogletransBackend, translate_values
     
     if translateFromList == False:
         unique_ = list(gdf[attrName].unique())
@@ -3819,16 +3799,13 @@ def translate_espanol(
     else:
         unique_ = listToTranslate
 
-    # Create translator object [requires googletrans library]
-    translator = Translator()
-    
-    en_unique_ = [translator.translate(unique_[x], src='es', dest='en').text for x in range(len(unique_))]
-    
-    # Create dictionary
-    en_unique2_ = dict(zip(unique_, en_unique_))
+    # Create dictionary [requires googletrans library for uncached phrases]
+    en_unique2_ = translate_values(unique_, source='es', target='en',
+                                   backend=GoogletransBackend(), cache=cache_path)
     
     if printTranslations == True:
-        pprint.pprint(en_unique2_)
+        for k, v in en_unique2_.items():
+            print(f'{k!r}: {v!r}')
     
     return en_unique2_
 
@@ -4074,7 +4051,7 @@ def integrate_flares(
     # =========================================================
     error_logs_, error_log_desc = [], [] # For storing possible errors in data entries
     
-    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0]):
+    for idx_, row in tqdm(gdf.iterrows(), total=gdf.shape[0], disable=not VERBOSE):
         # Specify attributes
         # CATEGORY
         try:
@@ -4370,7 +4347,8 @@ def integrate_flares(
         print ("*** There are possible errors in assigned attribute names! \n Please check error_logs *** \n =========== \n {} for attributes {}".format(error_logs2, error_logs_desc2))
         
     # Preview
-    print(all_facs_gdf3.head())
+    if VERBOSE:
+        print(all_facs_gdf3.head())
     
     return all_facs_gdf3, error_logs2
 
@@ -4426,8 +4404,7 @@ def strip_z_coord(gdf: 'GeoDataFrame'):
     Use this function to ensure a gdf's geometries do not mix types
     POINT and POINT Z before exporting to a shapefile, geopackage, etc.
     
-    *NOTE* that this function has only been tested on POINT type geometries
-    TO-DO: extend this function to work with line and polygon geometries.
+    Works for point, line and polygon geometries (requires Shapely 2.0+).
 
     Parameters
     ----------
@@ -4440,29 +4417,12 @@ def strip_z_coord(gdf: 'GeoDataFrame'):
         (all points are reduced to POINT type with only XY values)
 
     '''
-    c = 0  #counter variable
-    # Get series of geoms to iterate over
-    current_geometry = gdf.geometry
-    # Create empty list to append processed geometries to
-    new_geometry = []
-    # Create temporary empty gdf (will only contain new geometries)
-    new_gdf = gpd.GeoDataFrame()
-
-    for geom in current_geometry:
-        if geom.has_z:
-            c = c+1 
-            # remove the Z coordinate
-            geom_noz = shapely.ops.transform(lambda x, y, z: (x, y), geom) 
-            new_geometry.append(geom_noz)
-        else:
-            # keep original XY coordinate if no editing is needed
-            new_geometry.append(geom)
-    
-    # Create geometry column in our temp gdf based on our list of processed geoms
-    new_gdf.geometry = new_geometry
+    geoms = gdf.geometry.to_numpy()
+    # Count how many geometries actually have a Z coordinate to drop
+    c = int(shapely.has_z(geoms).sum())
 
-    # Swap the geometry column in the input gdf for the one created in this function
-    output_gdf = gdf.set_geometry(new_gdf.geometry)
+    # Drop the Z coordinate of every geometry at once
+    output_gdf = gdf.set_geometry(shapely.force_2d(geoms), crs=gdf.crs)
     print('Total number of geometries in gdf: '+str(len(gdf)))
     print('Number of z-coordinates dropped: '+str(c))
     return output_gdf
@@ -4628,6 +4588,12 @@ def replace_missing_strings_with_na(gdf,
             if limit_acceptable_columns==True and column not in acceptable_columns:
                 continue
 
+            elif isinstance(gdf[column].dtype, pd.CategoricalDtype):
+                # Edit only the categories, so the column stays compact
+                missing_upper = set(str(v).upper() for v in possible_missing_values)
+                gdf[column] = remap_values(gdf[column],
+                                           lambda v: NULL_STRING if str(v).upper() in missing_upper else str(v).upper())
+
             else:
                 gdf[column] = gdf[column].astype(str)
                 gdf[column] = gdf[column].str.upper()
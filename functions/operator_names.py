@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Canonical operator names, with blocked similarity matching and a persistent
+mapping cache.
+
+OPERATOR values come in many spellings ('XTO ENERGY INC.', 'XTO Energy,
+Inc', 'X.T.O. ENERGY', 'XTO ENERGY INC' ...). Names are first reduced to a
+matching key: upper case, punctuation removed, common abbreviations spelled
+out ('OPER' -> 'OPERATING', '&' -> 'AND') and corporate suffixes ('INC',
+'LLC', 'LTD', 'S.A. DE C.V.', ...) stripped. Names with the same key are the
+same operator. Keys that are merely *similar* (typos, missing words) are
+then matched by the Jaccard similarity of their character trigrams, unless
+they contain different numbers ('SMITH OIL COMPANY 1' and 'SMITH OIL
+COMPANY 2' stay apart), and only within blocks: by prefix filtering, each key is only compared with keys that
+share one of its rarest trigrams, which finds every pair above the
+similarity threshold without comparing all pairs, except pairs that only
+share trigrams too common to block on (see `max_block_size`). Matched keys are
+clustered (connected components), and each cluster gets the most common
+original spelling as its canonical name.
+
+The mapping {original name: canonical name} is kept in a local SQLite cache,
+so each release only processes names that weren't seen before; new names
+join the existing clusters where they match, and names that were already
+mapped are never remapped.
+
+Example usage
+---
+    wells['OPERATOR'] = canonicalize_operators(wells.OPERATOR)
+    review = OperatorCache().to_frame()  # all mappings, e.g. to review clusters
+
+@author: maobrien
+"""
+import os
+import re
+import sqlite3
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from conflation import normalize_text, trigram_table, trigram_similarity, link_matches
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.ogim', 'operator_names.sqlite')
+
+# Tokens stripped from the end of a name (in any order, repeatedly)
+CORPORATE_SUFFIXES = ['INC', 'INCORPORATED', 'LLC', 'L L C', 'LTD', 'LIMITED', 'CORP',
+                      'CORPORATION', 'CO', 'COMPANY', 'LP', 'L P', 'LLP', 'PLC', 'ULC',
+                      'SA', 'S A', 'DE CV', 'DE C V', 'SAB', 'SRL', 'SPA', 'SAS', 'AG',
+                      'GMBH', 'BV', 'NV', 'AS', 'ASA', 'AB', 'PTY', 'PTE', 'BHD', 'SDN',
+                      'TBK', 'PT', 'JSC', 'PJSC', 'OAO', 'OOO', 'PAO', 'ZAO', 'KK']
+ABBREVIATIONS = {'OPER': 'OPERATING',
+                 'OPERTG': 'OPERATING',
+                 'OPR': 'OPERATING',
+                 'PROD': 'PRODUCTION',
+                 'PRODN': 'PRODUCTION',
+                 'EXPL': 'EXPLORATION',
+                 'EXPLOR': 'EXPLORATION',
+                 'RES': 'RESOURCES',
+                 'RESRCS': 'RESOURCES',
+                 'PETE': 'PETROLEUM',
+                 'PET': 'PETROLEUM',
+                 'ENGY': 'ENERGY',
+                 'ENRGY': 'ENERGY',
+                 'INTL': 'INTERNATIONAL',
+                 'NATL': 'NATIONAL',
+                 'DEV': 'DEVELOPMENT',
+                 'MGMT': 'MANAGEMENT',
+                 'SVCS': 'SERVICES',
+                 'SVC': 'SERVICE',
+                 'BROS': 'BROTHERS',
+                 'ASSOC': 'ASSOCIATES',
+                 'AMER': 'AMERICA'}
+
+_SUFFIX_RE = r'(?:\s+(?:' + '|'.join(sorted((re.escape(s) for s in CORPORATE_SUFFIXES),
+                                                key=len, reverse=True)) + r'))+$'
+_ABBREV_RE = r'\b(' + '|'.join(ABBREVIATIONS) + r')\b'
+
+
+def operator_key(values):
+    """Return the matching key of operator names (vectorized; missing and N/A names give <NA>)."""
+    s = pd.Series(values, dtype='string').str.upper().str.replace('&', ' AND ', regex=False)
+    # Join dotted initials ('X.T.O.' -> 'XTO') before punctuation is removed
+    s = s.str.replace(r'\b([A-Z])\.(?=[A-Z]\b\.?)', r'\1', regex=True)
+    s = normalize_text(s)
+    s = s.str.replace(_ABBREV_RE, lambda m: ABBREVIATIONS[m.group(1)], regex=True)
+    s = s.str.replace(r'^THE\s+', '', regex=True)
+    stripped = s.str.replace(_SUFFIX_RE, '', regex=True).str.strip()
+    # Don't strip a name down to nothing (e.g. an operator called 'CO')
+    return stripped.where(stripped.str.len() > 0, s)
+
+
+# =============================================================================
+# Blocked similarity matching
+# =============================================================================
+def similar_key_pairs(keys, threshold=0.8, new=None, max_block_size=5000):
+    """Pairs of keys whose trigram Jaccard similarity is at least `threshold`.
+
+    Parameters
+    ----------
+    keys : array-like of str
+        Distinct matching keys.
+    threshold : float, optional (default 0.8)
+        Keys that contain different numbers are never paired, however
+        similar they are.
+    new : array-like of bool, optional
+        If given, only pairs involving at least one `new` key are returned.
+    max_block_size : int, optional (default 5000)
+        Trigrams shared by more keys than this (e.g. ' TH') are too common
+        to block on, and are skipped. Similar pairs whose shared prefix
+        trigrams are all this common are then missed; None blocks on every
+        trigram, which finds every pair but can compare many more.
+
+    Returns
+    -------
+    pairs : DataFrame
+        'i', 'j' (positions in `keys`, i < j) and 'similarity'.
+    """
+    keys = pd.Series(keys, dtype='string').reset_index(drop=True)
+    grams = trigram_table(keys)
+    if grams.empty:
+        return pd.DataFrame(columns=['i', 'j', 'similarity'])
+
+    # Prefix filtering: order every key's trigrams from rarest to most
+    # common. Two sets with Jaccard >= t share at least one of the first
+    # |x| - ceil(t * |x|) + 1 trigrams of each (exact only when no trigram
+    # is dropped by max_block_size).
+    freq = grams.gram.map(grams.gram.value_counts())
+    grams = grams.assign(freq=freq.to_numpy()).sort_values(['id', 'freq', 'gram'])
+    size = grams.groupby('id').gram.transform('size').to_numpy()
+    rank = grams.groupby('id').cumcount().to_numpy()
+    prefix = grams[rank < size - np.ceil(threshold * size) + 1]
+    if max_block_size is not None:
+        prefix = prefix[prefix.freq <= max_block_size]
+
+    pairs = prefix[['id', 'gram']].merge(prefix[['id', 'gram']], on='gram', suffixes=('_a', '_b'))
+    pairs = pairs[pairs.id_a < pairs.id_b][['id_a', 'id_b']].drop_duplicates()
+    pairs.columns = ['i', 'j']
+    if new is not None:
+        new = np.asarray(new, dtype=bool)
+        pairs = pairs[new[pairs.i.to_numpy()] | new[pairs.j.to_numpy()]]
+    # Numbers are part of a name ('SMITH OIL COMPANY 1' and 'SMITH OIL
+    # COMPANY 2' are different operators), so keys only match if they
+    # contain the same numbers
+    numbers = keys.str.findall(r'\d+').str.join(' ').fillna('').to_numpy(dtype=object)
+    pairs = pairs[numbers[pairs.i.to_numpy()] == numbers[pairs.j.to_numpy()]]
+    pairs = pairs.reset_index(drop=True)
+    pairs['similarity'] = trigram_similarity(pairs.i, pairs.j, grams[['id', 'gram']])
+    return pairs[pairs.similarity >= threshold].reset_index(drop=True)
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+class OperatorCache(object):
+    """Local SQLite store of {operator name: (matching key, canonical name)}.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the SQLite file; created if it doesn't exist. Default is
+        DEFAULT_CACHE_PATH, in the user's home folder.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS operators (
+                                 name TEXT PRIMARY KEY,
+                                 key TEXT NOT NULL,
+                                 canonical TEXT NOT NULL,
+                                 n_records INTEGER,
+                                 created TEXT)""")
+        self.conn.commit()
+
+    def to_frame(self):
+        """Return the whole cache as a DataFrame."""
+        return pd.read_sql('SELECT * FROM operators', self.conn)
+
+    def put(self, df):
+        """Store the rows of a DataFrame with columns name, key, canonical, n_records."""
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO operators VALUES (?, ?, ?, ?, ?)',
+            [(n, k, c, int(r), now) for n, k, c, r in
+             df[['name', 'key', 'canonical', 'n_records']].itertuples(index=False)])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+# =============================================================================
+# Canonicalizing
+# =============================================================================
+def _most_common(names, counts):
+    """Index of the most common name; ties go to the shortest, then alphabetical."""
+    order = sorted(range(len(names)), key=lambda k: (-counts[k], len(names[k]), names[k]))
+    return order[0]
+
+
+def canonicalize_operators(values, cache=None, threshold=0.8, max_block_size=5000):
+    """Map operator names to canonical names.
+
+    Parameters
+    ----------
+    values : array-like of str
+        Operator names (e.g. the OPERATOR column of a layer).
+    cache : OperatorCache or str, optional
+        Cache, or path of its SQLite file. Default is DEFAULT_CACHE_PATH.
+    threshold : float, optional (default 0.8)
+        Minimum trigram similarity of two keys to be the same operator.
+    max_block_size : int, optional
+        See `similar_key_pairs`.
+
+    Returns
+    -------
+    canonical : pandas Series
+        Canonical name of each value (same index as `values` if it's a
+        Series); missing and N/A names are returned unchanged.
+    """
+    values = pd.Series(values)
+    own_cache = not isinstance(cache, OperatorCache)
+    if own_cache:
+        cache = OperatorCache(cache or DEFAULT_CACHE_PATH)
+    try:
+        counts = values.dropna().astype(str).value_counts()
+        names = pd.DataFrame({'name': counts.index, 'n_records': counts.to_numpy(),
+                              'key': operator_key(counts.index).to_numpy()})
+        # Only real operator names are mapped (and counted); N/A names have no key
+        names = names[names.key.notna()]
+        known = cache.to_frame()
+        todo = names[~names.name.isin(known.name)].copy()
+        print(f'{len(names)} distinct operator names: {len(names) - len(todo)} cached, '
+              f'{len(todo)} new')
+
+        if len(todo):
+            # Keys of the cache are nodes with their cluster's canonical name
+            old_keys = known.groupby('key').canonical.agg(lambda c: c.mode().iloc[0])
+            new_keys = todo.groupby('key').n_records.sum()
+            new_keys = new_keys[~new_keys.index.isin(old_keys.index)]
+            keys = list(old_keys.index) + list(new_keys.index)
+            is_new = np.r_[np.zeros(len(old_keys), bool), np.ones(len(new_keys), bool)]
+
+            pairs = similar_key_pairs(keys, threshold, new=is_new, max_block_size=max_block_size)
+            groups = link_matches(len(keys), pairs)
+
+            # Canonical name of each key: the existing canonical name of its
+            # cluster if it has one (the most common, if new names bridged
+            # several), else the most common spelling of the new names
+            group_canonical = {}
+            key_group = pd.Series(groups, index=keys)
+            old_canon = pd.DataFrame({'group': groups[:len(old_keys)],
+                                      'canonical': old_keys.to_numpy()})
+            group_canon = old_canon.groupby('group').canonical.agg(lambda c: c.mode().iloc[0])
+            todo['group'] = todo.key.map(key_group).to_numpy()
+            for group, members in todo.groupby('group'):
+                if group in group_canon.index:
+                    group_canonical[group] = group_canon[group]
+                else:
+                    names = members.name.tolist()
+                    group_canonical[group] = names[_most_common(names, members.n_records.tolist())]
+            todo['canonical'] = todo.group.map(group_canonical)
+            cache.put(todo)
+
+        mapping = cache.to_frame().set_index('name').canonical
+    finally:
+        if own_cache:
+            cache.close()
+    return values.map(mapping).fillna(values)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Pipeline kilometres per administrative unit, in one overlay pass.
+
+`ogim_summary_functions.howmuchpipe` clipped the whole global pipelines layer
+once per country and measured the result. Here every pipeline is paired with
+the boundary polygons it intersects through a single bulk spatial-index
+query. Pipelines that lie entirely inside a polygon are measured as they are;
+only the ones that cross a boundary are split at it (`shapely.intersection`,
+vectorized over all pairs). Every piece is then measured geodesically with
+`geodesic_measures`, and the lengths are summed per administrative unit,
+e.g. per (COUNTRY, STATE_PROV, ON_OFFSHORE).
+
+The boundary layer should be seamless and non-overlapping (such as
+`marine_and_land_boundaries_seamless.shp`, or a country x state x
+on/offshore overlay of it prepared once), so each kilometre of pipeline is
+counted in exactly one unit. Length that falls outside every polygon is
+reported with 'N/A' units, so the table always adds up to the length of the
+whole layer.
+
+Example usage
+---
+    units = boundaries.rename(columns={'SOVEREIGN1': 'COUNTRY', 'ON_OFF': 'ON_OFFSHORE'})
+    km = pipeline_km_by_unit(ogim_pipes, units, unit_cols=['COUNTRY', 'ON_OFFSHORE'], n_workers=8)
+
+@author: maobrien
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from geodesic_measures import line_lengths_km
+
+DEFAULT_UNIT_COLS = ['COUNTRY', 'STATE_PROV', 'ON_OFFSHORE']
+
+
+def _split_chunk(pipe_geoms, unit_tree, unit_geoms, offset):
+    """Pair one chunk of pipelines with the units they intersect, and split them at unit boundaries."""
+    pipe_idx, unit_idx = unit_tree.query(pipe_geoms, predicate='intersects')
+    geoms = pipe_geoms[pipe_idx]
+    areas = unit_geoms[unit_idx]
+    inside = shapely.covered_by(geoms, areas)
+    pieces = geoms.copy()
+    pieces[~inside] = shapely.intersection(geoms[~inside], areas[~inside])
+    return pipe_idx + offset, unit_idx, pieces
+
+
+def split_by_units(pipes, units, chunk_size=100_000, n_workers=1):
+    """Split pipelines at the boundaries of the unit polygons they cross.
+
+    Parameters
+    ----------
+    pipes : GeoDataFrame
+        Line features.
+    units : GeoDataFrame
+        Boundary polygons; reprojected to the CRS of `pipes` if needed.
+    chunk_size : int, optional (default 100,000)
+        Number of pipelines intersected at a time.
+    n_workers : int, optional (default 1)
+        Number of threads processing chunks.
+
+    Returns
+    -------
+    pieces : GeoDataFrame
+        One row per (pipeline, unit) pair with the 'pipe' position in `pipes`,
+        the 'unit' position in `units`, and the part of the pipeline inside
+        the unit as geometry.
+    """
+    if units.crs is not None and pipes.crs is not None and units.crs != pipes.crs:
+        units = units.to_crs(pipes.crs)
+    unit_geoms = units.geometry.to_numpy()
+    unit_tree = shapely.STRtree(unit_geoms)
+    pipe_geoms = pipes.geometry.to_numpy()
+
+    starts = range(0, len(pipe_geoms), chunk_size)
+    def work(start):
+        return _split_chunk(pipe_geoms[start:start + chunk_size], unit_tree, unit_geoms, start)
+    if n_workers > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(work, starts))
+    else:
+        results = [work(start) for start in starts]
+
+    if results:
+        pipe_idx, unit_idx, pieces = (np.concatenate(r) for r in zip(*results))
+    else:
+        pipe_idx, unit_idx, pieces = np.array([], int), np.array([], int), np.array([], object)
+    return gpd.GeoDataFrame({'pipe': pipe_idx, 'unit': unit_idx},
+                            geometry=gpd.GeoSeries(pieces, crs=pipes.crs))
+
+
+def pipeline_km_by_unit(pipes, units, unit_cols=DEFAULT_UNIT_COLS, chunk_size=100_000,
+                        n_workers=1, return_pieces=False):
+    """Total pipeline length in km per administrative unit.
+
+    Parameters
+    ----------
+    pipes : GeoDataFrame
+        Pipeline (line) features, with a CRS set.
+    units : GeoDataFrame
+        Non-overlapping boundary polygons, with the `unit_cols` columns.
+    unit_cols : list of str, optional
+        Columns of `units` that identify a unit. Default COUNTRY,
+        STATE_PROV and ON_OFFSHORE.
+    chunk_size, n_workers : int, optional
+        See `split_by_units`.
+    return_pieces : bool, optional (default False)
+        Also return the length of every (pipeline, unit) piece.
+
+    Returns
+    -------
+    table : DataFrame
+        `unit_cols` and PIPELINE_KM, one row per unit with pipelines. Length
+        outside every unit is in a row whose `unit_cols` are 'N/A'.
+    pieces : DataFrame, only if `return_pieces`
+        'pipe' (index label in `pipes`), `unit_cols` and PIPELINE_KM.
+    """
+    pieces = split_by_units(pipes, units, chunk_size=chunk_size, n_workers=n_workers)
+    pieces['PIPELINE_KM'] = line_lengths_km(pieces.geometry, n_workers=n_workers).fillna(0).to_numpy()
+    pieces = pd.concat([pieces[['pipe', 'PIPELINE_KM']],
+                        units[unit_cols].iloc[pieces.unit.to_numpy()].reset_index(drop=True)], axis=1)
+
+    # Length outside every unit (e.g. beyond the boundary data)
+    total = line_lengths_km(pipes.geometry, n_workers=n_workers).fillna(0).to_numpy()
+    # ('pipe' is read with [], as the attribute is the DataFrame.pipe method)
+    inside = np.bincount(pieces['pipe'].to_numpy(), weights=pieces['PIPELINE_KM'].to_numpy(),
+                         minlength=len(pipes))
+    outside = total - inside
+    # Ignore floating point noise of pipelines split at boundaries
+    has_outside = outside > 1e-6 * np.maximum(total, 1)
+    if has_outside.any():
+        rest = pd.DataFrame({'pipe': np.flatnonzero(has_outside),
+                             'PIPELINE_KM': outside[has_outside]})
+        rest[unit_cols] = 'N/A'
+        pieces = pd.concat([pieces, rest], ignore_index=True)
+
+    pieces['pipe'] = pipes.index.to_numpy()[pieces['pipe'].to_numpy()]
+    table = (pieces.fillna({c: 'N/A' for c in unit_cols})
+             .groupby(unit_cols, as_index=False)['PIPELINE_KM'].sum())
+    print(f'{len(pipes)} pipelines, {total.sum():,.0f} km in total; '
+          f'{outside[has_outside].sum():,.0f} km outside every unit')
+    if return_pieces:
+        return table, pieces
+    return table
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Configurable monthly-to-annual rollup of state well production data.
+
+Most state blocks in `usa_production.py` do the same things with different
+column names:
+    - select one reporting year
+    - derive an API-10 (or similar) from a longer API number
+    - cap producing days at the number of days in the month
+    - group the monthly records by well (or well bore) and month, then group
+      again to one record per well for the year
+    - record the oil / gas / condensate totals before and after aggregating
+      in `before_after_table`
+
+Here a state instead declares its column names and quirks in a config dict,
+and `rollup_production` does all of the above in one pass: volume totals are
+computed with a single column-wise sum before and after, and every grouping
+step is one `groupby().agg()` call. `rollup_states` runs several states at
+once.
+
+Config keys
+---
+    'volumes'     dict mapping 'oil', 'gas', 'water', 'cond' to the source's
+                  volume columns (omit any the source doesn't report)
+    'days_col'    producing days column (optional)
+    'levels'      list of grouping steps, first to last, each a dict with
+                  'by' (list of columns) and 'days' ('max' or 'sum'; how the
+                  producing days of the grouped rows are combined). Volumes
+                  are always summed.
+    'attributes'  list of other columns to keep (the 'last' value is kept),
+                  or a dict of {column: aggregation}
+    'reader'      function with no arguments that returns the raw data
+                  (only needed by `rollup_states`)
+    'prepare'     function that takes and returns the raw DataFrame, for any
+                  state-specific reshaping (optional)
+    'api'         derive a shorter API column: dict with 'source', 'target',
+                  and either 'length' (10, 12 or 14; the API is parsed and
+                  truncated with `well_identifiers.normalize_api`, and
+                  values that aren't valid APIs are kept as they are) or
+                  'prefix' (string added to the front) and 'drop_last'
+                  (number of trailing characters removed)
+    'date_col'    report date column, from which the month and year are taken
+    'month_col'   month number column (if there's no 'date_col')
+    'year_col'    year column (if there's no 'date_col')
+    'year'        roll up only records of this year (requires 'date_col' or
+                  'year_col'; if neither is present, all records are kept).
+                  The production store gets every year.
+    'cap_days'    cap producing days at the days in the month (default True)
+    'fillna'      replace missing volumes and days with 0 (default False)
+    'drop_zero'   drop wells that reported no volumes all year (default False)
+    'unit_col'    column counted for 'units_reporting_production_original'
+                  (default: the first column of the last level)
+    'lease_col'   lease (or unit, PRU) column, stored as LEASE_ID in the
+                  production store for lookups by lease (optional)
+    'state_prov'  STATE_PROV of the records in the production store (default:
+                  the state name; e.g. for 'PENNSYLVANIA_U')
+
+Example usage
+---
+    AK_ROLLUP = {'reader': lambda: pd.read_excel('alaska\\wellproductionpost2000.xlsx'),
+                 'date_col': 'ReportDate',
+                 'year': 2022,
+                 'api': {'source': 'Api', 'target': 'API10', 'length': 10},
+                 'volumes': {'oil': 'OilProduced', 'gas': 'GasProduced', 'water': 'WaterProduced'},
+                 'days_col': 'DaysProduced',
+                 'cap_days': False,
+                 'levels': [{'by': ['Api', 'ReportDate'], 'days': 'max'},
+                            {'by': ['API10'], 'days': 'sum'}],
+                 'attributes': ['WellName', 'OperatorName']}
+    ak_prod, ak_totals = rollup_production(pd.read_excel(...), AK_ROLLUP)
+    update_before_after_table(before_after_table, 'ALASKA', ak_totals)
+
+@author: maobrien
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from production_store import normalize_monthly, write_production
+from well_identifiers import normalize_api
+
+VOLUME_KEYS = ['oil', 'gas', 'water', 'cond']
+STORE_VOLUMES = {'oil': 'OIL_BBL', 'gas': 'GAS_MCF', 'water': 'WATER_BBL', 'cond': 'CONDENSATE_BBL'}
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def days_in_month(month, year=None):
+    """Return the number of days in each month (1-12) as an array.
+
+    `year` may be a single year, an array the same length as `month`, or
+    None (February is then counted as 28 days).
+    """
+    month = np.asarray(month, dtype=float)
+    valid = ~np.isnan(month)
+    days = np.full(month.shape, np.nan)
+    days[valid] = _DAYS_IN_MONTH[month[valid].astype(int)]
+    if year is not None:
+        year = np.broadcast_to(np.asarray(year, dtype=float), month.shape)
+        leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+        days[valid & leap & (month == 2)] = 29
+    return days
+
+
+def cap_producing_days(df, days_col, month, year=None):
+    """Cap producing days at the number of days in the reporting month, in place.
+
+    Parameters
+    ----------
+    df : DataFrame
+    days_col : str
+        Producing days column.
+    month : array-like
+        Month number (1-12) of each record.
+    year : int or array-like, optional
+        Year of each record, to count leap-year Februaries as 29 days.
+
+    Returns
+    -------
+    n_capped : int
+        Number of records whose producing days were reduced.
+    """
+    max_days = days_in_month(month, year)
+    days = df[days_col].to_numpy(dtype=float)
+    over = days > max_days
+    df.loc[over, days_col] = max_days[over]
+    return int(over.sum())
+
+
+def _derive_api(df, api):
+    values = df[api['source']].astype(str)
+    if api.get('length'):
+        apis = normalize_api(df[api['source']], length=api['length'])
+        df[api['target']] = apis.astype(object).where(apis.notna(), values)
+        return
+    if api.get('prefix'):
+        values = api['prefix'] + values
+    if api.get('drop_last'):
+        values = values.str[:-api['drop_last']]
+    df[api['target']] = values
+
+
+def _attribute_aggs(config):
+    attributes = config.get('attributes', [])
+    if isinstance(attributes, dict):
+        return dict(attributes)
+    return {col: 'last' for col in attributes}
+
+
+def rollup_production(df, config, state=None, store_root=None,
+                      country='United States of America'):
+    """Aggregate monthly well production to one annual record per well.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Raw monthly production records of one state.
+    config : dict
+        Column mapping and options of the state; see the module docstring.
+    state : str, optional
+        State name, used in printed messages and as STATE_PROV in the
+        production store.
+    store_root : str, optional
+        If given, the monthly records of every year (after day capping, one
+        per well of the last level and month) are also written to the
+        production store in this folder, before they are filtered to
+        config['year']; see `production_store`.
+    country : str, optional (default 'United States of America')
+        COUNTRY of the records in the production store.
+
+    Returns
+    -------
+    annual : DataFrame
+        One row per unique value of the last level's 'by' columns, with the
+        volume, producing days and attribute columns of the source.
+    totals : dict
+        '<volume>_original' and '<volume>_agg' sums for each volume in
+        config['volumes'], and 'units_reporting_production_original'; see
+        `update_before_after_table`.
+
+    """
+    label = state or 'production'
+    if config.get('prepare') is not None:
+        df = config['prepare'](df)
+    df = df.copy()
+
+    # Reporting month and year of each record
+    month, year = None, None
+    if config.get('date_col'):
+        dates = pd.to_datetime(df[config['date_col']])
+        month, year = dates.dt.month.to_numpy(), dates.dt.year.to_numpy()
+    else:
+        if config.get('month_col'):
+            month = df[config['month_col']].to_numpy()
+        if config.get('year_col'):
+            year = df[config['year_col']].to_numpy()
+
+    if year is None:
+        year = config.get('year')
+
+    volumes = {k: v for k, v in config['volumes'].items() if v is not None}
+    vol_cols = list(volumes.values())
+    days_col = config.get('days_col')
+    if config.get('fillna', False):
+        fill_cols = vol_cols + ([days_col] if days_col else [])
+        df[fill_cols] = df[fill_cols].fillna(0)
+
+    if config.get('api'):
+        _derive_api(df, config['api'])
+
+    if days_col and config.get('cap_days', True) and month is not None:
+        n_capped = cap_producing_days(df, days_col, month, year)
+        print(f'{label}: producing days capped at days in month for {n_capped} records')
+
+    # Every year of the source goes to the store, not only the one rolled up
+    levels = config['levels']
+    if store_root is not None:
+        if month is None or year is None:
+            print(f'{label}: no reporting month and year, not written to the production store')
+        else:
+            monthly = df.assign(_YEAR=np.broadcast_to(year, month.shape), _MONTH=month)
+            write_production(normalize_monthly(monthly,
+                                               fac_id=levels[-1]['by'][0],
+                                               country=country,
+                                               state_prov=config.get('state_prov', state),
+                                               volumes={STORE_VOLUMES[k]: col for k, col in volumes.items()},
+                                               prod_days=days_col,
+                                               lease_id=config.get('lease_col'),
+                                               year_col='_YEAR',
+                                               month_col='_MONTH'),
+                             store_root)
+
+    if config.get('year') is not None and np.ndim(year) == 1:
+        keep = year == config['year']
+        df = df[keep].reset_index(drop=True)
+
+    unit_col = config.get('unit_col', levels[-1]['by'][0])
+    original = df[vol_cols].sum()
+    totals = {f'{k}_original': original[col] for k, col in volumes.items()}
+    totals['units_reporting_production_original'] = df[unit_col].nunique()
+
+    # Group level by level. Columns that later levels group by are carried
+    # along with their last value.
+    attr_aggs = _attribute_aggs(config)
+    for i, level in enumerate(levels):
+        keys = list(level['by'])
+        later_keys = [c for lvl in levels[i + 1:] for c in lvl['by']]
+        aggs = {col: 'last' for col in later_keys if col not in keys}
+        aggs.update({col: func for col, func in attr_aggs.items()
+                     if col not in keys and col in df.columns})
+        aggs.update({col: 'sum' for col in vol_cols})
+        if days_col:
+            aggs[days_col] = level.get('days', 'sum')
+        df = df.groupby(by=keys, as_index=False, sort=False).agg(aggs)
+
+    if config.get('drop_zero', False):
+        no_prod = (df[vol_cols].fillna(0) == 0).all(axis=1)
+        df = df[~no_prod].reset_index(drop=True)
+
+    agg = df[vol_cols].sum()
+    totals.update({f'{k}_agg': agg[col] for k, col in volumes.items()})
+    print(f'{label}: {totals["units_reporting_production_original"]} reporting units, {len(df)} annual records')
+    return df, totals
+
+
+def update_before_after_table(table, state, totals):
+    """Write the totals returned by `rollup_production` to `table`, in place.
+
+    Only keys that are columns of `table` are written (e.g. the
+    'water_original' total is skipped if there's no such column).
+    """
+    for key, value in totals.items():
+        if key in table.columns:
+            table.at[state, key] = value
+
+
+def _read_and_rollup(state, config, store_root):
+    """Read one state's raw data with its 'reader' and roll it up. Runs in a worker."""
+    start = datetime.datetime.now()
+    df = config['reader']()
+    annual, totals = rollup_production(df, config, state=state, store_root=store_root)
+    print(f'{state}: done in {datetime.datetime.now() - start}')
+    return annual, totals
+
+
+def rollup_states(configs, n_workers=4, executor='thread', before_after_table=None,
+                  store_root=None):
+    """Read and roll up the production of several states concurrently.
+
+    Parameters
+    ----------
+    configs : dict
+        {state name: config}, where each config has a 'reader' function.
+    n_workers : int, optional (default 4)
+        Number of states processed at once.
+    executor : str, optional (default 'thread')
+        'thread' or 'process'. Threads only run one state's Python code at a
+        time: they overlap file I/O and the parts of pandas that release the
+        GIL, but not CPU-bound parsing such as `pd.read_excel`, so the
+        default doesn't use all cores. Readers of Excel workbooks should
+        therefore use `excel_cache.read_excel_many`, which parses in separate
+        processes. A process pool runs everything in parallel, but requires
+        the readers and 'prepare' functions to be defined at module level
+        (not lambdas) and the calling script to be guarded with
+        `if __name__ == '__main__':`. Our integration scripts are run top to
+        bottom without such a guard, so they use threads.
+    before_after_table : DataFrame, optional
+        If given, each state's totals are written to it with
+        `update_before_after_table`.
+    store_root : str, optional
+        If given, each state's monthly records are also written to the
+        production store in this folder.
+
+    Returns
+    -------
+    results : dict
+        {state name: annual DataFrame}, in the order of `configs`.
+    totals : dict
+        {state name: totals dict}.
+
+    """
+    pool_class = {'thread': ThreadPoolExecutor,
+                  'process': ProcessPoolExecutor}[executor]
+    with pool_class(max_workers=n_workers) as pool:
+        futures = {state: pool.submit(_read_and_rollup, state, config, store_root)
+                   for state, config in configs.items()}
+        outputs = {state: fut.result() for state, fut in futures.items()}
+
+    results = {state: out[0] for state, out in outputs.items()}
+    totals = {state: out[1] for state, out in outputs.items()}
+    if before_after_table is not None:
+        for state, state_totals in totals.items():
+            update_before_after_table(before_after_table, state, state_totals)
+    return results, totals
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Partitioned, multi-year store of monthly well production.
+
+Production integration keeps only one reporting year, so answering a
+question about another year means re-reading the raw sources. This module
+instead persists normalized *monthly* volumes in a Parquet dataset
+partitioned by COUNTRY / STATE_PROV / YEAR (hive-style folders, zstd
+compressed):
+
+    production_store\\COUNTRY=United States of America\\STATE_PROV=ALASKA\\YEAR=2022\\part-0.parquet
+
+Every record has the columns in STORE_COLUMNS. Wells are keyed by WELL_KEY,
+an int64 packed from the well identifier (see `pack_well_ids`), and rows are
+sorted by WELL_KEY within each file, so a lookup by well or lease only reads
+the matching row groups of the matching partitions. `annual_production`
+derives the annual production table of any stored year, ready to be merged
+with well locations and passed to `integrate_production`.
+
+Example usage
+---
+    write_production(monthly, 'production_store')
+    one_well = read_production('production_store', wells=['50-029-20001'])
+    ak_2021 = annual_production('production_store', 2021, states=['ALASKA'])
+
+@author: maobrien
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITION_COLUMNS = ['COUNTRY', 'STATE_PROV', 'YEAR']
+VOLUME_COLUMNS = ['OIL_BBL', 'GAS_MCF', 'WATER_BBL', 'CONDENSATE_BBL']
+STORE_COLUMNS = (['WELL_KEY', 'FAC_ID', 'LEASE_ID', 'MONTH'] + VOLUME_COLUMNS
+                 + ['PROD_DAYS'] + PARTITION_COLUMNS)
+
+_SCHEMA = pa.schema([('WELL_KEY', pa.int64()),
+                     ('FAC_ID', pa.string()),
+                     ('LEASE_ID', pa.string()),
+                     ('MONTH', pa.int8()),
+                     ('OIL_BBL', pa.float64()),
+                     ('GAS_MCF', pa.float64()),
+                     ('WATER_BBL', pa.float64()),
+                     ('CONDENSATE_BBL', pa.float64()),
+                     ('PROD_DAYS', pa.float32()),
+                     ('COUNTRY', pa.string()),
+                     ('STATE_PROV', pa.string()),
+                     ('YEAR', pa.int16())])
+_PARTITIONING = ds.partitioning(pa.schema([('COUNTRY', pa.string()),
+                                           ('STATE_PROV', pa.string()),
+                                           ('YEAR', pa.int16())]),
+                                flavor='hive')
+
+
+def pack_well_ids(ids):
+    """Pack well identifiers into int64 keys.
+
+    Identifiers made only of digits and separators (API numbers such as
+    '05-123-45678-00', UWIs without letters) become the integer of their
+    digits, so '0512345678' and '05-123-45678' get the same key. Any other
+    identifier is hashed, with the sign bit set, so hashed and numeric keys
+    never collide.
+
+    Parameters
+    ----------
+    ids : array-like of str or int
+
+    Returns
+    -------
+    keys : numpy array of int64
+    """
+    ids = pd.Series(ids, dtype='string').str.strip()
+    digits = ids.str.replace(r'[\s\-_./]', '', regex=True)
+    numeric = digits.str.fullmatch(r'\d{1,18}').fillna(False).to_numpy(dtype=bool)
+
+    keys = np.zeros(len(ids), dtype=np.int64)
+    keys[numeric] = digits[numeric].astype('int64').to_numpy()
+    if (~numeric).any():
+        hashed = pd.util.hash_pandas_object(ids[~numeric].fillna(''), index=False).to_numpy()
+        keys[~numeric] = (hashed | np.uint64(1 << 63)).view(np.int64)
+    return keys
+
+
+def normalize_monthly(df,
+                      fac_id,
+                      country,
+                      state_prov,
+                      volumes,
+                      prod_days=None,
+                      lease_id=None,
+                      date_col=None,
+                      year_col=None,
+                      month_col=None):
+    """Convert one source's monthly production records to the store's columns.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Monthly production records.
+    fac_id : str
+        Column identifying the well (or other producing entity).
+    country, state_prov : str
+        Country and state/province names, as in the OGIM COUNTRY and
+        STATE_PROV fields.
+    volumes : dict
+        Maps store columns ('OIL_BBL', 'GAS_MCF', 'WATER_BBL',
+        'CONDENSATE_BBL') to source columns; missing volumes are stored as
+        NaN.
+    prod_days : str, optional
+        Producing days column.
+    lease_id : str, optional
+        Lease (or unit, PRU) column, for lookups by lease.
+    date_col : str, optional
+        Report date column. Otherwise, `year_col` and `month_col` are used.
+    year_col, month_col : str, optional
+        Year and month number columns.
+
+    Returns
+    -------
+    monthly : DataFrame
+        One row per well and month, with the columns in STORE_COLUMNS.
+        Multiple source rows of the same well and month (e.g. one per pool)
+        are combined: volumes are summed, producing days take the maximum.
+    """
+    if date_col is not None:
+        dates = pd.to_datetime(df[date_col])
+        year, month = dates.dt.year, dates.dt.month
+    else:
+        year, month = df[year_col], df[month_col]
+
+    out = pd.DataFrame({'FAC_ID': df[fac_id].astype('string').str.strip().to_numpy(),
+                        'LEASE_ID': (df[lease_id].astype('string').to_numpy()
+                                     if lease_id is not None else pd.NA),
+                        'YEAR': year.to_numpy(),
+                        'MONTH': month.to_numpy()})
+    for col in VOLUME_COLUMNS:
+        out[col] = (pd.to_numeric(df[volumes[col]], errors='coerce').to_numpy()
+                    if volumes.get(col) is not None else np.nan)
+    out['PROD_DAYS'] = (pd.to_numeric(df[prod_days], errors='coerce').to_numpy()
+                        if prod_days is not None else np.nan)
+
+    grouped = out.groupby(['FAC_ID', 'YEAR', 'MONTH'], sort=False, dropna=False)
+    out = grouped[VOLUME_COLUMNS].sum(min_count=1)
+    out['PROD_DAYS'] = grouped['PROD_DAYS'].max()
+    out['LEASE_ID'] = grouped['LEASE_ID'].last()
+    out = out.reset_index()
+    out['WELL_KEY'] = pack_well_ids(out['FAC_ID'])
+    out['COUNTRY'] = country
+    out['STATE_PROV'] = state_prov
+    return out[STORE_COLUMNS]
+
+
+def write_production(monthly, root, compression='zstd'):
+    """Write normalized monthly production to the store.
+
+    Partitions (country / state / year) present in `monthly` replace any
+    stored data of the same partitions; other partitions are left alone, so
+    each state and year can be (re)written on its own.
+
+    Parameters
+    ----------
+    monthly : DataFrame
+        Output of `normalize_monthly` (possibly of several sources combined).
+    root : str
+        Folder of the store.
+    compression : str, optional (default 'zstd')
+        Parquet compression codec.
+    """
+    monthly = monthly[STORE_COLUMNS].sort_values(PARTITION_COLUMNS + ['WELL_KEY', 'MONTH'])
+    table = pa.Table.from_pandas(monthly, schema=_SCHEMA, preserve_index=False)
+    ds.write_dataset(table,
+                     root,
+                     format='parquet',
+                     partitioning=_PARTITIONING,
+                     existing_data_behavior='delete_matching',
+                     file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+                     max_rows_per_group=64 * 1024)
+    print(f'{len(monthly)} monthly records written to {os.path.abspath(root)}')
+
+
+def _filter(wells=None, leases=None, years=None, states=None, countries=None):
+    expr = None
+    conditions = []
+    if countries is not None:
+        conditions.append(ds.field('COUNTRY').isin(list(countries)))
+    if states is not None:
+        conditions.append(ds.field('STATE_PROV').isin(list(states)))
+    if years is not None:
+        years = [years] if np.isscalar(years) else years
+        conditions.append(ds.field('YEAR').isin([int(y) for y in years]))
+    if wells is not None:
+        wells = [wells] if isinstance(wells, (str, int)) else wells
+        conditions.append(ds.field('WELL_KEY').isin(pack_well_ids(wells).tolist()))
+    if leases is not None:
+        leases = [leases] if isinstance(leases, str) else leases
+        conditions.append(ds.field('LEASE_ID').isin([str(x) for x in leases]))
+    for cond in conditions:
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def read_production(root, wells=None, leases=None, years=None, states=None,
+                    countries=None, columns=None):
+    """Read monthly production from the store.
+
+    Only the partitions and row groups that can match the filters are read.
+
+    Parameters
+    ----------
+    root : str
+        Folder of the store.
+    wells : str or list, optional
+        Well identifiers, in any format `pack_well_ids` accepts (e.g. with
+        or without dashes).
+    leases : str or list, optional
+        Lease identifiers.
+    years : int or list of int, optional
+    states : list of str, optional
+    countries : list of str, optional
+    columns : list of str, optional
+        Columns to read; default all of STORE_COLUMNS.
+
+    Returns
+    -------
+    monthly : DataFrame
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning=_PARTITIONING)
+    table = dataset.to_table(columns=columns,
+                             filter=_filter(wells, leases, years, states, countries))
+    return table.to_pandas()
+
+
+def _sum_volumes(df, keys, days):
+    """Sum volumes by `keys` (NaN if all values of a group are missing) and combine days with `days`."""
+    grouped = df.groupby(keys, sort=False, observed=True)
+    out = grouped[VOLUME_COLUMNS].sum(min_count=1)
+    out['PROD_DAYS'] = getattr(grouped['PROD_DAYS'], days)()
+    return out
+
+
+def annual_production(root, year, states=None, countries=None, by='FAC_ID'):
+    """Derive one year's annual production from the stored monthly records.
+
+    Parameters
+    ----------
+    root : str
+        Folder of the store.
+    year : int
+        Reporting year.
+    states, countries : list of str, optional
+        Limit the result to these states / countries.
+    by : str, optional (default 'FAC_ID')
+        'FAC_ID' for one record per well, or 'LEASE_ID' for one per lease.
+
+    Returns
+    -------
+    annual : DataFrame
+        One row per well (or lease) with COUNTRY, STATE_PROV, the summed
+        volumes, PROD_DAYS (sum of the monthly maxima, capped at the days in
+        the year) and PROD_YEAR.
+    """
+    monthly = read_production(root, years=year, states=states, countries=countries)
+    keys = ['COUNTRY', 'STATE_PROV', by]
+    if by == 'LEASE_ID':
+        # Wells of a lease produce at the same time, so lease days are the
+        # maximum of their wells in each month
+        monthly = _sum_volumes(monthly, keys + ['MONTH'], days='max').reset_index()
+    annual = _sum_volumes(monthly, keys, days='sum').reset_index()
+
+    days_in_year = 366 if pd.Timestamp(year=int(year), month=1, day=1).is_leap_year else 365
+    annual['PROD_DAYS'] = annual['PROD_DAYS'].clip(upper=days_in_year)
+    annual['PROD_YEAR'] = int(year)
+    return annual
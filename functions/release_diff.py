@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Hash-based change detection between two OGIM releases.
+
+Instead of loading two whole GeoPackages and joining them, `diff_releases`
+streams both releases layer by layer, in chunks of rows, and reduces every
+record to a few 64-bit fingerprints:
+
+    IDENTITY    hash of the source identity (SRC_REF_ID, FAC_ID)
+    ATTRIBUTES  hash of the normalized attributes (strings stripped and upper
+                case, numbers rounded, OGIM N/A values made equal)
+    GEOMETRY    hash of the geometry snapped to a grid (default 1e-5 degrees,
+                about 1 m), so floating point noise isn't a change
+
+Only the fingerprints (plus COUNTRY, OGIM_ID and a representative point) are
+kept in memory, so memory is bounded by the number of records of a layer,
+not by the size of its geometries and attributes. The two releases are then
+compared with hash joins on IDENTITY, and every record is classified as:
+
+    'added'               new record not paired with an old one
+    'removed'             old record not paired with a new one
+    'moved'               geometry changed (attributes may have changed too;
+                          see ATTR_CHANGED)
+    'attribute_changed'   same geometry, different attributes
+    'unchanged'           (not written to the change log)
+
+Records are paired within their identity in three passes, each on the
+records the previous passes left unpaired:
+
+    1. identical records (same identity, geometry and attributes)
+    2. records with the same geometry ('attribute_changed')
+    3. moves: if an identity has one record left in each release, they are
+       paired; otherwise records are paired nearest first, within
+       `max_move_m` ('moved')
+
+Identities shared by many records (whole sources have FAC_ID 'N/A') are
+therefore handled correctly: one inserted or deleted record is one 'added'
+or 'removed' row, and doesn't shift the pairing of the others.
+
+Example usage
+---
+    changes, stats = diff_releases('OGIM_v2.5.gpkg', 'OGIM_v2.7.gpkg', out_dir='diff_v2.5_v2.7')
+    stats.query("LAYER == 'Oil_and_Natural_Gas_Wells'")
+
+@author: maobrien
+"""
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import pyproj
+import shapely
+
+from conflation import EARTH_RADIUS_M, lonlat_to_xyz
+from target_extraction import list_layers, layer_columns
+
+IDENTITY_COLS = ['SRC_REF_ID', 'FAC_ID']
+# Columns that don't describe the facility (OGIM_ID is renumbered in every
+# release, and LATITUDE / LONGITUDE are covered by the geometry hash)
+EXCLUDED_COLS = ['OGIM_ID', 'LATITUDE', 'LONGITUDE']
+NA_VALUES = ['N/A', 'NAN', 'NONE', '-999', '-999.0', '1900-01-01']
+CHANGES = ['added', 'removed', 'moved', 'attribute_changed']
+_NEIGHBOURS = np.array([(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)])
+GEOD = pyproj.Geod(ellps='WGS84')
+
+
+# =============================================================================
+# Reading layers in chunks
+# =============================================================================
+def _layer_length(path, layer):
+    try:
+        import pyogrio
+        return int(pyogrio.read_info(path, layer=layer, force_feature_count=True)['features'])
+    except ImportError:
+        import fiona
+        with fiona.open(path, layer=layer) as src:
+            return len(src)
+
+
+def iter_layer(path, layer, columns=None, chunk_size=500_000):
+    """Yield a layer of a GeoPackage as GeoDataFrames of at most `chunk_size` rows."""
+    n = _layer_length(path, layer)
+    kwargs = {'columns': columns} if columns is not None else {}
+    for start in range(0, n, chunk_size):
+        yield gpd.read_file(path, layer=layer, rows=slice(start, min(start + chunk_size, n)), **kwargs)
+
+
+# =============================================================================
+# Fingerprints
+# =============================================================================
+def _normalize(df, decimals=6):
+    """Return `df` as normalized strings, so equal values hash equally across releases."""
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            s = s.astype(float).round(decimals)
+        s = s.astype(str).str.strip().str.upper()
+        out[col] = s.where(~s.isin(NA_VALUES) & df[col].notna().to_numpy(), '')
+    return out
+
+
+def _hash(df):
+    if df.shape[1] == 0:
+        return np.zeros(len(df), dtype=np.int64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().view(np.int64)
+
+
+def fingerprint(gdf, attr_cols, id_cols=IDENTITY_COLS, grid_size=1e-5):
+    """Reduce the records of a layer to their identity, attribute and geometry hashes.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame
+        Records of one layer (or a chunk of it).
+    attr_cols : list of str
+        Attribute columns compared between releases.
+    id_cols : list of str, optional
+        Columns of the source identity (default SRC_REF_ID and FAC_ID).
+    grid_size : float, optional (default 1e-5)
+        Grid the geometries are snapped to before hashing, in CRS units.
+
+    Returns
+    -------
+    fp : DataFrame
+        IDENTITY, ATTRIBUTES and GEOMETRY hashes, OGIM_ID, COUNTRY and the
+        coordinates (X, Y) of a point on each geometry.
+    """
+    geoms = gdf.geometry.to_numpy()
+    snapped = shapely.set_precision(geoms, grid_size)
+    wkb = pd.Series(shapely.to_wkb(snapped, hex=True), index=gdf.index).fillna('')
+    point = shapely.point_on_surface(geoms)
+
+    fp = pd.DataFrame({'IDENTITY': _hash(_normalize(gdf[[c for c in id_cols if c in gdf]])),
+                       'ATTRIBUTES': _hash(_normalize(gdf[attr_cols])),
+                       'GEOMETRY': _hash(wkb.to_frame()),
+                       'X': shapely.get_x(point),
+                       'Y': shapely.get_y(point)})
+    fp['OGIM_ID'] = gdf['OGIM_ID'].to_numpy() if 'OGIM_ID' in gdf else -1
+    fp['COUNTRY'] = gdf['COUNTRY'].astype(str).to_numpy() if 'COUNTRY' in gdf else 'N/A'
+    for col in id_cols:
+        fp[col] = gdf[col].astype(str).to_numpy() if col in gdf else 'N/A'
+    return fp
+
+
+def layer_fingerprints(path, layer, attr_cols, id_cols=IDENTITY_COLS, grid_size=1e-5,
+                       chunk_size=500_000):
+    """Fingerprints of a whole layer, read `chunk_size` rows at a time (in EPSG:4326)."""
+    columns = list(dict.fromkeys([c for c in id_cols + attr_cols + ['OGIM_ID', 'COUNTRY']
+                                  if c in layer_columns(path, layer)]))
+    chunks = []
+    for chunk in iter_layer(path, layer, columns=columns, chunk_size=chunk_size):
+        if chunk.crs is not None and not chunk.crs.equals('epsg:4326'):
+            chunk = chunk.to_crs('epsg:4326')
+        chunks.append(fingerprint(chunk, attr_cols, id_cols, grid_size))
+    if not chunks:
+        return fingerprint(gpd.GeoDataFrame(columns=columns, geometry=[]), attr_cols, id_cols, grid_size)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# =============================================================================
+# Comparing releases
+# =============================================================================
+def _match(old, new, keys):
+    """Pair records equal on `keys`, the n-th of the old release with the n-th of the new.
+
+    Returns the positions of the paired records in `old` and `new`.
+    """
+    o = old[keys].assign(_N=old.groupby(keys, sort=False).cumcount().to_numpy(),
+                         _OLD=np.arange(len(old)))
+    n = new[keys].assign(_N=new.groupby(keys, sort=False).cumcount().to_numpy(),
+                         _NEW=np.arange(len(new)))
+    pairs = o.merge(n, on=keys + ['_N'])
+    return pairs._OLD.to_numpy(), pairs._NEW.to_numpy()
+
+
+def _match_moves(old, new, max_move_m):
+    """Pair records of the same identity whose geometry changed.
+
+    An identity with one record left in each release is paired whatever the
+    distance. Otherwise records are paired nearest first (mutual nearest
+    neighbours, repeatedly), within `max_move_m`.
+
+    Returns the positions of the paired records in `old` and `new`.
+    """
+    old_counts = old.IDENTITY.map(old.IDENTITY.value_counts()).to_numpy()
+    new_counts = old.IDENTITY.map(new.IDENTITY.value_counts()).fillna(0).to_numpy()
+    single = (old_counts == 1) & (new_counts == 1)
+    o_single, n_single = _match(old[single], new, ['IDENTITY'])
+    o_single = np.flatnonzero(single)[o_single]
+
+    # Candidate pairs within max_move_m, found with a 3D grid hash join
+    o_rest = np.flatnonzero(~single & np.isfinite(old.X.to_numpy()) & np.isfinite(old.Y.to_numpy()))
+    n_rest = np.setdiff1d(np.flatnonzero(np.isfinite(new.X.to_numpy()) & np.isfinite(new.Y.to_numpy())),
+                          n_single)
+    o_cells = np.floor(lonlat_to_xyz(old.X.to_numpy()[o_rest], old.Y.to_numpy()[o_rest])
+                       * EARTH_RADIUS_M / max_move_m).astype(np.int64)
+    n_cells = np.floor(lonlat_to_xyz(new.X.to_numpy()[n_rest], new.Y.to_numpy()[n_rest])
+                       * EARTH_RADIUS_M / max_move_m).astype(np.int64)
+    expanded = pd.DataFrame((o_cells[:, None, :] + _NEIGHBOURS[None, :, :]).reshape(-1, 3),
+                            columns=['cx', 'cy', 'cz'])
+    expanded['o'] = np.repeat(o_rest, len(_NEIGHBOURS))
+    expanded['IDENTITY'] = old.IDENTITY.to_numpy()[expanded.o.to_numpy()]
+    targets = pd.DataFrame(n_cells, columns=['cx', 'cy', 'cz'])
+    targets['n'] = n_rest
+    targets['IDENTITY'] = new.IDENTITY.to_numpy()[n_rest]
+    cand = expanded.merge(targets, on=['IDENTITY', 'cx', 'cy', 'cz'])[['o', 'n']]
+    if cand.empty:
+        return o_single.astype(np.int64), n_single.astype(np.int64)
+    o, n = cand.o.to_numpy(), cand.n.to_numpy()
+    _, _, dist = GEOD.inv(old.X.to_numpy()[o], old.Y.to_numpy()[o], new.X.to_numpy()[n], new.Y.to_numpy()[n])
+    cand = cand[dist <= max_move_m].assign(DIST=dist[dist <= max_move_m])
+    cand = cand.sort_values('DIST', kind='stable')
+
+    o_near, n_near = [], []
+    while len(cand):
+        # Pairs that are each other's nearest remaining record
+        mutual = cand.drop_duplicates('o').merge(cand.drop_duplicates('n'), on=['o', 'n'])
+        o_near.append(mutual.o.to_numpy())
+        n_near.append(mutual.n.to_numpy())
+        cand = cand[~cand.o.isin(mutual.o) & ~cand.n.isin(mutual.n)]
+    return (np.concatenate([o_single] + o_near).astype(np.int64),
+            np.concatenate([n_single] + n_near).astype(np.int64))
+
+
+def compare_fingerprints(old, new, layer=None, max_move_m=1000):
+    """Classify the records of two releases of a layer (see the module docstring).
+
+    Returns the change log: one row per added, removed, moved or
+    attribute-changed record, with its identity, COUNTRY (of the new record,
+    or the old one if removed), the old and new OGIM_ID, ATTR_CHANGED and,
+    for moved records, MOVE_M (distance in m between their points).
+    """
+    old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+    old_left, new_left = np.ones(len(old), dtype=bool), np.ones(len(new), dtype=bool)
+    paired_old, paired_new = [], []
+    # Each pass only pairs the records the previous ones left unpaired;
+    # identical records (first pass) aren't logged
+    for keys, logged in ((['IDENTITY', 'GEOMETRY', 'ATTRIBUTES'], False),
+                         (['IDENTITY', 'GEOMETRY'], True),
+                         (None, True)):
+        o_pos, n_pos = np.flatnonzero(old_left), np.flatnonzero(new_left)
+        if keys is None:
+            o, n = _match_moves(old.iloc[o_pos], new.iloc[n_pos], max_move_m)
+        else:
+            o, n = _match(old.iloc[o_pos], new.iloc[n_pos], keys)
+        o, n = o_pos[o], n_pos[n]
+        old_left[o], new_left[n] = False, False
+        if logged:
+            paired_old.append(o)
+            paired_new.append(n)
+
+    o, n = np.concatenate(paired_old), np.concatenate(paired_new)
+    merged = pd.concat([
+        old.iloc[o].reset_index(drop=True).add_suffix('_OLD')
+        .join(new.iloc[n].reset_index(drop=True).add_suffix('_NEW')).assign(_merge='both'),
+        old[old_left].add_suffix('_OLD').assign(_merge='left_only'),
+        new[new_left].add_suffix('_NEW').assign(_merge='right_only')], ignore_index=True)
+
+    change = np.select([merged._merge == 'right_only',
+                        merged._merge == 'left_only',
+                        merged.GEOMETRY_OLD != merged.GEOMETRY_NEW,
+                        merged.ATTRIBUTES_OLD != merged.ATTRIBUTES_NEW],
+                       ['added', 'removed', 'moved', 'attribute_changed'],
+                       default='unchanged')
+    merged['CHANGE'] = change
+    merged = merged[merged.CHANGE != 'unchanged'].reset_index(drop=True)
+
+    log = pd.DataFrame({'LAYER': layer, 'CHANGE': merged.CHANGE})
+    for col in IDENTITY_COLS + ['COUNTRY']:
+        if f'{col}_NEW' in merged:
+            log[col] = merged[f'{col}_NEW'].fillna(merged[f'{col}_OLD'])
+    log['OGIM_ID_OLD'] = merged.OGIM_ID_OLD.astype('Int64')
+    log['OGIM_ID_NEW'] = merged.OGIM_ID_NEW.astype('Int64')
+    log['ATTR_CHANGED'] = ((merged._merge == 'both')
+                           & (merged.ATTRIBUTES_OLD != merged.ATTRIBUTES_NEW)).to_numpy()
+    moved = (log.CHANGE == 'moved').to_numpy()
+    log['MOVE_M'] = np.nan
+    if moved.any():
+        _, _, dist = GEOD.inv(merged.X_OLD[moved].to_numpy(), merged.Y_OLD[moved].to_numpy(),
+                              merged.X_NEW[moved].to_numpy(), merged.Y_NEW[moved].to_numpy())
+        log.loc[moved, 'MOVE_M'] = dist
+    return log
+
+
+def diff_releases(old_gpkg, new_gpkg, out_dir=None, layers=None, id_cols=IDENTITY_COLS,
+                  exclude_cols=EXCLUDED_COLS, grid_size=1e-5, chunk_size=500_000, max_move_m=1000):
+    """Compare two OGIM releases layer by layer.
+
+    Parameters
+    ----------
+    old_gpkg, new_gpkg : str
+        Paths to the two GeoPackages.
+    out_dir : str, optional
+        If given, the change log ('changes.parquet') and the statistics
+        ('change_stats.csv') are written to this folder.
+    layers : list of str, optional
+        Layers to compare. Default every layer of either release; a layer
+        present in only one release is all 'added' or all 'removed'.
+    id_cols : list of str, optional
+        Source identity columns (default SRC_REF_ID and FAC_ID).
+    exclude_cols : list of str, optional
+        Columns left out of the attribute hash (default OGIM_ID, LATITUDE,
+        LONGITUDE). Only columns present in both releases are compared.
+    grid_size : float, optional (default 1e-5 degrees)
+        Geometries are snapped to this grid before hashing.
+    chunk_size : int, optional (default 500,000)
+        Number of rows read at a time.
+    max_move_m : float, optional (default 1000)
+        Records of an identity shared by several records are only paired as
+        'moved' if they are at most this far apart; see the module docstring.
+
+    Returns
+    -------
+    changes : DataFrame
+        Change log of all layers; see `compare_fingerprints`.
+    stats : DataFrame
+        Number of records per LAYER, COUNTRY and CHANGE, one column per
+        kind of change.
+    """
+    old_layers, new_layers = list_layers(old_gpkg), list_layers(new_gpkg)
+    layers = layers or list(dict.fromkeys(new_layers + old_layers))
+
+    logs = []
+    for layer in layers:
+        start = datetime.datetime.now()
+        old_cols = layer_columns(old_gpkg, layer) if layer in old_layers else []
+        new_cols = layer_columns(new_gpkg, layer) if layer in new_layers else []
+        shared = old_cols if not new_cols else new_cols if not old_cols else \
+            [c for c in new_cols if c in old_cols]
+        attr_cols = [c for c in shared if c not in exclude_cols and c not in id_cols]
+
+        fps = []
+        for path, present in [(old_gpkg, layer in old_layers), (new_gpkg, layer in new_layers)]:
+            if present:
+                fps.append(layer_fingerprints(path, layer, attr_cols, id_cols, grid_size, chunk_size))
+            else:
+                fps.append(fingerprint(gpd.GeoDataFrame(columns=attr_cols, geometry=[]),
+                                       attr_cols, id_cols, grid_size))
+        log = compare_fingerprints(fps[0], fps[1], layer=layer, max_move_m=max_move_m)
+        logs.append(log)
+        print(f'{layer}: {len(fps[0])} -> {len(fps[1])} records, '
+              + ', '.join(f'{(log.CHANGE == c).sum()} {c}' for c in CHANGES)
+              + f' ({datetime.datetime.now() - start})')
+
+    changes = pd.concat(logs, ignore_index=True)
+    stats = (changes.groupby(['LAYER', 'COUNTRY', 'CHANGE']).size()
+             .unstack('CHANGE', fill_value=0)
+             .reindex(columns=CHANGES, fill_value=0)
+             .reset_index())
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        changes.to_parquet(os.path.join(out_dir, 'changes.parquet'), index=False)
+        stats.to_csv(os.path.join(out_dir, 'change_stats.csv'), index=False)
+    return changes, stats
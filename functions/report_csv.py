@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Single-pass reader for "report-style" CSVs: regulator reports such as the
+AER ST13B/ST13C/ST50A volumetric reports or Petrinex downloads, which wrap a
+plain table in title lines, repeated subheader / subtotal lines and a footer
+of notes.
+
+Rather than reading the whole file into a list, writing a cleaned copy to
+disk and parsing that copy with `pd.read_csv`, `read_report_csv` filters the
+lines as they are read and feeds them straight into the pandas C parser.
+Only `footer_lines` lines are ever held back (to recognise the footer), so
+memory use doesn't depend on the size of the report; with `chunksize`, even
+the parsed result is produced a piece at a time.
+
+Example usage
+---
+    st13b = read_report_csv('facilities\\AB_ST13B_GP_2024_Annual_Stats_Receipts_Disp.csv',
+                            subheader_prefixes=['Monthly Gas', 'Gas Plant', 'Sub total'],
+                            footer_lines=8,
+                            on_bad_lines='skip',
+                            index_col=False)
+
+@author: maobrien
+"""
+import io
+from collections import deque
+
+import pandas as pd
+
+
+class ReportLineFilter(io.TextIOBase):
+    '''Read-only text stream over a report CSV, with unwanted lines removed on the fly.
+
+    Parameters
+    ----------
+    path : str
+        Path to the report CSV.
+    subheader_prefixes : list of str, optional
+        Drop lines whose first field starts with any of these strings.
+    skip_rows : list of int, optional
+        Drop these (0-based) raw line numbers, e.g. title lines above the
+        header, like the `skiprows` parameter of `pd.read_csv`.
+    footer_lines : int, optional (default 0)
+        Drop the last `footer_lines` lines of the file, blank or not.
+    skip_blank : bool, optional (default True)
+        Drop empty lines.
+    encoding : str, optional (default 'latin-1')
+        Encoding of the report.
+
+    After the stream has been read, `n_dropped` counts the lines dropped for
+    each reason.
+    '''
+
+    def __init__(self, path, subheader_prefixes=(), skip_rows=(), footer_lines=0,
+                 skip_blank=True, encoding='latin-1'):
+        self._file = open(path, mode='r', encoding=encoding)
+        self._prefixes = tuple(subheader_prefixes)
+        self._skip_rows = set(skip_rows)
+        self._footer_lines = footer_lines
+        self._skip_blank = skip_blank
+        self._lines = self._filtered_lines()
+        self._pending = ''
+        self.n_dropped = {'skip_rows': 0, 'subheader': 0, 'blank': 0, 'footer': 0}
+
+    def _keep(self, line):
+        if self._skip_blank and not line.strip():
+            self.n_dropped['blank'] += 1
+            return False
+        if self._prefixes:
+            first_field = line[1:] if line.startswith('"') else line
+            if first_field.startswith(self._prefixes):
+                self.n_dropped['subheader'] += 1
+                return False
+        return True
+
+    def _filtered_lines(self):
+        # Hold back the last `footer_lines` lines until we know they aren't
+        # the footer
+        held = deque()
+        for i, line in enumerate(self._file):
+            if i in self._skip_rows:
+                self.n_dropped['skip_rows'] += 1
+                continue
+            held.append(line)
+            if len(held) > self._footer_lines:
+                line = held.popleft()
+                if self._keep(line):
+                    yield line
+        self.n_dropped['footer'] += len(held)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            out = self._pending + ''.join(self._lines)
+            self._pending = ''
+            return out
+        parts, n = [self._pending], len(self._pending)
+        while n < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            n += len(line)
+        text = ''.join(parts)
+        self._pending = text[size:]
+        return text[:size]
+
+    def readline(self, size=-1):
+        if self._pending:
+            line, sep, rest = self._pending.partition('\n')
+            if sep:
+                self._pending = rest
+                return line + sep
+            self._pending = ''
+            return line + next(self._lines, '')
+        return next(self._lines, '')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _iter_chunks(stream, reader):
+    """Yield DataFrame chunks from a pandas TextFileReader, closing the stream at the end."""
+    try:
+        with reader:
+            for chunk in reader:
+                yield chunk
+    finally:
+        stream.close()
+        print(f'Lines dropped: {stream.n_dropped}')
+
+
+def read_report_csv(path,
+                    subheader_prefixes=(),
+                    skip_rows=(),
+                    footer_lines=0,
+                    skip_blank=True,
+                    encoding='latin-1',
+                    chunksize=None,
+                    **read_csv_kwargs):
+    """Read a report-style CSV in one pass, dropping title, subheader and footer lines.
+
+    Parameters
+    ----------
+    path : str
+        Path to the report CSV.
+    subheader_prefixes : list of str, optional
+        Drop lines whose first field starts with any of these strings (e.g.
+        repeated 'Gas Plant' section titles or 'Sub total' rows).
+    skip_rows : list of int, optional
+        Drop these (0-based) raw line numbers, e.g. title lines above the
+        header.
+    footer_lines : int, optional (default 0)
+        Drop the last `footer_lines` lines of the file, blank or not. Unlike
+        `pd.read_csv(skipfooter=...)`, this works with the fast C parser.
+    skip_blank : bool, optional (default True)
+        Drop empty lines.
+    encoding : str, optional (default 'latin-1')
+        Encoding of the report.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames of `chunksize` rows, so
+        reports of any size can be processed in constant memory.
+    **read_csv_kwargs
+        Passed on to `pd.read_csv`, e.g. `dtype`, `usecols`,
+        `on_bad_lines='skip'` or `index_col=False`.
+
+    Returns
+    -------
+    df : DataFrame, or an iterator of DataFrames if `chunksize` is given
+
+    Example
+    -------
+    proc_data_ = read_report_csv('facilities\\AB_ST50A_GasPlant_Data.csv',
+                                 skip_rows=[0, 1, 2, 3, 4, 6],
+                                 footer_lines=28)
+
+    """
+    stream = ReportLineFilter(path,
+                              subheader_prefixes=subheader_prefixes,
+                              skip_rows=skip_rows,
+                              footer_lines=footer_lines,
+                              skip_blank=skip_blank,
+                              encoding=encoding)
+    read_csv_kwargs.setdefault('engine', 'c')
+
+    if chunksize is not None:
+        reader = pd.read_csv(stream, chunksize=chunksize, **read_csv_kwargs)
+        return _iter_chunks(stream, reader)
+
+    try:
+        df = pd.read_csv(stream, **read_csv_kwargs)
+    finally:
+        stream.close()
+    print(f'Lines dropped: {stream.n_dropped}')
+    return df
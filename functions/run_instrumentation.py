@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Lightweight stage-level timing and memory instrumentation for OGIM
+integration and consolidation runs.
+
+Wrap any step of a run in a `stage` (context manager) or decorate a function
+with `profile_stage`, and the wall time, rows in and out, rows per second and
+peak memory (RSS) of that step are recorded. At the end of the run, call
+`write_report` to save every recorded stage as a JSON or CSV file, so we can
+see where a long consolidation run actually spends its time.
+
+Example usage
+---
+    from run_instrumentation import RunProfiler
+
+    profiler = RunProfiler('OGIM_v3')
+
+    with profiler.stage('data_quality_checks', rows_in=len(gdf)) as s:
+        gdf = data_quality_checks(gdf, starting_ogim_id=1)
+        s.rows_out = len(gdf)
+
+    qc = profiler.profile_stage('data_quality_checks')(data_quality_checks)
+    gdf = qc(gdf, starting_ogim_id=1)   # rows in/out are inferred
+
+    profiler.write_report('OGIM_v3_run_report.json')
+
+@author: maobrien
+"""
+import os
+import sys
+import csv
+import json
+import time
+import datetime
+import functools
+import threading
+
+
+# =============================================================================
+# Memory measurement
+# =============================================================================
+def current_rss_mb():
+    """Return the resident set size of this process in MB, or None if unavailable."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024**2
+    except ImportError:
+        return None
+
+
+def lifetime_peak_rss_mb():
+    """Return the peak resident set size this process has reached so far, in MB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes on Linux
+        if sys.platform == 'darwin':
+            return peak / 1024**2
+        return peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024**2
+        except (ImportError, AttributeError):
+            return None
+
+
+class PeakMemorySampler:
+    '''Record the peak RSS reached while a block of code runs.
+
+    When `psutil` is installed, RSS is sampled on a background thread every
+    `interval` seconds, so the peak reflects only the wrapped block. Without
+    `psutil`, the process-lifetime peak from the `resource` module is used.
+    '''
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_mb = None
+        self.start_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            rss = current_rss_mb()
+            if rss is not None and rss > self.peak_mb:
+                self.peak_mb = rss
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_mb = current_rss_mb()
+        if self.start_mb is not None:
+            self.peak_mb = self.start_mb
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+        else:
+            self.peak_mb = lifetime_peak_rss_mb()
+
+
+# =============================================================================
+# Stage records and the run profiler
+# =============================================================================
+def _count_rows(obj):
+    """Return the number of rows in a (Geo)DataFrame-like object, or None.
+
+    If `obj` is a tuple (e.g. the `(gdf, errors)` returned by `integrate_facs`),
+    the rows of its first element are counted.
+    """
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+    if hasattr(obj, 'shape') and hasattr(obj, 'columns'):
+        return int(obj.shape[0])
+    return None
+
+
+class Stage:
+    '''Measurements for one instrumented step of a run.
+
+    Set `rows_in` and/or `rows_out` inside a `RunProfiler.stage` block if
+    they are not known when the block starts.
+    '''
+
+    def __init__(self, name, rows_in=None, layer=None):
+        self.name = name
+        self.layer = layer
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.started = None
+        self.wall_s = None
+        self.rss_start_mb = None
+        self.peak_rss_mb = None
+        self.status = 'running'
+
+    @property
+    def rows_per_s(self):
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        if rows is None or not self.wall_s:
+            return None
+        return rows / self.wall_s
+
+    def as_dict(self):
+        return {'stage': self.name,
+                'layer': self.layer,
+                'started': self.started,
+                'wall_s': self.wall_s,
+                'rows_in': self.rows_in,
+                'rows_out': self.rows_out,
+                'rows_per_s': self.rows_per_s,
+                'rss_start_mb': self.rss_start_mb,
+                'peak_rss_mb': self.peak_rss_mb,
+                'status': self.status}
+
+
+class RunProfiler:
+    '''Collect `Stage` measurements over one integration or consolidation run.
+
+    Parameters
+    ----------
+    run_name : str
+        Name written to the run report, e.g. 'OGIM_v3' or 'usa_wells'.
+    verbose : bool, optional (default False)
+        If True, print one line per stage as it finishes.
+    sample_memory : bool, optional (default True)
+        If False, skip peak RSS measurement for slightly less overhead.
+
+    '''
+
+    def __init__(self, run_name, verbose=False, sample_memory=True):
+        self.run_name = run_name
+        self.verbose = verbose
+        self.sample_memory = sample_memory
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+
+    def stage(self, name, rows_in=None, layer=None):
+        '''Context manager that times and measures the block it wraps.
+
+        Returns a `Stage` object whose `rows_out` (and `rows_in`) can be set
+        inside the block. Exceptions are recorded in the stage status and
+        re-raised.
+        '''
+        return _StageContext(self, Stage(name, rows_in=rows_in, layer=layer))
+
+    def profile_stage(self, name=None, layer=None):
+        '''Decorator that records each call of a function as a stage.
+
+        Rows in are counted from the first positional argument and rows out
+        from the return value, when they are DataFrames.
+        '''
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                rows_in = _count_rows(args[0]) if args else None
+                with self.stage(stage_name, rows_in=rows_in, layer=layer) as s:
+                    result = func(*args, **kwargs)
+                    s.rows_out = _count_rows(result)
+                return result
+            return wrapper
+        return decorator
+
+    def _finish(self, stage):
+        self.stages.append(stage)
+        if self.verbose:
+            rows = f', {stage.rows_out:,} rows out' if stage.rows_out is not None else ''
+            print(f'[{self.run_name}] {stage.name}'
+                  f'{" (" + stage.layer + ")" if stage.layer else ""}: '
+                  f'{stage.wall_s:.1f} s{rows}')
+
+    def to_records(self):
+        """Return every recorded stage as a list of dicts."""
+        return [s.as_dict() for s in self.stages]
+
+    def summary(self):
+        '''Return total wall time per stage name, slowest first, as a list of dicts.'''
+        totals = {}
+        for s in self.stages:
+            t = totals.setdefault(s.name, {'stage': s.name, 'calls': 0,
+                                           'wall_s': 0.0, 'peak_rss_mb': None})
+            t['calls'] += 1
+            t['wall_s'] += s.wall_s or 0
+            if s.peak_rss_mb is not None:
+                t['peak_rss_mb'] = max(t['peak_rss_mb'] or 0, s.peak_rss_mb)
+        return sorted(totals.values(), key=lambda t: t['wall_s'], reverse=True)
+
+    def print_summary(self):
+        """Print the output of `summary` as a table."""
+        print('=' * 70)
+        print(f'Run report for {self.run_name} (started {self.started})')
+        print('=' * 70)
+        print(f'{"stage":<40}{"calls":>6}{"wall_s":>12}{"peak MB":>12}')
+        for t in self.summary():
+            peak = f'{t["peak_rss_mb"]:.0f}' if t['peak_rss_mb'] is not None else '-'
+            print(f'{t["stage"]:<40}{t["calls"]:>6}{t["wall_s"]:>12.1f}{peak:>12}')
+
+    def write_report(self, path):
+        '''Write all recorded stages to a JSON or CSV file, based on `path` extension.
+
+        Parameters
+        ----------
+        path : str
+            Output file path ending in '.json' or '.csv'.
+
+        Returns
+        -------
+        None
+
+        '''
+        records = self.to_records()
+        if path.lower().endswith('.csv'):
+            fieldnames = list(Stage('').as_dict().keys())
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['run'] + fieldnames)
+                writer.writeheader()
+                for r in records:
+                    writer.writerow({'run': self.run_name, **r})
+        else:
+            report = {'run': self.run_name,
+                      'started': self.started,
+                      'finished': datetime.datetime.now().isoformat(timespec='seconds'),
+                      'pid': os.getpid(),
+                      'stages': records,
+                      'summary': self.summary()}
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+
+class _StageContext:
+    '''Context manager returned by `RunProfiler.stage`.'''
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+        self._mem = PeakMemorySampler() if profiler.sample_memory else None
+        self._t0 = None
+
+    def __enter__(self):
+        self.stage.started = datetime.datetime.now().isoformat(timespec='seconds')
+        if self._mem is not None:
+            self._mem.__enter__()
+        self._t0 = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stage.wall_s = time.perf_counter() - self._t0
+        if self._mem is not None:
+            self._mem.__exit__(exc_type, exc_val, exc_tb)
+            self.stage.rss_start_mb = self._mem.start_mb
+            self.stage.peak_rss_mb = self._mem.peak_mb
+        self.stage.status = 'ok' if exc_type is None else f'error: {exc_type.__name__}'
+        self.profiler._finish(self.stage)
+        return False
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Precomputed summary "cube" of an OGIM release.
+
+Release statistics (feature counts per country, attribute coverage, number
+of operators, status mix, km of pipeline, production totals, ...) used to be
+computed one country or state at a time, by rescanning whole layers with
+`len(data[data.COUNTRY == country])`. `build_summary_cube` instead computes
+all of them for every combination of (layer, COUNTRY, STATE_PROV, REGION,
+CATEGORY) with one groupby per layer, and `save_cube` stores the result, so
+later statistics are a single Parquet read followed by `summarize_cube`.
+
+Cube columns
+---
+    LAYER, COUNTRY, STATE_PROV, REGION, CATEGORY    dimensions ('N/A' if absent)
+    FEATURE_COUNT                 number of features
+    HAS_<ATTRIBUTE>               number of features with a value (not N/A,
+                                  -999 or 1900-01-01) for each attribute
+    N_OPERATORS                   number of distinct operators
+    STATUS_<FAC_STATUS>           number of features of each status
+    PIPELINE_KM                   km of lines (line layers only)
+    OIL_BBL, GAS_MCF, WATER_BBL, CONDENSATE_BBL    production totals
+                                  (production layers only)
+
+Operator counts can't be added up across rows (an operator can be active in
+several states), so the distinct (dimensions, operator) pairs are stored
+alongside the cube; `summarize_cube` uses them to count operators exactly
+at any level.
+
+Example usage
+---
+    cube, operators = build_summary_cube('OGIM_v2.7.gpkg')
+    save_cube(cube, operators, 'OGIM_v2.7_summary')
+    ...
+    cube, operators = load_cube('OGIM_v2.7_summary')
+    by_country = summarize_cube(cube, ['COUNTRY'], operators=operators)
+    wells_by_state = summarize_cube(cube, ['COUNTRY', 'STATE_PROV'], layers=['Oil_and_Natural_Gas_Wells'])
+
+@author: maobrien
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from geodesic_measures import line_lengths_km
+from target_extraction import list_layers
+
+DIMENSIONS = ['COUNTRY', 'STATE_PROV', 'REGION', 'CATEGORY']
+NA_VALUES = ['N/A', '1900-01-01', -999, '-999']
+# N/A value of date columns read as datetime64
+NA_DATE = pd.Timestamp('1900-01-01')
+PRODUCTION_COLUMNS = ['OIL_BBL', 'GAS_MCF', 'WATER_BBL', 'CONDENSATE_BBL']
+# Columns that are never summarized as attributes
+_NOT_ATTRIBUTES = ['OGIM_ID', 'LATITUDE', 'LONGITUDE']
+
+
+def has_value(series):
+    """Return a boolean array, True where `series` holds a real value (not missing or an OGIM N/A value)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        return (series.notna() & (series != NA_DATE)).to_numpy()
+    return (series.notna() & ~series.isin(NA_VALUES)).to_numpy()
+
+
+def _dimension_frame(df, dims):
+    """Dimension columns of a layer, with 'N/A' for missing values and absent columns."""
+    keys = pd.DataFrame(index=df.index)
+    for dim in dims:
+        keys[dim] = df[dim].astype(object).where(df[dim].notna(), 'N/A') if dim in df else 'N/A'
+    return keys
+
+
+def summarize_layer(df, layer, dims=DIMENSIONS, attributes=None,
+                    operator_col='OPERATOR', status_col='FAC_STATUS',
+                    length_col='PIPELINE_LENGTH_KM'):
+    """Compute the cube rows of one layer.
+
+    Parameters
+    ----------
+    df : GeoDataFrame or DataFrame
+        One OGIM layer.
+    layer : str
+        Layer name, written to the LAYER column.
+    dims : list of str, optional
+        Dimension columns (default DIMENSIONS).
+    attributes : list of str, optional
+        Columns whose coverage is counted. Default every column except the
+        dimensions, geometry, OGIM_ID, LATITUDE and LONGITUDE.
+    operator_col, status_col : str, optional
+        Operator and facility status columns (skipped if absent).
+    length_col : str, optional
+        Line length column, in km. For line layers without it, lengths are
+        computed geodesically.
+
+    Returns
+    -------
+    cube : DataFrame
+        One row per combination of dimension values present in the layer.
+    operators : DataFrame
+        Distinct (LAYER, dimensions, OPERATOR) rows.
+    """
+    geom_col = df.geometry.name if isinstance(df, gpd.GeoDataFrame) else None
+    if attributes is None:
+        attributes = [c for c in df.columns
+                      if c not in dims and c != geom_col and c not in _NOT_ATTRIBUTES]
+    keys = _dimension_frame(df, dims)
+
+    # Per-feature values; every metric is then a column of one groupby
+    values = pd.DataFrame({'FEATURE_COUNT': np.ones(len(df), dtype=np.int64)}, index=df.index)
+    for attr in attributes:
+        values[f'HAS_{attr}'] = has_value(df[attr]).astype(np.int64)
+    if status_col in df:
+        status = df[status_col].where(has_value(df[status_col]), 'N/A').astype(str).str.upper()
+        values = values.join(pd.get_dummies(status, prefix='STATUS', prefix_sep='_', dtype=np.int64))
+    if geom_col is not None and df.geom_type.isin(['LineString', 'MultiLineString']).any():
+        if length_col in df:
+            values['PIPELINE_KM'] = df[length_col].where(has_value(df[length_col])).astype(float)
+        else:
+            values['PIPELINE_KM'] = line_lengths_km(df.geometry)
+    for col in PRODUCTION_COLUMNS:
+        if col in df:
+            values[col] = pd.to_numeric(df[col].where(has_value(df[col])), errors='coerce')
+
+    grouped = pd.concat([keys, values], axis=1).groupby(dims, sort=True)
+    cube = grouped.sum(min_count=0).reset_index()
+
+    if operator_col in df:
+        operators = keys[has_value(df[operator_col])].assign(OPERATOR=df[operator_col]).drop_duplicates()
+        n_ops = operators.groupby(dims).size().rename('N_OPERATORS')
+        cube = cube.merge(n_ops.reset_index(), on=dims, how='left')
+        cube['N_OPERATORS'] = cube.N_OPERATORS.fillna(0).astype(np.int64)
+    else:
+        operators = pd.DataFrame(columns=dims + ['OPERATOR'])
+    cube.insert(0, 'LAYER', layer)
+    operators.insert(0, 'LAYER', layer)
+    return cube, operators.reset_index(drop=True)
+
+
+def build_summary_cube(source, layers=None, dims=DIMENSIONS, **kwargs):
+    """Compute the summary cube of all layers of an OGIM release.
+
+    Parameters
+    ----------
+    source : str or dict
+        Path to the OGIM GeoPackage, or {layer name: GeoDataFrame}.
+    layers : list of str, optional
+        Layers to summarize. Default all.
+    dims : list of str, optional
+        Dimension columns (default DIMENSIONS).
+    **kwargs
+        Passed on to `summarize_layer`.
+
+    Returns
+    -------
+    cube, operators : DataFrame
+        See `summarize_layer`; count and total columns absent from a layer
+        are 0 for that layer.
+    """
+    if isinstance(source, dict):
+        layers = layers or list(source)
+        read = source.__getitem__
+    else:
+        layers = layers or list_layers(source)
+        def read(lyr):
+            return gpd.read_file(source, layer=lyr)
+
+    cubes, operators = [], []
+    for lyr in layers:
+        cube, ops = summarize_layer(read(lyr), lyr, dims=dims, **kwargs)
+        cubes.append(cube)
+        operators.append(ops)
+        print(f'{lyr}: {int(cube.FEATURE_COUNT.sum())} features in {len(cube)} cube cells')
+
+    cube = pd.concat(cubes, ignore_index=True)
+    metrics = [c for c in cube.columns if c not in ['LAYER'] + dims]
+    cube[metrics] = cube[metrics].fillna(0)
+    return cube, pd.concat(operators, ignore_index=True)
+
+
+# =============================================================================
+# Storing and querying
+# =============================================================================
+def save_cube(cube, operators, folder):
+    """Save the cube and operator table as Parquet files in `folder`."""
+    os.makedirs(folder, exist_ok=True)
+    cube.to_parquet(os.path.join(folder, 'cube.parquet'), index=False)
+    operators.astype(str).to_parquet(os.path.join(folder, 'operators.parquet'), index=False)
+
+
+def load_cube(folder, operators=True):
+    """Load a cube saved with `save_cube`; returns (cube, operators), operators None if not requested."""
+    cube = pd.read_parquet(os.path.join(folder, 'cube.parquet'))
+    ops = pd.read_parquet(os.path.join(folder, 'operators.parquet')) if operators else None
+    return cube, ops
+
+
+def summarize_cube(cube, by, layers=None, operators=None, coverage_pct=False):
+    """Aggregate the cube to coarser dimensions.
+
+    Parameters
+    ----------
+    cube : DataFrame
+    by : list of str
+        Columns to group by, e.g. ['COUNTRY'] or ['LAYER', 'REGION'].
+    layers : list of str, optional
+        Only include these layers.
+    operators : DataFrame, optional
+        Operator table of the cube. If given, N_OPERATORS is recounted
+        exactly at the `by` level; otherwise it is dropped, since it can't be
+        summed.
+    coverage_pct : bool, optional (default False)
+        Add a PCT_<ATTRIBUTE> column (percent of features with a value) for
+        each HAS_<ATTRIBUTE> column.
+
+    Returns
+    -------
+    summary : DataFrame
+        One row per unique value of `by`.
+    """
+    if layers is not None:
+        cube = cube[cube.LAYER.isin(layers)]
+    metrics = [c for c in cube.columns
+               if c not in ['LAYER', 'N_OPERATORS'] + DIMENSIONS]
+    summary = cube.groupby(by)[metrics].sum()
+    if operators is not None:
+        if layers is not None:
+            operators = operators[operators.LAYER.isin(layers)]
+        n_ops = operators.drop_duplicates(by + ['OPERATOR']).groupby(by).size()
+        summary['N_OPERATORS'] = n_ops.reindex(summary.index).fillna(0).astype(np.int64)
+    if coverage_pct:
+        for col in [c for c in metrics if c.startswith('HAS_')]:
+            summary['PCT_' + col[4:]] = 100 * summary[col] / summary.FEATURE_COUNT
+    return summary.reset_index()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Bulk extraction of OGIM layers to MethaneSAT target areas.
+
+Cutting OGIM down to target areas used to mean one `gpd.clip` call per
+target and layer, i.e. hundreds of scans of a multi-million-feature wells
+layer. Here each layer is read once, and all of its features are assigned
+to all targets with a single bulk spatial-index query (an STRtree over the
+target polygons). Point features are simply kept in every target they fall
+in. Line and polygon features are only clipped where they actually cross a
+target boundary; features entirely inside a target are kept as they are.
+The per-target subsets of a layer are then written on several threads, one
+GeoPackage per target, with one layer per OGIM layer.
+
+A feature that lies in several (overlapping) targets is written to each of
+them.
+
+Example usage
+---
+    targets = gpd.read_file('MethaneSAT_targets_v20220423.shp')
+    summary = extract_targets('OGIM_v2.7.gpkg', targets, target_id='id',
+                              out_dir='target_extracts', n_workers=8)
+
+@author: maobrien
+"""
+import os
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+
+def list_layers(gpkg_path):
+    """Return the layer names of a GeoPackage."""
+    try:
+        import pyogrio
+        return [str(name) for name in pyogrio.list_layers(gpkg_path)[:, 0]]
+    except ImportError:
+        import fiona
+        return fiona.listlayers(gpkg_path)
+
+
+def layer_columns(gpkg_path, layer):
+    """Return the attribute column names of a layer, without reading its features."""
+    try:
+        import pyogrio
+        return list(pyogrio.read_info(gpkg_path, layer=layer)['fields'])
+    except ImportError:
+        return [c for c in gpd.read_file(gpkg_path, layer=layer, rows=0).columns if c != 'geometry']
+
+
+# =============================================================================
+# Assigning features to targets
+# =============================================================================
+def assign_to_targets(gdf, targets, target_id, clip=True):
+    """Assign each feature of a layer to every target it intersects.
+
+    Parameters
+    ----------
+    gdf : GeoDataFrame
+        Features of one layer.
+    targets : GeoDataFrame
+        Target polygons; reprojected to the CRS of `gdf` if needed.
+    target_id : str
+        Column of `targets` with the target ID.
+    clip : bool, optional (default True)
+        Clip line and polygon features to the target boundary, where they
+        cross it. If False, features are kept whole.
+
+    Returns
+    -------
+    assigned : GeoDataFrame
+        One row per (feature, target) pair, with the columns of `gdf` and
+        `target_id`. Its index is the position of the feature in `gdf`.
+    """
+    if targets.crs is not None and gdf.crs is not None and targets.crs != gdf.crs:
+        targets = targets.to_crs(gdf.crs)
+    target_geoms = targets.geometry.to_numpy()
+
+    # One bulk query: every (feature, target) pair whose geometries intersect
+    feat_idx, tgt_idx = targets.sindex.query(gdf.geometry.to_numpy(), predicate='intersects')
+    order = np.lexsort((tgt_idx, feat_idx))
+    feat_idx, tgt_idx = feat_idx[order], tgt_idx[order]
+
+    assigned = gdf.iloc[feat_idx].copy()
+    assigned.index = feat_idx
+    assigned[target_id] = targets[target_id].to_numpy()[tgt_idx]
+
+    if clip and len(assigned):
+        geoms = assigned.geometry.to_numpy()
+        areas = target_geoms[tgt_idx]
+        # Only features that aren't entirely inside the target are clipped
+        to_clip = ~shapely.is_missing(geoms) & (shapely.get_dimensions(geoms) > 0)
+        to_clip[to_clip] = ~shapely.covered_by(geoms[to_clip], areas[to_clip])
+        if to_clip.any():
+            geoms = geoms.copy()
+            geoms[to_clip] = shapely.intersection(geoms[to_clip], areas[to_clip])
+            assigned[assigned.geometry.name] = gpd.GeoSeries(geoms, index=assigned.index,
+                                                             crs=gdf.crs)
+            # Drop slivers where the features only touch the boundary
+            assigned = assigned[~shapely.is_empty(geoms)
+                                & (shapely.get_dimensions(geoms) >= shapely.get_dimensions(
+                                    gdf.geometry.to_numpy()[feat_idx]))]
+    return assigned
+
+
+# =============================================================================
+# Writing per-target outputs
+# =============================================================================
+def _target_path(out_dir, target, prefix):
+    return os.path.join(out_dir, f'{prefix}{target}.gpkg')
+
+
+def _write_target_layer(path, layer, features):
+    features.to_file(path, layer=layer, driver='GPKG')
+
+
+def extract_targets(gpkg_path,
+                    targets,
+                    target_id,
+                    out_dir,
+                    layers=None,
+                    clip=True,
+                    n_workers=4,
+                    prefix='target_',
+                    overwrite=True):
+    """Extract every layer of an OGIM GeoPackage to each target area.
+
+    Parameters
+    ----------
+    gpkg_path : str
+        Path to the OGIM GeoPackage.
+    targets : GeoDataFrame
+        Target polygons.
+    target_id : str
+        Column of `targets` with the target ID. Output files are named
+        '<prefix><target ID>.gpkg'.
+    out_dir : str
+        Folder for the per-target GeoPackages; created if needed.
+    layers : list of str, optional
+        Layers to extract. Default all layers of `gpkg_path`.
+    clip : bool, optional (default True)
+        Clip lines and polygons that cross a target boundary; see
+        `assign_to_targets`.
+    n_workers : int, optional (default 4)
+        Number of per-target files written at once.
+    prefix : str, optional (default 'target_')
+        File name prefix of the outputs.
+    overwrite : bool, optional (default True)
+        Delete existing output files of the targets first, so no layer of a
+        previous extraction is left behind.
+
+    Returns
+    -------
+    summary : DataFrame
+        Number of features written, with one row per target and one column
+        per layer.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    targets = targets[targets.geometry.notna()].reset_index(drop=True)
+    if targets[target_id].duplicated().any():
+        raise ValueError(f'Target IDs in column {target_id} are not unique')
+    if overwrite:
+        for target in targets[target_id]:
+            path = _target_path(out_dir, target, prefix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    counts = {}
+    for layer in (layers or list_layers(gpkg_path)):
+        start = datetime.datetime.now()
+        gdf = gpd.read_file(gpkg_path, layer=layer)
+        assigned = assign_to_targets(gdf, targets, target_id, clip=clip)
+        groups = {t: g.drop(columns=target_id).reset_index(drop=True)
+                  for t, g in assigned.groupby(target_id, sort=False)}
+
+        # Each thread writes to a different target's file
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(lambda item: _write_target_layer(_target_path(out_dir, item[0], prefix),
+                                                           layer, item[1]),
+                          groups.items()))
+        counts[layer] = {t: len(g) for t, g in groups.items()}
+        print(f'{layer}: {len(gdf)} features, {len(assigned)} written to {len(groups)} targets '
+              f'in {datetime.datetime.now() - start}')
+
+    summary = pd.DataFrame(counts, index=pd.Index(targets[target_id], name=target_id))
+    return summary.fillna(0).astype(int)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Persistent, batched translation of source attributes.
+
+Translations are kept in a local SQLite database keyed by (source language,
+target language, phrase), so a phrase is only ever sent to a translation
+service once. `translate_values` looks up the unique values of a dataset in
+the cache and sends only the misses to the backend, in batches; after the
+first run, translating a dataset is a dictionary lookup over its unique
+values.
+
+Backends
+---
+A backend is any callable `backend(phrases, source, target)` that returns a
+list of translations, in order. Provided:
+    DictionaryBackend     a fixed {phrase: translation} dict (offline; the
+                          default). Phrases it doesn't know are left
+                          untranslated, and NOT cached.
+    GoogleCloudBackend    Google Cloud Translation API, Basic edition
+                          (`google-cloud-translate`), which costs money
+    GoogletransBackend    the unofficial `googletrans` library
+The online backends only connect when the first cache miss is sent, so a
+fully cached run needs neither the client libraries nor a network.
+
+Example usage
+---
+    backend = GoogleCloudBackend(api_key="C:\\Users\\...\\key.json")
+    mydict = translate_values(arg_wells.TIPO_POZO, source='es', target='en', backend=backend)
+    arg_wells = translate_columns(arg_wells, ['TIPO_POZO', 'ESTADO'], source='es',
+                                  target='en', backend=backend)
+
+@author: maobrien
+"""
+import os
+import sqlite3
+import datetime
+
+import pandas as pd
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.ogim', 'translation_cache.sqlite')
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+class DictionaryBackend(object):
+    """Offline backend that translates from a fixed dictionary."""
+
+    name = 'dictionary'
+
+    def __init__(self, mapping=None):
+        self.mapping = dict(mapping or {})
+
+    def __call__(self, phrases, source, target):
+        return [self.mapping.get(p) for p in phrases]
+
+
+class GoogleCloudBackend(object):
+    """Google Cloud Translation API (Basic edition) backend.
+
+    Parameters
+    ----------
+    api_key : str
+        Path to the Google service account key (JSON) on the user's machine.
+    """
+
+    name = 'google_cloud'
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.client = None
+
+    def __call__(self, phrases, source, target):
+        # The client is only created once there's something to translate
+        if self.client is None:
+            from google.cloud import translate_v2 as translate
+            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self.api_key
+            self.client = translate.Client()
+        results = self.client.translate(list(phrases),
+                                        target_language=target,
+                                        source_language=source)
+        return [r['translatedText'] for r in results]
+
+
+class GoogletransBackend(object):
+    """Backend using the `googletrans` library (no API key)."""
+
+    name = 'googletrans'
+
+    def __init__(self):
+        self.translator = None
+
+    def __call__(self, phrases, source, target):
+        if self.translator is None:
+            from googletrans import Translator
+            self.translator = Translator()
+        results = self.translator.translate(list(phrases), src=source or 'auto', dest=target)
+        return [r.text for r in results]
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+class TranslationCache(object):
+    """Local SQLite store of translations, keyed by (source, target, phrase).
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the SQLite file; created if it doesn't exist. Default is
+        DEFAULT_CACHE_PATH, in the user's home folder, so all scripts share
+        one cache.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS translations (
+                                 source TEXT NOT NULL,
+                                 target TEXT NOT NULL,
+                                 phrase TEXT NOT NULL,
+                                 translation TEXT NOT NULL,
+                                 backend TEXT,
+                                 created TEXT,
+                                 PRIMARY KEY (source, target, phrase))""")
+        self.conn.commit()
+
+    def get(self, phrases, source, target):
+        """Return {phrase: translation} for the phrases that are cached."""
+        source = source or 'auto'
+        found = {}
+        phrases = list(phrases)
+        # SQLite limits the number of parameters in one statement
+        for i in range(0, len(phrases), 900):
+            batch = phrases[i:i + 900]
+            marks = ', '.join('?' * len(batch))
+            rows = self.conn.execute(
+                f'SELECT phrase, translation FROM translations '
+                f'WHERE source = ? AND target = ? AND phrase IN ({marks})',
+                [source, target] + batch).fetchall()
+            found.update(rows)
+        return found
+
+    def put(self, pairs, source, target, backend=None):
+        """Store {phrase: translation} pairs, replacing existing ones."""
+        source = source or 'auto'
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)',
+            [(source, target, p, t, backend, now) for p, t in pairs.items()])
+        self.conn.commit()
+
+    def to_frame(self):
+        """Return the whole cache as a DataFrame, e.g. to review translations."""
+        return pd.read_sql('SELECT * FROM translations', self.conn)
+
+    def close(self):
+        self.conn.close()
+
+
+# =============================================================================
+# Translating
+# =============================================================================
+def translate_values(values, source, target='en', backend=None, cache=None,
+                     batch_size=100):
+    """Translate the unique values of a column (or any list of phrases).
+
+    Parameters
+    ----------
+    values : array-like
+        Phrases to translate; missing values and non-strings are skipped.
+    source : str or None
+        ISO 639-1 code of the source language ('es', 'fr', ...), or None to
+        let the backend detect it (cached under 'auto').
+    target : str, optional (default 'en')
+        ISO 639-1 code of the target language.
+    backend : callable, optional
+        Translation backend (see the module docstring). Default is an empty
+        DictionaryBackend, i.e. only cached translations are returned.
+    cache : TranslationCache or str, optional
+        Cache, or path of its SQLite file. Default is DEFAULT_CACHE_PATH.
+    batch_size : int, optional (default 100)
+        Number of phrases sent to the backend at once.
+
+    Returns
+    -------
+    translations : dict
+        {phrase: translation} for every phrase that could be translated.
+    """
+    if backend is None:
+        backend = DictionaryBackend()
+    own_cache = not isinstance(cache, TranslationCache)
+    if own_cache:
+        cache = TranslationCache(cache or DEFAULT_CACHE_PATH)
+
+    try:
+        phrases = [p for p in pd.unique(pd.Series(values, dtype=object).dropna())
+                   if isinstance(p, str) and p.strip()]
+        out = cache.get(phrases, source, target)
+        misses = [p for p in phrases if p not in out]
+        print(f'{len(phrases)} unique phrases: {len(out)} cached, {len(misses)} to translate')
+
+        for i in range(0, len(misses), batch_size):
+            batch = misses[i:i + batch_size]
+            new = {p: t for p, t in zip(batch, backend(batch, source, target)) if t is not None}
+            cache.put(new, source, target, getattr(backend, 'name', type(backend).__name__))
+            out.update(new)
+    finally:
+        if own_cache:
+            cache.close()
+    return out
+
+
+def translate_columns(df, columns, source, target='en', backend=None, cache=None,
+                      batch_size=100):
+    """Return a copy of `df` with the values of `columns` translated.
+
+    All columns are translated with one call to `translate_values`, so a
+    phrase that appears in several columns is translated once. Values
+    without a translation are left as they are.
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    values = pd.concat([df[c] for c in columns], ignore_index=True)
+    mapping = translate_values(values, source, target, backend, cache, batch_size)
+    df = df.copy()
+    for col in columns:
+        df[col] = df[col].map(mapping).fillna(df[col])
+    return df
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Vectorized parsing, validation and integer keys for well and lease identifiers.
+
+Every production script normalizes its identifiers differently (API numbers
+truncated with `.str[:-4]`, Oklahoma PUNs joined with `agg('-'.join, axis=1)`,
+Texas lease + district strings, ...), and large production-to-well merges
+then join on Python strings. The functions here parse each identifier
+format with vectorized string operations, flag invalid values, and encode
+identifiers as packed integer keys (pandas nullable 'Int64'; invalid or
+missing identifiers are <NA>), so merges, groupbys and duplicate checks run
+on integers. Each key can be formatted back to the usual string.
+
+Supported formats
+---
+    API     US API-10 / API-12 / API-14, with or without dashes, including
+            numbers stored as integers that lost the leading zero of the
+            state code (e.g. California '4029...' for '04029...')
+    PUN     Oklahoma Production Unit Number, 'CCC-LLLLLL-S-MMMM'
+    Texas   RRC lease number + district (+ oil or gas lease), e.g. '012345-08'
+    UWI     Canadian Dominion Land Survey UWI, e.g. '100/06-12-045-23W4/00'
+
+Example usage
+---
+    wells['API10_KEY'] = api_key(wells.FAC_ID, length=10)
+    prod['API10_KEY'] = api_key(prod.Api, length=10)
+    merged = prod.merge(wells, on='API10_KEY', how='left')
+
+@author: maobrien
+"""
+import numpy as np
+import pandas as pd
+
+MAX_KEY_DIGITS = 18  # largest number of decimal digits that always fits in int64
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+def _as_string(values):
+    """Return `values` as a pandas 'string' Series; whole floats lose their '.0'."""
+    s = pd.Series(values)
+    if pd.api.types.is_float_dtype(s):
+        whole = s.notna() & (s == s.round())
+        out = pd.Series(pd.NA, index=s.index, dtype='string')
+        out[whole] = s[whole].astype('int64').astype('string')
+        return out
+    return s.astype('string').str.strip()
+
+
+def _digits_to_key(digits, valid):
+    """Convert digit strings to an Int64 Series; entries where `valid` is False are <NA>."""
+    valid = np.asarray(valid, dtype=bool)
+    keys = np.zeros(len(digits), dtype=np.int64)
+    if valid.any():
+        keys[valid] = digits[valid].to_numpy(dtype=str).astype(np.int64)
+    return pd.Series(pd.arrays.IntegerArray(keys, ~valid), index=digits.index)
+
+
+def _int_component(values):
+    """Return a column of identifier parts (e.g. '007', 7, 7.0) as Int64; non-digits are <NA>."""
+    s = _as_string(values)
+    ok = s.str.fullmatch(r'\d{1,18}').fillna(False).to_numpy(dtype=bool)
+    return _digits_to_key(s.fillna('0'), ok)
+
+
+def composite_key(df, columns, widths):
+    """Pack several integer identifier parts into one Int64 key.
+
+    Parameters
+    ----------
+    df : DataFrame
+    columns : list of str
+        Columns holding the parts, most significant first. Parts can be
+        integers or digit strings (with or without leading zeros).
+    widths : list of int
+        Number of decimal digits reserved for each part. Their total may
+        not exceed 18.
+
+    Returns
+    -------
+    keys : Series of Int64
+        <NA> where any part is missing, not a whole number, or wider than
+        its width.
+    """
+    if sum(widths) > MAX_KEY_DIGITS:
+        raise ValueError(f'Total width {sum(widths)} exceeds {MAX_KEY_DIGITS} digits')
+    key = pd.Series(0, index=df.index, dtype='Int64')
+    for col, width in zip(columns, widths):
+        part = _int_component(df[col])
+        part = part.where((part < 10 ** width).fillna(False))
+        key = key * (10 ** width) + part
+    return key
+
+
+def hash_key(df, columns):
+    """Vectorized int64 hash of the values in `columns`, one per row.
+
+    A stable replacement for `df[columns].apply(lambda x: hash(tuple(x)), axis=1)`:
+    the same values always give the same key, across runs and processes.
+    """
+    hashed = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return pd.Series(hashed.view(np.int64), index=df.index)
+
+
+# =============================================================================
+# US API numbers
+# =============================================================================
+def api_digits(values):
+    """Return the 10, 12 or 14 digits of API numbers as strings; invalid values are <NA>.
+
+    Separators are removed, and a leading zero is restored when an odd
+    number of digits (9, 11 or 13) was given. Numbers read as floats, and
+    their '.0' string form (e.g. '4212345678.0', from `.astype(str)` on a
+    float column), keep only their integer digits. An API is invalid if it
+    doesn't have 10, 12 or 14 digits, or if its state or county code is 0.
+    """
+    digits = (_as_string(values)
+              .str.replace(r'\.0+$', '', regex=True)
+              .str.replace(r'\D', '', regex=True))
+    odd = digits.str.len().isin([9, 11, 13]).fillna(False)
+    digits = digits.where(~odd, '0' + digits)
+    valid = (digits.str.len().isin([10, 12, 14]).fillna(False)
+             & (digits.str[:2] != '00').fillna(False)
+             & (digits.str[2:5] != '000').fillna(False))
+    return digits.where(valid)
+
+
+def validate_api(values):
+    """Return a boolean Series, True where `values` are valid API numbers."""
+    return api_digits(values).notna()
+
+
+def normalize_api(values, length=10, dashes=False):
+    """Return API numbers as strings of a given length.
+
+    Parameters
+    ----------
+    values : array-like
+        API numbers in any format (strings, integers or whole floats).
+    length : int, optional (default 10)
+        10, 12 or 14. Longer APIs are truncated (e.g. API-14 to API-10);
+        shorter ones are padded with '0' sidetrack / event codes.
+    dashes : bool, optional (default False)
+        Format as 'SS-CCC-WWWWW[-SS[-EE]]' instead of plain digits.
+
+    Returns
+    -------
+    apis : Series of string
+        <NA> where the input isn't a valid API.
+    """
+    if length not in (10, 12, 14):
+        raise ValueError('length must be 10, 12 or 14')
+    digits = api_digits(values).str.pad(length, side='right', fillchar='0').str[:length]
+    if not dashes:
+        return digits
+    out = digits.str[:2] + '-' + digits.str[2:5] + '-' + digits.str[5:10]
+    if length >= 12:
+        out = out + '-' + digits.str[10:12]
+    if length == 14:
+        out = out + '-' + digits.str[12:14]
+    return out
+
+
+def api_key(values, length=10):
+    """Return API numbers as Int64 keys of their first `length` digits (see `normalize_api`)."""
+    digits = normalize_api(values, length=length)
+    return _digits_to_key(digits.fillna('0'), digits.notna().to_numpy())
+
+
+# =============================================================================
+# Oklahoma Production Unit Numbers
+# =============================================================================
+PUN_WIDTHS = [3, 6, 1, 4]  # county, lease, sub-account, merge
+
+
+def pun_key(df, county_num, lease_num, sub_num, merge_num):
+    """Return Oklahoma PUNs as Int64 keys, from their four component columns."""
+    return composite_key(df, [county_num, lease_num, sub_num, merge_num], PUN_WIDTHS)
+
+
+def format_pun(keys):
+    """Format PUN keys as 'CCC-LLLLLL-S-MMMM' strings (<NA> stays <NA>)."""
+    s = pd.Series(keys).astype('Int64').astype('string').str.zfill(14)
+    return s.str[:3] + '-' + s.str[3:9] + '-' + s.str[9:10] + '-' + s.str[10:14]
+
+
+# =============================================================================
+# Texas RRC lease + district
+# =============================================================================
+# Oil and gas leases are numbered separately (oil leases have 5 digits, gas
+# leases 6), so the key records which kind of lease it is:
+#     district (2 digits) | gas flag (1 digit) | lease number (6 digits)
+def texas_lease_key(df, lease_no, district_no, oil_gas=None):
+    """Return Texas lease + district identifiers as Int64 keys.
+
+    Parameters
+    ----------
+    df : DataFrame
+    lease_no, district_no : str
+        Lease number and (numeric) district number columns.
+    oil_gas : str, optional
+        Column with 'O' (oil lease) or 'G' (gas lease). If not given, the
+        kind of lease is taken from the number of digits of `lease_no`
+        (6 digits = gas), as in the RRC's zero-padded lease numbers.
+    """
+    if oil_gas is not None:
+        gas = (df[oil_gas].astype('string').str.strip() == 'G').fillna(False)
+    else:
+        gas = (_as_string(df[lease_no]).str.len() == 6).fillna(False)
+    parts = pd.DataFrame({'district': df[district_no],
+                          'gas': gas.astype(int).to_numpy(),
+                          'lease': df[lease_no]}, index=df.index)
+    return composite_key(parts, ['district', 'gas', 'lease'], [2, 1, 6])
+
+
+def parse_texas_lease_id(ids):
+    """Return Int64 keys from 'LLLLL-DD' (oil) or 'LLLLLL-DD' (gas) strings."""
+    parts = _as_string(ids).str.extract(r'^(?P<lease>\d{5,6})-(?P<district>\d{1,2})$')
+    return texas_lease_key(parts, 'lease', 'district')
+
+
+def format_texas_lease(keys):
+    """Format Texas lease keys as 'LLLLL-DD' (oil) or 'LLLLLL-DD' (gas) strings."""
+    s = pd.Series(keys).astype('Int64').astype('string').str.zfill(9)
+    gas = s.str[2] == '1'
+    lease = s.str[3:].where(gas, s.str[4:])
+    return lease + '-' + s.str[:2]
+
+
+# =============================================================================
+# Canadian Unique Well Identifiers (Dominion Land Survey)
+# =============================================================================
+_UWI_PATTERN = (r'^(?P<survey>1)(?P<le>\d{2})(?P<lsd>\d{2})(?P<sec>\d{2})'
+                r'(?P<twp>\d{3})(?P<rge>\d{2})W(?P<mer>\d)(?P<event>\d{1,2})$')
+_UWI_PARTS = ['survey', 'le', 'lsd', 'sec', 'twp', 'rge', 'mer', 'event']
+_UWI_WIDTHS = [1, 2, 2, 2, 3, 2, 1, 2]
+
+
+def parse_uwi(values):
+    """Split DLS UWIs ('100/06-12-045-23W4/00', '100061204523W400') into their parts.
+
+    Returns a DataFrame of string columns survey, le (location exception),
+    lsd, sec, twp, rge, mer and event; all <NA> for values that aren't DLS
+    UWIs (e.g. NTS UWIs of north-east British Columbia).
+    """
+    compact = _as_string(values).str.upper().str.replace(r'[\s/\-]', '', regex=True)
+    return compact.str.extract(_UWI_PATTERN)
+
+
+def uwi_key(values):
+    """Return DLS UWIs as Int64 keys; other values are <NA>."""
+    return composite_key(parse_uwi(values), _UWI_PARTS, _UWI_WIDTHS)
+
+
+def format_uwi(keys):
+    """Format UWI keys as '1LE/LS-SC-TWP-RGWM/EV' strings."""
+    s = pd.Series(keys).astype('Int64').astype('string').str.zfill(15)
+    return (s.str[0:3] + '/' + s.str[3:5] + '-' + s.str[5:7] + '-' + s.str[7:10]
+            + '-' + s.str[10:12] + 'W' + s.str[12] + '/' + s.str[13:15])
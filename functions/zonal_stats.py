@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 2026
+
+Windowed zonal statistics of rasters (e.g. MethaneSAT flux GeoTIFFs made by
+`convert_netcdf_to_geotiff`) over OGIM features: basins, wells2sites site
+buffers, gridify cells.
+
+The raster is never read whole. Features are grouped into batches of
+features that lie close together (by the raster block their bounding box
+centre falls in). Each batch reads only the raster window that covers its
+features' bounding boxes, and rasterizes all of its features at once, as a
+raster of feature IDs, on that window. Features of a batch that overlap each
+other can't share one ID raster, so they are spread over a few layers of
+non-overlapping features, each rasterized once. The statistics are then
+computed for all features of the batch at once with `np.bincount`. Batches
+are processed on several processes.
+
+Unweighted statistics use the pixels whose centre is in a feature (or all
+pixels touched by it, with all_touched=True). Coverage-weighted statistics
+weight each pixel by the fraction of it covered by the feature, estimated by
+rasterizing on a `supersample` x `supersample` finer grid; they also count
+features smaller than a pixel.
+
+Example usage
+---
+    basins = gpd.read_file('OGIM_v2.7.gpkg', layer='Oil_Natural_Gas_Basins')
+    flux = zonal_stats(basins, 'AMU_DARYA_area_weighted_flux_066.tif',
+                       stats=['sum', 'mean', 'max', 'weighted_sum', 'coverage'])
+    basins = basins.join(flux)
+
+@author: maobrien
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import shapely
+import rasterio
+from rasterio.features import rasterize
+from rasterio.transform import Affine
+from rasterio.windows import Window
+
+STATS = ['count', 'sum', 'mean', 'min', 'max', 'weighted_sum', 'weighted_mean', 'coverage']
+WEIGHTED_STATS = ['weighted_sum', 'weighted_mean', 'coverage']
+
+
+# =============================================================================
+# Batching
+# =============================================================================
+def _batches(bounds, transform, window_size, batch_size):
+    """Split feature positions into batches of nearby features."""
+    cols, rows = ~transform * ((bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2)
+    cell = pd.DataFrame({'r': np.floor(rows / window_size), 'c': np.floor(cols / window_size)})
+    batches = []
+    for _, positions in cell.groupby(['r', 'c'], sort=True).indices.items():
+        for start in range(0, len(positions), batch_size):
+            batches.append(positions[start:start + batch_size])
+    return batches
+
+
+def _window(bounds, transform, width, height):
+    """Pixel window covering `bounds` (north-up raster), clipped to the raster."""
+    col0 = int(np.floor((bounds[:, 0].min() - transform.c) / transform.a))
+    col1 = int(np.ceil((bounds[:, 2].max() - transform.c) / transform.a))
+    row0 = int(np.floor((bounds[:, 3].max() - transform.f) / transform.e))
+    row1 = int(np.ceil((bounds[:, 1].min() - transform.f) / transform.e))
+    col0, row0 = max(col0, 0), max(row0, 0)
+    col1, row1 = min(col1, width), min(row1, height)
+    if col1 <= col0 or row1 <= row0:
+        return None
+    return Window(col0, row0, col1 - col0, row1 - row0)
+
+
+def _overlap_layers(geoms, all_touched):
+    """Layer number of each geometry, so that geometries of a layer don't overlap."""
+    layer = np.zeros(len(geoms), dtype=int)
+    i, j = shapely.STRtree(geoms).query(geoms, predicate='intersects')
+    keep = i < j
+    i, j = i[keep], j[keep]
+    if not all_touched:
+        # Polygons that only share an edge (e.g. grid cells) claim different pixel centres
+        apart = shapely.touches(geoms[i], geoms[j])
+        i, j = i[~apart], j[~apart]
+    if not len(i):
+        return layer
+
+    # Greedy colouring of the features that overlap others
+    neighbours = pd.Series(i).groupby(j).agg(list)
+    for node, earlier in neighbours.items():
+        used = set(layer[earlier])
+        layer[node] = next(n for n in range(len(used) + 1) if n not in used)
+    return layer
+
+
+# =============================================================================
+# Statistics of one batch
+# =============================================================================
+def _batch_stats(raster_path, band, wkb, window, stats, all_touched, supersample):
+    geoms = shapely.from_wkb(wkb)
+    n = len(geoms)
+    result = pd.DataFrame(index=range(n), columns=stats, dtype=float)
+
+    with rasterio.open(raster_path) as src:
+        data = src.read(band, window=window, masked=True)
+        transform = src.window_transform(window)
+    values = data.filled(np.nan).astype(np.float64)
+    valid = ~np.ma.getmaskarray(data) & ~np.isnan(values)
+    h, w = values.shape
+
+    layers = _overlap_layers(geoms, all_touched)
+    count, total = np.zeros(n), np.zeros(n)
+    low, high = np.full(n, np.inf), np.full(n, -np.inf)
+    w_total, covered = np.zeros(n), np.zeros(n)
+    for layer in np.unique(layers):
+        members = np.flatnonzero(layers == layer)
+        shapes = list(zip(geoms[members], members + 1))
+
+        if set(stats) - set(WEIGHTED_STATS):
+            ids = rasterize(shapes, out_shape=(h, w), transform=transform, fill=0,
+                            all_touched=all_touched, dtype='int32')
+            sel = (ids > 0) & valid
+            k, v = ids[sel] - 1, values[sel]
+            count += np.bincount(k, minlength=n)
+            total += np.bincount(k, weights=v, minlength=n)
+            np.minimum.at(low, k, v)
+            np.maximum.at(high, k, v)
+
+        if set(stats) & set(WEIGHTED_STATS):
+            s = supersample
+            fine = rasterize(shapes, out_shape=(h * s, w * s), transform=transform * Affine.scale(1 / s),
+                             fill=0, dtype='int32')
+            r, c = np.nonzero(fine)
+            key = (fine[r, c] - 1).astype(np.int64) * (h * w) + (r // s) * w + c // s
+            key, sub_pixels = np.unique(key, return_counts=True)
+            k, pixel = key // (h * w), key % (h * w)
+            frac = sub_pixels / s ** 2
+            ok = valid.ravel()[pixel]
+            w_total += np.bincount(k[ok], weights=values.ravel()[pixel[ok]] * frac[ok], minlength=n)
+            covered += np.bincount(k[ok], weights=frac[ok], minlength=n)
+
+    hit = count > 0
+    for stat, column in (('count', count), ('sum', total), ('mean', total / np.where(hit, count, 1)),
+                         ('min', low), ('max', high)):
+        if stat in stats:
+            result[stat] = column if stat in ('count', 'sum') else np.where(hit, column, np.nan)
+    if 'weighted_sum' in stats:
+        result['weighted_sum'] = w_total
+    if 'weighted_mean' in stats:
+        result['weighted_mean'] = np.where(covered > 0, w_total / np.where(covered > 0, covered, 1), np.nan)
+    if 'coverage' in stats:
+        # Fraction of the feature's area covered by valid pixels (NaN for points and lines)
+        area = shapely.area(geoms)
+        pixel_area = abs(transform.a * transform.e)
+        result['coverage'] = np.where(area > 0, covered * pixel_area / np.where(area > 0, area, 1), np.nan)
+    return result
+
+
+# =============================================================================
+# Zonal statistics
+# =============================================================================
+def zonal_stats(features,
+                raster_path,
+                stats=('count', 'sum', 'mean', 'max'),
+                band=1,
+                all_touched=False,
+                supersample=4,
+                window_size=1024,
+                batch_size=10000,
+                n_workers=4):
+    """Statistics of a raster band over each feature of a layer.
+
+    Parameters
+    ----------
+    features : GeoDataFrame
+        Polygons (or points and lines) to summarize the raster over; they
+        are reprojected to the CRS of the raster if needed.
+    raster_path : str
+        Path to the raster; must be north up (as the GeoTIFFs of
+        `convert_netcdf_to_geotiff` are).
+    stats : list of str, optional (default ['count', 'sum', 'mean', 'max'])
+        Any of STATS:
+        'count', 'sum', 'mean', 'min', 'max' of the valid pixels in the feature;
+        'weighted_sum', 'weighted_mean' of the valid pixels weighted by the
+        fraction of them covered by the feature;
+        'coverage', the fraction of the feature's area covered by valid pixels.
+    band : int, optional (default 1)
+        Band of the raster.
+    all_touched : bool, optional (default False)
+        Unweighted statistics use all pixels touched by a feature, instead of
+        the pixels whose centre is in it.
+    supersample : int, optional (default 4)
+        Subdivisions per pixel side to estimate pixel coverage with.
+    window_size : int, optional (default 1024)
+        Size in pixels of the blocks features are batched by.
+    batch_size : int, optional (default 10000)
+        Maximum number of features per batch.
+    n_workers : int, optional (default 4)
+        Number of processes; 1 to run in this process.
+
+    Returns
+    -------
+    result : DataFrame
+        One column per statistic, with the index of `features`. Features
+        outside the raster, empty or missing geometries, and features
+        without valid pixels get NaN (and a count of 0).
+
+    Note: on Windows, call this under `if __name__ == '__main__':` when
+    n_workers > 1.
+    """
+    stats = list(stats)
+    unknown = set(stats) - set(STATS)
+    if unknown:
+        raise ValueError(f'Unknown statistics {sorted(unknown)}; choose from {STATS}')
+
+    with rasterio.open(raster_path) as src:
+        crs, transform, width, height = src.crs, src.transform, src.width, src.height
+    if transform.b != 0 or transform.d != 0 or transform.e >= 0:
+        raise ValueError(f'{raster_path} is not a north-up raster')
+
+    geoms = features.geometry
+    if crs is not None and geoms.crs is not None and geoms.crs != crs:
+        geoms = geoms.to_crs(crs)
+    geoms = geoms.to_numpy()
+    present = np.flatnonzero(~shapely.is_missing(geoms) & ~shapely.is_empty(geoms))
+    bounds = shapely.bounds(geoms[present])
+
+    tasks = []
+    for batch in _batches(bounds, transform, window_size, batch_size):
+        window = _window(bounds[batch], transform, width, height)
+        if window is not None:
+            tasks.append((present[batch], (raster_path, band, shapely.to_wkb(geoms[present[batch]]),
+                                           window, stats, all_touched, supersample)))
+    print(f'{len(features)} features in {len(tasks)} batches')
+
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_batch_stats, *zip(*[args for _, args in tasks])))
+    else:
+        results = [_batch_stats(*args) for _, args in tasks]
+
+    result = pd.DataFrame(np.nan, index=range(len(features)), columns=stats)
+    for (positions, _), batch_result in zip(tasks, results):
+        result.iloc[positions] = batch_result.to_numpy()
+    if 'count' in stats:
+        result['count'] = result['count'].fillna(0).astype(int)
+    result.index = features.index
+    return result
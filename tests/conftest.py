@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Test configuration: make the modules of our `functions` folder importable,
+the same way the integration scripts do by changing into that folder.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'functions'))
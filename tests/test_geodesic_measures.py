@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of geodesic_measures.
+"""
+import geopandas as gpd
+import numpy as np
+import pytest
+from shapely.geometry import MultiPolygon, Polygon, box
+
+from geodesic_measures import GEOD, polygon_areas_km2
+
+
+@pytest.fixture
+def polygons():
+    # A large triangle (long edges, far from meridians and parallels), a
+    # polygon with a hole, a multipolygon, a null geometry and a box across
+    # the antimeridian
+    return gpd.GeoSeries([Polygon([(-100, 10), (-60, 50), (-20, 15)]),
+                          Polygon(box(0, 0, 10, 10).exterior, [box(2, 2, 4, 4).exterior.coords]),
+                          MultiPolygon([box(20, 60, 25, 65), box(30, 60, 35, 62)]),
+                          None,
+                          Polygon([(179, 0), (-179, 0), (-179, 1), (179, 1)])],
+                         crs=4326, index=[5, 6, 7, 8, 9])
+
+
+def test_geodesic_matches_pyproj(polygons):
+    areas = polygon_areas_km2(polygons, chunk_size=2, n_workers=2)
+    assert list(areas.index) == [5, 6, 7, 8, 9]
+    assert np.isnan(areas[8])
+    for i in [5, 6, 7]:
+        expected = abs(GEOD.geometry_area_perimeter(polygons[i])[0]) / 1e6
+        assert areas[i] == pytest.approx(expected, rel=1e-9)
+    # Two by one degree at the equator, not the whole globe minus that
+    expected = abs(GEOD.polygon_area_perimeter([179, 181, 181, 179], [0, 0, 1, 1])[0]) / 1e6
+    assert areas[9] == pytest.approx(expected, rel=1e-9)
+
+
+def test_authalic_approximation(polygons):
+    geodesic = polygon_areas_km2(polygons)
+    authalic = polygon_areas_km2(polygons, method='authalic')
+    # Close for the boxes, off for the triangle with long edges
+    assert authalic[6] == pytest.approx(geodesic[6], rel=1e-2)
+    assert authalic[9] == pytest.approx(geodesic[9], rel=1e-3)
+    assert authalic[5] != pytest.approx(geodesic[5], rel=1e-3)
+
+
+def test_unknown_method(polygons):
+    with pytest.raises(ValueError):
+        polygon_areas_km2(polygons, method='planar')
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of operator_names.
+"""
+import pandas as pd
+
+from operator_names import OperatorCache, canonicalize_operators, operator_key, similar_key_pairs
+
+
+def test_operator_key_keeps_numbers():
+    keys = operator_key(['Smith Oil Company 1', 'SMITH OIL CO. 2', 'XTO Energy, Inc.', 'N/A'])
+    assert keys.tolist()[:3] == ['SMITH OIL COMPANY 1', 'SMITH OIL CO 2', 'XTO ENERGY']
+    assert pd.isna(keys[3])
+
+
+def test_numbered_names_not_matched():
+    keys = ['SMITH OIL COMPANY 1', 'SMITH OIL COMPANY 2', 'SMITH OIL COMPANY 3',
+            'SMITHH OIL COMPANY 1']
+    pairs = similar_key_pairs(keys, threshold=0.5)
+    assert set(zip(pairs.i, pairs.j)) == {(0, 3)}
+
+
+def test_canonicalize_counts_only_real_names(tmp_path, capsys):
+    cache = OperatorCache(str(tmp_path / 'operators.sqlite'))
+    names = pd.Series(['SMITH OIL COMPANY 1', 'SMITH OIL COMPANY 2', 'N/A', 'N/A', None])
+    canonical = canonicalize_operators(names, cache=cache)
+    assert canonical[:3].tolist() == ['SMITH OIL COMPANY 1', 'SMITH OIL COMPANY 2', 'N/A']
+    assert '2 distinct operator names: 0 cached, 2 new' in capsys.readouterr().out
+
+    canonicalize_operators(names, cache=cache)
+    assert '2 distinct operator names: 2 cached, 0 new' in capsys.readouterr().out
+    cache.close()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of pipeline_attribution.
+"""
+import geopandas as gpd
+import numpy as np
+import pytest
+from shapely.geometry import LineString, box
+
+from geodesic_measures import line_lengths_km
+from pipeline_attribution import pipeline_km_by_unit
+
+
+@pytest.fixture
+def units():
+    return gpd.GeoDataFrame({'COUNTRY': ['A', 'B']},
+                            geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1)], crs=4326)
+
+
+@pytest.fixture
+def pipes():
+    # Crosses from A into B and ends outside both; lies inside A
+    return gpd.GeoDataFrame({'NAME': ['crossing', 'inside']},
+                            geometry=[LineString([(0.5, 0.5), (2.5, 0.5)]),
+                                      LineString([(0.2, 0.2), (0.2, 0.8)])],
+                            crs=4326, index=[10, 20])
+
+
+def test_pipeline_km_by_unit(pipes, units):
+    table, pieces = pipeline_km_by_unit(pipes, units, unit_cols=['COUNTRY'], return_pieces=True)
+    km = table.set_index('COUNTRY').PIPELINE_KM
+
+    assert set(km.index) == {'A', 'B', 'N/A'}
+    assert km.sum() == pytest.approx(line_lengths_km(pipes.geometry).sum())
+    # Half a degree of the crossing pipeline and all of the inside one are in A
+    half_degree = line_lengths_km(gpd.GeoSeries([LineString([(0.5, 0.5), (1, 0.5)])], crs=4326))[0]
+    inside = line_lengths_km(pipes.geometry)[20]
+    assert km['A'] == pytest.approx(half_degree + inside)
+    assert km['B'] == pytest.approx(2 * half_degree, rel=1e-3)
+    assert km['N/A'] == pytest.approx(half_degree, rel=1e-3)
+    # Pieces are labelled with the index of `pipes`
+    assert set(pieces['pipe']) == {10, 20}
+
+
+def test_pipeline_km_by_unit_no_pipelines(units):
+    empty = gpd.GeoDataFrame({'NAME': []}, geometry=gpd.GeoSeries([], crs=4326), crs=4326)
+    table = pipeline_km_by_unit(empty, units, unit_cols=['COUNTRY'])
+    assert len(table) == 0
+    assert np.isclose(table.PIPELINE_KM.sum(), 0)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of summary_cube.
+"""
+import numpy as np
+import pandas as pd
+
+from summary_cube import has_value, summarize_layer
+
+
+def test_has_value_datetime():
+    dates = pd.Series(pd.to_datetime(['2020-05-01', '1900-01-01', None]))
+    assert has_value(dates).tolist() == [True, False, False]
+    assert has_value(dates.dt.tz_localize('UTC')).tolist() == [True, False, False]
+
+
+def test_has_value_strings_and_numbers():
+    assert has_value(pd.Series(['A', 'N/A', None, '1900-01-01'])).tolist() == [True, False, False, False]
+    assert has_value(pd.Series([1.5, -999, np.nan])).tolist() == [True, False, False]
+
+
+def test_summarize_layer_date_coverage():
+    df = pd.DataFrame({'COUNTRY': ['A', 'A', 'B'],
+                       'SRC_DATE': pd.to_datetime(['2021-01-01', '1900-01-01', '2022-03-04']),
+                       'OPERATOR': ['X', 'N/A', 'Y']})
+    cube, operators = summarize_layer(df, 'Wells', dims=['COUNTRY'])
+    cube = cube.set_index('COUNTRY')
+    assert cube.loc['A', 'FEATURE_COUNT'] == 2
+    assert cube.loc['A', 'HAS_SRC_DATE'] == 1
+    assert cube.loc['B', 'HAS_SRC_DATE'] == 1
+    assert cube.loc['A', 'N_OPERATORS'] == 1
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of well_identifiers.
+"""
+import numpy as np
+import pandas as pd
+
+from well_identifiers import api_key, normalize_api
+
+
+def test_normalize_api_float_forms():
+    # The same Texas API-10 as a string, a float, its `.astype(str)` form,
+    # with dashes, and as an API-14
+    values = pd.Series(['4212345678', 4212345678.0, '4212345678.0', '42-123-45678',
+                        '42123456780000'], dtype=object)
+    assert normalize_api(values).tolist() == ['4212345678'] * 5
+    assert normalize_api(pd.Series([4212345678.0, np.nan])).tolist()[0] == '4212345678'
+
+
+def test_normalize_api_lost_leading_zero():
+    # California API-12 stored as an integer
+    assert normalize_api(pd.Series([40291234500])).tolist() == ['0402912345']
+
+
+def test_api_key_invalid():
+    keys = api_key(pd.Series(['4212345678', '12345', 'N/A', '0012345678']))
+    assert keys[0] == 4212345678
+    assert keys[1:].isna().all()